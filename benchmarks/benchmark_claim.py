@@ -0,0 +1,194 @@
+"""
+Compares the jobs per second run by 1, 4 and 16 competing servers claiming
+the jobs with the scripted 'claim_job' against the claim of the original
+versions: each server scans the keys for an enqueued job, reads it, locks
+it with SETNX (losing the race when another server locked it first) and
+rewrites the job with its new status.
+
+Each server is a 'ServerService' with its own repository, running no-op
+jobs, so the numbers include the whole processing cycle of the servers and
+not only the claims.
+
+The benchmark flushes the Redis database used, so don't point it to a
+database holding real data.
+
+Usage:
+    python benchmarks/benchmark_claim.py --host 172.17.0.1 --jobs 1000
+    python benchmarks/benchmark_claim.py --fake
+    python benchmarks/benchmark_claim.py --memory
+    python benchmarks/benchmark_claim.py --sqlite /tmp/hangpy-benchmark.db
+    python benchmarks/benchmark_claim.py --journal /tmp/hangpy-benchmark
+"""
+
+import argparse
+import datetime
+import hangpy
+import os
+import redis
+import shutil
+import threading
+import time
+
+
+class JobCounter():
+    """Counts the jobs run by all the servers, signaling when all of them
+    ran."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.finished = threading.Event()
+        self.count = 0
+        self.target = 0
+
+    def reset(self, target: int):
+        with self.lock:
+            self.count = 0
+            self.target = target
+            self.finished.clear()
+
+    def increment(self):
+        with self.lock:
+            self.count += 1
+            if (self.count >= self.target):
+                self.finished.set()
+
+
+job_counter = JobCounter()
+
+
+class BenchmarkJob(hangpy.JobActivityBase):
+
+    def action(self):
+        job_counter.increment()
+
+
+class LegacyRedisJobRepository(hangpy.RedisJobRepository):
+    """The claim path of the RedisJobRepository of the versions up to 0.1.8
+    on top of the current storage: each claim scans the keys for a job with
+    the status enqueued, reads it, locks it with SETNX on 'lock:job:{id}',
+    looking for another job when the lock was already taken, and rewrites
+    the job with the status processing. The other operations are the ones of
+    the current repository."""
+
+    def __init__(self, redis_client):
+        super().__init__(redis_client)
+        self.lost_locks = 0
+
+    def get_job_by_status(self, status):
+        """The original lookup: the keys are scanned until a job with the
+        status is found."""
+
+        for job_key in self.redis_client.scan_iter(match='job:*'):
+            fields = {self._decode_value(name): value for name, value in self.redis_client.hgetall(job_key).items()}
+            if ('data' in fields and self._decode_value(fields['status']) == status.name):
+                return self.__get_job_from_fields(fields)
+        return None
+
+    def claim_job(self, lease_milliseconds=60000, queues=None):
+        """The original server loop: get the next enqueued job, try to lock
+        it, and look for another one when the lock was lost."""
+
+        while (True):
+            job = self.get_job_by_status(hangpy.JobStatus.ENQUEUED)
+            if (job is None):
+                return None
+            if (not self.try_set_lock_on_job(job, lease_milliseconds)):
+                self.lost_locks += 1
+                continue
+            job.start_datetime = datetime.datetime.now().isoformat()
+            job.status = hangpy.JobStatus.PROCESSING
+            self.update_job(job)
+            return job
+
+    def __get_job_from_fields(self, fields):
+        job = self._deserialize_entry(fields['data'])
+        job.status = hangpy.JobStatus[self._decode_value(fields['status'])]
+        job.priority = int(fields['priority'])
+        for name in ('error', 'start_datetime', 'end_datetime', 'queue'):
+            setattr(job, name, self._decode_value(fields[name]) or None)
+        return job
+
+
+def get_arguments():
+    parser = argparse.ArgumentParser(description='Job claim benchmark')
+    parser.add_argument('--host', default='172.17.0.1')
+    parser.add_argument('--port', type=int, default=6379)
+    parser.add_argument('--db', type=int, default=15)
+    parser.add_argument('--jobs', type=int, default=1000)
+    parser.add_argument('--servers', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--slots', type=int, default=100,
+                        help='slots of each server, enough for the no-op jobs to rarely fill them')
+    parser.add_argument('--fake', action='store_true', help='use fakeredis instead of a Redis server')
+    parser.add_argument('--memory', action='store_true', help='use the in-memory job repository as a baseline')
+    parser.add_argument('--sqlite', metavar='PATH', help='use a SQLite job repository stored on the path (the file is replaced)')
+    parser.add_argument('--journal', metavar='PATH', help='use a journal job repository on the directory (its files are deleted)')
+    return parser.parse_args()
+
+
+def get_redis_client_factory(arguments):
+    if (arguments.fake):
+        import fakeredis
+        fake_server = fakeredis.FakeServer()
+        return lambda: fakeredis.FakeStrictRedis(server=fake_server)
+    return lambda: redis.StrictRedis(host=arguments.host, port=arguments.port, db=arguments.db)
+
+
+def create_job_repository_factory(arguments, claim_name):
+    """Returns a factory of job repositories sharing an empty storage."""
+
+    if (arguments.memory):
+        job_repository = hangpy.InMemoryJobRepository()
+        return lambda: job_repository
+    if (arguments.sqlite):
+        for suffix in ('', '-wal', '-shm'):
+            if (os.path.exists(arguments.sqlite + suffix)):
+                os.remove(arguments.sqlite + suffix)
+        return lambda: hangpy.SqliteJobRepository(arguments.sqlite)
+    if (arguments.journal):
+        shutil.rmtree(arguments.journal, ignore_errors=True)
+        job_repository = hangpy.JournalJobRepository(arguments.journal)
+        return lambda: job_repository
+    redis_client_factory = get_redis_client_factory(arguments)
+    redis_client_factory().flushdb()
+    if (claim_name == 'legacy'):
+        return lambda: LegacyRedisJobRepository(redis_client_factory())
+    return lambda: hangpy.RedisJobRepository(redis_client_factory())
+
+
+def run_benchmark(arguments, claim_name, servers, jobs):
+    job_repository_factory = create_job_repository_factory(arguments, claim_name)
+    hangpy.JobService(job_repository_factory()).enqueue_jobs(BenchmarkJob(), ([] for _ in range(jobs)))
+    job_counter.reset(jobs)
+
+    server_repository = hangpy.InMemoryServerRepository()
+    server_configuration = hangpy.ServerConfigurationDto(cycle_interval_milliseconds=100, slots=arguments.slots)
+    job_repositories = [job_repository_factory() for server_index in range(servers)]
+    server_services = [hangpy.ServerService(server_configuration, server_repository, job_repository)
+                       for job_repository in job_repositories]
+    time_start = time.perf_counter()
+    for server_service in server_services:
+        server_service.start()
+    job_counter.finished.wait()
+    elapsed_seconds = time.perf_counter() - time_start
+    for server_service in server_services:
+        server_service.stop()
+    for server_service in server_services:
+        server_service.join()
+
+    lost_locks = sum(getattr(job_repository, 'lost_locks', 0) for job_repository in set(job_repositories))
+    return jobs / elapsed_seconds, lost_locks
+
+
+def main():
+    arguments = get_arguments()
+    uses_redis = not (arguments.memory or arguments.sqlite or arguments.journal)
+    claim_names = ['legacy', 'scripted'] if (uses_redis) else ['scripted']
+    print(f'{"claim":<10}{"servers":>8}{"jobs/s":>12}{"lost locks":>12}')
+    for servers in arguments.servers:
+        for claim_name in claim_names:
+            jobs_per_second, lost_locks = run_benchmark(arguments, claim_name, servers, arguments.jobs)
+            print(f'{claim_name:<10}{servers:>8}{jobs_per_second:>12.0f}{lost_locks:>12}')
+
+
+if (__name__ == '__main__'):
+    main()
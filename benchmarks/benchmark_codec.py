@@ -0,0 +1,61 @@
+"""
+Compares the encode and decode throughput, and the bytes stored per job, of
+the 'jsonpickle' codec used by the previous versions and the compact codec,
+for jobs with a growing number of parameters. It doesn't need Redis.
+
+Usage:
+    python benchmarks/benchmark_codec.py --jobs 20000
+    python benchmarks/benchmark_codec.py --parameters 0 10 100
+"""
+
+import argparse
+import datetime
+import hangpy
+import time
+
+
+def get_arguments():
+    parser = argparse.ArgumentParser(description='Entry codec benchmark')
+    parser.add_argument('--jobs', type=int, default=20000)
+    parser.add_argument('--parameters', type=int, nargs='+', default=[0, 10, 100])
+    return parser.parse_args()
+
+
+def create_jobs(quantity, parameters):
+    jobs = []
+    for job_index in range(quantity):
+        job = hangpy.Job('benchmarks.benchmark_codec', 'BenchmarkJob', [f'parameter {index}' for index in range(parameters)])
+        job.status = hangpy.JobStatus.SUCCESS
+        job.start_datetime = datetime.datetime.now().isoformat()
+        job.end_datetime = datetime.datetime.now().isoformat()
+        jobs.append(job)
+    return jobs
+
+
+def run_benchmark(entry_codec, jobs):
+    time_start = time.perf_counter()
+    serialized_jobs = [entry_codec.encode(job) for job in jobs]
+    encode_seconds = time.perf_counter() - time_start
+
+    time_start = time.perf_counter()
+    for serialized_job in serialized_jobs:
+        entry_codec.decode(serialized_job)
+    decode_seconds = time.perf_counter() - time_start
+
+    bytes_per_job = sum(len(serialized_job) for serialized_job in serialized_jobs) / len(jobs)
+    return len(jobs) / encode_seconds, len(jobs) / decode_seconds, bytes_per_job
+
+
+def main():
+    arguments = get_arguments()
+    entry_codecs = {'jsonpickle': hangpy.JsonpickleEntryCodec(), 'compact': hangpy.CompactEntryCodec()}
+    print(f'{"codec":<12}{"parameters":>11}{"encodes/s":>12}{"decodes/s":>12}{"bytes/job":>11}')
+    for parameters in arguments.parameters:
+        jobs = create_jobs(arguments.jobs, parameters)
+        for codec_name, entry_codec in entry_codecs.items():
+            encodes_per_second, decodes_per_second, bytes_per_job = run_benchmark(entry_codec, jobs)
+            print(f'{codec_name:<12}{parameters:>11}{encodes_per_second:>12.0f}{decodes_per_second:>12.0f}{bytes_per_job:>11.0f}')
+
+
+if (__name__ == '__main__'):
+    main()
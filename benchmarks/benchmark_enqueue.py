@@ -0,0 +1,69 @@
+"""
+Compares the jobs enqueued per second calling 'enqueue_job' once per job
+against a single call to 'enqueue_jobs', which adds the jobs to the
+repository in batches.
+
+The benchmark flushes the Redis database used, so don't point it to a
+database holding real data.
+
+Usage:
+    python benchmarks/benchmark_enqueue.py --host 172.17.0.1 --jobs 100000
+    python benchmarks/benchmark_enqueue.py --fake
+"""
+
+import argparse
+import hangpy
+import redis
+import time
+
+
+class BenchmarkJob(hangpy.JobActivityBase):
+
+    def action(self):
+        pass
+
+
+def get_arguments():
+    parser = argparse.ArgumentParser(description='Job enqueue benchmark')
+    parser.add_argument('--host', default='172.17.0.1')
+    parser.add_argument('--port', type=int, default=6379)
+    parser.add_argument('--db', type=int, default=15)
+    parser.add_argument('--jobs', type=int, default=20000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--fake', action='store_true', help='use fakeredis instead of a Redis server')
+    return parser.parse_args()
+
+
+def get_redis_client(arguments):
+    if (arguments.fake):
+        import fakeredis
+        return fakeredis.FakeStrictRedis()
+    return redis.StrictRedis(host=arguments.host, port=arguments.port, db=arguments.db)
+
+
+def enqueue_one_by_one(job_service, arguments):
+    for job_index in range(arguments.jobs):
+        job_service.enqueue_job(BenchmarkJob(), [str(job_index)])
+
+
+def enqueue_in_batches(job_service, arguments):
+    parameter_sets = ([str(job_index)] for job_index in range(arguments.jobs))
+    job_service.enqueue_jobs(BenchmarkJob(), parameter_sets, batch_size=arguments.batch_size)
+
+
+def main():
+    arguments = get_arguments()
+    redis_client = get_redis_client(arguments)
+    job_service = hangpy.JobService(hangpy.RedisJobRepository(redis_client))
+    enqueue_functions = {'enqueue_job': enqueue_one_by_one, 'enqueue_jobs': enqueue_in_batches}
+    print(f'{"function":<14}{"jobs":>10}{"jobs/s":>12}')
+    for function_name, enqueue_function in enqueue_functions.items():
+        redis_client.flushdb()
+        time_start = time.perf_counter()
+        enqueue_function(job_service, arguments)
+        elapsed_seconds = time.perf_counter() - time_start
+        print(f'{function_name:<14}{arguments.jobs:>10}{arguments.jobs / elapsed_seconds:>12.0f}')
+
+
+if (__name__ == '__main__'):
+    main()
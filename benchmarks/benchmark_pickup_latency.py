@@ -0,0 +1,96 @@
+"""
+Measures the pickup latency of the jobs (the time between the job being
+enqueued and starting to run) on an idle server, which waits for the
+notification of enqueued jobs instead of sleeping the whole cycle interval.
+
+The benchmark flushes the Redis database used, so don't point it to a
+database holding real data.
+
+Usage:
+    python benchmarks/benchmark_pickup_latency.py --host 172.17.0.1 --jobs 200
+    python benchmarks/benchmark_pickup_latency.py --fake
+    python benchmarks/benchmark_pickup_latency.py --memory
+"""
+
+import argparse
+import datetime
+import hangpy
+import random
+import redis
+import statistics
+import time
+
+
+class BenchmarkJob(hangpy.JobActivityBase):
+
+    def action(self):
+        pass
+
+
+def get_arguments():
+    parser = argparse.ArgumentParser(description='Job pickup latency benchmark')
+    parser.add_argument('--host', default='172.17.0.1')
+    parser.add_argument('--port', type=int, default=6379)
+    parser.add_argument('--db', type=int, default=15)
+    parser.add_argument('--jobs', type=int, default=200)
+    parser.add_argument('--cycle-interval', type=int, default=10000, help='cycle interval of the server, in milliseconds')
+    parser.add_argument('--fake', action='store_true', help='use fakeredis instead of a Redis server')
+    parser.add_argument('--memory', action='store_true', help='use the in-memory repositories instead of Redis')
+    return parser.parse_args()
+
+
+def get_redis_client_factory(arguments):
+    if (arguments.fake):
+        import fakeredis
+        fake_server = fakeredis.FakeServer()
+        return lambda: fakeredis.FakeStrictRedis(server=fake_server)
+    return lambda: redis.StrictRedis(host=arguments.host, port=arguments.port, db=arguments.db)
+
+
+def get_repositories(arguments):
+    """Returns the server repository, the job repository used by the server
+    and the one used to enqueue the jobs."""
+
+    if (arguments.memory):
+        job_repository = hangpy.InMemoryJobRepository()
+        return hangpy.InMemoryServerRepository(), job_repository, job_repository
+    redis_client_factory = get_redis_client_factory(arguments)
+    redis_client_factory().flushdb()
+    return (hangpy.RedisServerRepository(redis_client_factory()), hangpy.RedisJobRepository(redis_client_factory()),
+            hangpy.RedisJobRepository(redis_client_factory()))
+
+
+def get_latency_milliseconds(job):
+    enqueued_datetime = datetime.datetime.fromisoformat(job.enqueued_datetime)
+    start_datetime = datetime.datetime.fromisoformat(job.start_datetime)
+    return (start_datetime - enqueued_datetime).total_seconds() * 1000
+
+
+def main():
+    arguments = get_arguments()
+    server_repository, server_job_repository, job_repository = get_repositories(arguments)
+    server_configuration = hangpy.ServerConfigurationDto(cycle_interval_milliseconds=arguments.cycle_interval)
+    server_service = hangpy.ServerService(server_configuration, server_repository, server_job_repository)
+    server_service.start()
+
+    job_service = hangpy.JobService(job_repository)
+    for job_index in range(arguments.jobs):
+        time.sleep(random.uniform(0.01, 0.05))
+        job_service.enqueue_job(BenchmarkJob())
+    status_counts = job_repository.get_status_counts()
+    while (status_counts[hangpy.JobStatus.ENQUEUED] > 0 or status_counts[hangpy.JobStatus.PROCESSING] > 0):
+        time.sleep(0.1)
+        status_counts = job_repository.get_status_counts()
+    server_service.stop()
+    server_service.join()
+
+    latencies = sorted(get_latency_milliseconds(job) for job in job_repository.get_jobs())
+    percentiles = statistics.quantiles(latencies, n=100)
+    print(f'jobs: {len(latencies)}')
+    print(f'p50: {percentiles[49]:.1f} ms')
+    print(f'p99: {percentiles[98]:.1f} ms')
+    print(f'max: {latencies[-1]:.1f} ms')
+
+
+if (__name__ == '__main__'):
+    main()
@@ -11,5 +11,4 @@ job_repository = hangpy.RedisJobRepository(redis_client)
 
 job_service = hangpy.JobService(job_repository)
 
-for job_index in range(jobs_quantity):
-    job_service.enqueue_job(JobDelay())
+job_service.enqueue_jobs(JobDelay(), (None for job_index in range(jobs_quantity)))
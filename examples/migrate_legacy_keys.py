@@ -0,0 +1,10 @@
+import hangpy
+import redis
+
+redis_client = redis.StrictRedis(host='172.17.0.1', port=6379, password=None)
+
+job_repository = hangpy.RedisJobRepository(redis_client)
+
+migrated_jobs = job_repository.migrate_legacy_keys()
+
+print(f'Jobs migrated: {migrated_jobs}')
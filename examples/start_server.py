@@ -7,9 +7,11 @@ redis_client = redis.StrictRedis(host='172.17.0.1', port=6379, password=None)
 
 job_repository = hangpy.RedisJobRepository(redis_client)
 server_repository = hangpy.RedisServerRepository(redis_client)
+recurring_job_repository = hangpy.RedisRecurringJobRepository(redis_client)
 log_service = hangpy.PrintLogService()
 
-server_service = hangpy.ServerService(server_configuration, server_repository, job_repository, log_service)
+server_service = hangpy.ServerService(server_configuration, server_repository, job_repository, log_service,
+                                      recurring_job_repository=recurring_job_repository)
 
 server_service.start()
 
@@ -2,21 +2,44 @@ from hangpy.dtos import \
     ServerConfigurationDto # noqa F401
 
 from hangpy.entities import \
+    CronExpression, \
     Job, \
+    RecurringJob, \
+    RetentionPolicy, \
+    RetryPolicy, \
     Server # noqa F401
 
 from hangpy.enums import \
+    CatchUpPolicy, \
     JobStatus # noqa F401
 
 from hangpy.repositories import \
+    CompactEntryCodec, \
+    EntryCodec, \
+    GzipFileJobArchive, \
+    InMemoryJobRepository, \
+    InMemoryServerRepository, \
+    JobArchive, \
+    JournalJobRepository, \
     JobRepository, \
+    JsonpickleEntryCodec, \
+    RecurringJobRepository, \
     ServerRepository, \
+    ShardedJobRepository, \
+    SqliteJobRepository, \
+    RedisConnectionPool, \
     RedisJobRepository, \
+    RedisRecurringJobRepository, \
     RedisServerRepository # noqa F401
 
 from hangpy.services import \
+    AsyncioJobExecutor, \
+    CancellationToken, \
     JobActivityBase, \
+    JobExecutor, \
     JobService, \
     LogService, \
     PrintLogService, \
-    ServerService # noqa F401
+    ProcessPoolJobExecutor, \
+    ServerService, \
+    ThreadPoolJobExecutor # noqa F401
@@ -1,22 +1,94 @@
 class ServerConfigurationDto():
     """Class used to manage the server configuration"""
 
-    def __init__(self, cycle_interval_milliseconds: int = 10000, slots: int = 10):
+    def __init__(self,
+                 cycle_interval_milliseconds: int = 10000,
+                 slots: int = 10,
+                 batch_claim: bool = False,
+                 prefetch_jobs: int = 0,
+                 async_slots: int = 0,
+                 lease_milliseconds: int = 60000,
+                 heartbeat_interval_milliseconds: int = 5000,
+                 queues: list = None):
         """
         Args:
             cycle_interval_milliseconds (int, optional): Milliseconds to sleep bewteen the server cycles. Defaults to 10000.
             slots (int, optional): Number os slots available to execute jobs concurrently on each server. Defaults to 10.
+            batch_claim (bool, optional): Fills every free slot claiming the jobs in a single batch, instead of claiming
+            one job at a time. Defaults to False.
+            prefetch_jobs (int, optional): Number of jobs claimed in advance and kept waiting on the server for a free
+            slot, when using the batch claim. It can't be greater than the number of slots. Defaults to 0.
+            async_slots (int, optional): Number of slots available to execute jobs whose action is a coroutine function,
+            all of them sharing a single event loop. When zero, these jobs use the regular slots. Defaults to 0.
+            lease_milliseconds (int, optional): Milliseconds a claimed job stays locked for the server without being
+            renewed. The server renews the leases of its jobs while they run, and the jobs whose lease expired (as their
+            server stopped) are put back on the queue. Defaults to 60000.
+            heartbeat_interval_milliseconds (int, optional): Milliseconds between the heartbeats sent by the server,
+            reporting that it is live and the slots in use. The server is considered dead when three heartbeats are
+            missed. Defaults to 5000.
+            queues (list, optional): Queues served by the server, each one given by its name or by a tuple of its name
+            and its weight (a positive integer, 1 when omitted). The server only claims jobs from these queues, taking
+            from each one in proportion to its weight. Defaults to ['default'].
         """
 
-        self.__validate_parameters(cycle_interval_milliseconds, slots)
+        self.__validate_parameters(cycle_interval_milliseconds,
+                                   slots,
+                                   batch_claim,
+                                   prefetch_jobs,
+                                   async_slots,
+                                   lease_milliseconds,
+                                   heartbeat_interval_milliseconds,
+                                   queues)
         self.cycle_interval_milliseconds = cycle_interval_milliseconds
         self.slots = slots
+        self.batch_claim = batch_claim
+        self.prefetch_jobs = prefetch_jobs
+        self.async_slots = async_slots
+        self.lease_milliseconds = lease_milliseconds
+        self.heartbeat_interval_milliseconds = heartbeat_interval_milliseconds
+        self.queues = self.__get_queue_weights(queues)
 
-    def __validate_parameters(self, cycle_interval_milliseconds: int, slots: int):
+    def __get_queue_weights(self, queues: list) -> dict[str, int]:
+        """
+        Internal function that returns the weight of each queue served by the
+        server, indexed by the name of the queue.
+
+        Args:
+            queues (list)
+
+        Returns:
+            dict[str, int]
+        """
+
+        if (queues is None):
+            return {'default': 1}
+        queue_weights = {}
+        for queue in queues:
+            if (isinstance(queue, str)):
+                queue_weights[queue] = 1
+            else:
+                queue_weights[queue[0]] = queue[1]
+        return queue_weights
+
+    def __validate_parameters(self,
+                              cycle_interval_milliseconds: int,
+                              slots: int,
+                              batch_claim: bool,
+                              prefetch_jobs: int,
+                              async_slots: int,
+                              lease_milliseconds: int,
+                              heartbeat_interval_milliseconds: int,
+                              queues: list):
         """Internal function used to validate the class constructor parameters."""
 
         self.__validate_cycle_interval_milliseconds(cycle_interval_milliseconds)
         self.__validate_slots(slots)
+        self.__validate_batch_claim(batch_claim)
+        self.__validate_prefetch_jobs(prefetch_jobs, slots)
+        self.__validate_async_slots(async_slots)
+        self.__validate_lease_milliseconds(lease_milliseconds)
+        self.__validate_heartbeat_interval_milliseconds(heartbeat_interval_milliseconds)
+        self.__validate_queues(queues)
 
     def __validate_cycle_interval_milliseconds(self, cycle_interval_milliseconds: int):
         """
@@ -45,3 +117,104 @@ class ServerConfigurationDto():
             raise ValueError('slots', slots, 'The value must be an integer')
         if (slots <= 0):
             raise ValueError('slots', slots, 'The value must be greater than zero')
+
+    def __validate_batch_claim(self, batch_claim: bool):
+        """
+        Internal function used to validate the 'batch_claim' value.
+
+        Raises:
+            ValueError: The value must be a boolean
+        """
+
+        if (not isinstance(batch_claim, bool)):
+            raise ValueError('batch_claim', batch_claim, 'The value must be a boolean')
+
+    def __validate_prefetch_jobs(self, prefetch_jobs: int, slots: int):
+        """
+        Internal function used to validate the 'prefetch_jobs' value.
+
+        Raises:
+            ValueError: The value must be an integer
+            ValueError: The value must not be negative
+            ValueError: The value must not be greater than the number of slots
+        """
+
+        if (not isinstance(prefetch_jobs, int)):
+            raise ValueError('prefetch_jobs', prefetch_jobs, 'The value must be an integer')
+        if (prefetch_jobs < 0):
+            raise ValueError('prefetch_jobs', prefetch_jobs, 'The value must not be negative')
+        if (prefetch_jobs > slots):
+            raise ValueError('prefetch_jobs', prefetch_jobs, 'The value must not be greater than the number of slots')
+
+    def __validate_async_slots(self, async_slots: int):
+        """
+        Internal function used to validate the 'async_slots' value.
+
+        Raises:
+            ValueError: The value must be an integer
+            ValueError: The value must not be negative
+        """
+
+        if (not isinstance(async_slots, int)):
+            raise ValueError('async_slots', async_slots, 'The value must be an integer')
+        if (async_slots < 0):
+            raise ValueError('async_slots', async_slots, 'The value must not be negative')
+
+    def __validate_lease_milliseconds(self, lease_milliseconds: int):
+        """
+        Internal function used to validate the 'lease_milliseconds' value.
+
+        Raises:
+            ValueError: The value must be an integer
+            ValueError: The value must be greater than zero
+        """
+
+        if (not isinstance(lease_milliseconds, int)):
+            raise ValueError('lease_milliseconds', lease_milliseconds, 'The value must be an integer')
+        if (lease_milliseconds <= 0):
+            raise ValueError('lease_milliseconds', lease_milliseconds, 'The value must be greater than zero')
+
+    def __validate_heartbeat_interval_milliseconds(self, heartbeat_interval_milliseconds: int):
+        """
+        Internal function used to validate the 'heartbeat_interval_milliseconds' value.
+
+        Raises:
+            ValueError: The value must be an integer
+            ValueError: The value must be greater than zero
+        """
+
+        if (not isinstance(heartbeat_interval_milliseconds, int)):
+            raise ValueError('heartbeat_interval_milliseconds', heartbeat_interval_milliseconds, 'The value must be an integer')
+        if (heartbeat_interval_milliseconds <= 0):
+            raise ValueError('heartbeat_interval_milliseconds', heartbeat_interval_milliseconds, 'The value must be greater than zero')
+
+    def __validate_queues(self, queues: list):
+        """
+        Internal function used to validate the 'queues' value.
+
+        Raises:
+            ValueError: The value must be a list or None
+            ValueError: The value must not be empty
+            ValueError: The queues must be names or tuples of a name and a weight
+            ValueError: The names of the queues must not be empty or repeated
+            ValueError: The weights of the queues must be integers greater than zero
+        """
+
+        if (queues is None):
+            return
+        if (not isinstance(queues, list)):
+            raise ValueError('queues', queues, 'The value must be a list or None')
+        if (len(queues) == 0):
+            raise ValueError('queues', queues, 'The value must not be empty')
+        names = []
+        for queue in queues:
+            if (isinstance(queue, str)):
+                queue = (queue, 1)
+            if (not isinstance(queue, tuple) or len(queue) != 2 or not isinstance(queue[0], str)):
+                raise ValueError('queues', queues, 'The queues must be names or tuples of a name and a weight')
+            name, weight = queue
+            if (not name or name in names):
+                raise ValueError('queues', queues, 'The names of the queues must not be empty or repeated')
+            if (not isinstance(weight, int) or isinstance(weight, bool) or weight <= 0):
+                raise ValueError('queues', queues, 'The weights of the queues must be integers greater than zero')
+            names.append(name)
@@ -1,2 +1,6 @@
 from hangpy.entities.job import Job # noqa F401
 from hangpy.entities.server import Server # noqa F401
+from hangpy.entities.cron_expression import CronExpression # noqa F401
+from hangpy.entities.recurring_job import RecurringJob # noqa F401
+from hangpy.entities.retry_policy import RetryPolicy # noqa F401
+from hangpy.entities.retention_policy import RetentionPolicy # noqa F401
@@ -0,0 +1,146 @@
+import datetime
+
+CRON_ALIASES = {'@yearly': '0 0 1 1 *',
+                '@annually': '0 0 1 1 *',
+                '@monthly': '0 0 1 * *',
+                '@weekly': '0 0 * * 0',
+                '@daily': '0 0 * * *',
+                '@midnight': '0 0 * * *',
+                '@hourly': '0 * * * *'}
+
+CRON_FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+CRON_SEARCH_YEARS = 10
+
+
+class CronExpression():
+    """Represents the occurrences of a cron expression, made of five fields:
+    minute, hour, day of the month, month and day of the week (0 or 7 for
+    Sunday). Each field takes '*', numbers, ranges ('1-5'), steps ('*/15' or
+    '0-30/10') and lists of them ('0,30'). When both the day of the month and
+    the day of the week are restricted, a day matching either one occurs.
+    The aliases '@yearly', '@monthly', '@weekly', '@daily' and '@hourly' are
+    also accepted.
+    """
+
+    def __init__(self, expression: str):
+        """
+        Args:
+            expression (str): The cron expression.
+        """
+
+        self.__validate_expression(expression)
+        self.expression = expression
+        fields = CRON_ALIASES.get(expression, expression).split()
+        self.minutes, self.hours, self.days, self.months, weekdays = [
+            self.__parse_field(field, minimum, maximum) for field, (minimum, maximum) in zip(fields, CRON_FIELD_RANGES)]
+        self.weekdays = {weekday % 7 for weekday in weekdays}
+        self.any_day = fields[2] == '*'
+        self.any_weekday = fields[4] == '*'
+        if (self.get_next_datetime(datetime.datetime(2000, 1, 1)) is None):
+            raise ValueError('expression', expression, 'The value must have occurrences')
+
+    def get_next_datetime(self, after: datetime.datetime) -> datetime.datetime:
+        """
+        Returns the first occurrence after the datetime passed by parameter.
+        If there is none in the next years, 'None' is returned.
+
+        Args:
+            after (datetime.datetime)
+
+        Returns:
+            datetime.datetime
+        """
+
+        next_datetime = after.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        while (next_datetime.year <= after.year + CRON_SEARCH_YEARS):
+            if (next_datetime.month not in self.months):
+                next_datetime = self.__get_next_month(next_datetime)
+            elif (not self.__matches_day(next_datetime)):
+                next_datetime = next_datetime.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+            elif (next_datetime.hour not in self.hours):
+                next_datetime = next_datetime.replace(minute=0) + datetime.timedelta(hours=1)
+            elif (next_datetime.minute not in self.minutes):
+                next_datetime += datetime.timedelta(minutes=1)
+            else:
+                return next_datetime
+        return None
+
+    def get_datetimes(self, start: datetime.datetime, end: datetime.datetime) -> list[datetime.datetime]:
+        """
+        Returns the occurrences from the start (included, if it is an
+        occurrence) to the end (included) passed by parameter.
+
+        Args:
+            start (datetime.datetime)
+            end (datetime.datetime)
+
+        Returns:
+            list[datetime.datetime]
+        """
+
+        datetimes = []
+        next_datetime = self.get_next_datetime(start - datetime.timedelta(minutes=1))
+        while (next_datetime is not None and next_datetime <= end):
+            datetimes.append(next_datetime)
+            next_datetime = self.get_next_datetime(next_datetime)
+        return datetimes
+
+    def __get_next_month(self, value: datetime.datetime) -> datetime.datetime:
+        """Internal function that returns the first minute of the month after
+        the datetime passed by parameter."""
+
+        if (value.month == 12):
+            return datetime.datetime(value.year + 1, 1, 1)
+        return datetime.datetime(value.year, value.month + 1, 1)
+
+    def __matches_day(self, value: datetime.datetime) -> bool:
+        """Internal function that returns 'True' if the day of the datetime
+        passed by parameter occurs on the expression."""
+
+        day_matches = value.day in self.days
+        weekday_matches = (value.weekday() + 1) % 7 in self.weekdays
+        if (self.any_day or self.any_weekday):
+            return day_matches and weekday_matches
+        return day_matches or weekday_matches
+
+    def __parse_field(self, field: str, minimum: int, maximum: int) -> set[int]:
+        """Internal function that returns the values of a field of the
+        expression."""
+
+        values = set()
+        for part in field.split(','):
+            part_range, _, step = part.partition('/')
+            if (part_range == '*'):
+                start, stop = minimum, maximum
+            elif ('-' in part_range):
+                start, stop = (int(value) for value in part_range.split('-'))
+            else:
+                start = stop = int(part_range)
+                if (step):
+                    stop = maximum
+            step = int(step) if step else 1
+            if (start < minimum or stop > maximum or start > stop or step <= 0):
+                raise ValueError(field)
+            values.update(range(start, stop + 1, step))
+        return values
+
+    def __validate_expression(self, expression: str):
+        """
+        Internal function used to validate the 'expression' value.
+
+        Raises:
+            ValueError: The value must be a string
+            ValueError: The value must be a cron expression of five fields
+        """
+
+        if (not isinstance(expression, str)):
+            raise ValueError('expression', expression, 'The value must be a string')
+        fields = CRON_ALIASES.get(expression, expression).split()
+        try:
+            if (len(fields) != 5):
+                raise ValueError(expression)
+            for field, (minimum, maximum) in zip(fields, CRON_FIELD_RANGES):
+                self.__parse_field(field, minimum, maximum)
+        except ValueError:
+            raise ValueError('expression', expression, 'The value must be a cron expression of five fields')
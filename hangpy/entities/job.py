@@ -2,13 +2,25 @@ import datetime
 import uuid
 from hangpy.enums import JobStatus
 
+DEFAULT_QUEUE = 'default'
+
+CANCELLED_JOB_ERROR = 'The job was cancelled'
+
 
 class Job():
     """Represents a set of instructions to instantiate and execute an action
-    defined by a class that inherits from JobActivityBase.
+    defined by a class that inherits from JobActivityBase. The history of the
+    times the job ran is kept on 'attempts', each one a dictionary with its
+    'start_datetime', 'end_datetime' and 'error'.
     """
 
-    def __init__(self, module_name: str, class_name: str, parameters: list = None):
+    def __init__(self,
+                 module_name: str,
+                 class_name: str,
+                 parameters: list = None,
+                 priority: int = 0,
+                 queue: str = DEFAULT_QUEUE,
+                 timeout_seconds: float = None):
         """
         Args:
             module_name (str): Full module name of the class that contains
@@ -17,9 +29,18 @@ class Job():
             be executed.
             parameters (list, optional): List of parameters that will be
             passed to the action to be executed. Defaults to None.
+            priority (int, optional): Priority of the job on the queue, from
+            -1000 to 1000. Jobs with a higher priority are dequeued first.
+            Defaults to 0.
+            queue (str, optional): Name of the queue the job is enqueued on.
+            Only the servers subscribed to the queue run the job. Defaults
+            to 'default'.
+            timeout_seconds (float, optional): Seconds the job can run before
+            it is stopped and set with an error. When None, the timeout of
+            the activity is used. Defaults to None.
         """
 
-        self.__validate_parameters(module_name, class_name, parameters)
+        self.__validate_parameters(module_name, class_name, parameters, priority, queue, timeout_seconds)
         self.id = str(uuid.uuid4())
         self.module_name = module_name
         self.class_name = class_name
@@ -29,15 +50,28 @@ class Job():
         self.start_datetime = None
         self.end_datetime = None
         self.parameters = []
+        self.priority = priority
+        self.queue = queue
+        self.timeout_seconds = timeout_seconds
+        self.attempts = []
         if (parameters is not None):
             self.parameters.extend(parameters)
 
-    def __validate_parameters(self, module_name: str, class_name: str, parameters: list):
+    def __validate_parameters(self,
+                              module_name: str,
+                              class_name: str,
+                              parameters: list,
+                              priority: int,
+                              queue: str,
+                              timeout_seconds: float):
         """Internal function used to validate the class constructor parameters."""
 
         self.__validate_module_name(module_name)
         self.__validate_class_name(class_name)
         self.__validate_parameters_argument(parameters)
+        self.__validate_priority(priority)
+        self.__validate_queue(queue)
+        self.__validate_timeout_seconds(timeout_seconds)
 
     def __validate_module_name(self, module_name: str):
         """
@@ -77,3 +111,47 @@ class Job():
 
         if (not isinstance(parameters, list) and parameters is not None):
             raise ValueError('parameters', parameters, 'The value must be a list or None')
+
+    def __validate_priority(self, priority: int):
+        """
+        Internal function used to validate the 'priority' value.
+
+        Raises:
+            ValueError: The value must be an integer
+            ValueError: The value must be between -1000 and 1000
+        """
+
+        if (not isinstance(priority, int) or isinstance(priority, bool)):
+            raise ValueError('priority', priority, 'The value must be an integer')
+        if (priority < -1000 or priority > 1000):
+            raise ValueError('priority', priority, 'The value must be between -1000 and 1000')
+
+    def __validate_queue(self, queue: str):
+        """
+        Internal function used to validate the 'queue' value.
+
+        Raises:
+            ValueError: The value must be a string
+            ValueError: The value must not be empty
+        """
+
+        if (not isinstance(queue, str)):
+            raise ValueError('queue', queue, 'The value must be a string')
+        if (not queue):
+            raise ValueError('queue', queue, 'The value must not be empty')
+
+    def __validate_timeout_seconds(self, timeout_seconds: float):
+        """
+        Internal function used to validate the 'timeout_seconds' value.
+
+        Raises:
+            ValueError: The value must be a number or None
+            ValueError: The value must be greater than zero
+        """
+
+        if (timeout_seconds is None):
+            return
+        if (not isinstance(timeout_seconds, (int, float)) or isinstance(timeout_seconds, bool)):
+            raise ValueError('timeout_seconds', timeout_seconds, 'The value must be a number or None')
+        if (timeout_seconds <= 0):
+            raise ValueError('timeout_seconds', timeout_seconds, 'The value must be greater than zero')
@@ -0,0 +1,78 @@
+import datetime
+from hangpy.entities.cron_expression import CronExpression
+from hangpy.entities.job import Job
+from hangpy.enums import CatchUpPolicy
+
+
+class RecurringJob():
+    """Represents a job enqueued periodically, on the occurrences of a cron
+    expression. Each occurrence enqueues a new job created from the job
+    passed as template. The first run is the first occurrence after the
+    recurring job is created.
+    """
+
+    def __init__(self, name: str, job: Job, cron: str, catch_up: CatchUpPolicy = CatchUpPolicy.LATEST):
+        """
+        Args:
+            name (str): Unique name of the recurring job. Adding a recurring
+            job with the name of another one replaces it.
+            job (Job): Template of the jobs enqueued on each occurrence.
+            cron (str): Cron expression defining the occurrences.
+            catch_up (CatchUpPolicy, optional): Defines how the occurrences
+            missed while no server was running are handled: ALL enqueues a
+            job for each one of them, LATEST enqueues a single job for all of
+            them and NONE discards them. Defaults to LATEST.
+        """
+
+        self.__validate_parameters(name, job, cron, catch_up)
+        next_run_datetime = CronExpression(cron).get_next_datetime(datetime.datetime.now())
+        self.name = name
+        self.job = job
+        self.cron = cron
+        self.catch_up = catch_up
+        self.next_run_datetime = next_run_datetime.isoformat()
+        self.last_run_datetime = None
+
+    def __validate_parameters(self, name: str, job: Job, cron: str, catch_up: CatchUpPolicy):
+        """Internal function used to validate the class constructor parameters."""
+
+        self.__validate_name(name)
+        self.__validate_job(job)
+        CronExpression(cron)
+        self.__validate_catch_up(catch_up)
+
+    def __validate_name(self, name: str):
+        """
+        Internal function used to validate the 'name' value.
+
+        Raises:
+            ValueError: The value must be a string
+            ValueError: The value must not be empty
+        """
+
+        if (not isinstance(name, str)):
+            raise ValueError('name', name, 'The value must be a string')
+        if (not name):
+            raise ValueError('name', name, 'The value must not be empty')
+
+    def __validate_job(self, job: Job):
+        """
+        Internal function used to validate the 'job' value.
+
+        Raises:
+            ValueError: The value must be a Job
+        """
+
+        if (not isinstance(job, Job)):
+            raise ValueError('job', job, 'The value must be a Job')
+
+    def __validate_catch_up(self, catch_up: CatchUpPolicy):
+        """
+        Internal function used to validate the 'catch_up' value.
+
+        Raises:
+            ValueError: The value must be a CatchUpPolicy
+        """
+
+        if (not isinstance(catch_up, CatchUpPolicy)):
+            raise ValueError('catch_up', catch_up, 'The value must be a CatchUpPolicy')
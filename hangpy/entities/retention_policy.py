@@ -0,0 +1,61 @@
+class RetentionPolicy():
+    """Defines how long the finished jobs of a status are kept on the
+    repository. The jobs older than the maximum age, and the oldest ones
+    beyond the maximum count, are removed (and archived, if an archive is
+    configured) by the servers.
+    """
+
+    def __init__(self, max_age_seconds: float = None, max_count: int = None):
+        """
+        Args:
+            max_age_seconds (float, optional): Seconds a job is kept after it
+            finished. When None, the jobs are not removed by age. Defaults to
+            None.
+            max_count (int, optional): Maximum number of jobs kept, the
+            oldest ones being removed first. When None, the jobs are not
+            removed by count. Defaults to None.
+        """
+
+        self.__validate_parameters(max_age_seconds, max_count)
+        self.max_age_seconds = max_age_seconds
+        self.max_count = max_count
+
+    def __validate_parameters(self, max_age_seconds: float, max_count: int):
+        """Internal function used to validate the class constructor parameters."""
+
+        self.__validate_max_age_seconds(max_age_seconds)
+        self.__validate_max_count(max_count)
+        if (max_age_seconds is None and max_count is None):
+            raise ValueError('max_age_seconds', max_age_seconds, 'Either the maximum age or the maximum count must be informed')
+
+    def __validate_max_age_seconds(self, max_age_seconds: float):
+        """
+        Internal function used to validate the 'max_age_seconds' value.
+
+        Raises:
+            ValueError: The value must be a number or None
+            ValueError: The value must not be negative
+        """
+
+        if (max_age_seconds is None):
+            return
+        if (not isinstance(max_age_seconds, (int, float)) or isinstance(max_age_seconds, bool)):
+            raise ValueError('max_age_seconds', max_age_seconds, 'The value must be a number or None')
+        if (max_age_seconds < 0):
+            raise ValueError('max_age_seconds', max_age_seconds, 'The value must not be negative')
+
+    def __validate_max_count(self, max_count: int):
+        """
+        Internal function used to validate the 'max_count' value.
+
+        Raises:
+            ValueError: The value must be an integer or None
+            ValueError: The value must not be negative
+        """
+
+        if (max_count is None):
+            return
+        if (not isinstance(max_count, int) or isinstance(max_count, bool)):
+            raise ValueError('max_count', max_count, 'The value must be an integer or None')
+        if (max_count < 0):
+            raise ValueError('max_count', max_count, 'The value must not be negative')
@@ -0,0 +1,111 @@
+import random
+
+
+class RetryPolicy():
+    """Defines how the jobs of an activity are retried when they fail. Each
+    retry waits twice the delay of the previous one, up to a maximum, and the
+    delays are drawn at random between half and the whole of it (jitter), so
+    jobs that failed together don't retry all at once.
+    """
+
+    def __init__(self,
+                 max_attempts: int = 3,
+                 base_delay_seconds: float = 1,
+                 max_delay_seconds: float = 3600,
+                 jitter: bool = True):
+        """
+        Args:
+            max_attempts (int, optional): Maximum number of times a job runs,
+            counting the first one. Jobs that fail on the last attempt are
+            moved to the dead-letter queue. Defaults to 3.
+            base_delay_seconds (float, optional): Delay before the first
+            retry. Defaults to 1.
+            max_delay_seconds (float, optional): Maximum delay before a retry.
+            Defaults to 3600.
+            jitter (bool, optional): Draws the delays at random between half
+            and the whole of the exponential delay. Defaults to True.
+        """
+
+        self.__validate_parameters(max_attempts, base_delay_seconds, max_delay_seconds, jitter)
+        self.max_attempts = max_attempts
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.jitter = jitter
+
+    def can_retry(self, attempts: int) -> bool:
+        """
+        Returns 'True' if a job that failed on the attempts passed by
+        parameter must run again.
+
+        Args:
+            attempts (int): Number of times the job ran.
+
+        Returns:
+            bool
+        """
+
+        return attempts < self.max_attempts
+
+    def get_delay_seconds(self, attempts: int) -> float:
+        """
+        Returns the delay before the retry of a job that failed on the
+        attempts passed by parameter.
+
+        Args:
+            attempts (int): Number of times the job ran.
+
+        Returns:
+            float
+        """
+
+        delay_seconds = min(self.base_delay_seconds * 2 ** min(attempts - 1, 64), self.max_delay_seconds)
+        if (self.jitter):
+            return random.uniform(delay_seconds / 2, delay_seconds)
+        return delay_seconds
+
+    def __validate_parameters(self, max_attempts: int, base_delay_seconds: float, max_delay_seconds: float, jitter: bool):
+        """Internal function used to validate the class constructor parameters."""
+
+        self.__validate_max_attempts(max_attempts)
+        self.__validate_delay_seconds('base_delay_seconds', base_delay_seconds)
+        self.__validate_delay_seconds('max_delay_seconds', max_delay_seconds)
+        self.__validate_jitter(jitter)
+
+    def __validate_max_attempts(self, max_attempts: int):
+        """
+        Internal function used to validate the 'max_attempts' value.
+
+        Raises:
+            ValueError: The value must be an integer
+            ValueError: The value must be greater than zero
+        """
+
+        if (not isinstance(max_attempts, int) or isinstance(max_attempts, bool)):
+            raise ValueError('max_attempts', max_attempts, 'The value must be an integer')
+        if (max_attempts <= 0):
+            raise ValueError('max_attempts', max_attempts, 'The value must be greater than zero')
+
+    def __validate_delay_seconds(self, name: str, delay_seconds: float):
+        """
+        Internal function used to validate the delay values.
+
+        Raises:
+            ValueError: The value must be a number
+            ValueError: The value must not be negative
+        """
+
+        if (not isinstance(delay_seconds, (int, float)) or isinstance(delay_seconds, bool)):
+            raise ValueError(name, delay_seconds, 'The value must be a number')
+        if (delay_seconds < 0):
+            raise ValueError(name, delay_seconds, 'The value must not be negative')
+
+    def __validate_jitter(self, jitter: bool):
+        """
+        Internal function used to validate the 'jitter' value.
+
+        Raises:
+            ValueError: The value must be a boolean
+        """
+
+        if (not isinstance(jitter, bool)):
+            raise ValueError('jitter', jitter, 'The value must be a boolean')
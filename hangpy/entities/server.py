@@ -17,4 +17,7 @@ class Server():
         self.start_datetime = None
         self.stop_datetime = None
         self.last_cycle_datetime = None
+        self.last_heartbeat_datetime = None
+        self.used_slots = 0
+        self.used_async_slots = 0
         self.configuration = configuration
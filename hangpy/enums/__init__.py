@@ -1 +1,2 @@
 from hangpy.enums.job_status import JobStatus # noqa F401
+from hangpy.enums.catch_up_policy import CatchUpPolicy # noqa F401
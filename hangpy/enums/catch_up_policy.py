@@ -0,0 +1,10 @@
+from enum import Enum
+
+
+class CatchUpPolicy(Enum):
+    """Enumeration containing the ways a recurring job handles the
+    occurrences missed while no server was running."""
+
+    ALL = 0
+    LATEST = 1
+    NONE = 2
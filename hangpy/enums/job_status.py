@@ -5,6 +5,8 @@ class JobStatus(Enum):
     """Enumeration containing the possible status for a job."""
 
     ENQUEUED = 0
+    SCHEDULED = 5
     PROCESSING = 10
     SUCCESS = 20
+    CANCELLED = 30
     ERROR = 99
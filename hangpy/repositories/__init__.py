@@ -1,5 +1,18 @@
+from hangpy.repositories.entry_codec import EntryCodec # noqa F401
+from hangpy.repositories.jsonpickle_entry_codec import JsonpickleEntryCodec # noqa F401
+from hangpy.repositories.compact_entry_codec import CompactEntryCodec # noqa F401
+from hangpy.repositories.redis_connection_pool import RedisConnectionPool # noqa F401
 from hangpy.repositories.redis_repository_base import RedisRepositoryBase # noqa F401
 from hangpy.repositories.job_repository import JobRepository # noqa F401
 from hangpy.repositories.server_repository import ServerRepository # noqa F401
+from hangpy.repositories.recurring_job_repository import RecurringJobRepository # noqa F401
+from hangpy.repositories.job_archive import JobArchive # noqa F401
+from hangpy.repositories.gzip_file_job_archive import GzipFileJobArchive # noqa F401
+from hangpy.repositories.in_memory_job_repository import InMemoryJobRepository # noqa F401
+from hangpy.repositories.in_memory_server_repository import InMemoryServerRepository # noqa F401
+from hangpy.repositories.journal_job_repository import JournalJobRepository # noqa F401
+from hangpy.repositories.sqlite_job_repository import SqliteJobRepository # noqa F401
+from hangpy.repositories.sharded_job_repository import ShardedJobRepository # noqa F401
 from hangpy.repositories.redis_job_repository import RedisJobRepository # noqa F401
 from hangpy.repositories.redis_server_repository import RedisServerRepository # noqa F401
+from hangpy.repositories.redis_recurring_job_repository import RedisRecurringJobRepository # noqa F401
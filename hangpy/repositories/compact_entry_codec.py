@@ -0,0 +1,346 @@
+import datetime
+import json
+import jsonpickle
+import struct
+from hangpy.dtos import ServerConfigurationDto
+from hangpy.entities import Job, Server
+from hangpy.entities.job import DEFAULT_QUEUE
+from hangpy.enums import JobStatus
+from hangpy.repositories.entry_codec import EntryCodec
+from hangpy.repositories.jsonpickle_entry_codec import JsonpickleEntryCodec
+
+RECORD_MARKER = 0xC7
+RECORD_VERSION = 6
+
+JOB_RECORD = 1
+SERVER_RECORD = 2
+
+JOB_ATTRIBUTES = ('id', 'module_name', 'class_name', 'status', 'error', 'enqueued_datetime',
+                  'start_datetime', 'end_datetime', 'parameters', 'priority', 'queue', 'attempts', 'timeout_seconds')
+ATTEMPT_KEYS = ('start_datetime', 'end_datetime', 'error')
+SERVER_ATTRIBUTES = ('id', 'start_datetime', 'stop_datetime', 'last_cycle_datetime', 'last_heartbeat_datetime',
+                     'used_slots', 'used_async_slots', 'configuration')
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+class CompactEntryCodec(EntryCodec):
+    """
+    Codec that encodes the jobs and the servers as compact binary records,
+    written field by field following the attributes of each entity: the
+    datetimes are stored as integers, the status as its value and the strings
+    prefixed by their length. Attributes unknown to the record (or parameters
+    that are not strings) are kept using 'jsonpickle'.
+
+    Every record starts with a marker byte, the version of the record and the
+    type of the entity. Data without the marker is decoded as 'jsonpickle',
+    so entries stored by previous versions are still read, and entries of
+    any other type are encoded using 'jsonpickle'.
+
+    The records are binary, so the Redis client must not decode the
+    responses.
+    """
+
+    def __init__(self):
+        self.fallback_codec = JsonpickleEntryCodec()
+
+    def encode(self, entry: object) -> bytes:
+        if (type(entry) is Job):
+            return self.__encode_job(entry)
+        if (type(entry) is Server):
+            return self.__encode_server(entry)
+        return self.fallback_codec.encode(entry)
+
+    def decode(self, serialized_entry: bytes) -> object:
+        if (not self.is_compact_record(serialized_entry)):
+            return self.fallback_codec.decode(serialized_entry)
+        reader = RecordReader(serialized_entry)
+        reader.read_byte()
+        version = reader.read_byte()
+        if (version > RECORD_VERSION):
+            raise ValueError('serialized_entry', version, 'The record version is not supported')
+        record_type = reader.read_byte()
+        if (record_type == JOB_RECORD):
+            return self.__decode_job(reader, version)
+        if (record_type == SERVER_RECORD):
+            return self.__decode_server(reader, version)
+        raise ValueError('serialized_entry', record_type, 'The record type is not supported')
+
+    def is_compact_record(self, serialized_entry: bytes) -> bool:
+        """
+        Returns 'True' if the data passed by parameter is a record encoded by
+        this codec, and 'False' otherwise.
+
+        Args:
+            serialized_entry (bytes)
+
+        Returns:
+            bool
+        """
+
+        return isinstance(serialized_entry, bytes) and serialized_entry[:1] == bytes([RECORD_MARKER])
+
+    def __encode_job(self, job: Job) -> bytes:
+        """Internal function that writes the record of a job."""
+
+        writer = RecordWriter(JOB_RECORD)
+        writer.write_string(job.id)
+        writer.write_string(job.module_name)
+        writer.write_string(job.class_name)
+        writer.write_unsigned(job.status.value)
+        writer.write_optional_string(job.error)
+        writer.write_datetime(job.enqueued_datetime)
+        writer.write_datetime(job.start_datetime)
+        writer.write_datetime(job.end_datetime)
+        writer.write_parameters(job.parameters)
+        writer.write_signed(job.priority)
+        writer.write_string(job.queue)
+        writer.write_attempts(job.attempts)
+        writer.write_optional_number(job.timeout_seconds)
+        writer.write_extra_attributes(job, JOB_ATTRIBUTES)
+        return writer.get_bytes()
+
+    def __decode_job(self, reader: 'RecordReader', version: int) -> Job:
+        """Internal function that reads the record of a job. The records
+        before the version 3 don't have the priority, the ones before the
+        version 4 don't have the queue, the ones before the version 5 don't
+        have the attempts and the ones before the version 6 don't have the
+        timeout."""
+
+        job = Job.__new__(Job)
+        job.id = reader.read_string()
+        job.module_name = reader.read_string()
+        job.class_name = reader.read_string()
+        job.status = JobStatus(reader.read_unsigned())
+        job.error = reader.read_optional_string()
+        job.enqueued_datetime = reader.read_datetime()
+        job.start_datetime = reader.read_datetime()
+        job.end_datetime = reader.read_datetime()
+        job.parameters = reader.read_parameters()
+        job.priority = reader.read_signed() if version >= 3 else 0
+        job.queue = reader.read_string() if version >= 4 else DEFAULT_QUEUE
+        job.attempts = reader.read_attempts() if version >= 5 else []
+        job.timeout_seconds = reader.read_optional_number() if version >= 6 else None
+        reader.read_extra_attributes(job)
+        return job
+
+    def __encode_server(self, server: Server) -> bytes:
+        """Internal function that writes the record of a server."""
+
+        writer = RecordWriter(SERVER_RECORD)
+        writer.write_string(server.id)
+        writer.write_datetime(server.start_datetime)
+        writer.write_datetime(server.stop_datetime)
+        writer.write_datetime(server.last_cycle_datetime)
+        writer.write_datetime(server.last_heartbeat_datetime)
+        writer.write_unsigned(server.used_slots)
+        writer.write_unsigned(server.used_async_slots)
+        configuration = None if server.configuration is None else json.dumps(vars(server.configuration))
+        writer.write_optional_string(configuration)
+        writer.write_extra_attributes(server, SERVER_ATTRIBUTES)
+        return writer.get_bytes()
+
+    def __decode_server(self, reader: 'RecordReader', version: int) -> Server:
+        """Internal function that reads the record of a server. The records of
+        the version 1 don't have the heartbeat and the slots in use."""
+
+        server = Server.__new__(Server)
+        server.id = reader.read_string()
+        server.start_datetime = reader.read_datetime()
+        server.stop_datetime = reader.read_datetime()
+        server.last_cycle_datetime = reader.read_datetime()
+        server.last_heartbeat_datetime = None
+        server.used_slots = 0
+        server.used_async_slots = 0
+        if (version >= 2):
+            server.last_heartbeat_datetime = reader.read_datetime()
+            server.used_slots = reader.read_unsigned()
+            server.used_async_slots = reader.read_unsigned()
+        configuration = reader.read_optional_string()
+        server.configuration = None
+        if (configuration is not None):
+            server.configuration = ServerConfigurationDto.__new__(ServerConfigurationDto)
+            vars(server.configuration).update(json.loads(configuration))
+        reader.read_extra_attributes(server)
+        return server
+
+
+class RecordWriter():
+    """Writes the fields of a record encoded by the CompactEntryCodec."""
+
+    def __init__(self, record_type: int):
+        self.buffer = bytearray([RECORD_MARKER, RECORD_VERSION, record_type])
+
+    def get_bytes(self) -> bytes:
+        return bytes(self.buffer)
+
+    def write_byte(self, value: int):
+        self.buffer.append(value)
+
+    def write_unsigned(self, value: int):
+        """Writes the integer using 7 bits per byte, the highest bit telling
+        whether more bytes follow."""
+
+        while (value > 0x7F):
+            self.buffer.append((value & 0x7F) | 0x80)
+            value >>= 7
+        self.buffer.append(value)
+
+    def write_signed(self, value: int):
+        """Writes the integer mapping the negative values to odd numbers, so
+        small values take a single byte regardless of the sign."""
+
+        self.write_unsigned(value * 2 if value >= 0 else -value * 2 - 1)
+
+    def write_bytes(self, value: bytes):
+        self.write_unsigned(len(value))
+        self.buffer.extend(value)
+
+    def write_string(self, value: str):
+        self.write_bytes(value.encode())
+
+    def write_optional_string(self, value: str):
+        if (value is None):
+            self.write_byte(0)
+            return
+        self.write_byte(1)
+        self.write_string(value)
+
+    def write_optional_number(self, value: float):
+        """Writes the integer or float as a double, keeping the integers as
+        integers when read."""
+
+        if (value is None):
+            self.write_byte(0)
+            return
+        self.write_byte(1 if isinstance(value, int) else 2)
+        self.buffer.extend(struct.pack('<d', value))
+
+    def write_datetime(self, value: str):
+        """Writes the ISO datetime as the microseconds since the epoch. The
+        datetimes whose text can't be rebuilt from that (with a timezone, for
+        instance) are written as strings."""
+
+        if (value is None):
+            self.write_byte(0)
+            return
+        parsed_value = self.__parse_datetime(value)
+        if (parsed_value is None or parsed_value.tzinfo is not None or parsed_value.isoformat() != value):
+            self.write_byte(2)
+            self.write_string(value)
+            return
+        self.write_byte(1)
+        self.buffer.extend(struct.pack('<q', (parsed_value - EPOCH) // datetime.timedelta(microseconds=1)))
+
+    def __parse_datetime(self, value: str) -> datetime.datetime:
+        try:
+            return datetime.datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            return None
+
+    def write_parameters(self, parameters: list):
+        if (all(isinstance(parameter, str) for parameter in parameters)):
+            self.write_byte(0)
+            self.write_unsigned(len(parameters))
+            for parameter in parameters:
+                self.write_string(parameter)
+            return
+        self.write_byte(1)
+        self.write_string(jsonpickle.encode(parameters))
+
+    def write_attempts(self, attempts: list):
+        """Writes the attempts of a job field by field. Attempts with other
+        keys are written using 'jsonpickle'."""
+
+        if (any(set(attempt) != set(ATTEMPT_KEYS) for attempt in attempts)):
+            self.write_byte(1)
+            self.write_string(jsonpickle.encode(attempts))
+            return
+        self.write_byte(0)
+        self.write_unsigned(len(attempts))
+        for attempt in attempts:
+            self.write_datetime(attempt['start_datetime'])
+            self.write_datetime(attempt['end_datetime'])
+            self.write_optional_string(attempt['error'])
+
+    def write_extra_attributes(self, entry: object, attributes: tuple):
+        extra_attributes = {name: value for name, value in vars(entry).items() if name not in attributes}
+        if (not extra_attributes):
+            self.write_byte(0)
+            return
+        self.write_byte(1)
+        self.write_string(jsonpickle.encode(extra_attributes))
+
+
+class RecordReader():
+    """Reads the fields of a record encoded by the CompactEntryCodec."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.position = 0
+
+    def read_byte(self) -> int:
+        value = self.data[self.position]
+        self.position += 1
+        return value
+
+    def read_unsigned(self) -> int:
+        value = 0
+        shift = 0
+        while (True):
+            byte = self.read_byte()
+            value |= (byte & 0x7F) << shift
+            if (byte < 0x80):
+                return value
+            shift += 7
+
+    def read_signed(self) -> int:
+        value = self.read_unsigned()
+        return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+    def read_bytes(self) -> bytes:
+        length = self.read_unsigned()
+        value = self.data[self.position:self.position + length]
+        self.position += length
+        return value
+
+    def read_string(self) -> str:
+        return self.read_bytes().decode()
+
+    def read_optional_string(self) -> str:
+        if (self.read_byte() == 0):
+            return None
+        return self.read_string()
+
+    def read_optional_number(self) -> float:
+        kind = self.read_byte()
+        if (kind == 0):
+            return None
+        value = struct.unpack_from('<d', self.data, self.position)[0]
+        self.position += 8
+        return int(value) if kind == 1 else value
+
+    def read_datetime(self) -> str:
+        kind = self.read_byte()
+        if (kind == 0):
+            return None
+        if (kind == 2):
+            return self.read_string()
+        microseconds = struct.unpack_from('<q', self.data, self.position)[0]
+        self.position += 8
+        return (EPOCH + datetime.timedelta(microseconds=microseconds)).isoformat()
+
+    def read_parameters(self) -> list:
+        if (self.read_byte() == 1):
+            return jsonpickle.decode(self.read_string())
+        return [self.read_string() for index in range(self.read_unsigned())]
+
+    def read_attempts(self) -> list:
+        if (self.read_byte() == 1):
+            return jsonpickle.decode(self.read_string())
+        return [dict(zip(ATTEMPT_KEYS, (self.read_datetime(), self.read_datetime(), self.read_optional_string())))
+                for index in range(self.read_unsigned())]
+
+    def read_extra_attributes(self, entry: object):
+        if (self.read_byte() == 1):
+            vars(entry).update(jsonpickle.decode(self.read_string()))
@@ -0,0 +1,36 @@
+from abc import ABC, abstractmethod
+
+
+class EntryCodec(ABC):
+    """
+    Interface defining the functions necessary for a class to be used to
+    encode the entries stored on the repositories.
+    """
+
+    @abstractmethod
+    def encode(self, entry: object) -> bytes:
+        """
+        Encodes the entry passed by parameter, returning the data to be
+        stored on the repository (bytes or a string).
+
+        Args:
+            entry (object)
+
+        Returns:
+            bytes
+        """
+        pass
+
+    @abstractmethod
+    def decode(self, serialized_entry: bytes) -> object:
+        """
+        Decodes the data passed by parameter, returning an instance of the
+        entry.
+
+        Args:
+            serialized_entry (bytes)
+
+        Returns:
+            object
+        """
+        pass
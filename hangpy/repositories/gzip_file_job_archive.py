@@ -0,0 +1,53 @@
+import datetime
+import gzip
+import os
+import uuid
+import jsonpickle
+from hangpy.entities import Job
+from hangpy.repositories.job_archive import JobArchive
+
+
+class GzipFileJobArchive(JobArchive):
+    """
+    Implementation of the JobArchive that writes the jobs to gzip compressed
+    files on a local directory, one file for each batch archived, named
+    'jobs-{datetime}-{id}.jsonl.gz'. Each line of a file is a job encoded
+    using 'jsonpickle'. The files are written under a temporary name and
+    renamed when complete, so a file with the final name is never partial.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory (str): Directory where the files are written, created
+            if it doesn't exist.
+        """
+
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def archive_jobs(self, jobs: list[Job]):
+        if (len(jobs) == 0):
+            return
+        file_name = f'jobs-{datetime.datetime.now().strftime("%Y%m%dT%H%M%S")}-{uuid.uuid4().hex}.jsonl.gz'
+        file_path = os.path.join(self.directory, file_name)
+        temporary_file_path = f'{file_path}.tmp'
+        with gzip.open(temporary_file_path, 'wt', encoding='utf-8') as archive_file:
+            for job in jobs:
+                archive_file.write(jsonpickle.encode(job))
+                archive_file.write('\n')
+        os.replace(temporary_file_path, file_path)
+
+    def read_jobs(self, file_path: str) -> list[Job]:
+        """
+        Returns the jobs archived on the file passed by parameter.
+
+        Args:
+            file_path (str)
+
+        Returns:
+            list[Job]
+        """
+
+        with gzip.open(file_path, 'rt', encoding='utf-8') as archive_file:
+            return [jsonpickle.decode(line) for line in archive_file if line.strip()]
@@ -0,0 +1,562 @@
+import collections
+import copy
+import datetime
+import heapq
+import itertools
+import threading
+from hangpy.entities import Job
+from hangpy.entities.job import CANCELLED_JOB_ERROR, DEFAULT_QUEUE
+from hangpy.enums import JobStatus
+from hangpy.repositories import JobRepository
+
+
+class InMemoryJobRepository(JobRepository):
+    """Implementation of the JobRepository that keeps the jobs on the memory
+    of the process, for single node deployments and tests. The jobs are
+    shared by the servers and job services of the same process only, and are
+    lost when it ends.
+
+    The jobs are kept by id, as copies of the instances passed by parameter,
+    so changing a job has no effect until it is updated, like on the other
+    repositories. For each status there is an ordered dictionary of the ids
+    of its jobs, in the order they reached it, working as the index of the
+    status. The enqueued jobs are indexed by queue and by priority, so
+    claiming a job takes the first one of the highest priority of the queue,
+    without sorting or scanning the jobs. Priorities are always strict. The
+    scheduled jobs are also kept on a heap ordered by the datetime they are
+    due.
+
+    All the operations hold a single lock, so they are atomic across the
+    threads of the process.
+
+    Every change of the jobs is reported to the functions prefixed by '_on_',
+    called holding the lock, which do nothing here. They are overridden by
+    the subclasses that persist the jobs, like the JournalJobRepository.
+    """
+
+    def __init__(self):
+        self.__lock = threading.RLock()
+        self.__enqueued_jobs_condition = threading.Condition(self.__lock)
+        self.__jobs = {}
+        self.__indexes = {status: collections.OrderedDict() for status in JobStatus if status != JobStatus.ENQUEUED}
+        self.__queues = {}
+        self.__queue_notifications = collections.Counter()
+        self.__scheduled_jobs = []
+        self.__locks = {}
+        self.__leases = {}
+        self.__cancellations = set()
+        self.__purges = {}
+        self.__dead_letter_jobs = collections.OrderedDict()
+
+    def get_jobs(self) -> list[Job]:
+        with self.__lock:
+            return [self.__copy_job(self.__jobs[job_id]) for status in JobStatus for job_id in self.__get_job_ids_by_status(status)]
+
+    def get_job_by_status(self, status: JobStatus) -> Job:
+        """The enqueued job returned is the next one of all the queues."""
+
+        with self.__lock:
+            if (status != JobStatus.ENQUEUED):
+                job_ids = self.__indexes[status]
+                return self.__copy_job(self.__jobs[next(iter(job_ids))]) if (len(job_ids) > 0) else None
+            first_jobs = [self.__jobs[self.__get_first_job_id(queue)] for queue in self.__queues]
+            if (len(first_jobs) == 0):
+                return None
+            return self.__copy_job(min(first_jobs, key=lambda job: (-job.priority, job.enqueued_datetime or '')))
+
+    def get_jobs_by_status(self, status: JobStatus) -> list[Job]:
+        with self.__lock:
+            return [self.__copy_job(self.__jobs[job_id]) for job_id in self.__get_job_ids_by_status(status)]
+
+    def exists_jobs_with_status(self, status: JobStatus) -> bool:
+        return self.count_jobs_by_status(status) > 0
+
+    def count_jobs_by_status(self, status: JobStatus) -> int:
+        with self.__lock:
+            if (status == JobStatus.ENQUEUED):
+                return self.count_enqueued_jobs(list(self.__queues))
+            return len(self.__indexes[status])
+
+    def count_enqueued_jobs(self, queues: list[str]) -> int:
+        with self.__lock:
+            return sum(len(job_ids) for queue in queues for job_ids in self.__queues.get(queue, {}).values())
+
+    def get_status_counts(self) -> dict[JobStatus, int]:
+        with self.__lock:
+            return {status: self.count_jobs_by_status(status) for status in JobStatus}
+
+    def add_job(self, job: Job):
+        self.__set_jobs([job])
+
+    def add_jobs(self, jobs: list[Job]):
+        self.__set_jobs(jobs)
+
+    def update_job(self, job: Job):
+        self.__set_jobs([job])
+
+    def update_jobs(self, jobs: list[Job]):
+        self.__set_jobs(jobs)
+
+    def try_set_lock_on_job(self, job: Job, lease_milliseconds: int = 60000) -> bool:
+        with self.__lock:
+            if (self.__locks.get(job.id, 0) > self.__get_now_timestamp()):
+                return False
+            self.__locks[job.id] = self.__get_lease_timestamp(lease_milliseconds)
+            return True
+
+    def claim_job(self, lease_milliseconds: int = 60000, queues: list[str] = None) -> Job:
+        jobs = self.claim_jobs(1, lease_milliseconds, queues)
+        if (len(jobs) == 0):
+            return None
+        return jobs[0]
+
+    def claim_jobs(self, quantity: int, lease_milliseconds: int = 60000, queues: list[str] = None) -> list[Job]:
+        jobs = []
+        with self.__lock:
+            start_datetime = datetime.datetime.now().isoformat()
+            lease_timestamp = self.__get_lease_timestamp(lease_milliseconds)
+            for queue in queues or [DEFAULT_QUEUE]:
+                while (len(jobs) < quantity and queue in self.__queues):
+                    job = self.__jobs[self.__get_first_job_id(queue)]
+                    self.__remove_job_index(job)
+                    job.status = JobStatus.PROCESSING
+                    job.start_datetime = start_datetime
+                    self.__add_job_index(job)
+                    self.__locks[job.id] = lease_timestamp
+                    self.__leases[job.id] = lease_timestamp
+                    self._on_job_transitioned(job)
+                    jobs.append(self.__copy_job(job))
+        return jobs
+
+    def renew_job_leases(self, jobs: list[Job], lease_milliseconds: int = 60000) -> list[Job]:
+        lost_jobs = []
+        with self.__lock:
+            lease_timestamp = self.__get_lease_timestamp(lease_milliseconds)
+            for job in jobs:
+                if (job.id not in self.__leases):
+                    lost_jobs.append(job)
+                    continue
+                self.__leases[job.id] = lease_timestamp
+                self.__locks[job.id] = lease_timestamp
+        return lost_jobs
+
+    def reclaim_expired_jobs(self) -> list[str]:
+        """The jobs flagged to be cancelled are cancelled instead."""
+
+        job_ids = []
+        with self.__lock:
+            now = datetime.datetime.now()
+            for job_id in [job_id for job_id, lease_timestamp in self.__leases.items() if lease_timestamp <= now.timestamp()]:
+                del self.__leases[job_id]
+                job = self.__jobs.get(job_id)
+                if (job is None or job.status != JobStatus.PROCESSING):
+                    continue
+                self.__locks.pop(job_id, None)
+                self.__remove_job_index(job)
+                if (job_id in self.__cancellations):
+                    self.__cancellations.discard(job_id)
+                    self.__set_cancelled_state(job, now)
+                else:
+                    job.status = JobStatus.ENQUEUED
+                    job.start_datetime = None
+                    job_ids.append(job_id)
+                self.__add_job_index(job)
+                self._on_job_transitioned(job)
+        return job_ids
+
+    def promote_scheduled_jobs(self, limit: int = 1000) -> list[str]:
+        """The scheduled jobs are kept on a heap, so only the due ones are
+        read. The jobs whose entry on the heap is outdated, as they were
+        cancelled or scheduled again, are skipped.
+        """
+
+        job_ids = []
+        with self.__lock:
+            now_timestamp = self.__get_now_timestamp()
+            while (len(job_ids) < limit and len(self.__scheduled_jobs) > 0 and self.__scheduled_jobs[0][0] <= now_timestamp):
+                timestamp, job_id = heapq.heappop(self.__scheduled_jobs)
+                job = self.__jobs.get(job_id)
+                if (job is None or job.status != JobStatus.SCHEDULED or self.__get_due_timestamp(job) != timestamp):
+                    continue
+                self.__remove_job_index(job)
+                job.status = JobStatus.ENQUEUED
+                self.__add_job_index(job)
+                self._on_job_transitioned(job)
+                job_ids.append(job_id)
+        return job_ids
+
+    def cancel_job(self, job_id: str) -> bool:
+        with self.__lock:
+            job = self.__jobs.get(job_id)
+            if (job is None):
+                return False
+            if (job.status in (JobStatus.ENQUEUED, JobStatus.SCHEDULED)):
+                self.__remove_job_index(job)
+                self.__set_cancelled_state(job, datetime.datetime.now())
+                self.__add_job_index(job)
+                self._on_job_transitioned(job)
+                return True
+            if (job.status == JobStatus.PROCESSING):
+                self.__cancellations.add(job_id)
+                self._on_cancellation_requested(job_id)
+                return True
+            return False
+
+    def get_cancelled_job_ids(self, job_ids: list[str]) -> list[str]:
+        with self.__lock:
+            return [job_id for job_id in job_ids if job_id in self.__cancellations]
+
+    def move_jobs_to_dead_letter(self, jobs: list[Job]):
+        with self.__lock:
+            for job in jobs:
+                self.__delete_job(job.id)
+                self.__dead_letter_jobs[job.id] = self.__copy_job(job)
+                self._on_dead_letter_job_added(self.__dead_letter_jobs[job.id])
+
+    def get_dead_letter_jobs(self, limit: int = 100) -> list[Job]:
+        with self.__lock:
+            dead_letter_jobs = list(self.__dead_letter_jobs.values())[:max(limit, 0)]
+            return [self.__copy_job(job) for job in dead_letter_jobs]
+
+    def count_dead_letter_jobs(self) -> int:
+        with self.__lock:
+            return len(self.__dead_letter_jobs)
+
+    def requeue_dead_letter_job(self, job_id: str) -> Job:
+        with self.__lock:
+            job = self.__dead_letter_jobs.pop(job_id, None)
+            if (job is None):
+                return None
+            self._on_dead_letter_job_removed(job_id)
+            job.status = JobStatus.ENQUEUED
+            job.error = None
+            job.enqueued_datetime = datetime.datetime.now().isoformat()
+            job.start_datetime = None
+            job.end_datetime = None
+            self.__set_jobs([job])
+            return self.__copy_job(job)
+
+    def claim_expired_jobs(self,
+                           status: JobStatus,
+                           max_age_seconds: float = None,
+                           max_count: int = None,
+                           limit: int = 1000,
+                           lease_milliseconds: int = 60000) -> list[Job]:
+        """The jobs are read from the beginning of the index of the status,
+        where the jobs that finished first are. The jobs whose claim expired
+        are claimed first, whatever their status.
+        """
+
+        with self.__lock:
+            now_timestamp = self.__get_now_timestamp()
+            job_ids = [job_id for job_id, lease_timestamp in self.__purges.items() if lease_timestamp <= now_timestamp][:max(limit, 0)]
+            job_ids_by_status = self.__indexes.get(status, {})
+            if (max_count is not None):
+                excess = min(len(job_ids_by_status) - max_count, limit - len(job_ids))
+                job_ids.extend(itertools.islice(job_ids_by_status, max(excess, 0)))
+            if (max_age_seconds is not None):
+                max_timestamp = now_timestamp - max_age_seconds
+                claimed_job_ids = set(job_ids)
+                for job_id in job_ids_by_status:
+                    if (len(job_ids) >= limit or self.__get_status_timestamp(self.__jobs[job_id]) > max_timestamp):
+                        break
+                    if (job_id not in claimed_job_ids):
+                        job_ids.append(job_id)
+            lease_timestamp = self.__get_lease_timestamp(lease_milliseconds)
+            jobs = []
+            for job_id in job_ids:
+                job = self.__jobs.get(job_id)
+                if (job is None):
+                    self.__purges.pop(job_id, None)
+                    continue
+                if (job_id not in self.__purges):
+                    self.__remove_job_index(job)
+                self.__purges[job_id] = lease_timestamp
+                jobs.append(self.__copy_job(job))
+            return jobs
+
+    def delete_jobs(self, jobs: list[Job]):
+        with self.__lock:
+            for job in jobs:
+                self.__purges.pop(job.id, None)
+                self.__locks.pop(job.id, None)
+                if (self.__jobs.pop(job.id, None) is not None):
+                    self._on_job_removed(job.id)
+
+    def wait_for_enqueued_jobs(self, timeout_seconds: float, queues: list[str] = None) -> bool:
+        """Only the jobs enqueued while waiting are notified."""
+
+        queues = queues or [DEFAULT_QUEUE]
+        with self.__enqueued_jobs_condition:
+            notifications = [self.__queue_notifications[queue] for queue in queues]
+            return self.__enqueued_jobs_condition.wait_for(
+                lambda: [self.__queue_notifications[queue] for queue in queues] != notifications, timeout_seconds)
+
+    def __set_jobs(self, jobs: list[Job]):
+        """Internal function to unify the add and update instructions. Each
+        job is stored as a copy, and moved to the index of its current status
+        and queue. The enqueued jobs take their place on the queue by the
+        datetime they were enqueued, so the jobs released by a server are
+        claimed again before the ones enqueued after them. The lock, the
+        lease and the flag of the cancellation of jobs that are no longer
+        being processed are released.
+
+        Args:
+            jobs (list[Job])
+        """
+
+        with self.__lock:
+            for job in jobs:
+                stored_job = self.__jobs.get(job.id)
+                if (stored_job is not None):
+                    self.__remove_job_index(stored_job)
+                job = self.__copy_job(job)
+                self.__jobs[job.id] = job
+                self.__add_job_index(job)
+                if (job.status == JobStatus.ENQUEUED):
+                    self.__sort_enqueued_job_index(job)
+                if (job.status != JobStatus.PROCESSING):
+                    self.__locks.pop(job.id, None)
+                    self.__leases.pop(job.id, None)
+                    self.__cancellations.discard(job.id)
+                self._on_job_stored(job, stored_job)
+
+    def _on_job_stored(self, job: Job, previous_job: Job):
+        """Called after the job passed by parameter is added or updated.
+
+        Args:
+            job (Job): The job stored.
+            previous_job (Job): The job replaced, or None if it was added.
+        """
+
+    def _on_job_transitioned(self, job: Job):
+        """Called after the job passed by parameter changes its status by an
+        operation of the repository (claimed, reclaimed, promoted or
+        cancelled). Only its status, start and end datetimes and error
+        change.
+
+        Args:
+            job (Job)
+        """
+
+    def _on_job_removed(self, job_id: str):
+        """Called after the job with the id passed by parameter is deleted
+        or moved to the dead-letter queue.
+
+        Args:
+            job_id (str)
+        """
+
+    def _on_cancellation_requested(self, job_id: str):
+        """Called after the cancellation of the job being processed with the
+        id passed by parameter is requested.
+
+        Args:
+            job_id (str)
+        """
+
+    def _on_dead_letter_job_added(self, job: Job):
+        """Called after the job passed by parameter is moved to the
+        dead-letter queue.
+
+        Args:
+            job (Job)
+        """
+
+    def _on_dead_letter_job_removed(self, job_id: str):
+        """Called after the job with the id passed by parameter is removed
+        from the dead-letter queue to be enqueued again.
+
+        Args:
+            job_id (str)
+        """
+
+    def __add_job_index(self, job: Job):
+        """Internal function that adds the job to the index of its status, and
+        to the heap of the scheduled jobs if it is scheduled. The servers
+        waiting on the queue of the enqueued jobs are notified.
+
+        Args:
+            job (Job)
+        """
+
+        if (job.status == JobStatus.ENQUEUED):
+            self.__queues.setdefault(job.queue, {}).setdefault(job.priority, collections.OrderedDict())[job.id] = None
+            self.__queue_notifications[job.queue] += 1
+            self.__enqueued_jobs_condition.notify_all()
+            return
+        self.__indexes[job.status][job.id] = None
+        if (job.status == JobStatus.SCHEDULED):
+            heapq.heappush(self.__scheduled_jobs, (self.__get_due_timestamp(job), job.id))
+
+    def __remove_job_index(self, job: Job):
+        """Internal function that removes the job from the index of its
+        status. Empty queues and priorities are removed, so the queues kept
+        are the ones with jobs enqueued. The entries of the heap of the
+        scheduled jobs are skipped when they are popped.
+
+        Args:
+            job (Job)
+        """
+
+        if (job.status != JobStatus.ENQUEUED):
+            self.__indexes[job.status].pop(job.id, None)
+            return
+        priorities = self.__queues.get(job.queue, {})
+        job_ids = priorities.get(job.priority, {})
+        job_ids.pop(job.id, None)
+        if (len(job_ids) == 0):
+            priorities.pop(job.priority, None)
+        if (len(priorities) == 0):
+            self.__queues.pop(job.queue, None)
+
+    def __sort_enqueued_job_index(self, job: Job):
+        """Internal function that moves the enqueued job passed by parameter,
+        the last one of its priority, before the jobs of its queue and
+        priority enqueued after it. Only the jobs after it are moved, so
+        adding a new job moves none.
+
+        Args:
+            job (Job)
+        """
+
+        if (job.enqueued_datetime is None):
+            return
+        enqueued_datetime = datetime.datetime.fromisoformat(job.enqueued_datetime)
+        job_ids = self.__queues[job.queue][job.priority]
+        later_job_ids = []
+        for job_id in itertools.islice(reversed(job_ids), 1, None):
+            later_job = self.__jobs[job_id]
+            if (later_job.enqueued_datetime is not None
+                    and datetime.datetime.fromisoformat(later_job.enqueued_datetime) <= enqueued_datetime):
+                break
+            later_job_ids.append(job_id)
+        for job_id in reversed(later_job_ids):
+            job_ids.move_to_end(job_id)
+
+    def __delete_job(self, job_id: str):
+        """Internal function that removes the job with the id passed by
+        parameter, along with its index, lock, lease and flags.
+
+        Args:
+            job_id (str)
+        """
+
+        job = self.__jobs.pop(job_id, None)
+        if (job is not None and job_id not in self.__purges):
+            self.__remove_job_index(job)
+        if (job is not None):
+            self._on_job_removed(job_id)
+        self.__locks.pop(job_id, None)
+        self.__leases.pop(job_id, None)
+        self.__cancellations.discard(job_id)
+        self.__purges.pop(job_id, None)
+
+    def __get_first_job_id(self, queue: str) -> str:
+        """Internal function that returns the id of the next job of the queue
+        passed by parameter, the first one of its highest priority. The queue
+        must have jobs enqueued.
+
+        Args:
+            queue (str)
+
+        Returns:
+            str
+        """
+
+        priorities = self.__queues[queue]
+        return next(iter(priorities[max(priorities)]))
+
+    def __get_job_ids_by_status(self, status: JobStatus) -> list[str]:
+        """Internal function that returns the ids of the jobs with the status
+        passed by parameter. The enqueued jobs are returned by queue, in the
+        order they are claimed.
+
+        Args:
+            status (JobStatus)
+
+        Returns:
+            list[str]
+        """
+
+        if (status != JobStatus.ENQUEUED):
+            return list(self.__indexes[status])
+        return [job_id for priorities in self.__queues.values()
+                for priority in sorted(priorities, reverse=True) for job_id in priorities[priority]]
+
+    def __set_cancelled_state(self, job: Job, end_datetime: datetime.datetime):
+        """Internal function that sets the job passed by parameter as
+        cancelled.
+
+        Args:
+            job (Job)
+            end_datetime (datetime)
+        """
+
+        job.status = JobStatus.CANCELLED
+        job.end_datetime = end_datetime.isoformat()
+        job.error = CANCELLED_JOB_ERROR
+
+    def __copy_job(self, job: Job) -> Job:
+        """Internal function that returns a copy of the job passed by
+        parameter, with its own lists of parameters and attempts, so the
+        jobs stored don't change along with the instances used by the
+        servers.
+
+        Args:
+            job (Job)
+
+        Returns:
+            Job
+        """
+
+        job_copy = copy.copy(job)
+        job_copy.parameters = list(job.parameters)
+        job_copy.attempts = list(getattr(job, 'attempts', []))
+        return job_copy
+
+    def __get_due_timestamp(self, job: Job) -> float:
+        """Internal function that returns the timestamp in which the scheduled
+        job passed by parameter is due.
+
+        Args:
+            job (Job)
+
+        Returns:
+            float
+        """
+
+        if (job.enqueued_datetime is None):
+            return 0
+        return datetime.datetime.fromisoformat(job.enqueued_datetime).timestamp()
+
+    def __get_status_timestamp(self, job: Job) -> float:
+        """Internal function that returns the timestamp in which the finished
+        job passed by parameter reached its status.
+
+        Args:
+            job (Job)
+
+        Returns:
+            float
+        """
+
+        if (job.end_datetime is None):
+            return self.__get_now_timestamp()
+        return datetime.datetime.fromisoformat(job.end_datetime).timestamp()
+
+    def __get_now_timestamp(self) -> float:
+        return datetime.datetime.now().timestamp()
+
+    def __get_lease_timestamp(self, lease_milliseconds: int) -> float:
+        """Internal function that returns the timestamp in which a lease
+        renewed now expires.
+
+        Args:
+            lease_milliseconds (int)
+
+        Returns:
+            float
+        """
+
+        return (datetime.datetime.now() + datetime.timedelta(milliseconds=lease_milliseconds)).timestamp()
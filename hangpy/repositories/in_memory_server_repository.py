@@ -0,0 +1,61 @@
+import copy
+import datetime
+import threading
+from hangpy.entities import Server
+from hangpy.repositories import ServerRepository
+
+
+class InMemoryServerRepository(ServerRepository):
+    """Implementation of the ServerRepository that keeps the servers on the
+    memory of the process, for single node deployments and tests.
+
+    The servers are kept by id, as copies of the instances passed by
+    parameter. The live servers are kept apart, along with the timestamp in
+    which their last heartbeat expires, and the servers whose heartbeat
+    expired are removed on every heartbeat.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__servers = {}
+        self.__live_servers = {}
+
+    def get_servers(self) -> list[Server]:
+        with self.__lock:
+            return [copy.copy(server) for server in self.__servers.values()]
+
+    def add_server(self, server: Server):
+        self.__set_server(server)
+
+    def update_server(self, server: Server):
+        """Stopped servers are removed from the live servers."""
+
+        self.__set_server(server)
+
+    def send_heartbeat(self, server: Server, timeout_milliseconds: int):
+        now = datetime.datetime.now()
+        expiration_timestamp = (now + datetime.timedelta(milliseconds=timeout_milliseconds)).timestamp()
+        with self.__lock:
+            self.__servers[server.id] = copy.copy(server)
+            self.__live_servers[server.id] = expiration_timestamp
+            for server_id in [server_id for server_id, timestamp in self.__live_servers.items() if timestamp <= now.timestamp()]:
+                del self.__live_servers[server_id]
+                del self.__servers[server_id]
+
+    def get_live_servers(self) -> list[Server]:
+        now_timestamp = datetime.datetime.now().timestamp()
+        with self.__lock:
+            return [copy.copy(self.__servers[server_id]) for server_id, timestamp in self.__live_servers.items()
+                    if timestamp > now_timestamp]
+
+    def __set_server(self, server: Server):
+        """Internal function to unify the add and update instructions.
+
+        Args:
+            server (Server)
+        """
+
+        with self.__lock:
+            self.__servers[server.id] = copy.copy(server)
+            if (server.stop_datetime is not None):
+                self.__live_servers.pop(server.id, None)
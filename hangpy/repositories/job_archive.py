@@ -0,0 +1,20 @@
+from abc import ABC, abstractmethod
+from hangpy.entities import Job
+
+
+class JobArchive(ABC):
+    """
+    Interface defining the functions necessary for a class to be used to
+    archive the jobs removed from the job repository by their retention.
+    """
+
+    @abstractmethod
+    def archive_jobs(self, jobs: list[Job]):
+        """
+        Stores the jobs passed by parameter for good. The jobs are only
+        removed from the job repository if no exception is raised.
+
+        Args:
+            jobs (list[Job])
+        """
+        pass
@@ -62,6 +62,46 @@ class JobRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def count_jobs_by_status(self, status: JobStatus) -> int:
+        """
+        Returns the number of jobs with the status passed by parameter on the
+        repository. The count must not depend on the number of jobs stored,
+        as it is read by the servers on every cycle.
+
+        Args:
+            status (JobStatus)
+
+        Returns:
+            int
+        """
+        pass
+
+    @abstractmethod
+    def count_enqueued_jobs(self, queues: list[str]) -> int:
+        """
+        Returns the number of jobs enqueued on the queues passed by parameter,
+        without reading the other queues.
+
+        Args:
+            queues (list[str])
+
+        Returns:
+            int
+        """
+        pass
+
+    @abstractmethod
+    def get_status_counts(self) -> dict[JobStatus, int]:
+        """
+        Returns the number of jobs on the repository for each status, read at
+        once. Statuses without jobs are returned with zero.
+
+        Returns:
+            dict[JobStatus, int]
+        """
+        pass
+
     @abstractmethod
     def add_job(self, job: Job):
         """
@@ -73,6 +113,18 @@ class JobRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def add_jobs(self, jobs: list[Job]):
+        """
+        Adds the jobs passed by parameter into the repository and commits the
+        transaction. The cost of adding the jobs must not grow with the
+        number of round trips to the repository.
+
+        Args:
+            jobs (list[Job])
+        """
+        pass
+
     @abstractmethod
     def update_job(self, job: Job):
         """
@@ -88,7 +140,8 @@ class JobRepository(ABC):
     def update_jobs(self, jobs: list[Job]):
         """
         Updates the jobs passed by parameter into the repository and commits
-        the transaction.
+        the transaction. The cost of updating the jobs must not grow with the
+        number of round trips to the repository.
 
         Args:
             jobs (list[Job])
@@ -96,15 +149,246 @@ class JobRepository(ABC):
         pass
 
     @abstractmethod
-    def try_set_lock_on_job(self, job: Job) -> bool:
+    def try_set_lock_on_job(self, job: Job, lease_milliseconds: int = 60000) -> bool:
         """
         Locks the job on the repository, informing all servers that it is
-        currently being handled by this server. This operation must be
-        atomic. Returns 'True' if the server could obtain the lock and
-        'False' otherwise.
+        currently being handled by this server, until the lease expires. This
+        operation must be atomic. Returns 'True' if the server could obtain
+        the lock and 'False' otherwise.
 
         Args:
             job (Job)
+            lease_milliseconds (int, optional): Defaults to 60000.
+
+        Returns:
+            bool
+        """
+        pass
+
+    @abstractmethod
+    def claim_job(self, lease_milliseconds: int = 60000, queues: list[str] = None) -> Job:
+        """
+        Takes the next enqueued job from the repository, already set with the
+        status PROCESSING, its start datetime and the lock informing all
+        servers that it is being handled by this server. The lock is a lease
+        that expires after the milliseconds passed by parameter, unless it is
+        renewed. This operation must be atomic, so a job is never claimed by
+        more than one server. If no jobs are enqueued, 'None' is returned.
+
+        The job is taken from the queues passed by parameter, in the order
+        given: a queue is only read when the previous ones are empty, and the
+        other queues are never read.
+
+        Args:
+            lease_milliseconds (int, optional): Defaults to 60000.
+            queues (list[str], optional): Defaults to ['default'].
+
+        Returns:
+            Job
+        """
+        pass
+
+    @abstractmethod
+    def claim_jobs(self, quantity: int, lease_milliseconds: int = 60000, queues: list[str] = None) -> list[Job]:
+        """
+        Claims up to the quantity of jobs passed by parameter at once, with
+        the same guarantees of the function 'claim_job'. If no jobs are
+        enqueued, an empty list is returned.
+
+        Args:
+            quantity (int)
+            lease_milliseconds (int, optional): Defaults to 60000.
+            queues (list[str], optional): Defaults to ['default'].
+
+        Returns:
+            list[Job]
+        """
+        pass
+
+    @abstractmethod
+    def renew_job_leases(self, jobs: list[Job], lease_milliseconds: int = 60000) -> list[Job]:
+        """
+        Extends the leases of the jobs passed by parameter, so they expire
+        after the milliseconds passed by parameter. Returns the jobs whose
+        lease was already lost, which may have been claimed again by other
+        servers.
+
+        Args:
+            jobs (list[Job])
+            lease_milliseconds (int, optional): Defaults to 60000.
+
+        Returns:
+            list[Job]
+        """
+        pass
+
+    @abstractmethod
+    def reclaim_expired_jobs(self) -> list[str]:
+        """
+        Puts back on the queue the jobs still being processed whose lease
+        expired, as the server running them stopped renewing it. Returns the
+        ids of the jobs enqueued again. This operation must be atomic, so it
+        can run on many servers at once.
+
+        Returns:
+            list[str]
+        """
+        pass
+
+    @abstractmethod
+    def promote_scheduled_jobs(self, limit: int = 1000) -> list[str]:
+        """
+        Enqueues up to the limit passed by parameter of the scheduled jobs
+        whose enqueued datetime is due, in the order they are due. Returns
+        the ids of the jobs enqueued. This operation must be atomic, so it
+        can run on many servers at once, and its cost must not depend on the
+        number of jobs scheduled to the future.
+
+        Args:
+            limit (int, optional): Defaults to 1000.
+
+        Returns:
+            list[str]
+        """
+        pass
+
+    @abstractmethod
+    def cancel_job(self, job_id: str) -> bool:
+        """
+        Cancels the job with the id passed by parameter. Jobs enqueued or
+        scheduled are set with the status CANCELLED right away, and jobs
+        being processed are flagged for the server running them to stop them.
+        Returns 'True' if the job was cancelled or flagged, and 'False' if it
+        was not found or is already finished. This operation must be atomic,
+        so a job is never claimed while it is cancelled.
+
+        Args:
+            job_id (str)
+
+        Returns:
+            bool
+        """
+        pass
+
+    @abstractmethod
+    def get_cancelled_job_ids(self, job_ids: list[str]) -> list[str]:
+        """
+        Returns the ids, out of the ones passed by parameter, of the jobs
+        being processed that were flagged to be cancelled. The flag is
+        removed once the job is updated with a status other than PROCESSING.
+
+        Args:
+            job_ids (list[str])
+
+        Returns:
+            list[str]
+        """
+        pass
+
+    @abstractmethod
+    def move_jobs_to_dead_letter(self, jobs: list[Job]):
+        """
+        Removes the jobs passed by parameter from the repository, storing
+        them apart on the dead-letter queue, so the jobs that exhausted their
+        retries don't weigh on the indexes read by the servers. This
+        operation must be atomic, so the jobs are never lost or kept on both.
+
+        Args:
+            jobs (list[Job])
+        """
+        pass
+
+    @abstractmethod
+    def get_dead_letter_jobs(self, limit: int = 100) -> list[Job]:
+        """
+        Returns up to the limit passed by parameter of the jobs on the
+        dead-letter queue, starting from the oldest ones. If there are none,
+        an empty list is returned.
+
+        Args:
+            limit (int, optional): Defaults to 100.
+
+        Returns:
+            list[Job]
+        """
+        pass
+
+    @abstractmethod
+    def count_dead_letter_jobs(self) -> int:
+        """
+        Returns the number of jobs on the dead-letter queue.
+
+        Returns:
+            int
+        """
+        pass
+
+    @abstractmethod
+    def requeue_dead_letter_job(self, job_id: str) -> Job:
+        """
+        Moves the job with the id passed by parameter from the dead-letter
+        queue back to its queue, enqueued again, and returns it. The history
+        of its attempts is kept. If the job is not on the dead-letter queue,
+        'None' is returned. This operation must be atomic, so the job is
+        enqueued only once.
+
+        Args:
+            job_id (str)
+
+        Returns:
+            Job
+        """
+        pass
+
+    @abstractmethod
+    def claim_expired_jobs(self,
+                           status: JobStatus,
+                           max_age_seconds: float = None,
+                           max_count: int = None,
+                           limit: int = 1000,
+                           lease_milliseconds: int = 60000) -> list[Job]:
+        """
+        Claims up to the limit passed by parameter of the jobs with the
+        status passed by parameter that exceeded their retention: the ones
+        that finished more than 'max_age_seconds' ago, and the oldest ones
+        beyond 'max_count'. The jobs claimed are no longer returned by the
+        other functions, and must be removed with 'delete_jobs' before the
+        lease expires, after which they are claimed again. This operation
+        must be atomic, so each job is claimed by a single server.
+
+        Args:
+            status (JobStatus)
+            max_age_seconds (float, optional): Defaults to None.
+            max_count (int, optional): Defaults to None.
+            limit (int, optional): Defaults to 1000.
+            lease_milliseconds (int, optional): Defaults to 60000.
+
+        Returns:
+            list[Job]
+        """
+        pass
+
+    @abstractmethod
+    def delete_jobs(self, jobs: list[Job]):
+        """
+        Removes for good the jobs claimed by 'claim_expired_jobs'.
+
+        Args:
+            jobs (list[Job])
+        """
+        pass
+
+    @abstractmethod
+    def wait_for_enqueued_jobs(self, timeout_seconds: float, queues: list[str] = None) -> bool:
+        """
+        Blocks until the repository notifies that jobs were enqueued on the
+        queues passed by parameter, or until the timeout expires. Returns
+        'True' if a notification was received and 'False' if the timeout
+        expired.
+
+        Args:
+            timeout_seconds (float)
+            queues (list[str], optional): Defaults to ['default'].
 
         Returns:
             bool
@@ -0,0 +1,507 @@
+import collections
+import contextlib
+import datetime
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+from hangpy.entities import Job
+from hangpy.entities.job import CANCELLED_JOB_ERROR
+from hangpy.enums import JobStatus
+from hangpy.repositories import CompactEntryCodec, EntryCodec, InMemoryJobRepository
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+RECORD_HEADER = struct.Struct('<IIB')
+
+JOB_RECORD = 1
+TRANSITION_RECORD = 2
+REMOVAL_RECORD = 3
+CANCELLATION_RECORD = 4
+DEAD_LETTER_RECORD = 5
+DEAD_LETTER_REMOVAL_RECORD = 6
+
+TRANSITION_ATTRIBUTES = ('status', 'start_datetime', 'end_datetime', 'error')
+
+SEGMENT_SUFFIX = '.journal'
+SNAPSHOT_SUFFIX = '.snapshot'
+LOCK_FILE_NAME = 'lock'
+
+
+class JournalJobRepository(InMemoryJobRepository):
+    """Implementation of the JobRepository that keeps the jobs on the memory
+    of the process, like the InMemoryJobRepository, and persists every
+    change on an append-only journal on the directory passed by parameter,
+    so the jobs survive restarts without an external service.
+
+    The journal is a sequence of segments, files written only at their end.
+    Each change is a small record: stored jobs are serialized whole, while
+    claiming, finishing, reclaiming, promoting and cancelling a job append
+    only its status, datetimes and error. The records of an operation are
+    written at once when it ends, flushed to the operating system, so they
+    survive the crash of the process, and, with 'sync_writes', synced to the
+    disk, so they survive the crash of the host.
+
+    When a segment exceeds its maximum size, a new one is started along with
+    a snapshot of all the jobs, and the previous segments and snapshots are
+    deleted, compacting the journal. On startup, the jobs are loaded from the
+    last snapshot and the segments that follow it, read through memory maps.
+    A record left incomplete by a crash ends the journal, and is truncated.
+
+    Leases aren't persisted: the jobs that were being processed when the
+    journal was closed are enqueued again when it is loaded (or cancelled, if
+    their cancellation was requested). The journal must be used by a single
+    process at a time, which is enforced by a lock on the directory where
+    the operating system supports it.
+    """
+
+    def __init__(self,
+                 directory: str,
+                 entry_codec: EntryCodec = None,
+                 segment_max_bytes: int = 64 * 1024 * 1024,
+                 sync_writes: bool = False):
+        """
+        Args:
+            directory (str): Directory of the journal, created if it doesn't
+            exist.
+            entry_codec (EntryCodec, optional): Codec used to serialize the
+            jobs. Defaults to CompactEntryCodec.
+            segment_max_bytes (int, optional): Size from which a segment is
+            closed, and the journal compacted. Defaults to 64 MiB.
+            sync_writes (bool, optional): When True, the records of every
+            operation are synced to the disk before it returns. Defaults to
+            False.
+        """
+
+        self.__validate_segment_max_bytes(segment_max_bytes)
+        super().__init__()
+        self.directory = directory
+        self.entry_codec = CompactEntryCodec() if entry_codec is None else entry_codec
+        self.segment_max_bytes = segment_max_bytes
+        self.sync_writes = sync_writes
+        self.__journal_lock = threading.RLock()
+        self.__records = None
+        self.__purged_jobs = {}
+        self.__segment_file = None
+        self.__segment_sequence = 0
+        os.makedirs(directory, exist_ok=True)
+        self.__lock_file = self.__lock_directory()
+        self.__load()
+
+    def add_job(self, job: Job):
+        with self.__journal_changes():
+            super().add_job(job)
+
+    def add_jobs(self, jobs: list[Job]):
+        with self.__journal_changes():
+            super().add_jobs(jobs)
+
+    def update_job(self, job: Job):
+        with self.__journal_changes():
+            super().update_job(job)
+
+    def update_jobs(self, jobs: list[Job]):
+        with self.__journal_changes():
+            super().update_jobs(jobs)
+
+    def claim_jobs(self, quantity: int, lease_milliseconds: int = 60000, queues: list[str] = None) -> list[Job]:
+        with self.__journal_changes():
+            return super().claim_jobs(quantity, lease_milliseconds, queues)
+
+    def reclaim_expired_jobs(self) -> list[str]:
+        with self.__journal_changes():
+            return super().reclaim_expired_jobs()
+
+    def promote_scheduled_jobs(self, limit: int = 1000) -> list[str]:
+        with self.__journal_changes():
+            return super().promote_scheduled_jobs(limit)
+
+    def cancel_job(self, job_id: str) -> bool:
+        with self.__journal_changes():
+            return super().cancel_job(job_id)
+
+    def move_jobs_to_dead_letter(self, jobs: list[Job]):
+        with self.__journal_changes():
+            super().move_jobs_to_dead_letter(jobs)
+
+    def requeue_dead_letter_job(self, job_id: str) -> Job:
+        with self.__journal_changes():
+            return super().requeue_dead_letter_job(job_id)
+
+    def claim_expired_jobs(self,
+                           status: JobStatus,
+                           max_age_seconds: float = None,
+                           max_count: int = None,
+                           limit: int = 1000,
+                           lease_milliseconds: int = 60000) -> list[Job]:
+        """The claims aren't persisted: the jobs claimed and not deleted when
+        the journal was closed are kept with their status.
+        """
+
+        with self.__journal_changes():
+            jobs = super().claim_expired_jobs(status, max_age_seconds, max_count, limit, lease_milliseconds)
+            self.__purged_jobs.update((job.id, job) for job in jobs)
+            return jobs
+
+    def delete_jobs(self, jobs: list[Job]):
+        with self.__journal_changes():
+            super().delete_jobs(jobs)
+            for job in jobs:
+                self.__purged_jobs.pop(job.id, None)
+
+    def compact(self):
+        """Starts a new segment along with a snapshot of all the jobs, and
+        deletes the previous segments and snapshots. Called when a segment
+        exceeds its maximum size.
+        """
+
+        with self.__journal_lock:
+            self.__segment_file.close()
+            self.__segment_sequence += 1
+            self.__segment_file = open(self.__get_path(self.__segment_sequence, SEGMENT_SUFFIX), 'ab')
+            self.__write_snapshot(self.__segment_sequence)
+            self.__delete_previous_files(self.__segment_sequence)
+
+    def close(self):
+        """Closes the journal, releasing the directory for other processes."""
+
+        with self.__journal_lock:
+            if (self.__segment_file is not None):
+                self.__segment_file.close()
+                self.__segment_file = None
+            if (self.__lock_file is not None):
+                self.__lock_file.close()
+                self.__lock_file = None
+
+    def _on_job_stored(self, job: Job, previous_job: Job):
+        """Jobs whose only changes are on the attributes of the transitions
+        are written as transitions.
+        """
+
+        if (self.__records is None):
+            return
+        if (previous_job is not None and self.__get_changed_attributes(previous_job, job) <= set(TRANSITION_ATTRIBUTES)):
+            self._on_job_transitioned(job)
+            return
+        self.__records.append((JOB_RECORD, self.entry_codec.encode(job)))
+
+    def _on_job_transitioned(self, job: Job):
+        if (self.__records is None):
+            return
+        transition = [job.id, job.status.name, job.start_datetime, job.end_datetime, job.error]
+        self.__records.append((TRANSITION_RECORD, json.dumps(transition).encode()))
+
+    def _on_job_removed(self, job_id: str):
+        if (self.__records is not None):
+            self.__records.append((REMOVAL_RECORD, job_id.encode()))
+
+    def _on_cancellation_requested(self, job_id: str):
+        if (self.__records is not None):
+            self.__records.append((CANCELLATION_RECORD, job_id.encode()))
+
+    def _on_dead_letter_job_added(self, job: Job):
+        if (self.__records is not None):
+            self.__records.append((DEAD_LETTER_RECORD, self.entry_codec.encode(job)))
+
+    def _on_dead_letter_job_removed(self, job_id: str):
+        if (self.__records is not None):
+            self.__records.append((DEAD_LETTER_REMOVAL_RECORD, job_id.encode()))
+
+    @contextlib.contextmanager
+    def __journal_changes(self):
+        """Internal function that runs an operation of the repository,
+        writing the records of its changes on the journal when it ends, and
+        compacting the journal when the segment exceeds its maximum size.
+        """
+
+        with self.__journal_lock:
+            try:
+                yield
+            finally:
+                self.__write_records()
+            if (self.__segment_file.tell() >= self.segment_max_bytes):
+                self.compact()
+
+    def __write_records(self):
+        """Internal function that appends the records pending to the current
+        segment with a single write.
+        """
+
+        if (len(self.__records) == 0):
+            return
+        self.__segment_file.write(b''.join(self.__encode_record(record_type, payload) for record_type, payload in self.__records))
+        self.__records = []
+        self.__segment_file.flush()
+        if (self.sync_writes):
+            os.fsync(self.__segment_file.fileno())
+
+    def __encode_record(self, record_type: int, payload: bytes) -> bytes:
+        """Internal function that returns the record framed by its header: the
+        size of the payload, its checksum and its type.
+
+        Args:
+            record_type (int)
+            payload (bytes)
+
+        Returns:
+            bytes
+        """
+
+        return RECORD_HEADER.pack(len(payload), zlib.crc32(payload, record_type), record_type) + payload
+
+    def __load(self):
+        """Internal function that loads the jobs from the last snapshot and the
+        segments that follow it, and opens the last segment to append the
+        next records. The jobs that were being processed are enqueued again,
+        or cancelled, and the change is written on the journal.
+        """
+
+        jobs = collections.OrderedDict()
+        dead_letter_jobs = collections.OrderedDict()
+        cancellations = set()
+        snapshot_sequences = self.__get_sequences(SNAPSHOT_SUFFIX)
+        segment_sequences = self.__get_sequences(SEGMENT_SUFFIX)
+        first_sequence = snapshot_sequences[-1] if (len(snapshot_sequences) > 0) else 0
+        if (len(snapshot_sequences) > 0):
+            self.__read_file(self.__get_path(first_sequence, SNAPSHOT_SUFFIX), jobs, dead_letter_jobs, cancellations)
+        segment_sequences = [sequence for sequence in segment_sequences if sequence >= first_sequence]
+        valid_size = 0
+        for sequence in segment_sequences:
+            valid_size = self.__read_file(self.__get_path(sequence, SEGMENT_SUFFIX), jobs, dead_letter_jobs, cancellations)
+        self.__segment_sequence = segment_sequences[-1] if (len(segment_sequences) > 0) else first_sequence
+        self.__delete_previous_files(first_sequence)
+        segment_path = self.__get_path(self.__segment_sequence, SEGMENT_SUFFIX)
+        if (os.path.exists(segment_path) and os.path.getsize(segment_path) > valid_size):
+            os.truncate(segment_path, valid_size)
+        self.__segment_file = open(segment_path, 'ab')
+        reclaimed_jobs = [job for job in jobs.values() if job.status == JobStatus.PROCESSING]
+        now = datetime.datetime.now()
+        for job in reclaimed_jobs:
+            self.__set_reclaimed_state(job, job.id in cancellations, now)
+        super().update_jobs(list(jobs.values()))
+        super().move_jobs_to_dead_letter(list(dead_letter_jobs.values()))
+        self.__records = []
+        with self.__journal_changes():
+            for job in reclaimed_jobs:
+                self._on_job_transitioned(job)
+
+    def __read_file(self, path: str, jobs: dict, dead_letter_jobs: dict, cancellations: set) -> int:
+        """Internal function that applies the records of the journal file
+        passed by parameter on the jobs, dead-letter jobs and cancellations
+        passed by parameter. The file is read through a memory map, until
+        its end or its first incomplete or corrupted record.
+
+        Args:
+            path (str)
+            jobs (dict): Jobs by id, in the order they reached their status.
+            dead_letter_jobs (dict): Dead-letter jobs by id.
+            cancellations (set): Ids of the jobs whose cancellation was
+            requested.
+
+        Returns:
+            int: Size of the valid records of the file.
+        """
+
+        with open(path, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            if (size == 0):
+                return 0
+            offset = 0
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as journal:
+                while (offset + RECORD_HEADER.size <= size):
+                    payload_size, checksum, record_type = RECORD_HEADER.unpack_from(journal, offset)
+                    payload_end = offset + RECORD_HEADER.size + payload_size
+                    if (payload_end > size):
+                        break
+                    payload = journal[offset + RECORD_HEADER.size:payload_end]
+                    if (zlib.crc32(payload, record_type) != checksum):
+                        break
+                    self.__apply_record(record_type, payload, jobs, dead_letter_jobs, cancellations)
+                    offset = payload_end
+            return offset
+
+    def __apply_record(self, record_type: int, payload: bytes, jobs: dict, dead_letter_jobs: dict, cancellations: set):
+        """Internal function that applies a record read from the journal on the
+        jobs, dead-letter jobs and cancellations passed by parameter.
+
+        Args:
+            record_type (int)
+            payload (bytes)
+            jobs (dict)
+            dead_letter_jobs (dict)
+            cancellations (set)
+        """
+
+        if (record_type in (JOB_RECORD, TRANSITION_RECORD)):
+            job = self.__apply_job_record(record_type, payload, jobs)
+            if (job is not None and job.status != JobStatus.PROCESSING):
+                cancellations.discard(job.id)
+        elif (record_type == REMOVAL_RECORD):
+            jobs.pop(payload.decode(), None)
+            cancellations.discard(payload.decode())
+        elif (record_type == CANCELLATION_RECORD):
+            cancellations.add(payload.decode())
+        elif (record_type == DEAD_LETTER_RECORD):
+            job = self.entry_codec.decode(payload)
+            dead_letter_jobs[job.id] = job
+        elif (record_type == DEAD_LETTER_REMOVAL_RECORD):
+            dead_letter_jobs.pop(payload.decode(), None)
+
+    def __apply_job_record(self, record_type: int, payload: bytes, jobs: dict) -> Job:
+        """Internal function that applies a record of a stored job, or of a
+        transition, on the jobs passed by parameter. The job is moved to the
+        end of the jobs, as it reached its status after the others.
+
+        Args:
+            record_type (int)
+            payload (bytes)
+            jobs (dict)
+
+        Returns:
+            Job: The job changed, or None if the job of the transition isn't
+            stored.
+        """
+
+        if (record_type == JOB_RECORD):
+            job = self.entry_codec.decode(payload)
+            jobs.pop(job.id, None)
+            jobs[job.id] = job
+            return job
+        job_id, status, start_datetime, end_datetime, error = json.loads(payload)
+        job = jobs.pop(job_id, None)
+        if (job is None):
+            return None
+        job.status = JobStatus[status]
+        job.start_datetime = start_datetime
+        job.end_datetime = end_datetime
+        job.error = error
+        jobs[job_id] = job
+        return job
+
+    def __write_snapshot(self, sequence: int):
+        """Internal function that writes the snapshot of all the jobs that
+        precedes the segment passed by parameter. The snapshot is written on
+        a temporary file, synced and then renamed, so a snapshot is never
+        read incomplete.
+
+        Args:
+            sequence (int)
+        """
+
+        jobs = self.get_jobs() + list(self.__purged_jobs.values())
+        processing_job_ids = [job.id for job in jobs if job.status == JobStatus.PROCESSING]
+        records = [(JOB_RECORD, self.entry_codec.encode(job)) for job in jobs]
+        records.extend((CANCELLATION_RECORD, job_id.encode()) for job_id in self.get_cancelled_job_ids(processing_job_ids))
+        records.extend((DEAD_LETTER_RECORD, self.entry_codec.encode(job))
+                       for job in self.get_dead_letter_jobs(self.count_dead_letter_jobs()))
+        path = self.__get_path(sequence, SNAPSHOT_SUFFIX)
+        with open(path + '.tmp', 'wb') as file:
+            file.write(b''.join(self.__encode_record(record_type, payload) for record_type, payload in records))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(path + '.tmp', path)
+
+    def __delete_previous_files(self, sequence: int):
+        """Internal function that deletes the segments and snapshots that
+        precede the sequence passed by parameter, already covered by its
+        snapshot.
+
+        Args:
+            sequence (int)
+        """
+
+        for suffix in (SEGMENT_SUFFIX, SNAPSHOT_SUFFIX):
+            for previous_sequence in self.__get_sequences(suffix):
+                if (previous_sequence < sequence):
+                    os.remove(self.__get_path(previous_sequence, suffix))
+
+    def __get_sequences(self, suffix: str) -> list[int]:
+        """Internal function that returns the sequences of the files of the
+        journal with the suffix passed by parameter, in order.
+
+        Args:
+            suffix (str)
+
+        Returns:
+            list[int]
+        """
+
+        return sorted(int(file_name[:-len(suffix)]) for file_name in os.listdir(self.directory)
+                      if file_name.endswith(suffix) and file_name[:-len(suffix)].isdigit())
+
+    def __get_path(self, sequence: int, suffix: str) -> str:
+        return os.path.join(self.directory, f'{sequence:012d}{suffix}')
+
+    def __get_changed_attributes(self, previous_job: Job, job: Job) -> set:
+        """Internal function that returns the names of the attributes of the
+        job whose values differ from the job stored previously.
+
+        Args:
+            previous_job (Job)
+            job (Job)
+
+        Returns:
+            set
+        """
+
+        previous_attributes = vars(previous_job)
+        return {name for name, value in vars(job).items() if name not in previous_attributes or previous_attributes[name] != value}
+
+    def __set_reclaimed_state(self, job: Job, cancelled: bool, now: datetime.datetime):
+        """Internal function that enqueues again the job that was being
+        processed when the journal was closed, or cancels it, if its
+        cancellation was requested.
+
+        Args:
+            job (Job)
+            cancelled (bool)
+            now (datetime)
+        """
+
+        if (cancelled):
+            job.status = JobStatus.CANCELLED
+            job.end_datetime = now.isoformat()
+            job.error = CANCELLED_JOB_ERROR
+            return
+        job.status = JobStatus.ENQUEUED
+        job.start_datetime = None
+
+    def __lock_directory(self):
+        """Internal function that takes an exclusive lock on the directory of
+        the journal, where the operating system supports it.
+
+        Raises:
+            ValueError: The journal is being used by another process
+
+        Returns:
+            file: The file holding the lock, or None.
+        """
+
+        if (fcntl is None):
+            return None
+        lock_file = open(os.path.join(self.directory, LOCK_FILE_NAME), 'a')
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            raise ValueError('directory', self.directory, 'The journal is being used by another process')
+        return lock_file
+
+    def __validate_segment_max_bytes(self, segment_max_bytes: int):
+        """
+        Internal function used to validate the 'segment_max_bytes' value.
+
+        Raises:
+            ValueError: The value must be an integer
+            ValueError: The value must be greater than zero
+        """
+
+        if (not isinstance(segment_max_bytes, int) or isinstance(segment_max_bytes, bool)):
+            raise ValueError('segment_max_bytes', segment_max_bytes, 'The value must be an integer')
+        if (segment_max_bytes <= 0):
+            raise ValueError('segment_max_bytes', segment_max_bytes, 'The value must be greater than zero')
@@ -0,0 +1,16 @@
+import jsonpickle
+from hangpy.repositories.entry_codec import EntryCodec
+
+
+class JsonpickleEntryCodec(EntryCodec):
+    """
+    Codec that encodes the entries using the 'jsonpickle' serialization
+    package. This is the format used by the previous versions of HangPy,
+    and it supports any object.
+    """
+
+    def encode(self, entry: object) -> str:
+        return jsonpickle.encode(entry)
+
+    def decode(self, serialized_entry: bytes) -> object:
+        return jsonpickle.decode(serialized_entry)
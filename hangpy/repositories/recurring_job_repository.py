@@ -0,0 +1,112 @@
+from abc import ABC, abstractmethod
+from hangpy.entities import RecurringJob
+
+
+class RecurringJobRepository(ABC):
+    """
+    Interface defining the functions necessary for a class to be used as
+    recurring job repository.
+    """
+
+    @abstractmethod
+    def get_recurring_jobs(self) -> list[RecurringJob]:
+        """
+        Returns a list of all the recurring jobs on the repository. If none
+        are found, an empty list is returned.
+
+        Returns:
+            list[RecurringJob]
+        """
+        pass
+
+    @abstractmethod
+    def get_recurring_job(self, name: str) -> RecurringJob:
+        """
+        Returns the recurring job with the name passed by parameter. If it
+        isn't found, 'None' is returned.
+
+        Args:
+            name (str)
+
+        Returns:
+            RecurringJob
+        """
+        pass
+
+    @abstractmethod
+    def add_recurring_job(self, recurring_job: RecurringJob):
+        """
+        Adds the recurring job passed by parameter into the repository,
+        replacing the one with the same name.
+
+        Args:
+            recurring_job (RecurringJob)
+        """
+        pass
+
+    @abstractmethod
+    def remove_recurring_job(self, name: str):
+        """
+        Removes the recurring job with the name passed by parameter from the
+        repository.
+
+        Args:
+            name (str)
+        """
+        pass
+
+    @abstractmethod
+    def get_due_recurring_jobs(self) -> list[RecurringJob]:
+        """
+        Returns the recurring jobs whose next run datetime is due. The cost
+        must not depend on the number of recurring jobs that are not due.
+
+        Returns:
+            list[RecurringJob]
+        """
+        pass
+
+    @abstractmethod
+    def try_update_recurring_job_run(self, recurring_job: RecurringJob, next_run_datetime: str) -> bool:
+        """
+        Updates the recurring job passed by parameter only if its next run
+        datetime stored is still the one passed by parameter, so each
+        occurrence is only taken once. This operation must be atomic. Returns
+        'True' if the recurring job was updated and 'False' otherwise.
+
+        Args:
+            recurring_job (RecurringJob)
+            next_run_datetime (str)
+
+        Returns:
+            bool
+        """
+        pass
+
+    @abstractmethod
+    def try_acquire_scheduler_lease(self, server_id: str, lease_milliseconds: int) -> bool:
+        """
+        Elects the server passed by parameter as the one enqueuing the
+        recurring jobs, until the lease expires. The server holding the lease
+        extends it. This operation must be atomic. Returns 'True' if the
+        server holds the lease and 'False' otherwise.
+
+        Args:
+            server_id (str)
+            lease_milliseconds (int)
+
+        Returns:
+            bool
+        """
+        pass
+
+    @abstractmethod
+    def release_scheduler_lease(self, server_id: str):
+        """
+        Releases the lease of the scheduler, if it is held by the server
+        passed by parameter, so another server can take it right away.
+
+        Args:
+            server_id (str)
+        """
+        pass
@@ -0,0 +1,173 @@
+import threading
+import time
+from redis import BlockingConnectionPool
+from redis.backoff import EqualJitterBackoff
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.retry import Retry
+
+
+class RedisConnectionPool(BlockingConnectionPool):
+    """
+    Pool of connections to Redis tuned for the HangPy servers, whose cycle,
+    heartbeat and job threads share the same repositories. The pool holds up
+    to 'max_connections' connections, and a thread asking for a connection
+    while all of them are in use waits up to 'timeout' seconds for one to be
+    released, instead of opening connections without limit.
+
+    The connections check their health before being used when they were
+    idle for longer than 'health_check_interval' seconds, give up on reads
+    and connects that take longer than their socket timeouts, and retry the
+    commands failing with connection errors or timeouts, waiting an
+    exponential backoff with jitter between the attempts. A retried command
+    may have run on Redis before its connection failed, which the
+    repositories tolerate: a job claimed twice stays locked until its lease
+    expires, and is put back on the queue.
+
+    The pool records how long the threads waited for a connection and how
+    many connections were in use at once, returned by 'get_statistics', so
+    the pool can be sized. The subscription of a server to the enqueued jobs
+    holds one connection while the server runs.
+    """
+
+    def __init__(self,
+                 max_connections: int = 50,
+                 timeout: float = 10,
+                 socket_timeout: float = 5,
+                 socket_connect_timeout: float = 5,
+                 health_check_interval: float = 30,
+                 retries: int = 3,
+                 retry_backoff_base_seconds: float = 0.05,
+                 retry_backoff_cap_seconds: float = 1,
+                 **connection_kwargs):
+        """
+        Args:
+            max_connections (int, optional): Maximum number of connections
+            open at once. Defaults to 50.
+            timeout (float, optional): Seconds a thread waits for a connection
+            when all of them are in use, before failing with a
+            ConnectionError. Defaults to 10.
+            socket_timeout (float, optional): Seconds a connection waits for
+            a reply. Defaults to 5.
+            socket_connect_timeout (float, optional): Seconds a connection
+            waits to be established. Defaults to 5.
+            health_check_interval (float, optional): Seconds a connection is
+            idle before being checked when used again. Defaults to 30.
+            retries (int, optional): Times a command failing with a connection
+            error or a timeout is retried. Defaults to 3.
+            retry_backoff_base_seconds (float, optional): Backoff before the
+            first retry, doubled on each of the next ones. Defaults to 0.05.
+            retry_backoff_cap_seconds (float, optional): Maximum backoff
+            between retries. Defaults to 1.
+            **connection_kwargs: Other arguments of the connections, like
+            'host', 'port' and 'password'.
+        """
+
+        self.__validate_parameters(max_connections, retries)
+        self.__statistics_lock = threading.Lock()
+        self.__reset_statistics()
+        connection_kwargs.setdefault('retry', Retry(EqualJitterBackoff(retry_backoff_cap_seconds, retry_backoff_base_seconds), retries))
+        super().__init__(max_connections=max_connections,
+                         timeout=timeout,
+                         socket_timeout=socket_timeout,
+                         socket_connect_timeout=socket_connect_timeout,
+                         health_check_interval=health_check_interval,
+                         **connection_kwargs)
+
+    def get_connection(self, *args, **kwargs):
+        start_time = time.monotonic()
+        try:
+            connection = super().get_connection(*args, **kwargs)
+        except RedisConnectionError:
+            if (self.timeout is not None and time.monotonic() - start_time >= self.timeout):
+                with self.__statistics_lock:
+                    self.__exhaustions += 1
+            raise
+        wait_seconds = time.monotonic() - start_time
+        with self.__statistics_lock:
+            self.__acquisitions += 1
+            self.__total_wait_seconds += wait_seconds
+            self.__max_wait_seconds = max(self.__max_wait_seconds, wait_seconds)
+            self.__connections_in_use.add(id(connection))
+            self.__peak_connections_in_use = max(self.__peak_connections_in_use, len(self.__connections_in_use))
+        return connection
+
+    def reset(self):
+        super().reset()
+        with self.__statistics_lock:
+            self.__reset_statistics()
+
+    def release(self, connection):
+        with self.__statistics_lock:
+            self.__connections_in_use.discard(id(connection))
+        super().release(connection)
+
+    def get_statistics(self) -> dict:
+        """
+        Returns the usage of the pool since it was created, or since the
+        statistics were last reset:
+
+        - 'max_connections': Maximum number of connections of the pool.
+        - 'connections_in_use': Connections in use at the moment.
+        - 'peak_connections_in_use': Most connections in use at once.
+        - 'saturation': Peak of connections in use by the maximum number of
+        connections. Waits for connections are expected as it reaches 1.
+        - 'acquisitions': Connections taken from the pool.
+        - 'total_wait_seconds': Time waited to take the connections,
+        including the time to open the new ones.
+        - 'max_wait_seconds': Longest time waited to take a connection.
+        - 'exhaustions': Times no connection was released before the
+        timeout.
+
+        Returns:
+            dict
+        """
+
+        with self.__statistics_lock:
+            return {
+                'max_connections': self.max_connections,
+                'connections_in_use': len(self.__connections_in_use),
+                'peak_connections_in_use': self.__peak_connections_in_use,
+                'saturation': self.__peak_connections_in_use / self.max_connections,
+                'acquisitions': self.__acquisitions,
+                'total_wait_seconds': self.__total_wait_seconds,
+                'max_wait_seconds': self.__max_wait_seconds,
+                'exhaustions': self.__exhaustions
+            }
+
+    def reset_statistics(self):
+        """
+        Resets the statistics of the pool, keeping the count of connections
+        in use, which is the initial peak.
+        """
+
+        with self.__statistics_lock:
+            connections_in_use = self.__connections_in_use
+            self.__reset_statistics()
+            self.__connections_in_use = connections_in_use
+            self.__peak_connections_in_use = len(connections_in_use)
+
+    def __reset_statistics(self):
+        """
+        Internal function that sets all the statistics of the pool to zero.
+        """
+
+        self.__connections_in_use = set()
+        self.__peak_connections_in_use = 0
+        self.__acquisitions = 0
+        self.__total_wait_seconds = 0.0
+        self.__max_wait_seconds = 0.0
+        self.__exhaustions = 0
+
+    def __validate_parameters(self, max_connections: int, retries: int):
+        """
+        Internal function used to validate the class constructor parameters.
+
+        Raises:
+            ValueError: The value must be an integer greater than zero
+            ValueError: The value must be an integer not lower than zero
+        """
+
+        if (not isinstance(max_connections, int) or isinstance(max_connections, bool) or max_connections <= 0):
+            raise ValueError('max_connections', max_connections, 'The value must be an integer greater than zero')
+        if (not isinstance(retries, int) or isinstance(retries, bool) or retries < 0):
+            raise ValueError('retries', retries, 'The value must be an integer not lower than zero')
@@ -1,102 +1,1019 @@
+import copy
+import datetime
+import time
+import weakref
 from hangpy.entities import Job
+from hangpy.entities.job import CANCELLED_JOB_ERROR, DEFAULT_QUEUE
 from hangpy.enums import JobStatus
+from hangpy.repositories import EntryCodec
 from hangpy.repositories import RedisRepositoryBase
 from hangpy.repositories import JobRepository
 from redis import Redis
+from typing import Union
+from redis.exceptions import WatchError
+
+ENQUEUED_JOBS_CHANNEL = 'jobs:enqueued'
+
+JOB_FIELDS = ('status', 'error', 'start_datetime', 'end_datetime', 'priority', 'queue')
+
+JOB_QUEUES_KEY = 'jobqueues'
+
+STRICT_PRIORITY_SECONDS = 10 ** 8
+
+JOB_LEASES_KEY = 'jobleases'
+
+JOB_CANCELLATIONS_KEY = 'jobcancellations'
+
+DEAD_LETTER_JOBS_KEY = 'deadletterjobs'
+
+DEAD_LETTER_INDEX_KEY = 'deadletterjobs:index'
+
+JOB_PURGES_KEY = 'jobpurges'
+
+CLAIM_JOBS_SCRIPT = """
+local processing_index_key = KEYS[1]
+local leases_key = KEYS[2]
+local job_key_prefix = KEYS[3]
+local lock_key_prefix = KEYS[4]
+local processing_status = ARGV[1]
+local start_datetime = ARGV[2]
+local start_timestamp = ARGV[3]
+local quantity = tonumber(ARGV[4])
+local lease_milliseconds = ARGV[5]
+local lease_timestamp = ARGV[6]
+local jobs = {}
+for key_index = 5, #KEYS do
+    while #jobs < quantity do
+        local popped = redis.call('ZPOPMIN', KEYS[key_index], quantity - #jobs)
+        if #popped == 0 then
+            break
+        end
+        for index = 1, #popped, 2 do
+            local job_id = popped[index]
+            local job_key = job_key_prefix .. job_id
+            if redis.call('EXISTS', job_key) == 1 then
+                redis.call('SET', lock_key_prefix .. job_id, 1, 'PX', lease_milliseconds)
+                redis.call('ZADD', leases_key, lease_timestamp, job_id)
+                redis.call('HSET', job_key, 'status', processing_status, 'start_datetime', start_datetime)
+                redis.call('ZADD', processing_index_key, start_timestamp, job_id)
+                table.insert(jobs, redis.call('HGETALL', job_key))
+            end
+        end
+    end
+end
+return jobs
+"""
+
+ENQUEUE_JOB_FUNCTIONS = """
+local enqueued_index_key = KEYS[1]
+local queues_key = KEYS[2]
+local job_key_prefix = KEYS[3]
+local enqueued_status = ARGV[2]
+local enqueued_jobs_channel = ARGV[3]
+local priority_seconds = tonumber(ARGV[4])
+local default_queue = ARGV[5]
+local queue_counts = {}
+local function enqueue_job(job_id, timestamp)
+    local job_key = job_key_prefix .. job_id
+    redis.call('HSET', job_key, 'status', enqueued_status)
+    local priority = tonumber(redis.call('HGET', job_key, 'priority') or '0')
+    local queue = redis.call('HGET', job_key, 'queue') or default_queue
+    local queue_suffix = ''
+    if queue ~= default_queue then
+        queue_suffix = ':' .. queue
+        redis.call('SADD', queues_key, queue)
+    end
+    redis.call('ZADD', enqueued_index_key .. queue_suffix, timestamp - priority * priority_seconds, job_id)
+    queue_counts[queue_suffix] = (queue_counts[queue_suffix] or 0) + 1
+end
+local function publish_enqueued_jobs()
+    for queue_suffix, count in pairs(queue_counts) do
+        redis.call('PUBLISH', enqueued_jobs_channel .. queue_suffix, count)
+    end
+end
+"""
+
+RECLAIM_EXPIRED_JOBS_SCRIPT = ENQUEUE_JOB_FUNCTIONS + """
+local processing_index_key = KEYS[4]
+local leases_key = KEYS[5]
+local cancellations_key = KEYS[6]
+local cancelled_index_key = KEYS[7]
+local lock_key_prefix = KEYS[8]
+local now_timestamp = ARGV[1]
+local processing_status = ARGV[6]
+local cancelled_status = ARGV[7]
+local end_datetime = ARGV[8]
+local cancelled_error = ARGV[9]
+local job_ids = {}
+for _, job_id in ipairs(redis.call('ZRANGEBYSCORE', leases_key, '-inf', now_timestamp)) do
+    local job_key = job_key_prefix .. job_id
+    redis.call('ZREM', leases_key, job_id)
+    if redis.call('HGET', job_key, 'status') == processing_status then
+        redis.call('DEL', lock_key_prefix .. job_id)
+        redis.call('ZREM', processing_index_key, job_id)
+        if redis.call('SREM', cancellations_key, job_id) == 1 then
+            redis.call('HSET', job_key, 'status', cancelled_status, 'end_datetime', end_datetime, 'error', cancelled_error)
+            redis.call('ZADD', cancelled_index_key, now_timestamp, job_id)
+        else
+            redis.call('HSET', job_key, 'start_datetime', '')
+            enqueue_job(job_id, now_timestamp)
+            table.insert(job_ids, job_id)
+        end
+    end
+end
+publish_enqueued_jobs()
+return job_ids
+"""
+
+PROMOTE_SCHEDULED_JOBS_SCRIPT = ENQUEUE_JOB_FUNCTIONS + """
+local scheduled_index_key = KEYS[4]
+local now_timestamp = ARGV[1]
+local scheduled_status = ARGV[6]
+local limit = ARGV[7]
+local job_ids = {}
+local due_jobs = redis.call('ZRANGEBYSCORE', scheduled_index_key, '-inf', now_timestamp, 'WITHSCORES', 'LIMIT', 0, limit)
+for index = 1, #due_jobs, 2 do
+    local job_id = due_jobs[index]
+    redis.call('ZREM', scheduled_index_key, job_id)
+    if redis.call('HGET', job_key_prefix .. job_id, 'status') == scheduled_status then
+        enqueue_job(job_id, tonumber(due_jobs[index + 1]))
+        table.insert(job_ids, job_id)
+    end
+end
+publish_enqueued_jobs()
+return job_ids
+"""
+
+CANCEL_JOB_SCRIPT = """
+local enqueued_index_key = KEYS[1]
+local scheduled_index_key = KEYS[2]
+local cancelled_index_key = KEYS[3]
+local cancellations_key = KEYS[4]
+local job_key = KEYS[5]
+local job_id = ARGV[1]
+local enqueued_status = ARGV[2]
+local scheduled_status = ARGV[3]
+local processing_status = ARGV[4]
+local cancelled_status = ARGV[5]
+local end_datetime = ARGV[6]
+local end_timestamp = ARGV[7]
+local cancelled_error = ARGV[8]
+local default_queue = ARGV[9]
+local status = redis.call('HGET', job_key, 'status')
+if status == enqueued_status or status == scheduled_status then
+    local queue = redis.call('HGET', job_key, 'queue') or default_queue
+    local queue_suffix = ''
+    if queue ~= default_queue then
+        queue_suffix = ':' .. queue
+    end
+    redis.call('ZREM', enqueued_index_key .. queue_suffix, job_id)
+    redis.call('ZREM', scheduled_index_key, job_id)
+    redis.call('HSET', job_key, 'status', cancelled_status, 'end_datetime', end_datetime, 'error', cancelled_error)
+    redis.call('ZADD', cancelled_index_key, end_timestamp, job_id)
+    return 1
+end
+if status == processing_status then
+    redis.call('SADD', cancellations_key, job_id)
+    return 1
+end
+return 0
+"""
+
+CLAIM_EXPIRED_JOBS_SCRIPT = """
+local index_key = KEYS[1]
+local purges_key = KEYS[2]
+local now_timestamp = ARGV[1]
+local max_timestamp = ARGV[2]
+local max_count = ARGV[3]
+local limit = tonumber(ARGV[4])
+local lease_timestamp = ARGV[5]
+local job_ids = redis.call('ZRANGEBYSCORE', purges_key, '-inf', now_timestamp, 'LIMIT', 0, limit)
+local function claim_jobs(expired_job_ids)
+    for _, job_id in ipairs(expired_job_ids) do
+        redis.call('ZREM', index_key, job_id)
+        table.insert(job_ids, job_id)
+    end
+end
+if max_count ~= '' and #job_ids < limit then
+    local excess = redis.call('ZCARD', index_key) - tonumber(max_count)
+    if excess > 0 then
+        claim_jobs(redis.call('ZRANGE', index_key, 0, math.min(excess, limit - #job_ids) - 1))
+    end
+end
+if max_timestamp ~= '' and #job_ids < limit then
+    claim_jobs(redis.call('ZRANGEBYSCORE', index_key, '-inf', max_timestamp, 'LIMIT', 0, limit - #job_ids))
+end
+for _, job_id in ipairs(job_ids) do
+    redis.call('ZADD', purges_key, lease_timestamp, job_id)
+end
+return job_ids
+"""
 
 
 class RedisJobRepository(JobRepository, RedisRepositoryBase):
-    """Implementation of the JobRepository using Redis."""
+    """Implementation of the JobRepository using Redis.
+
+    Each job is stored on a hash named 'job:{id}'. The attributes that change
+    while the job runs ('status', 'error', 'start_datetime' and
+    'end_datetime') are kept on their own fields, and the remaining ones
+    (parameters included) are serialized on the field 'data'. The repository
+    remembers the values last written or read for each job instance, so
+    updating a job writes only the fields that changed, and the serialized
+    data is only rewritten when its attributes change.
+
+    For each status there is a sorted set named 'jobindex:{status}' with the
+    ids of the jobs on that status, scored by the datetime of the job's last
+    transition. The index of the enqueued jobs works as the queue, and is
+    consumed starting from the lowest score: the enqueued datetime moved
+    back by the priority of the job times a number of seconds. By default
+    this number is large enough to make priorities strict, and when a weight
+    is configured, jobs of lower priority move ahead of the newer jobs of
+    higher priority as they wait, so they don't starve. As the indexes are
+    changed on the same transaction as the jobs, their cardinality works as
+    the counter of jobs on each status.
+
+    Each queue has its own index of enqueued jobs, named
+    'jobindex:ENQUEUED:{queue}' ('jobindex:ENQUEUED' for the default queue),
+    and the names of the queues that ever had jobs are kept on the set
+    'jobqueues'. A server only reads the indexes of the queues it serves.
+    The scheduled jobs wait on the index 'jobindex:SCHEDULED', scored by the
+    datetime they are due, until they are moved to the index of their queue.
+
+    A claimed job is leased to the server for a limited time: its lock
+    'lock:job:{id}' expires, and the sorted set 'jobleases' keeps the ids of
+    the jobs being processed scored by the expiration of their leases. The
+    servers renew the leases of the jobs they are running, and the jobs whose
+    lease expired (as their server died) are put back on the queue. The ids
+    of the jobs being processed that must be cancelled are kept on the set
+    'jobcancellations', read by the servers running them.
+
+    The jobs moved to the dead-letter queue leave the hashes and indexes of
+    the other jobs: they are serialized whole on the hash 'deadletterjobs',
+    and the sorted set 'deadletterjobs:index' keeps their ids scored by the
+    datetime they were moved.
 
-    def __init__(self, redis_client: Redis):
+    The finished jobs claimed to be removed, as they exceeded their
+    retention, leave the index of their status, and wait on the sorted set
+    'jobpurges', scored by the expiration of the claim, until they are
+    deleted. The jobs whose claim expired (as their server died before
+    deleting them) are claimed again.
+
+    Every time jobs are enqueued, a message is published on the channel of
+    their queue ('jobs:enqueued:{queue}', or 'jobs:enqueued' for the default
+    queue), waking up the servers waiting for jobs on it. Adding or updating
+    many jobs at once takes a single transaction.
+
+    When a hash tag is given, it is prefixed to every key and channel (as in
+    '{tag}:job:{id}'), so all the keys of the repository are on the same slot
+    of a Redis Cluster, where the scripts and transactions run, and
+    repositories with different hash tags are independent shards, which can
+    be combined by the ShardedJobRepository. No operation relies on scanning
+    the keys, apart from the migration of the legacy layout. The Lua scripts
+    receive every key they touch on 'KEYS', so a cluster client routes them
+    to the node of the slot: the keys of the jobs, whose ids are only known
+    while the scripts run, are built from the prefixes 'job:' and
+    'lock:job:', passed as keys. A hash tag is required by the Redis Cluster
+    clients, whose pipelines can't publish, so the jobs enqueued are
+    notified right after their transaction instead.
+    """
+
+    def __init__(self,
+                 redis_client: Union[Redis, str],
+                 entry_codec: EntryCodec = None,
+                 priority_weight_seconds: int = None,
+                 hash_tag: str = None):
         """
         Args:
-            redis_client (Redis): Implementation of a Redis client.
+            redis_client (Redis | str): Implementation of a Redis client, of
+            a Redis Cluster client, or the URL of the Redis server, from
+            which the repository creates its own client using a
+            RedisConnectionPool.
+            entry_codec (EntryCodec, optional): Codec used to serialize the
+            entries. Defaults to CompactEntryCodec.
+            priority_weight_seconds (int, optional): Seconds of waiting on the
+            queue that each level of priority is worth, making the dequeue
+            weighted. When None, jobs with a higher priority are always
+            dequeued first. All the repositories sharing a queue must use
+            the same value. Defaults to None.
+            hash_tag (str, optional): Hash tag prefixed to the keys and
+            channels, as '{hash_tag}:', placing all the keys on the same slot
+            of a Redis Cluster. Defaults to None.
         """
-        RedisRepositoryBase.__init__(self, redis_client)
+        RedisRepositoryBase.__init__(self, redis_client, entry_codec, hash_tag)
+        self.__validate_priority_weight_seconds(priority_weight_seconds)
+        self.priority_weight_seconds = priority_weight_seconds
+        self.__claim_jobs_script = self.redis_client.register_script(CLAIM_JOBS_SCRIPT)
+        self.__reclaim_expired_jobs_script = self.redis_client.register_script(RECLAIM_EXPIRED_JOBS_SCRIPT)
+        self.__promote_scheduled_jobs_script = self.redis_client.register_script(PROMOTE_SCHEDULED_JOBS_SCRIPT)
+        self.__cancel_job_script = self.redis_client.register_script(CANCEL_JOB_SCRIPT)
+        self.__claim_expired_jobs_script = self.redis_client.register_script(CLAIM_EXPIRED_JOBS_SCRIPT)
+        self.__queues_key = self._get_prefixed_key(JOB_QUEUES_KEY)
+        self.__leases_key = self._get_prefixed_key(JOB_LEASES_KEY)
+        self.__cancellations_key = self._get_prefixed_key(JOB_CANCELLATIONS_KEY)
+        self.__dead_letter_jobs_key = self._get_prefixed_key(DEAD_LETTER_JOBS_KEY)
+        self.__dead_letter_index_key = self._get_prefixed_key(DEAD_LETTER_INDEX_KEY)
+        self.__purges_key = self._get_prefixed_key(JOB_PURGES_KEY)
+        self.__enqueued_jobs_subscription = None
+        self.__enqueued_jobs_channels = set()
+        self.__stored_jobs = weakref.WeakKeyDictionary()
 
     def get_jobs(self) -> list[Job]:
-        keys = self._get_keys('job:*')
-        serialized_jobs = self.redis_client.mget(keys)
-        return self._deserialize_entries(serialized_jobs)
+        job_ids = []
+        for status in JobStatus:
+            for index_key in self.__get_index_keys(status):
+                job_ids.extend(self.redis_client.zrange(index_key, 0, -1))
+        return self.__get_jobs_by_ids(job_ids)
 
     def get_job_by_status(self, status: JobStatus) -> Job:
-        status_job_key = self._get_key(f'jobstatus:*:{str(status)}')
-        if (status_job_key is None):
-            return None
-        job_key = self.redis_client.get(status_job_key)
-        if (job_key is None):
+        """The enqueued job returned is the next one of all the queues."""
+
+        pipeline = self.redis_client.pipeline(transaction=False)
+        for index_key in self.__get_index_keys(status):
+            pipeline.zrange(index_key, 0, 0, withscores=True)
+        first_jobs = [job_ids[0] for job_ids in pipeline.execute() if len(job_ids) > 0]
+        if (len(first_jobs) == 0):
             return None
-        serialized_job = self.redis_client.get(job_key)
-        return self._deserialize_entry(serialized_job)
+        job_id, _ = min(first_jobs, key=lambda first_job: first_job[1])
+        fields = self.redis_client.hgetall(self.__get_job_key(job_id))
+        return self.__get_job_from_fields(fields)
 
-    def __get_job_keys_by_status(self, status: JobStatus) -> list[str]:
-        """Internal function for returning the Redis keys for jobs filtered by
-        status.
+    def get_jobs_by_status(self, status: JobStatus) -> list[Job]:
+        job_ids = []
+        for index_key in self.__get_index_keys(status):
+            job_ids.extend(self.redis_client.zrange(index_key, 0, -1))
+        return self.__get_jobs_by_ids(job_ids)
 
-        Args:
-            status (JobStatus)
+    def exists_jobs_with_status(self, status: JobStatus) -> bool:
+        return self.count_jobs_by_status(status) > 0
 
-        Returns:
-            list[str]
-        """
-        return self._get_keys(f'jobstatus:*:{str(status)}')
+    def count_jobs_by_status(self, status: JobStatus) -> int:
+        pipeline = self.redis_client.pipeline(transaction=False)
+        for index_key in self.__get_index_keys(status):
+            pipeline.zcard(index_key)
+        return sum(pipeline.execute())
 
-    def get_jobs_by_status(self, status: JobStatus) -> list[Job]:
-        status_job_keys = self.__get_job_keys_by_status(status)
-        job_keys = self.redis_client.mget(status_job_keys)
-        serialized_jobs = self.redis_client.mget(job_keys)
-        return self._deserialize_entries(serialized_jobs)
+    def count_enqueued_jobs(self, queues: list[str]) -> int:
+        pipeline = self.redis_client.pipeline(transaction=False)
+        for queue in queues:
+            pipeline.zcard(self.__get_index_key(JobStatus.ENQUEUED, queue))
+        return sum(pipeline.execute())
 
-    def exists_jobs_with_status(self, status: JobStatus) -> bool:
-        status_job_keys = self.__get_job_keys_by_status(status)
-        return len(status_job_keys) > 0
+    def get_status_counts(self) -> dict[JobStatus, int]:
+        pipeline = self.redis_client.pipeline(transaction=False)
+        index_statuses = []
+        for status in JobStatus:
+            for index_key in self.__get_index_keys(status):
+                pipeline.zcard(index_key)
+                index_statuses.append(status)
+        status_counts = dict.fromkeys(JobStatus, 0)
+        for status, count in zip(index_statuses, pipeline.execute()):
+            status_counts[status] += count
+        return status_counts
 
     def add_job(self, job: Job):
-        self.__set_job(job)
+        self.__set_jobs([job], new_jobs=True)
+
+    def add_jobs(self, jobs: list[Job]):
+        self.__set_jobs(jobs, new_jobs=True)
 
     def update_job(self, job: Job):
-        self.__set_job(job)
+        self.__set_jobs([job])
 
     def update_jobs(self, jobs: list[Job]):
+        self.__set_jobs(jobs)
+
+    def try_set_lock_on_job(self, job: Job, lease_milliseconds: int = 60000) -> bool:
+        return bool(self.redis_client.set(self.__get_lock_key(job.id), 1, nx=True, px=lease_milliseconds))
+
+    def claim_job(self, lease_milliseconds: int = 60000, queues: list[str] = None) -> Job:
+        jobs = self.claim_jobs(1, lease_milliseconds, queues)
+        if (len(jobs) == 0):
+            return None
+        return jobs[0]
+
+    def claim_jobs(self, quantity: int, lease_milliseconds: int = 60000, queues: list[str] = None) -> list[Job]:
+        """The claim runs as a Lua script, so popping the jobs from the queues,
+        locking them and setting their start state take a single round trip
+        and can't be interleaved with the claims of other servers. Ids left
+        on the queue without a job stored are discarded.
+        """
+
+        if (quantity <= 0):
+            return []
+        start_datetime = datetime.datetime.now()
+        keys = [self.__get_index_key(JobStatus.PROCESSING), self.__leases_key, self.__get_job_key(''), self.__get_lock_key('')]
+        keys.extend(self.__get_index_key(JobStatus.ENQUEUED, queue) for queue in queues or [DEFAULT_QUEUE])
+        args = [JobStatus.PROCESSING.name, start_datetime.isoformat(), start_datetime.timestamp(), quantity,
+                lease_milliseconds, self.__get_lease_timestamp(lease_milliseconds)]
+        jobs_fields = self.__claim_jobs_script(keys=keys, args=args)
+        return [self.__get_job_from_fields(dict(zip(fields[::2], fields[1::2]))) for fields in jobs_fields]
+
+    def renew_job_leases(self, jobs: list[Job], lease_milliseconds: int = 60000) -> list[Job]:
+        if (len(jobs) == 0):
+            return []
+        lease_timestamp = self.__get_lease_timestamp(lease_milliseconds)
+        pipeline = self.redis_client.pipeline(transaction=True)
         for job in jobs:
-            self.update_job(job)
+            pipeline.zscore(self.__leases_key, job.id)
+            pipeline.zadd(self.__leases_key, {job.id: lease_timestamp}, xx=True)
+            pipeline.pexpire(self.__get_lock_key(job.id), lease_milliseconds)
+        lease_scores = pipeline.execute()[::3]
+        return [job for job, lease_score in zip(jobs, lease_scores) if lease_score is None]
+
+    def reclaim_expired_jobs(self) -> list[str]:
+        """The jobs are put back on the queue by a Lua script, so a job is
+        never reclaimed while its server is renewing the lease or updating
+        its status. The jobs flagged to be cancelled are cancelled instead.
+        """
+
+        keys = self.__get_enqueue_job_keys() + [self.__get_index_key(JobStatus.PROCESSING), self.__leases_key, self.__cancellations_key,
+                                                self.__get_index_key(JobStatus.CANCELLED), self.__get_lock_key('')]
+        args = self.__get_enqueue_job_args() + [JobStatus.PROCESSING.name, JobStatus.CANCELLED.name,
+                                                datetime.datetime.now().isoformat(), CANCELLED_JOB_ERROR]
+        return [self._decode_value(job_id) for job_id in self.__reclaim_expired_jobs_script(keys=keys, args=args)]
+
+    def promote_scheduled_jobs(self, limit: int = 1000) -> list[str]:
+        """The due jobs are moved to their queues by a Lua script, reading
+        only the beginning of the index of the scheduled jobs, so the jobs
+        scheduled to the future cost nothing until they are due. They are
+        enqueued scored by the datetime they were scheduled to.
+        """
+
+        keys = self.__get_enqueue_job_keys() + [self.__get_index_key(JobStatus.SCHEDULED)]
+        args = self.__get_enqueue_job_args() + [JobStatus.SCHEDULED.name, limit]
+        return [self._decode_value(job_id) for job_id in self.__promote_scheduled_jobs_script(keys=keys, args=args)]
+
+    def cancel_job(self, job_id: str) -> bool:
+        """The job is cancelled by a Lua script, so it can't be claimed or
+        promoted in between.
+        """
+
+        end_datetime = datetime.datetime.now()
+        keys = [self.__get_index_key(JobStatus.ENQUEUED), self.__get_index_key(JobStatus.SCHEDULED),
+                self.__get_index_key(JobStatus.CANCELLED), self.__cancellations_key, self.__get_job_key(job_id)]
+        args = [job_id, JobStatus.ENQUEUED.name, JobStatus.SCHEDULED.name, JobStatus.PROCESSING.name, JobStatus.CANCELLED.name,
+                end_datetime.isoformat(), end_datetime.timestamp(), CANCELLED_JOB_ERROR, DEFAULT_QUEUE]
+        return bool(self.__cancel_job_script(keys=keys, args=args))
+
+    def get_cancelled_job_ids(self, job_ids: list[str]) -> list[str]:
+        if (len(job_ids) == 0):
+            return []
+        pipeline = self.redis_client.pipeline(transaction=False)
+        for job_id in job_ids:
+            pipeline.sismember(self.__cancellations_key, job_id)
+        return [job_id for job_id, cancelled in zip(job_ids, pipeline.execute()) if cancelled]
+
+    def move_jobs_to_dead_letter(self, jobs: list[Job]):
+        if (len(jobs) == 0):
+            return
+        dead_letter_timestamp = datetime.datetime.now().timestamp()
+        pipeline = self.redis_client.pipeline(transaction=True)
+        for job in jobs:
+            pipeline.hset(self.__dead_letter_jobs_key, job.id, self._serialize_entry(job))
+            pipeline.zadd(self.__dead_letter_index_key, {job.id: dead_letter_timestamp})
+            pipeline.delete(self.__get_job_key(job.id), self.__get_lock_key(job.id))
+            pipeline.zrem(self.__leases_key, job.id)
+            pipeline.srem(self.__cancellations_key, job.id)
+            for status in JobStatus:
+                pipeline.zrem(self.__get_index_key(status, job.queue), job.id)
+        pipeline.execute()
+        for job in jobs:
+            self.__stored_jobs.pop(job, None)
+
+    def get_dead_letter_jobs(self, limit: int = 100) -> list[Job]:
+        if (limit <= 0):
+            return []
+        job_ids = self.redis_client.zrange(self.__dead_letter_index_key, 0, limit - 1)
+        if (len(job_ids) == 0):
+            return []
+        jobs = []
+        for serialized_job in self.redis_client.hmget(self.__dead_letter_jobs_key, job_ids):
+            if (serialized_job is not None):
+                job = self._deserialize_entry(serialized_job)
+                self.__set_missing_attributes(job)
+                jobs.append(job)
+        return jobs
+
+    def count_dead_letter_jobs(self) -> int:
+        return self.redis_client.zcard(self.__dead_letter_index_key)
+
+    def requeue_dead_letter_job(self, job_id: str) -> Job:
+        """The job is read watching the dead-letter queue, and removed from it
+        on the same transaction that enqueues it, which is retried if the
+        dead-letter queue changes in between.
+        """
+
+        with self.redis_client.pipeline(transaction=True) as pipeline:
+            while (True):
+                try:
+                    pipeline.watch(self.__dead_letter_jobs_key)
+                    serialized_job = pipeline.hget(self.__dead_letter_jobs_key, job_id)
+                    if (serialized_job is None):
+                        return None
+                    job = self._deserialize_entry(serialized_job)
+                    self.__set_missing_attributes(job)
+                    job.status = JobStatus.ENQUEUED
+                    job.error = None
+                    job.enqueued_datetime = datetime.datetime.now().isoformat()
+                    job.start_datetime = None
+                    job.end_datetime = None
+                    pipeline.multi()
+                    pipeline.hdel(self.__dead_letter_jobs_key, job_id)
+                    pipeline.zrem(self.__dead_letter_index_key, job_id)
+                    fields, attributes, _ = self.__queue_set_job(pipeline, job, new_job=True)
+                    self.__execute_and_publish_enqueued_jobs(pipeline, {job.queue: 1})
+                    self.__stored_jobs[job] = (fields, attributes)
+                    return job
+                except WatchError:
+                    continue
+
+    def claim_expired_jobs(self,
+                           status: JobStatus,
+                           max_age_seconds: float = None,
+                           max_count: int = None,
+                           limit: int = 1000,
+                           lease_milliseconds: int = 60000) -> list[Job]:
+        """The jobs are claimed by a Lua script, reading only the beginning of
+        the index of the status, so the cost doesn't grow with the jobs kept.
+        The jobs whose claim expired are claimed first, whatever their status.
+        Ids claimed without a job stored are discarded.
+        """
+
+        if (limit <= 0):
+            return []
+        now = datetime.datetime.now()
+        max_timestamp = '' if max_age_seconds is None else (now - datetime.timedelta(seconds=max_age_seconds)).timestamp()
+        keys = [self.__get_index_key(status), self.__purges_key]
+        args = [now.timestamp(), max_timestamp, '' if max_count is None else max_count, limit,
+                self.__get_lease_timestamp(lease_milliseconds)]
+        job_ids = [self._decode_value(job_id) for job_id in self.__claim_expired_jobs_script(keys=keys, args=args)]
+        jobs = self.__get_jobs_by_ids(job_ids)
+        missing_job_ids = set(job_ids) - {job.id for job in jobs}
+        if (len(missing_job_ids) > 0):
+            self.redis_client.zrem(self.__purges_key, *missing_job_ids)
+        return jobs
+
+    def delete_jobs(self, jobs: list[Job]):
+        if (len(jobs) == 0):
+            return
+        pipeline = self.redis_client.pipeline(transaction=True)
+        for job in jobs:
+            pipeline.delete(self.__get_job_key(job.id), self.__get_lock_key(job.id))
+            pipeline.zrem(self.__purges_key, job.id)
+        pipeline.execute()
+        for job in jobs:
+            self.__stored_jobs.pop(job, None)
+
+    def wait_for_enqueued_jobs(self, timeout_seconds: float, queues: list[str] = None) -> bool:
+        """The subscription to the channels is kept open after the first call,
+        so the jobs enqueued while the server is busy are not missed.
+        """
+
+        subscription = self.__get_enqueued_jobs_subscription(queues or [DEFAULT_QUEUE])
+        deadline = time.monotonic() + timeout_seconds
+        while (True):
+            message = subscription.get_message(timeout=max(deadline - time.monotonic(), 0))
+            if (message is not None):
+                while (subscription.get_message() is not None):
+                    pass
+                return True
+            if (time.monotonic() >= deadline):
+                return False
+
+    def close(self):
+        """Closes the subscription to the enqueued jobs, releasing its
+        connection, and the Redis client, if it was created by the
+        repository.
+        """
+
+        if (self.__enqueued_jobs_subscription is not None):
+            self.__enqueued_jobs_subscription.close()
+            self.__enqueued_jobs_subscription = None
+            self.__enqueued_jobs_channels = set()
+        RedisRepositoryBase.close(self)
+
+    def migrate_legacy_keys(self) -> int:
+        """Moves the jobs stored using the layout of the previous versions
+        (serialized jobs on 'job:{id}' indexed by the keys
+        'jobstatus:{id}:{status}') to the current layout. It is safe to run
+        it more than once. Returns the number of jobs migrated. The previous
+        versions didn't run on Redis Cluster, where the keys of the legacy
+        layout and the prefixed ones are on different slots.
+
+        Returns:
+            int
+        """
+
+        migrated_jobs = 0
+        for status_key in self._get_keys('jobstatus:*:*'):
+            job_key = self.redis_client.get(status_key)
+            serialized_job = None if job_key is None else self.redis_client.get(job_key)
+            pipeline = self.redis_client.pipeline(transaction=True)
+            pipeline.delete(status_key)
+            if (serialized_job is not None):
+                job = self._deserialize_entry(serialized_job)
+                self.__set_missing_attributes(job)
+                pipeline.delete(job_key)
+                self.__queue_set_job(pipeline, job)
+                migrated_jobs += 1
+            pipeline.execute()
+        return migrated_jobs
+
+    def __get_enqueued_jobs_subscription(self, queues: list[str]):
+        """Internal function that returns the subscription to the channels
+        where the jobs enqueued on the queues passed by parameter are
+        notified, subscribing to the channels not subscribed yet.
+
+        Args:
+            queues (list[str])
+
+        Returns:
+            PubSub
+        """
+
+        if (self.__enqueued_jobs_subscription is None):
+            self.__enqueued_jobs_subscription = self.redis_client.pubsub(ignore_subscribe_messages=True)
+        channels = {self.__get_enqueued_jobs_channel(queue) for queue in queues} - self.__enqueued_jobs_channels
+        if (channels):
+            self.__enqueued_jobs_subscription.subscribe(*channels)
+            self.__enqueued_jobs_channels.update(channels)
+        return self.__enqueued_jobs_subscription
+
+    def __get_jobs_by_ids(self, job_ids: list[str]) -> list[Job]:
+        """Internal function for returning the jobs stored with the ids passed
+        by parameter, fetched on a single round trip. Ids without a job
+        stored are ignored.
+
+        Args:
+            job_ids (list[str])
+
+        Returns:
+            list[Job]
+        """
+
+        pipeline = self.redis_client.pipeline(transaction=False)
+        for job_id in job_ids:
+            pipeline.hgetall(self.__get_job_key(job_id))
+        jobs = [self.__get_job_from_fields(fields) for fields in pipeline.execute()]
+        return [job for job in jobs if job is not None]
+
+    def __set_jobs(self, jobs: list[Job], new_jobs: bool = False):
+        """Internal function to unify the commands used for both add and
+        update instructions on Redis, applied as a single transaction. The
+        servers are notified once for each queue where jobs were enqueued,
+        with the number of jobs enqueued on that queue.
+
+        Args:
+            jobs (list[Job])
+            new_jobs (bool, optional): Flags that the jobs are not stored yet,
+            so there's no index or lock to remove. Defaults to False.
+        """
+
+        if (len(jobs) == 0):
+            return
+        pipeline = self.redis_client.pipeline(transaction=True)
+        stored_jobs = [self.__queue_set_job(pipeline, job, new_jobs) for job in jobs]
+        enqueued_jobs_by_queue = {}
+        for job, (_, _, index_changed) in zip(jobs, stored_jobs):
+            if (job.status == JobStatus.ENQUEUED and index_changed):
+                enqueued_jobs_by_queue[job.queue] = enqueued_jobs_by_queue.get(job.queue, 0) + 1
+        self.__execute_and_publish_enqueued_jobs(pipeline, enqueued_jobs_by_queue)
+        for job, (fields, attributes, _) in zip(jobs, stored_jobs):
+            self.__stored_jobs[job] = (fields, attributes)
+
+    def __execute_and_publish_enqueued_jobs(self, pipeline, enqueued_jobs_by_queue: dict[str, int]):
+        """Internal function that executes the transaction queued on the
+        pipeline, notifying the servers of the number of jobs enqueued on each
+        queue. The notifications are part of the transaction, except on Redis
+        Cluster, whose pipelines can't publish, where they are published once
+        the transaction succeeds.
+
+        Args:
+            pipeline (Pipeline)
+            enqueued_jobs_by_queue (dict[str, int])
+        """
+
+        if (not self.is_cluster_client):
+            for queue, enqueued_jobs in enqueued_jobs_by_queue.items():
+                pipeline.publish(self.__get_enqueued_jobs_channel(queue), enqueued_jobs)
+        pipeline.execute()
+        if (self.is_cluster_client):
+            for queue, enqueued_jobs in enqueued_jobs_by_queue.items():
+                self.redis_client.publish(self.__get_enqueued_jobs_channel(queue), enqueued_jobs)
 
-    def try_set_lock_on_job(self, job: Job) -> bool:
-        return bool(self.redis_client.setnx(f'lock:job:{job.id}', 1))
+    def __queue_set_job(self, pipeline, job: Job, new_job: bool = False) -> tuple:
+        """Internal function that queues on the pipeline the commands that
+        store the fields of the job changed since they were last written or
+        read, and move it to the index of its current status and queue.
+        Returns the values stored, to be remembered once the pipeline is
+        executed, and whether the job was moved to another index.
 
-    def __set_job(self, job: Job):
-        """Internal function to unify the command 'set' used for both add and
-        update instructions on Redis. It also mantains a secondary index for
-        jobs on the database to make possible to apply a filter by job status.
+        Args:
+            pipeline (Pipeline)
+            job (Job)
+            new_job (bool, optional): Defaults to False.
+
+        Returns:
+            tuple
+        """
+
+        fields = self.__get_fields_from_job(job)
+        attributes = self.__get_attributes_from_job(job)
+        stored_fields, stored_attributes = self.__stored_jobs.get(job, ({}, None))
+        changed_fields = {name: value for name, value in fields.items() if stored_fields.get(name) != value}
+        if (attributes != stored_attributes):
+            changed_fields['data'] = self.__serialize_job_attributes(job)
+        if (changed_fields):
+            pipeline.hset(self.__get_job_key(job.id), mapping=changed_fields)
+        index_changed = 'status' in changed_fields or 'queue' in changed_fields
+        if (new_job):
+            self.__queue_add_job_index(pipeline, job)
+        elif (index_changed):
+            self.__queue_move_job_index(pipeline, job, stored_fields.get('queue'))
+        elif (any(name in changed_fields for name in ('start_datetime', 'end_datetime', 'priority'))):
+            pipeline.zadd(self.__get_job_index_key(job), {job.id: self.__get_index_score(job)})
+        return fields, attributes, index_changed
+
+    def __queue_add_job_index(self, pipeline, job: Job):
+        """Internal function that queues on the pipeline the commands that add
+        the job to the index of its current status and queue, registering the
+        queue of the enqueued jobs.
+
+        Args:
+            pipeline (Pipeline)
+            job (Job)
+        """
+
+        pipeline.zadd(self.__get_job_index_key(job), {job.id: self.__get_index_score(job)})
+        if (job.status == JobStatus.ENQUEUED and job.queue != DEFAULT_QUEUE):
+            pipeline.sadd(self.__queues_key, job.queue)
+
+    def __queue_move_job_index(self, pipeline, job: Job, stored_queue: str = None):
+        """Internal function that queues on the pipeline the commands that
+        move the job to the index of its current status and queue. The lock,
+        the lease and the flag of the cancellation of jobs that are no longer
+        being processed are released. The job is removed from every other
+        index, as its status may have been changed by another server since it
+        was read.
 
         Args:
+            pipeline (Pipeline)
             job (Job)
+            stored_queue (str, optional): Queue of the job when it was last
+            written or read, if known. Defaults to None.
         """
 
-        serialized_job = self._serialize_entry(job)
-        self.__delete_job_status(job)
-        self.redis_client.set(f'job:{job.id}', serialized_job)
-        self.__set_job_status(job)
+        if (job.status != JobStatus.PROCESSING):
+            pipeline.delete(self.__get_lock_key(job.id))
+            pipeline.zrem(self.__leases_key, job.id)
+            pipeline.srem(self.__cancellations_key, job.id)
+        for status in JobStatus:
+            if (status != job.status):
+                pipeline.zrem(self.__get_index_key(status, job.queue), job.id)
+        if (stored_queue not in (None, job.queue)):
+            pipeline.zrem(self.__get_index_key(JobStatus.ENQUEUED, stored_queue), job.id)
+        self.__queue_add_job_index(pipeline, job)
 
-    def __delete_job_status(self, job: Job):
-        """Internal function to delete the secondary index by status kept on
-        Redis.
+    def __get_fields_from_job(self, job: Job) -> dict:
+        """Internal function that returns the fields of the hash used to store
+        the attributes of the job that change while it runs.
 
         Args:
             job (Job)
+
+        Returns:
+            dict
         """
 
-        keys = self._get_keys(f'jobstatus:{job.id}:*')
-        for key in keys:
-            self.redis_client.delete(key)
+        return {'status': job.status.name,
+                'error': job.error or '',
+                'start_datetime': job.start_datetime or '',
+                'end_datetime': job.end_datetime or '',
+                'priority': str(job.priority),
+                'queue': job.queue}
 
-    def __set_job_status(self, job: Job):
-        """Internal function to set the secondary index by status kept on
-        Redis.
+    def __get_attributes_from_job(self, job: Job) -> dict:
+        """Internal function that returns the attributes of the job stored on
+        the field 'data', used to find out if it must be rewritten. Changes
+        made in place on the items of the parameters or the attempts are not
+        detected.
 
         Args:
             job (Job)
+
+        Returns:
+            dict
         """
 
-        self.redis_client.set(f'jobstatus:{job.id}:{str(job.status)}', f'job:{job.id}')
+        attributes = {name: value for name, value in vars(job).items() if name not in JOB_FIELDS}
+        attributes['parameters'] = list(job.parameters)
+        attributes['attempts'] = list(job.attempts)
+        return attributes
+
+    def __serialize_job_attributes(self, job: Job) -> bytes:
+        """Internal function that serializes the job stored on the field
+        'data', without the values kept on the other fields.
+
+        Args:
+            job (Job)
+
+        Returns:
+            bytes
+        """
+
+        job_attributes = copy.copy(job)
+        job_attributes.status = JobStatus.ENQUEUED
+        job_attributes.error = None
+        job_attributes.start_datetime = None
+        job_attributes.end_datetime = None
+        return self._serialize_entry(job_attributes)
+
+    def __get_job_from_fields(self, fields: dict) -> Job:
+        """Internal function that returns the job stored on the fields of a
+        hash, remembering the values read. If the hash is empty, 'None' is
+        returned.
+
+        Args:
+            fields (dict)
+
+        Returns:
+            Job
+        """
+
+        if (not fields):
+            return None
+        fields = {self._decode_value(key): value for key, value in fields.items()}
+        job = self._deserialize_entry(fields.pop('data'))
+        fields = {name: self._decode_value(value) for name, value in fields.items() if name in JOB_FIELDS}
+        for name, value in fields.items():
+            setattr(job, name, self.__parse_field(name, value))
+        self.__set_missing_attributes(job)
+        self.__stored_jobs[job] = (fields, self.__get_attributes_from_job(job))
+        return job
+
+    def __set_missing_attributes(self, job: Job):
+        """Internal function that sets the default values of the attributes
+        missing on the jobs stored by previous versions.
+
+        Args:
+            job (Job)
+        """
+
+        job.priority = getattr(job, 'priority', 0)
+        job.queue = getattr(job, 'queue', DEFAULT_QUEUE)
+        job.attempts = getattr(job, 'attempts', [])
+        job.timeout_seconds = getattr(job, 'timeout_seconds', None)
+
+    def __parse_field(self, name: str, value: str) -> object:
+        """Internal function that returns the value of the job attribute kept
+        on the field passed by parameter.
+
+        Args:
+            name (str)
+            value (str)
+
+        Returns:
+            object
+        """
+
+        if (name == 'status'):
+            return JobStatus[value]
+        if (name == 'priority'):
+            return int(value)
+        return value or None
+
+    def __get_index_score(self, job: Job) -> float:
+        """Internal function that returns the score of the job on the index of
+        its status: the timestamp of the datetime in which the job reached
+        that status (or is due, for the scheduled jobs). On the index of the
+        enqueued jobs, the timestamp is moved back according to the priority
+        of the job.
+
+        Args:
+            job (Job)
+
+        Returns:
+            float
+        """
+
+        status_datetimes = {JobStatus.ENQUEUED: job.enqueued_datetime,
+                            JobStatus.SCHEDULED: job.enqueued_datetime,
+                            JobStatus.PROCESSING: job.start_datetime}
+        status_datetime = status_datetimes.get(job.status, job.end_datetime)
+        if (status_datetime is None):
+            timestamp = datetime.datetime.now().timestamp()
+        else:
+            timestamp = datetime.datetime.fromisoformat(status_datetime).timestamp()
+        if (job.status == JobStatus.ENQUEUED):
+            return timestamp - job.priority * self.__get_priority_seconds()
+        return timestamp
+
+    def __get_enqueue_job_keys(self) -> list:
+        """Internal function that returns the keys shared by the scripts that
+        enqueue the jobs kept on other indexes: the index of the default
+        queue, extended by the scripts to the other queues, the set of queues
+        and the prefix of the keys of the jobs.
+
+        Returns:
+            list
+        """
+
+        return [self.__get_index_key(JobStatus.ENQUEUED), self.__queues_key, self.__get_job_key('')]
+
+    def __get_enqueue_job_args(self) -> list:
+        """Internal function that returns the arguments shared by the scripts
+        that enqueue the jobs kept on other indexes.
+
+        Returns:
+            list
+        """
+
+        return [datetime.datetime.now().timestamp(), JobStatus.ENQUEUED.name, self._get_prefixed_key(ENQUEUED_JOBS_CHANNEL),
+                self.__get_priority_seconds(), DEFAULT_QUEUE]
+
+    def __get_priority_seconds(self) -> int:
+        """Internal function that returns the seconds of waiting each level of
+        priority is worth on the queue.
+
+        Returns:
+            int
+        """
+
+        if (self.priority_weight_seconds is None):
+            return STRICT_PRIORITY_SECONDS
+        return self.priority_weight_seconds
+
+    def __validate_priority_weight_seconds(self, priority_weight_seconds: int):
+        """
+        Internal function used to validate the 'priority_weight_seconds' value.
+
+        Raises:
+            ValueError: The value must be an integer or None
+            ValueError: The value must be greater than zero
+        """
+
+        if (priority_weight_seconds is None):
+            return
+        if (not isinstance(priority_weight_seconds, int)):
+            raise ValueError('priority_weight_seconds', priority_weight_seconds, 'The value must be an integer or None')
+        if (priority_weight_seconds <= 0):
+            raise ValueError('priority_weight_seconds', priority_weight_seconds, 'The value must be greater than zero')
+
+    def __get_lease_timestamp(self, lease_milliseconds: int) -> float:
+        """Internal function that returns the timestamp in which a lease
+        renewed now expires.
+
+        Args:
+            lease_milliseconds (int)
+
+        Returns:
+            float
+        """
+
+        return (datetime.datetime.now() + datetime.timedelta(milliseconds=lease_milliseconds)).timestamp()
+
+    def __get_job_key(self, job_id: str) -> str:
+        return self._get_prefixed_key(f'job:{self._decode_value(job_id)}')
+
+    def __get_index_key(self, status: JobStatus, queue: str = DEFAULT_QUEUE) -> str:
+        if (status == JobStatus.ENQUEUED and queue != DEFAULT_QUEUE):
+            return self._get_prefixed_key(f'jobindex:{status.name}:{queue}')
+        return self._get_prefixed_key(f'jobindex:{status.name}')
+
+    def __get_job_index_key(self, job: Job) -> str:
+        return self.__get_index_key(job.status, job.queue)
+
+    def __get_index_keys(self, status: JobStatus) -> list[str]:
+        """Internal function that returns the keys of the indexes of the
+        status passed by parameter: one for each queue for the enqueued jobs,
+        and a single one for the other statuses.
+
+        Args:
+            status (JobStatus)
+
+        Returns:
+            list[str]
+        """
+
+        if (status != JobStatus.ENQUEUED):
+            return [self.__get_index_key(status)]
+        return [self.__get_index_key(status, queue) for queue in self.__get_queues()]
+
+    def __get_queues(self) -> list[str]:
+        """Internal function that returns the names of the queues that ever had
+        jobs enqueued, starting by the default queue.
+
+        Returns:
+            list[str]
+        """
+
+        queues = sorted(self._decode_value(queue) for queue in self.redis_client.smembers(self.__queues_key))
+        return [DEFAULT_QUEUE] + [queue for queue in queues if queue != DEFAULT_QUEUE]
+
+    def __get_enqueued_jobs_channel(self, queue: str) -> str:
+        if (queue == DEFAULT_QUEUE):
+            return self._get_prefixed_key(ENQUEUED_JOBS_CHANNEL)
+        return self._get_prefixed_key(f'{ENQUEUED_JOBS_CHANNEL}:{queue}')
+
+    def __get_lock_key(self, job_id: str) -> str:
+        return self._get_prefixed_key(f'lock:job:{job_id}')
@@ -0,0 +1,116 @@
+import datetime
+from hangpy.entities import RecurringJob
+from hangpy.repositories import EntryCodec
+from hangpy.repositories import RecurringJobRepository
+from hangpy.repositories import RedisRepositoryBase
+from redis import Redis
+from typing import Union
+
+RECURRING_JOBS_KEY = 'recurringjobs'
+RECURRING_JOBS_SCHEDULE_KEY = 'recurringjobs:schedule'
+SCHEDULER_LEASE_KEY = 'recurringjobs:scheduler'
+
+UPDATE_RECURRING_JOB_RUN_SCRIPT = """
+local next_run_score = redis.call('ZSCORE', KEYS[2], ARGV[1])
+if not next_run_score or tonumber(next_run_score) ~= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[3])
+redis.call('ZADD', KEYS[2], ARGV[4], ARGV[1])
+return 1
+"""
+
+ACQUIRE_SCHEDULER_LEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    return 1
+end
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    return 1
+end
+return 0
+"""
+
+RELEASE_SCHEDULER_LEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisRecurringJobRepository(RecurringJobRepository, RedisRepositoryBase):
+    """Implementation of the RecurringJobRepository using Redis.
+
+    The recurring jobs are stored on the hash 'recurringjobs', indexed by
+    their names, and the sorted set 'recurringjobs:schedule' keeps their
+    names scored by their next run datetime, so only the recurring jobs that
+    are due are read. The server elected to enqueue the recurring jobs holds
+    the key 'recurringjobs:scheduler', which expires with its lease. When a
+    hash tag is given, it is prefixed to every key.
+    """
+
+    def __init__(self, redis_client: Union[Redis, str], entry_codec: EntryCodec = None, hash_tag: str = None):
+        """
+        Args:
+            redis_client (Redis | str): Implementation of a Redis client, of
+            a Redis Cluster client, or the URL of the Redis server, from
+            which the repository creates its own client using a
+            RedisConnectionPool.
+            entry_codec (EntryCodec, optional): Codec used to serialize the
+            entries. Defaults to CompactEntryCodec.
+            hash_tag (str, optional): Hash tag prefixed to the keys, as
+            '{hash_tag}:', placing all the keys on the same slot of a Redis
+            Cluster. Defaults to None.
+        """
+        RedisRepositoryBase.__init__(self, redis_client, entry_codec, hash_tag)
+        self.__recurring_jobs_key = self._get_prefixed_key(RECURRING_JOBS_KEY)
+        self.__schedule_key = self._get_prefixed_key(RECURRING_JOBS_SCHEDULE_KEY)
+        self.__scheduler_lease_key = self._get_prefixed_key(SCHEDULER_LEASE_KEY)
+        self.__update_recurring_job_run_script = self.redis_client.register_script(UPDATE_RECURRING_JOB_RUN_SCRIPT)
+        self.__acquire_scheduler_lease_script = self.redis_client.register_script(ACQUIRE_SCHEDULER_LEASE_SCRIPT)
+        self.__release_scheduler_lease_script = self.redis_client.register_script(RELEASE_SCHEDULER_LEASE_SCRIPT)
+
+    def get_recurring_jobs(self) -> list[RecurringJob]:
+        return self._deserialize_entries(self.redis_client.hvals(self.__recurring_jobs_key))
+
+    def get_recurring_job(self, name: str) -> RecurringJob:
+        serialized_recurring_job = self.redis_client.hget(self.__recurring_jobs_key, name)
+        if (serialized_recurring_job is None):
+            return None
+        return self._deserialize_entry(serialized_recurring_job)
+
+    def add_recurring_job(self, recurring_job: RecurringJob):
+        pipeline = self.redis_client.pipeline(transaction=True)
+        pipeline.hset(self.__recurring_jobs_key, recurring_job.name, self._serialize_entry(recurring_job))
+        pipeline.zadd(self.__schedule_key, {recurring_job.name: self.__get_schedule_score(recurring_job.next_run_datetime)})
+        pipeline.execute()
+
+    def remove_recurring_job(self, name: str):
+        pipeline = self.redis_client.pipeline(transaction=True)
+        pipeline.hdel(self.__recurring_jobs_key, name)
+        pipeline.zrem(self.__schedule_key, name)
+        pipeline.execute()
+
+    def get_due_recurring_jobs(self) -> list[RecurringJob]:
+        names = self.redis_client.zrangebyscore(self.__schedule_key, '-inf', datetime.datetime.now().timestamp())
+        if (len(names) == 0):
+            return []
+        serialized_recurring_jobs = self.redis_client.hmget(self.__recurring_jobs_key, names)
+        return self._deserialize_entries([serialized_recurring_job for serialized_recurring_job in serialized_recurring_jobs
+                                          if serialized_recurring_job is not None])
+
+    def try_update_recurring_job_run(self, recurring_job: RecurringJob, next_run_datetime: str) -> bool:
+        keys = [self.__recurring_jobs_key, self.__schedule_key]
+        args = [recurring_job.name, self.__get_schedule_score(next_run_datetime), self._serialize_entry(recurring_job),
+                self.__get_schedule_score(recurring_job.next_run_datetime)]
+        return bool(self.__update_recurring_job_run_script(keys=keys, args=args))
+
+    def try_acquire_scheduler_lease(self, server_id: str, lease_milliseconds: int) -> bool:
+        return bool(self.__acquire_scheduler_lease_script(keys=[self.__scheduler_lease_key], args=[server_id, lease_milliseconds]))
+
+    def release_scheduler_lease(self, server_id: str):
+        self.__release_scheduler_lease_script(keys=[self.__scheduler_lease_key], args=[server_id])
+
+    def __get_schedule_score(self, run_datetime: str) -> float:
+        return datetime.datetime.fromisoformat(run_datetime).timestamp()
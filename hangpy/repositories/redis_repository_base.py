@@ -1,18 +1,75 @@
-import jsonpickle
+from hangpy.repositories.compact_entry_codec import CompactEntryCodec
+from hangpy.repositories.entry_codec import EntryCodec
+from hangpy.repositories.jsonpickle_entry_codec import JsonpickleEntryCodec
+from hangpy.repositories.redis_connection_pool import RedisConnectionPool
 from redis import Redis
+from redis.cluster import RedisCluster
+from typing import Union
 
 
 class RedisRepositoryBase():
 
-    def __init__(self, redis_client: Redis):
+    def __init__(self, redis_client: Union[Redis, str], entry_codec: EntryCodec = None, hash_tag: str = None):
         """Base class for the implementations of the Redis repositories.
         It contains common functions used on Redis that don't depend on any
         specific entity.
 
         Args:
-            redis_client (Redis): Implementation of a Redis client.
+            redis_client (Redis | str): Implementation of a Redis client, or
+            the URL of the Redis server ('redis://host:port/db'). Given an
+            URL, the repository creates its own client, using a
+            RedisConnectionPool configured by the options of the URL, and
+            closes it on 'close'.
+            entry_codec (EntryCodec, optional): Codec used to serialize the
+            entries. Defaults to CompactEntryCodec, or to JsonpickleEntryCodec
+            when the client decodes the responses ('decode_responses=True'),
+            as the compact records are binary.
+            hash_tag (str, optional): Hash tag prefixed to the keys, as
+            '{hash_tag}:', placing all the keys of the repository on the same
+            slot of a Redis Cluster. Required by the Redis Cluster clients.
+            Defaults to None.
         """
-        self.redis_client = redis_client
+        self.owns_redis_client = isinstance(redis_client, str)
+        self.redis_client = Redis(connection_pool=RedisConnectionPool.from_url(redis_client)) if self.owns_redis_client else redis_client
+        self.entry_codec = self.__get_default_entry_codec() if entry_codec is None else entry_codec
+        self.__validate_entry_codec(self.entry_codec)
+        self.is_cluster_client = isinstance(self.redis_client, RedisCluster)
+        self.__validate_hash_tag(hash_tag)
+        self.key_prefix = '' if hash_tag is None else f'{{{hash_tag}}}:'
+
+    def get_connection_pool_statistics(self) -> dict:
+        """Returns the statistics of the connection pool of the Redis client,
+        as returned by 'RedisConnectionPool.get_statistics'. If the client
+        doesn't use a RedisConnectionPool, 'None' is returned.
+
+        Returns:
+            dict
+        """
+        connection_pool = getattr(self.redis_client, 'connection_pool', None)
+        if (not isinstance(connection_pool, RedisConnectionPool)):
+            return None
+        return connection_pool.get_statistics()
+
+    def close(self):
+        """Closes the connections of the Redis client, if it was created by
+        the repository. The clients passed to the repository are left open,
+        as they may be shared.
+        """
+        if (self.owns_redis_client):
+            self.redis_client.close()
+            self.redis_client.connection_pool.disconnect()
+
+    def _get_prefixed_key(self, key: str) -> str:
+        """Returns the key passed by parameter prefixed by the hash tag of
+        the repository, if there is one.
+
+        Args:
+            key (str)
+
+        Returns:
+            str
+        """
+        return self.key_prefix + key
 
     def _get_key(self, match: str) -> str:
         """Returns a key matching the pattern passed by parameter. If no match
@@ -26,15 +83,7 @@ class RedisRepositoryBase():
         Returns:
             str
         """
-        keys = []
-        cursor, result_keys = self.redis_client.scan(cursor=0, match=match)
-        keys.extend(result_keys)
-        while (len(keys) == 0 and cursor != 0):
-            cursor, result_keys = self.redis_client.scan(cursor=cursor, match=match)
-            keys.extend(result_keys)
-        if (len(keys) == 0):
-            return None
-        return keys[0]
+        return next(self.redis_client.scan_iter(match=match), None)
 
     def _get_keys(self, match: str) -> list[str]:
         """Returns all keys matching the pattern passed by parameter. If no
@@ -48,47 +97,100 @@ class RedisRepositoryBase():
         Returns:
             list[str]
         """
-        keys = []
-        cursor, result_keys = self.redis_client.scan(cursor=0, match=match)
-        keys.extend(result_keys)
-        while (cursor != 0):
-            cursor, result_keys = self.redis_client.scan(cursor=cursor, match=match)
-            keys.extend(result_keys)
-        return keys
+        return list(self.redis_client.scan_iter(match=match))
 
-    def _serialize_entry(self, entry: object) -> str:
-        """Serializes an object to make it possible to set the record on Redis.
-        It uses the 'jsonpickle' serialization package.
+    def _decode_value(self, value) -> str:
+        """Returns the value passed by parameter as a string. Values are
+        returned as bytes by clients that don't decode the responses.
 
         Args:
-            entry (object): Any object serializable using 'jsonpickle'.
+            value (bytes | str)
 
         Returns:
             str
         """
-        return jsonpickle.encode(entry)
+        if (isinstance(value, bytes)):
+            return value.decode()
+        return value
+
+    def _serialize_entry(self, entry: object) -> bytes:
+        """Serializes an object to make it possible to set the record on Redis.
+        It uses the codec of the repository.
+
+        Args:
+            entry (object): Any object supported by the codec.
+
+        Returns:
+            bytes
+        """
+        return self.entry_codec.encode(entry)
 
-    def _deserialize_entry(self, serialized_entry: str) -> object:
-        """Deserializes an object using the 'jsonpickle' serialization
-        package. It returns an instance of the object.
+    def _deserialize_entry(self, serialized_entry: bytes) -> object:
+        """Deserializes an object using the codec of the repository. It
+        returns an instance of the object.
 
         Args:
-            serialized_entry (str): Any object serialized using 'jsonpickle'.
+            serialized_entry (bytes): Any object serialized by the codec.
 
         Returns:
             object
         """
-        return jsonpickle.decode(serialized_entry)
+        return self.entry_codec.decode(serialized_entry)
 
-    def _deserialize_entries(self, serialized_entries: list[str]) -> list[object]:
-        """Deserializes a list of objects using the 'jsonpickle' serialization
-        package. It returns a list of instances of the objects.
+    def _deserialize_entries(self, serialized_entries: list[bytes]) -> list[object]:
+        """Deserializes a list of objects using the codec of the repository.
+        It returns a list of instances of the objects.
 
         Args:
-            serialized_entries (list[str]): A list of any objects serialized
-            using 'jsonpickle'.
+            serialized_entries (list[bytes]): A list of any objects serialized
+            by the codec.
 
         Returns:
             list[object]
         """
         return [self._deserialize_entry(serialized_entry) for serialized_entry in serialized_entries]
+
+    def __get_default_entry_codec(self) -> EntryCodec:
+        """Internal function that returns the codec used when none is passed
+        to the repository: the compact codec, unless the client decodes the
+        responses.
+
+        Returns:
+            EntryCodec
+        """
+        if (self.__decodes_responses()):
+            return JsonpickleEntryCodec()
+        return CompactEntryCodec()
+
+    def __decodes_responses(self) -> bool:
+        """Internal function that returns 'True' if the Redis client decodes
+        the responses to strings, which binary values don't survive.
+
+        Returns:
+            bool
+        """
+        get_encoder = getattr(self.redis_client, 'get_encoder', None)
+        if (get_encoder is not None):
+            return bool(get_encoder().decode_responses)
+        connection_pool = getattr(self.redis_client, 'connection_pool', None)
+        return connection_pool is not None and bool(connection_pool.connection_kwargs.get('decode_responses'))
+
+    def __validate_entry_codec(self, entry_codec: EntryCodec):
+        """
+        Internal function used to validate the codec of the repository.
+
+        Raises:
+            ValueError: The compact codec can't be used by a client that decodes the responses
+        """
+        if (isinstance(entry_codec, CompactEntryCodec) and self.__decodes_responses()):
+            raise ValueError('entry_codec', entry_codec, 'The compact codec can\'t be used by a client that decodes the responses')
+
+    def __validate_hash_tag(self, hash_tag: str):
+        """
+        Internal function used to validate the hash tag of the repository.
+
+        Raises:
+            ValueError: A hash tag is required by the Redis Cluster clients
+        """
+        if (hash_tag is None and self.is_cluster_client):
+            raise ValueError('hash_tag', hash_tag, 'A hash tag is required by the Redis Cluster clients')
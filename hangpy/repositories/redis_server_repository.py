@@ -1,30 +1,93 @@
+import datetime
 from hangpy.entities import Server
+from hangpy.repositories import EntryCodec
 from hangpy.repositories import RedisRepositoryBase
 from hangpy.repositories import ServerRepository
 from redis import Redis
+from typing import Union
+
+SERVERS_KEY = 'servers'
+
+LIVE_SERVERS_KEY = 'servers:live'
 
 
 class RedisServerRepository(ServerRepository, RedisRepositoryBase):
-    """Implementation of the ServerRepository using Redis."""
+    """Implementation of the ServerRepository using Redis.
+
+    Each server is stored on a key named 'server.{id}'. The live servers are
+    kept on the sorted set 'servers:live', scored by the timestamp in which
+    their last heartbeat expires, so listing them doesn't depend on the
+    number of servers ever started. Each heartbeat also sets the expiration
+    of the server key, so the servers that stopped or died are removed.
+
+    The sorted set 'servers' keeps the ids of all the servers, scored by the
+    expiration of their keys, so listing them doesn't scan the keys, which
+    doesn't work on a Redis Cluster. When a hash tag is given, it is
+    prefixed to every key.
+    """
 
-    def __init__(self, redis_client: Redis):
+    def __init__(self, redis_client: Union[Redis, str], entry_codec: EntryCodec = None, hash_tag: str = None):
         """
         Args:
-            redis_client (Redis): Implementation of a Redis client.
+            redis_client (Redis | str): Implementation of a Redis client, of
+            a Redis Cluster client, or the URL of the Redis server, from
+            which the repository creates its own client using a
+            RedisConnectionPool.
+            entry_codec (EntryCodec, optional): Codec used to serialize the
+            entries. Defaults to CompactEntryCodec.
+            hash_tag (str, optional): Hash tag prefixed to the keys, as
+            '{hash_tag}:', placing all the keys on the same slot of a Redis
+            Cluster. Defaults to None.
         """
-        RedisRepositoryBase.__init__(self, redis_client)
+        RedisRepositoryBase.__init__(self, redis_client, entry_codec, hash_tag)
+        self.__servers_key = self._get_prefixed_key(SERVERS_KEY)
+        self.__live_servers_key = self._get_prefixed_key(LIVE_SERVERS_KEY)
 
     def get_servers(self) -> list[Server]:
-        keys = self._get_keys('server.*')
-        serialized_servers = self.redis_client.mget(keys)
-        return self._deserialize_entries(serialized_servers)
+        server_ids = self.redis_client.zrangebyscore(self.__servers_key, datetime.datetime.now().timestamp(), '+inf')
+        return self.__get_servers_by_ids(server_ids)
 
     def add_server(self, server: Server):
         self.__set_server(server)
 
     def update_server(self, server: Server):
+        """Stopped servers are removed from the live servers, and their key
+        keeps the expiration set by the last heartbeat.
+        """
+
         self.__set_server(server)
 
+    def send_heartbeat(self, server: Server, timeout_milliseconds: int):
+        now = datetime.datetime.now()
+        expiration_timestamp = (now + datetime.timedelta(milliseconds=timeout_milliseconds)).timestamp()
+        pipeline = self.redis_client.pipeline(transaction=True)
+        pipeline.set(self.__get_server_key(server.id), self._serialize_entry(server), px=timeout_milliseconds)
+        pipeline.zadd(self.__live_servers_key, {server.id: expiration_timestamp})
+        pipeline.zremrangebyscore(self.__live_servers_key, '-inf', now.timestamp())
+        pipeline.zadd(self.__servers_key, {server.id: expiration_timestamp})
+        pipeline.zremrangebyscore(self.__servers_key, '-inf', now.timestamp())
+        pipeline.execute()
+
+    def get_live_servers(self) -> list[Server]:
+        server_ids = self.redis_client.zrangebyscore(self.__live_servers_key, datetime.datetime.now().timestamp(), '+inf')
+        return self.__get_servers_by_ids(server_ids)
+
+    def __get_servers_by_ids(self, server_ids: list[str]) -> list[Server]:
+        """Internal function that returns the servers stored with the ids
+        passed by parameter. Ids without a server stored are ignored.
+
+        Args:
+            server_ids (list[str])
+
+        Returns:
+            list[Server]
+        """
+        if (len(server_ids) == 0):
+            return []
+        serialized_servers = self.redis_client.mget([self.__get_server_key(server_id) for server_id in server_ids])
+        return self._deserialize_entries([serialized_server for serialized_server in serialized_servers
+                                          if serialized_server is not None])
+
     def __set_server(self, server: Server):
         """Internal function to unify the command 'set' used for both add and
         update instructions on Redis.
@@ -33,4 +96,12 @@ class RedisServerRepository(ServerRepository, RedisRepositoryBase):
             server (Server)
         """
         serialized_server = self._serialize_entry(server)
-        self.redis_client.set(f'server.{server.id}', serialized_server)
+        pipeline = self.redis_client.pipeline(transaction=True)
+        pipeline.set(self.__get_server_key(server.id), serialized_server, keepttl=True)
+        pipeline.zadd(self.__servers_key, {server.id: '+inf'}, nx=True)
+        if (server.stop_datetime is not None):
+            pipeline.zrem(self.__live_servers_key, server.id)
+        pipeline.execute()
+
+    def __get_server_key(self, server_id: str) -> str:
+        return self._get_prefixed_key(f'server.{self._decode_value(server_id)}')
@@ -19,3 +19,29 @@ class ServerRepository(ABC):
     @abstractmethod
     def update_server(self, server: Server):
         pass
+
+    @abstractmethod
+    def send_heartbeat(self, server: Server, timeout_milliseconds: int):
+        """
+        Stores the state of the server passed by parameter, keeping it on the
+        live servers until the timeout passed by parameter expires, unless
+        another heartbeat is sent. Servers whose timeout expired are removed
+        from the live servers.
+
+        Args:
+            server (Server)
+            timeout_milliseconds (int)
+        """
+        pass
+
+    @abstractmethod
+    def get_live_servers(self) -> list[Server]:
+        """
+        Returns the servers whose last heartbeat didn't expire yet, without
+        reading the servers that already stopped or died. If no servers are
+        live, an empty list is returned.
+
+        Returns:
+            list[Server]
+        """
+        pass
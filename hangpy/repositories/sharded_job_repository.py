@@ -0,0 +1,306 @@
+import itertools
+import threading
+import time
+import zlib
+from hangpy.entities import Job
+from hangpy.enums import JobStatus
+from hangpy.repositories import JobRepository
+
+ENQUEUED_JOBS_WAIT_SLICE_SECONDS = 0.01
+
+
+class ShardedJobRepository(JobRepository):
+    """Implementation of the JobRepository that distributes the jobs across
+    other job repositories, the shards, so the throughput of enqueuing and
+    claiming jobs scales beyond a single Redis instance (or core). The
+    shards can be RedisJobRepository instances on different Redis instances,
+    or on the same Redis Cluster with different hash tags.
+
+    Each job is kept on the shard chosen by the hash of its id, so the jobs
+    of every queue are partitioned across the shards, and the operations on
+    a job always reach the same shard. The operations on many jobs are split
+    by shard, and the queries are merged from all of them.
+
+    Each claim reads the shards in turn, starting from the shard after the
+    one where the previous claim started (round-robin), or from the local
+    shard, when one is configured, and only moves to the next shards while
+    the jobs claimed don't fill the quantity requested. The servers waiting
+    for jobs poll the notifications of the shards in turn.
+
+    The priorities are only kept within each shard: a claim takes the next
+    jobs of the first shard it reads, without comparing them with the next
+    jobs of the other shards, so a job of lower priority may be claimed
+    while a job of higher priority waits on another shard, until a claim
+    reads that shard. Comparing the shards on every claim would take a
+    round trip to each of them, and wouldn't be atomic either. Applications
+    depending on strict priorities across all the jobs should use a single
+    repository, or dedicated queues for the urgent jobs.
+
+    The maximum count of the retention is split by the shards in proportion
+    to the jobs of the status each one keeps, so the fleet keeps the
+    maximum count of jobs overall, and the jobs kept are the newest ones of
+    each shard, which approximates the newest ones overall as the jobs are
+    evenly distributed.
+    """
+
+    def __init__(self, shards: list[JobRepository], local_shard: int = None):
+        """
+        Args:
+            shards (list[JobRepository]): Repositories where the jobs are
+            kept. Every repository (on every server and job service) sharing
+            the jobs must use the same shards, in the same order.
+            local_shard (int, optional): Index of the shard read first by the
+            claims, usually the one closest to the server. When None, the
+            claims start from each shard in turn. Defaults to None.
+        """
+
+        self.__validate_parameters(shards, local_shard)
+        self.shards = list(shards)
+        self.local_shard = local_shard
+        self.__claim_counter = itertools.count()
+        self.__lock = threading.Lock()
+
+    def get_jobs(self) -> list[Job]:
+        return [job for shard in self.shards for job in shard.get_jobs()]
+
+    def get_job_by_status(self, status: JobStatus) -> Job:
+        """The enqueued job returned is the one of highest priority, and
+        enqueued first, among the next jobs of each shard.
+        """
+
+        jobs = [job for job in (shard.get_job_by_status(status) for shard in self.shards) if job is not None]
+        if (len(jobs) == 0):
+            return None
+        if (status != JobStatus.ENQUEUED):
+            return jobs[0]
+        return min(jobs, key=lambda job: (-job.priority, job.enqueued_datetime or ''))
+
+    def get_jobs_by_status(self, status: JobStatus) -> list[Job]:
+        return [job for shard in self.shards for job in shard.get_jobs_by_status(status)]
+
+    def exists_jobs_with_status(self, status: JobStatus) -> bool:
+        return any(shard.exists_jobs_with_status(status) for shard in self.shards)
+
+    def count_jobs_by_status(self, status: JobStatus) -> int:
+        return sum(shard.count_jobs_by_status(status) for shard in self.shards)
+
+    def count_enqueued_jobs(self, queues: list[str]) -> int:
+        return sum(shard.count_enqueued_jobs(queues) for shard in self.shards)
+
+    def get_status_counts(self) -> dict[JobStatus, int]:
+        status_counts = dict.fromkeys(JobStatus, 0)
+        for shard in self.shards:
+            for status, count in shard.get_status_counts().items():
+                status_counts[status] += count
+        return status_counts
+
+    def add_job(self, job: Job):
+        self.get_shard(job.id).add_job(job)
+
+    def add_jobs(self, jobs: list[Job]):
+        for shard, shard_jobs in self.__group_jobs_by_shard(jobs):
+            shard.add_jobs(shard_jobs)
+
+    def update_job(self, job: Job):
+        self.get_shard(job.id).update_job(job)
+
+    def update_jobs(self, jobs: list[Job]):
+        for shard, shard_jobs in self.__group_jobs_by_shard(jobs):
+            shard.update_jobs(shard_jobs)
+
+    def try_set_lock_on_job(self, job: Job, lease_milliseconds: int = 60000) -> bool:
+        return self.get_shard(job.id).try_set_lock_on_job(job, lease_milliseconds)
+
+    def claim_job(self, lease_milliseconds: int = 60000, queues: list[str] = None) -> Job:
+        jobs = self.claim_jobs(1, lease_milliseconds, queues)
+        if (len(jobs) == 0):
+            return None
+        return jobs[0]
+
+    def claim_jobs(self, quantity: int, lease_milliseconds: int = 60000, queues: list[str] = None) -> list[Job]:
+        jobs = []
+        for shard in self.__get_claim_order():
+            if (len(jobs) >= quantity):
+                break
+            jobs.extend(shard.claim_jobs(quantity - len(jobs), lease_milliseconds, queues))
+        return jobs
+
+    def renew_job_leases(self, jobs: list[Job], lease_milliseconds: int = 60000) -> list[Job]:
+        return [job for shard, shard_jobs in self.__group_jobs_by_shard(jobs)
+                for job in shard.renew_job_leases(shard_jobs, lease_milliseconds)]
+
+    def reclaim_expired_jobs(self) -> list[str]:
+        return [job_id for shard in self.shards for job_id in shard.reclaim_expired_jobs()]
+
+    def promote_scheduled_jobs(self, limit: int = 1000) -> list[str]:
+        """Each shard promotes up to the limit of jobs."""
+
+        return [job_id for shard in self.shards for job_id in shard.promote_scheduled_jobs(limit)]
+
+    def cancel_job(self, job_id: str) -> bool:
+        return self.get_shard(job_id).cancel_job(job_id)
+
+    def get_cancelled_job_ids(self, job_ids: list[str]) -> list[str]:
+        job_ids_by_shard = {}
+        for job_id in job_ids:
+            job_ids_by_shard.setdefault(self.__get_shard_index(job_id), []).append(job_id)
+        cancelled_job_ids = {job_id for shard_index, shard_job_ids in job_ids_by_shard.items()
+                             for job_id in self.shards[shard_index].get_cancelled_job_ids(shard_job_ids)}
+        return [job_id for job_id in job_ids if job_id in cancelled_job_ids]
+
+    def move_jobs_to_dead_letter(self, jobs: list[Job]):
+        for shard, shard_jobs in self.__group_jobs_by_shard(jobs):
+            shard.move_jobs_to_dead_letter(shard_jobs)
+
+    def get_dead_letter_jobs(self, limit: int = 100) -> list[Job]:
+        jobs = []
+        for shard in self.shards:
+            if (len(jobs) >= limit):
+                break
+            jobs.extend(shard.get_dead_letter_jobs(limit - len(jobs)))
+        return jobs
+
+    def count_dead_letter_jobs(self) -> int:
+        return sum(shard.count_dead_letter_jobs() for shard in self.shards)
+
+    def requeue_dead_letter_job(self, job_id: str) -> Job:
+        return self.get_shard(job_id).requeue_dead_letter_job(job_id)
+
+    def claim_expired_jobs(self,
+                           status: JobStatus,
+                           max_age_seconds: float = None,
+                           max_count: int = None,
+                           limit: int = 1000,
+                           lease_milliseconds: int = 60000) -> list[Job]:
+        shard_max_counts = [None] * len(self.shards)
+        if (max_count is not None):
+            shard_max_counts = self.__get_shard_max_counts(max_count, [shard.count_jobs_by_status(status) for shard in self.shards])
+        jobs = []
+        for shard, shard_max_count in zip(self.shards, shard_max_counts):
+            if (len(jobs) >= limit):
+                break
+            jobs.extend(shard.claim_expired_jobs(status, max_age_seconds, shard_max_count, limit - len(jobs), lease_milliseconds))
+        return jobs
+
+    def delete_jobs(self, jobs: list[Job]):
+        for shard, shard_jobs in self.__group_jobs_by_shard(jobs):
+            shard.delete_jobs(shard_jobs)
+
+    def wait_for_enqueued_jobs(self, timeout_seconds: float, queues: list[str] = None) -> bool:
+        """The shards are waited on in turn, for a short slice of time each,
+        until one of them notifies jobs enqueued or the timeout expires. The
+        shards must keep the notifications received between their waits,
+        like the RedisJobRepository does, otherwise the jobs enqueued on a
+        shard while another one is waited on are only noticed on the next
+        cycle of the servers.
+        """
+
+        if (len(self.shards) == 1):
+            return self.shards[0].wait_for_enqueued_jobs(timeout_seconds, queues)
+        deadline = time.monotonic() + timeout_seconds
+        for shard in itertools.cycle(self.shards):
+            remaining_seconds = deadline - time.monotonic()
+            if (shard.wait_for_enqueued_jobs(max(min(ENQUEUED_JOBS_WAIT_SLICE_SECONDS, remaining_seconds), 0), queues)):
+                return True
+            if (remaining_seconds <= 0):
+                return False
+
+    def get_shard(self, job_id: str) -> JobRepository:
+        """
+        Returns the shard where the job with the id passed by parameter is
+        kept.
+
+        Args:
+            job_id (str)
+
+        Returns:
+            JobRepository
+        """
+
+        return self.shards[self.__get_shard_index(job_id)]
+
+    def __get_shard_index(self, job_id: str) -> int:
+        """Internal function that returns the index of the shard of the job,
+        given by the hash of its id, which is the same on every process.
+
+        Args:
+            job_id (str)
+
+        Returns:
+            int
+        """
+
+        return zlib.crc32(job_id.encode()) % len(self.shards)
+
+    def __group_jobs_by_shard(self, jobs: list[Job]) -> list[tuple]:
+        """Internal function that splits the jobs passed by parameter by the
+        shard where they are kept, keeping their order.
+
+        Args:
+            jobs (list[Job])
+
+        Returns:
+            list[tuple]: The shards and their jobs.
+        """
+
+        jobs_by_shard = {}
+        for job in jobs:
+            jobs_by_shard.setdefault(self.__get_shard_index(job.id), []).append(job)
+        return [(self.shards[shard_index], shard_jobs) for shard_index, shard_jobs in jobs_by_shard.items()]
+
+    def __get_claim_order(self) -> list[JobRepository]:
+        """Internal function that returns the shards in the order they are
+        read by a claim: starting from the local shard, if there is one, or
+        from the shard after the one where the previous claim started.
+
+        Returns:
+            list[JobRepository]
+        """
+
+        if (self.local_shard is not None):
+            first_shard = self.local_shard
+        else:
+            with self.__lock:
+                first_shard = next(self.__claim_counter) % len(self.shards)
+        return self.shards[first_shard:] + self.shards[:first_shard]
+
+    def __get_shard_max_counts(self, max_count: int, job_counts: list[int]) -> list[int]:
+        """Internal function that returns the share of the maximum count of
+        jobs kept by each shard, in proportion to the jobs each one keeps, so
+        the shares add up to the maximum count. The remainder is given to the
+        shards with the largest fractions of a job. When the shards keep no
+        more jobs than the maximum count, each share is the count of its
+        shard.
+
+        Args:
+            max_count (int)
+            job_counts (list[int]): Jobs kept by each shard.
+
+        Returns:
+            list[int]
+        """
+
+        total_jobs = sum(job_counts)
+        if (total_jobs <= max_count):
+            return list(job_counts)
+        shares = [max_count * job_count // total_jobs for job_count in job_counts]
+        remainders = sorted(range(len(job_counts)), key=lambda index: -(max_count * job_counts[index] % total_jobs))
+        for shard_index in remainders[:max_count - sum(shares)]:
+            shares[shard_index] += 1
+        return shares
+
+    def __validate_parameters(self, shards: list[JobRepository], local_shard: int):
+        """
+        Internal function used to validate the class constructor parameters.
+
+        Raises:
+            ValueError: There must be at least one shard
+            ValueError: The value must be the index of a shard or None
+        """
+
+        if (len(shards) == 0):
+            raise ValueError('shards', shards, 'There must be at least one shard')
+        if (local_shard is None):
+            return
+        if (not isinstance(local_shard, int) or isinstance(local_shard, bool) or not 0 <= local_shard < len(shards)):
+            raise ValueError('local_shard', local_shard, 'The value must be the index of a shard or None')
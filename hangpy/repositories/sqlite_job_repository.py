@@ -0,0 +1,671 @@
+import contextlib
+import copy
+import datetime
+import sqlite3
+import threading
+import time
+from hangpy.entities import Job
+from hangpy.entities.job import CANCELLED_JOB_ERROR, DEFAULT_QUEUE
+from hangpy.enums import JobStatus
+from hangpy.repositories import CompactEntryCodec, EntryCodec, JobRepository
+
+STRICT_PRIORITY_SECONDS = 10 ** 8
+
+ENQUEUED_JOBS_POLL_SECONDS = 0.02
+
+JOB_COLUMNS = 'id, status, queue, priority, start_datetime, end_datetime, error, data'
+
+SCHEMA_SCRIPT = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    queue TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    score REAL NOT NULL,
+    start_datetime TEXT,
+    end_datetime TEXT,
+    error TEXT,
+    lease_timestamp REAL,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_queue_index ON jobs (status, queue, score);
+CREATE INDEX IF NOT EXISTS jobs_status_index ON jobs (status, score);
+
+CREATE TABLE IF NOT EXISTS job_counts (
+    status TEXT NOT NULL,
+    queue TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (status, queue)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS job_notifications (
+    queue TEXT PRIMARY KEY,
+    sequence INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS job_purges (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    queue TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    start_datetime TEXT,
+    end_datetime TEXT,
+    error TEXT,
+    lease_timestamp REAL NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS job_purges_lease_index ON job_purges (lease_timestamp);
+
+CREATE TABLE IF NOT EXISTS dead_letter_jobs (
+    id TEXT PRIMARY KEY,
+    dead_letter_timestamp REAL NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS dead_letter_jobs_index ON dead_letter_jobs (dead_letter_timestamp);
+
+CREATE TRIGGER IF NOT EXISTS jobs_insert_trigger AFTER INSERT ON jobs
+BEGIN
+    INSERT INTO job_counts (status, queue, count) VALUES (NEW.status, NEW.queue, 1)
+    ON CONFLICT (status, queue) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS jobs_update_trigger AFTER UPDATE OF status, queue ON jobs
+WHEN OLD.status != NEW.status OR OLD.queue != NEW.queue
+BEGIN
+    UPDATE job_counts SET count = count - 1 WHERE status = OLD.status AND queue = OLD.queue;
+    INSERT INTO job_counts (status, queue, count) VALUES (NEW.status, NEW.queue, 1)
+    ON CONFLICT (status, queue) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS jobs_delete_trigger AFTER DELETE ON jobs
+BEGIN
+    UPDATE job_counts SET count = count - 1 WHERE status = OLD.status AND queue = OLD.queue;
+END;
+
+CREATE TRIGGER IF NOT EXISTS jobs_insert_enqueued_trigger AFTER INSERT ON jobs
+WHEN NEW.status = 'ENQUEUED'
+BEGIN
+    INSERT INTO job_notifications (queue, sequence) VALUES (NEW.queue, 1)
+    ON CONFLICT (queue) DO UPDATE SET sequence = sequence + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS jobs_update_enqueued_trigger AFTER UPDATE OF status, queue ON jobs
+WHEN NEW.status = 'ENQUEUED' AND (OLD.status != NEW.status OR OLD.queue != NEW.queue)
+BEGIN
+    INSERT INTO job_notifications (queue, sequence) VALUES (NEW.queue, 1)
+    ON CONFLICT (queue) DO UPDATE SET sequence = sequence + 1;
+END;
+"""
+
+SET_JOB_STATEMENT = """
+INSERT INTO jobs (id, status, queue, priority, score, start_datetime, end_datetime, error, data)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    status = excluded.status,
+    queue = excluded.queue,
+    priority = excluded.priority,
+    score = excluded.score,
+    start_datetime = excluded.start_datetime,
+    end_datetime = excluded.end_datetime,
+    error = excluded.error,
+    data = excluded.data,
+    lease_timestamp = CASE WHEN excluded.status = 'PROCESSING' THEN jobs.lease_timestamp END,
+    cancel_requested = CASE WHEN excluded.status = 'PROCESSING' THEN jobs.cancel_requested ELSE 0 END
+"""
+
+CLAIM_JOBS_STATEMENT = f"""
+UPDATE jobs SET status = 'PROCESSING', start_datetime = ?, score = ?, lease_timestamp = ?
+WHERE id IN (SELECT id FROM jobs WHERE status = 'ENQUEUED' AND queue = ? ORDER BY score LIMIT ?)
+RETURNING {JOB_COLUMNS}
+"""
+
+
+class SqliteJobRepository(JobRepository):
+    """Implementation of the JobRepository using an SQLite database file,
+    for nodes where running Redis isn't an option. The servers of many
+    processes of the same host can share the database.
+
+    The jobs are stored on the table 'jobs', one row for each job. The
+    attributes that change while the job runs are kept on their own columns,
+    and the remaining ones are serialized on the column 'data'. The column
+    'score' works like the score of the indexes of the Redis repository: the
+    datetime of the last transition of the job, or the datetime a scheduled
+    job is due, moved back by the priority of the enqueued jobs. The table
+    is indexed by status, queue and score, so claiming the next job of a
+    queue, promoting the due scheduled jobs and finding the expired finished
+    jobs read only the rows they return.
+
+    Claiming jobs is a single 'UPDATE ... RETURNING' statement, so the jobs
+    are selected, locked and set with their start state atomically. The
+    lease of a claimed job is kept on the column 'lease_timestamp', which
+    also works as its lock. The number of jobs of each status and queue is
+    kept on the table 'job_counts' by triggers, so counting the jobs doesn't
+    depend on the number of jobs stored, and every time jobs are enqueued on
+    a queue, its sequence on the table 'job_notifications' is incremented,
+    which is polled by the servers waiting for jobs.
+
+    The finished jobs claimed to be removed by their retention are moved to
+    the table 'job_purges' until they are deleted, and the jobs on the
+    dead-letter queue are serialized whole on the table 'dead_letter_jobs'.
+
+    The database uses the WAL journal mode, so readers don't block the
+    writer, and each thread uses its own connection. The transactions that
+    read before writing take the write lock at their beginning ('BEGIN
+    IMMEDIATE'), and a connection waits for the lock held by other processes
+    up to the timeout. The statement 'RETURNING' requires SQLite 3.35 or
+    later.
+    """
+
+    def __init__(self,
+                 database_path: str,
+                 entry_codec: EntryCodec = None,
+                 priority_weight_seconds: int = None,
+                 timeout_seconds: float = 5):
+        """
+        Args:
+            database_path (str): Path of the database file, created if it
+            doesn't exist.
+            entry_codec (EntryCodec, optional): Codec used to serialize the
+            entries. Defaults to CompactEntryCodec.
+            priority_weight_seconds (int, optional): Seconds of waiting on the
+            queue that each level of priority is worth, making the dequeue
+            weighted. When None, jobs with a higher priority are always
+            dequeued first. All the repositories sharing a database must use
+            the same value. Defaults to None.
+            timeout_seconds (float, optional): Seconds a connection waits for
+            the database locked by another connection. Defaults to 5.
+        """
+
+        self.__validate_priority_weight_seconds(priority_weight_seconds)
+        self.database_path = database_path
+        self.entry_codec = CompactEntryCodec() if entry_codec is None else entry_codec
+        self.priority_weight_seconds = priority_weight_seconds
+        self.timeout_seconds = timeout_seconds
+        self.__local = threading.local()
+        self.__connections = []
+        self.__connections_lock = threading.Lock()
+        connection = self.__get_connection()
+        connection.execute('PRAGMA journal_mode = WAL')
+        connection.executescript(SCHEMA_SCRIPT)
+
+    def get_jobs(self) -> list[Job]:
+        return self.__get_jobs(f'SELECT {JOB_COLUMNS} FROM jobs ORDER BY status, queue, score')
+
+    def get_job_by_status(self, status: JobStatus) -> Job:
+        """The enqueued job returned is the next one of all the queues."""
+
+        jobs = self.__get_jobs(f'SELECT {JOB_COLUMNS} FROM jobs WHERE status = ? ORDER BY score LIMIT 1', (status.name,))
+        if (len(jobs) == 0):
+            return None
+        return jobs[0]
+
+    def get_jobs_by_status(self, status: JobStatus) -> list[Job]:
+        return self.__get_jobs(f'SELECT {JOB_COLUMNS} FROM jobs WHERE status = ? ORDER BY queue, score', (status.name,))
+
+    def exists_jobs_with_status(self, status: JobStatus) -> bool:
+        return self.count_jobs_by_status(status) > 0
+
+    def count_jobs_by_status(self, status: JobStatus) -> int:
+        row = self.__get_connection().execute('SELECT SUM(count) FROM job_counts WHERE status = ?', (status.name,)).fetchone()
+        return row[0] or 0
+
+    def count_enqueued_jobs(self, queues: list[str]) -> int:
+        if (len(queues) == 0):
+            return 0
+        statement = f'SELECT SUM(count) FROM job_counts WHERE status = ? AND queue IN ({self.__get_placeholders(queues)})'
+        row = self.__get_connection().execute(statement, (JobStatus.ENQUEUED.name, *queues)).fetchone()
+        return row[0] or 0
+
+    def get_status_counts(self) -> dict[JobStatus, int]:
+        status_counts = dict.fromkeys(JobStatus, 0)
+        for status, count in self.__get_connection().execute('SELECT status, SUM(count) FROM job_counts GROUP BY status'):
+            status_counts[JobStatus[status]] = count
+        return status_counts
+
+    def add_job(self, job: Job):
+        self.__set_jobs([job])
+
+    def add_jobs(self, jobs: list[Job]):
+        self.__set_jobs(jobs)
+
+    def update_job(self, job: Job):
+        self.__set_jobs([job])
+
+    def update_jobs(self, jobs: list[Job]):
+        self.__set_jobs(jobs)
+
+    def try_set_lock_on_job(self, job: Job, lease_milliseconds: int = 60000) -> bool:
+        """The lock is the lease of the job, so only stored jobs can be
+        locked.
+        """
+
+        statement = 'UPDATE jobs SET lease_timestamp = ? WHERE id = ? AND (lease_timestamp IS NULL OR lease_timestamp <= ?)'
+        cursor = self.__get_connection().execute(statement, (self.__get_lease_timestamp(lease_milliseconds), job.id,
+                                                             datetime.datetime.now().timestamp()))
+        return cursor.rowcount == 1
+
+    def claim_job(self, lease_milliseconds: int = 60000, queues: list[str] = None) -> Job:
+        jobs = self.claim_jobs(1, lease_milliseconds, queues)
+        if (len(jobs) == 0):
+            return None
+        return jobs[0]
+
+    def claim_jobs(self, quantity: int, lease_milliseconds: int = 60000, queues: list[str] = None) -> list[Job]:
+        """Each queue is claimed by a single 'UPDATE ... RETURNING'
+        statement, so the jobs can't be claimed by other servers in between.
+        """
+
+        jobs = []
+        start_datetime = datetime.datetime.now()
+        lease_timestamp = self.__get_lease_timestamp(lease_milliseconds)
+        connection = self.__get_connection()
+        for queue in queues or [DEFAULT_QUEUE]:
+            if (len(jobs) >= quantity):
+                break
+            parameters = (start_datetime.isoformat(), start_datetime.timestamp(), lease_timestamp, queue, quantity - len(jobs))
+            jobs.extend(self.__get_job_from_row(row) for row in connection.execute(CLAIM_JOBS_STATEMENT, parameters).fetchall())
+        return jobs
+
+    def renew_job_leases(self, jobs: list[Job], lease_milliseconds: int = 60000) -> list[Job]:
+        if (len(jobs) == 0):
+            return []
+        lease_timestamp = self.__get_lease_timestamp(lease_milliseconds)
+        renewed_job_ids = set()
+        with self.__transaction() as connection:
+            for jobs_chunk in self.__get_chunks(jobs):
+                statement = (f'UPDATE jobs SET lease_timestamp = ? WHERE id IN ({self.__get_placeholders(jobs_chunk)}) '
+                             'AND status = ? AND lease_timestamp IS NOT NULL RETURNING id')
+                parameters = (lease_timestamp, *[job.id for job in jobs_chunk], JobStatus.PROCESSING.name)
+                renewed_job_ids.update(row[0] for row in connection.execute(statement, parameters).fetchall())
+        return [job for job in jobs if job.id not in renewed_job_ids]
+
+    def reclaim_expired_jobs(self) -> list[str]:
+        """The jobs are put back on the queue on a single transaction, so a
+        job is never reclaimed while its server is renewing the lease or
+        updating its status. The jobs flagged to be cancelled are cancelled
+        instead.
+        """
+
+        now = datetime.datetime.now()
+        with self.__transaction() as connection:
+            connection.execute('UPDATE jobs SET status = ?, end_datetime = ?, error = ?, score = ?, lease_timestamp = NULL, '
+                               'cancel_requested = 0 WHERE status = ? AND lease_timestamp <= ? AND cancel_requested = 1',
+                               (JobStatus.CANCELLED.name, now.isoformat(), CANCELLED_JOB_ERROR, now.timestamp(),
+                                JobStatus.PROCESSING.name, now.timestamp()))
+            rows = connection.execute('UPDATE jobs SET status = ?, start_datetime = NULL, lease_timestamp = NULL, '
+                                      'score = ? - priority * ? WHERE status = ? AND lease_timestamp <= ? RETURNING id',
+                                      (JobStatus.ENQUEUED.name, now.timestamp(), self.__get_priority_seconds(),
+                                       JobStatus.PROCESSING.name, now.timestamp())).fetchall()
+        return [row[0] for row in rows]
+
+    def promote_scheduled_jobs(self, limit: int = 1000) -> list[str]:
+        """The due jobs are enqueued by a single statement, reading only the
+        beginning of the index of the scheduled jobs. They are enqueued
+        scored by the datetime they were scheduled to.
+        """
+
+        statement = ('UPDATE jobs SET status = ?, score = score - priority * ? WHERE id IN '
+                     '(SELECT id FROM jobs WHERE status = ? AND score <= ? ORDER BY score LIMIT ?) RETURNING id')
+        parameters = (JobStatus.ENQUEUED.name, self.__get_priority_seconds(), JobStatus.SCHEDULED.name,
+                      datetime.datetime.now().timestamp(), limit)
+        return [row[0] for row in self.__get_connection().execute(statement, parameters).fetchall()]
+
+    def cancel_job(self, job_id: str) -> bool:
+        now = datetime.datetime.now()
+        with self.__transaction() as connection:
+            cursor = connection.execute('UPDATE jobs SET status = ?, end_datetime = ?, error = ?, score = ? '
+                                        'WHERE id = ? AND status IN (?, ?)',
+                                        (JobStatus.CANCELLED.name, now.isoformat(), CANCELLED_JOB_ERROR, now.timestamp(), job_id,
+                                         JobStatus.ENQUEUED.name, JobStatus.SCHEDULED.name))
+            if (cursor.rowcount == 1):
+                return True
+            cursor = connection.execute('UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?',
+                                        (job_id, JobStatus.PROCESSING.name))
+            return cursor.rowcount == 1
+
+    def get_cancelled_job_ids(self, job_ids: list[str]) -> list[str]:
+        if (len(job_ids) == 0):
+            return []
+        connection = self.__get_connection()
+        cancelled_job_ids = set()
+        for job_ids_chunk in self.__get_chunks(job_ids):
+            statement = f'SELECT id FROM jobs WHERE id IN ({self.__get_placeholders(job_ids_chunk)}) AND cancel_requested = 1'
+            cancelled_job_ids.update(row[0] for row in connection.execute(statement, job_ids_chunk))
+        return [job_id for job_id in job_ids if job_id in cancelled_job_ids]
+
+    def move_jobs_to_dead_letter(self, jobs: list[Job]):
+        if (len(jobs) == 0):
+            return
+        dead_letter_timestamp = datetime.datetime.now().timestamp()
+        with self.__transaction() as connection:
+            connection.executemany('INSERT OR REPLACE INTO dead_letter_jobs (id, dead_letter_timestamp, data) VALUES (?, ?, ?)',
+                                   [(job.id, dead_letter_timestamp, self.entry_codec.encode(job)) for job in jobs])
+            connection.executemany('DELETE FROM jobs WHERE id = ?', [(job.id,) for job in jobs])
+
+    def get_dead_letter_jobs(self, limit: int = 100) -> list[Job]:
+        if (limit <= 0):
+            return []
+        rows = self.__get_connection().execute('SELECT data FROM dead_letter_jobs ORDER BY dead_letter_timestamp LIMIT ?', (limit,))
+        return [self.__deserialize_job(row[0]) for row in rows.fetchall()]
+
+    def count_dead_letter_jobs(self) -> int:
+        return self.__get_connection().execute('SELECT COUNT(*) FROM dead_letter_jobs').fetchone()[0]
+
+    def requeue_dead_letter_job(self, job_id: str) -> Job:
+        with self.__transaction() as connection:
+            row = connection.execute('DELETE FROM dead_letter_jobs WHERE id = ? RETURNING data', (job_id,)).fetchone()
+            if (row is None):
+                return None
+            job = self.__deserialize_job(row[0])
+            job.status = JobStatus.ENQUEUED
+            job.error = None
+            job.enqueued_datetime = datetime.datetime.now().isoformat()
+            job.start_datetime = None
+            job.end_datetime = None
+            connection.execute(SET_JOB_STATEMENT, self.__get_row_from_job(job))
+        return job
+
+    def claim_expired_jobs(self,
+                           status: JobStatus,
+                           max_age_seconds: float = None,
+                           max_count: int = None,
+                           limit: int = 1000,
+                           lease_milliseconds: int = 60000) -> list[Job]:
+        """The jobs are read from the beginning of the index of the status,
+        and moved to the table 'job_purges' on a single transaction. The jobs
+        whose claim expired are claimed first, whatever their status.
+        """
+
+        if (limit <= 0):
+            return []
+        now = datetime.datetime.now()
+        lease_timestamp = self.__get_lease_timestamp(lease_milliseconds)
+        with self.__transaction() as connection:
+            rows = connection.execute(f'UPDATE job_purges SET lease_timestamp = ? WHERE id IN (SELECT id FROM job_purges '
+                                      f'WHERE lease_timestamp <= ? ORDER BY lease_timestamp LIMIT ?) RETURNING {JOB_COLUMNS}',
+                                      (lease_timestamp, now.timestamp(), limit)).fetchall()
+            job_ids = []
+            if (max_count is not None):
+                excess = min(self.count_jobs_by_status(status) - max_count, limit - len(rows))
+                if (excess > 0):
+                    job_ids.extend(row[0] for row in connection.execute(
+                        'SELECT id FROM jobs WHERE status = ? ORDER BY score LIMIT ?', (status.name, excess)))
+            if (max_age_seconds is not None and len(rows) + len(job_ids) < limit):
+                max_timestamp = (now - datetime.timedelta(seconds=max_age_seconds)).timestamp()
+                expired_rows = connection.execute('SELECT id FROM jobs WHERE status = ? AND score <= ? ORDER BY score LIMIT ?',
+                                                  (status.name, max_timestamp, limit - len(rows)))
+                job_ids.extend(row[0] for row in expired_rows if row[0] not in job_ids)
+                job_ids = job_ids[:limit - len(rows)]
+            for job_ids_chunk in self.__get_chunks(job_ids):
+                placeholders = self.__get_placeholders(job_ids_chunk)
+                connection.execute(f'INSERT INTO job_purges ({JOB_COLUMNS}, lease_timestamp) SELECT {JOB_COLUMNS}, ? FROM jobs '
+                                   f'WHERE id IN ({placeholders})', (lease_timestamp, *job_ids_chunk))
+                rows.extend(connection.execute(f'DELETE FROM jobs WHERE id IN ({placeholders}) RETURNING {JOB_COLUMNS}',
+                                               job_ids_chunk).fetchall())
+        return [self.__get_job_from_row(row) for row in rows]
+
+    def delete_jobs(self, jobs: list[Job]):
+        with self.__transaction() as connection:
+            connection.executemany('DELETE FROM job_purges WHERE id = ?', [(job.id,) for job in jobs])
+
+    def wait_for_enqueued_jobs(self, timeout_seconds: float, queues: list[str] = None) -> bool:
+        """The sequences of the queues are polled, so the servers of other
+        processes are notified too. Only the jobs enqueued while waiting are
+        notified.
+        """
+
+        queues = queues or [DEFAULT_QUEUE]
+        notifications = self.__get_queue_notifications(queues)
+        deadline = time.monotonic() + timeout_seconds
+        while (time.monotonic() < deadline):
+            time.sleep(min(ENQUEUED_JOBS_POLL_SECONDS, max(deadline - time.monotonic(), 0)))
+            if (self.__get_queue_notifications(queues) != notifications):
+                return True
+        return False
+
+    def close(self):
+        """Closes the connections opened by all the threads."""
+
+        with self.__connections_lock:
+            for connection in self.__connections:
+                connection.close()
+            self.__connections = []
+        self.__local = threading.local()
+
+    def __get_connection(self) -> sqlite3.Connection:
+        """Internal function that returns the connection of the current
+        thread, opening it on the first call. The connections don't open
+        transactions implicitly.
+
+        Returns:
+            Connection
+        """
+
+        connection = getattr(self.__local, 'connection', None)
+        if (connection is None):
+            connection = sqlite3.connect(self.database_path, timeout=self.timeout_seconds, isolation_level=None,
+                                         check_same_thread=False)
+            connection.execute('PRAGMA synchronous = NORMAL')
+            self.__local.connection = connection
+            with self.__connections_lock:
+                self.__connections.append(connection)
+        return connection
+
+    @contextlib.contextmanager
+    def __transaction(self):
+        """Internal function that runs the statements of the block on a
+        transaction holding the write lock since its beginning, committed at
+        the end of the block, or rolled back if it raises an exception.
+
+        Yields:
+            Connection
+        """
+
+        connection = self.__get_connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    def __set_jobs(self, jobs: list[Job]):
+        """Internal function to unify the add and update instructions,
+        applied as a single transaction. The lease and the flag of the
+        cancellation of jobs that are no longer being processed are released.
+
+        Args:
+            jobs (list[Job])
+        """
+
+        if (len(jobs) == 0):
+            return
+        rows = [self.__get_row_from_job(job) for job in jobs]
+        with self.__transaction() as connection:
+            connection.executemany(SET_JOB_STATEMENT, rows)
+
+    def __get_jobs(self, statement: str, parameters: tuple = ()) -> list[Job]:
+        """Internal function that returns the jobs of the rows selected by the
+        statement passed by parameter.
+
+        Args:
+            statement (str)
+            parameters (tuple, optional): Defaults to ().
+
+        Returns:
+            list[Job]
+        """
+
+        return [self.__get_job_from_row(row) for row in self.__get_connection().execute(statement, parameters).fetchall()]
+
+    def __get_row_from_job(self, job: Job) -> tuple:
+        """Internal function that returns the values of the columns of the
+        table 'jobs' of the job passed by parameter, in the order of the
+        statement that stores the jobs.
+
+        Args:
+            job (Job)
+
+        Returns:
+            tuple
+        """
+
+        return (job.id, job.status.name, job.queue, job.priority, self.__get_index_score(job), job.start_datetime,
+                job.end_datetime, job.error, self.__serialize_job_attributes(job))
+
+    def __get_job_from_row(self, row: tuple) -> Job:
+        """Internal function that returns the job of a row with the columns
+        of 'JOB_COLUMNS'.
+
+        Args:
+            row (tuple)
+
+        Returns:
+            Job
+        """
+
+        _, status, queue, priority, start_datetime, end_datetime, error, data = row
+        job = self.__deserialize_job(data)
+        job.status = JobStatus[status]
+        job.queue = queue
+        job.priority = priority
+        job.start_datetime = start_datetime
+        job.end_datetime = end_datetime
+        job.error = error
+        return job
+
+    def __serialize_job_attributes(self, job: Job) -> bytes:
+        """Internal function that serializes the job stored on the column
+        'data', without the values kept on the other columns.
+
+        Args:
+            job (Job)
+
+        Returns:
+            bytes
+        """
+
+        job_attributes = copy.copy(job)
+        job_attributes.status = JobStatus.ENQUEUED
+        job_attributes.error = None
+        job_attributes.start_datetime = None
+        job_attributes.end_datetime = None
+        return self.entry_codec.encode(job_attributes)
+
+    def __deserialize_job(self, data: bytes) -> Job:
+        """Internal function that deserializes a job, setting the default
+        values of the attributes missing on the jobs serialized by previous
+        versions.
+
+        Args:
+            data (bytes)
+
+        Returns:
+            Job
+        """
+
+        job = self.entry_codec.decode(data)
+        job.priority = getattr(job, 'priority', 0)
+        job.queue = getattr(job, 'queue', DEFAULT_QUEUE)
+        job.attempts = getattr(job, 'attempts', [])
+        job.timeout_seconds = getattr(job, 'timeout_seconds', None)
+        return job
+
+    def __get_queue_notifications(self, queues: list[str]) -> dict[str, int]:
+        """Internal function that returns the sequence of the notifications
+        of each queue passed by parameter.
+
+        Args:
+            queues (list[str])
+
+        Returns:
+            dict[str, int]
+        """
+
+        statement = f'SELECT queue, sequence FROM job_notifications WHERE queue IN ({self.__get_placeholders(queues)})'
+        return dict(self.__get_connection().execute(statement, queues).fetchall())
+
+    def __get_index_score(self, job: Job) -> float:
+        """Internal function that returns the score of the job: the timestamp
+        of the datetime in which the job reached its status (or is due, for
+        the scheduled jobs). For the enqueued jobs, the timestamp is moved
+        back according to the priority of the job.
+
+        Args:
+            job (Job)
+
+        Returns:
+            float
+        """
+
+        status_datetimes = {JobStatus.ENQUEUED: job.enqueued_datetime,
+                            JobStatus.SCHEDULED: job.enqueued_datetime,
+                            JobStatus.PROCESSING: job.start_datetime}
+        status_datetime = status_datetimes.get(job.status, job.end_datetime)
+        if (status_datetime is None):
+            timestamp = datetime.datetime.now().timestamp()
+        else:
+            timestamp = datetime.datetime.fromisoformat(status_datetime).timestamp()
+        if (job.status == JobStatus.ENQUEUED):
+            return timestamp - job.priority * self.__get_priority_seconds()
+        return timestamp
+
+    def __get_priority_seconds(self) -> int:
+        """Internal function that returns the seconds of waiting each level of
+        priority is worth on the queue.
+
+        Returns:
+            int
+        """
+
+        if (self.priority_weight_seconds is None):
+            return STRICT_PRIORITY_SECONDS
+        return self.priority_weight_seconds
+
+    def __validate_priority_weight_seconds(self, priority_weight_seconds: int):
+        """
+        Internal function used to validate the 'priority_weight_seconds' value.
+
+        Raises:
+            ValueError: The value must be an integer or None
+            ValueError: The value must be greater than zero
+        """
+
+        if (priority_weight_seconds is None):
+            return
+        if (not isinstance(priority_weight_seconds, int)):
+            raise ValueError('priority_weight_seconds', priority_weight_seconds, 'The value must be an integer or None')
+        if (priority_weight_seconds <= 0):
+            raise ValueError('priority_weight_seconds', priority_weight_seconds, 'The value must be greater than zero')
+
+    def __get_lease_timestamp(self, lease_milliseconds: int) -> float:
+        """Internal function that returns the timestamp in which a lease
+        renewed now expires.
+
+        Args:
+            lease_milliseconds (int)
+
+        Returns:
+            float
+        """
+
+        return (datetime.datetime.now() + datetime.timedelta(milliseconds=lease_milliseconds)).timestamp()
+
+    def __get_placeholders(self, values: list) -> str:
+        return ', '.join('?' * len(values))
+
+    def __get_chunks(self, values: list, chunk_size: int = 500) -> list[list]:
+        """Internal function that splits the values passed by parameter in
+        chunks, so the statements don't exceed the limit of parameters.
+
+        Args:
+            values (list)
+            chunk_size (int, optional): Defaults to 500.
+
+        Returns:
+            list[list]
+        """
+
+        return [values[index:index + chunk_size] for index in range(0, len(values), chunk_size)]
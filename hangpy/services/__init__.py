@@ -1,4 +1,9 @@
+from hangpy.services.cancellation_token import CancellationToken # noqa F401
 from hangpy.services.job_activity_base import JobActivityBase # noqa F401
+from hangpy.services.job_executor import JobExecutor # noqa F401
+from hangpy.services.thread_pool_job_executor import ThreadPoolJobExecutor # noqa F401
+from hangpy.services.process_pool_job_executor import ProcessPoolJobExecutor # noqa F401
+from hangpy.services.asyncio_job_executor import AsyncioJobExecutor # noqa F401
 from hangpy.services.job_service import JobService # noqa F401
 from hangpy.services.log_service import LogService # noqa F401
 from hangpy.services.print_log_service import PrintLogService # noqa F401
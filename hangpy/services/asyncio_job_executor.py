@@ -0,0 +1,131 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from hangpy.services.job_activity_base import JobActivityBase
+from hangpy.services.job_executor import JobExecutor
+from hangpy.services.thread_pool_job_executor import CANCELLATION_GRACE_SECONDS, DaemonThreadPoolExecutor
+
+
+class AsyncioJobExecutor(JobExecutor):
+    """
+    Executor that runs the activities on an event loop running on its own
+    thread. Coroutine actions ('async def') are awaited on the event loop,
+    while regular actions run on a pool of threads, so they don't block it.
+
+    Cancelled coroutine actions are cancelled on their next 'await'. Regular
+    actions are given a grace period to stop by themselves, after which the
+    activity is finished and its thread left behind, like on the
+    ThreadPoolJobExecutor, without keeping the interpreter from exiting.
+    """
+
+    def __init__(self, cancellation_grace_seconds: float = CANCELLATION_GRACE_SECONDS):
+        """
+        Args:
+            cancellation_grace_seconds (float, optional): Seconds a cancelled
+            regular activity has to stop by itself. Defaults to 5.
+        """
+
+        self.cancellation_grace_seconds = cancellation_grace_seconds
+        self.workers = 0
+        self.event_loop = None
+        self.event_loop_thread = None
+        self.thread_pool = None
+        self.futures = {}
+
+    def start(self, workers: int):
+        self.workers = workers
+        self.event_loop = asyncio.new_event_loop()
+        self.thread_pool = self.create_thread_pool()
+        self.event_loop_thread = threading.Thread(target=self.event_loop.run_forever, name='hangpy-event-loop', daemon=True)
+        self.event_loop_thread.start()
+
+    def create_thread_pool(self) -> DaemonThreadPoolExecutor:
+        return DaemonThreadPoolExecutor(self.workers)
+
+    def submit(self, job_activity: JobActivityBase):
+        future = asyncio.run_coroutine_threadsafe(self.run_job_activity(job_activity), self.event_loop)
+        self.futures[job_activity] = future
+        future.add_done_callback(lambda future: self.finish_job_activity(job_activity, future))
+
+    async def run_job_activity(self, job_activity: JobActivityBase):
+        """
+        Runs the activity on the event loop.
+
+        Args:
+            job_activity (JobActivityBase)
+        """
+
+        if (job_activity.is_coroutine_action()):
+            await job_activity.run_async()
+        else:
+            await self.event_loop.run_in_executor(self.thread_pool, job_activity.run)
+
+    def finish_job_activity(self, job_activity: JobActivityBase, future: Future):
+        """
+        Stops tracking the future of the activity, finishing the activity
+        as cancelled if the future was cancelled.
+
+        Args:
+            job_activity (JobActivityBase)
+            future (Future)
+        """
+
+        self.futures.pop(job_activity, None)
+        if (future.cancelled() and not job_activity.is_finished()):
+            job_activity.finish_cancelled()
+
+    def cancel(self, job_activity: JobActivityBase):
+        if (job_activity.is_coroutine_action()):
+            future = self.futures.get(job_activity)
+            if (future is not None):
+                future.cancel()
+            return
+        timer = threading.Timer(self.cancellation_grace_seconds, self.abandon_job_activity, [job_activity])
+        timer.daemon = True
+        timer.start()
+
+    def abandon_job_activity(self, job_activity: JobActivityBase):
+        """
+        Finishes the cancelled regular activity that didn't stop within the
+        grace period, no longer awaiting it, and replaces the pool of threads
+        of the event loop, as one of its threads is still running the action.
+        The activity is abandoned, so the action can't change its job when it
+        returns.
+
+        Args:
+            job_activity (JobActivityBase)
+        """
+
+        if (job_activity.is_finished()):
+            return
+        self.event_loop.call_soon_threadsafe(self.replace_thread_pool)
+        job_activity.abandon()
+        future = self.futures.get(job_activity)
+        if (future is not None):
+            future.cancel()
+
+    def replace_thread_pool(self):
+        """
+        Replaces the pool of threads of the event loop, letting the threads of
+        the previous one end when their actions return.
+        """
+
+        thread_pool = self.thread_pool
+        self.thread_pool = self.create_thread_pool()
+        thread_pool.shutdown(wait=False)
+
+    async def shutdown_thread_pool(self):
+        """
+        Waits on the event loop for the regular actions running on the pool of
+        threads to return, without blocking the event loop.
+        """
+
+        await self.event_loop.run_in_executor(None, self.thread_pool.shutdown)
+
+    def shutdown(self):
+        if (self.event_loop is None):
+            return
+        asyncio.run_coroutine_threadsafe(self.shutdown_thread_pool(), self.event_loop).result()
+        self.event_loop.call_soon_threadsafe(self.event_loop.stop)
+        self.event_loop_thread.join()
+        self.event_loop.close()
@@ -0,0 +1,64 @@
+import threading
+
+
+class CancellationToken():
+    """
+    Tells the action of a job activity that it must stop, as the job was
+    cancelled or timed out. Threads can't be stopped from outside, so the
+    actions that run on threads must check the token (or wait on it instead
+    of sleeping) and return when it is cancelled.
+
+    The token can be sent to other processes, where it keeps the state it had
+    when it was sent.
+    """
+
+    def __init__(self):
+        self.reason = None
+        self.__event = threading.Event()
+
+    def cancel(self, reason: str = None):
+        """
+        Flags the token as cancelled, waking up the actions waiting on it.
+
+        Args:
+            reason (str, optional): Description of why the job must stop.
+            Defaults to None.
+        """
+
+        self.reason = reason
+        self.__event.set()
+
+    def is_cancelled(self) -> bool:
+        """
+        Returns 'True' if the token was cancelled.
+
+        Returns:
+            bool
+        """
+
+        return self.__event.is_set()
+
+    def wait(self, timeout_seconds: float = None) -> bool:
+        """
+        Blocks until the token is cancelled, or until the timeout expires.
+        Returns 'True' if the token was cancelled and 'False' if the timeout
+        expired.
+
+        Args:
+            timeout_seconds (float, optional): When None, waits until the
+            token is cancelled. Defaults to None.
+
+        Returns:
+            bool
+        """
+
+        return self.__event.wait(timeout_seconds)
+
+    def __getstate__(self) -> dict:
+        return {'reason': self.reason, 'cancelled': self.is_cancelled()}
+
+    def __setstate__(self, state: dict):
+        self.reason = state['reason']
+        self.__event = threading.Event()
+        if (state['cancelled']):
+            self.__event.set()
@@ -1,30 +1,168 @@
+import asyncio
+import copy
 import datetime
-import threading
+import inspect
+import time
 from abc import ABC, abstractmethod
-from hangpy.entities import Job
+from hangpy.entities import Job, RetryPolicy
+from hangpy.entities.job import DEFAULT_QUEUE
 from hangpy.enums import JobStatus
+from hangpy.services.cancellation_token import CancellationToken
 
 
-class JobActivityBase(ABC, threading.Thread):
+class JobActivityBase(ABC):
     """
     Base class for any job activities intended to be processed using
-    HangPy.
+    HangPy. The activity doesn't depend on how it is executed, so the same
+    activity can run on any of the job executors.
+
+    The jobs of an activity that fail are retried according to the retry
+    policy set on the class attribute 'retry_policy'. By default there is
+    none, and the jobs that fail are kept with the status ERROR.
+
+    The jobs of an activity are stopped after running for the seconds set on
+    the class attribute 'timeout_seconds' (unless the job has its own
+    timeout), and can be cancelled. When that happens, the cancellation token
+    of the activity is cancelled: the actions running on threads must check
+    it, as only the executors running the activities on other processes can
+    stop them right away.
     """
 
+    retry_policy: RetryPolicy = None
+
+    timeout_seconds: float = None
+
     def __init__(self):
         self._started_to_run = False
+        self._start_time = None
+        self._finished = False
         self._can_be_untracked = False
+        self._cancellation_token = CancellationToken()
+        self._cancellation_status = None
+        self._abandoned_job = None
         ABC.__init__(self)
-        threading.Thread.__init__(self)
 
     @abstractmethod
     def action(self):
         """
         Override this with a function containing the actions to be processed
-        on the background job.
+        on the background job. It can also be defined as a coroutine
+        function ('async def').
         """
         pass
 
+    def get_retry_policy(self) -> RetryPolicy:
+        """
+        Returns the retry policy of the activity, or 'None' if its jobs are
+        not retried.
+
+        Returns:
+            RetryPolicy
+        """
+        return self.retry_policy
+
+    def get_timeout_seconds(self) -> float:
+        """
+        Returns the seconds the job can run before it is stopped: the timeout
+        of the job, or the one of the activity if the job has none. When
+        there is no timeout, returns 'None'.
+
+        Returns:
+            float
+        """
+        job_timeout_seconds = getattr(self._job, 'timeout_seconds', None)
+        return job_timeout_seconds if job_timeout_seconds is not None else self.timeout_seconds
+
+    def get_running_seconds(self) -> float:
+        """
+        Returns the seconds since the activity started to run, or zero if it
+        didn't start yet.
+
+        Returns:
+            float
+        """
+        if (self._start_time is None):
+            return 0
+        return time.monotonic() - self._start_time
+
+    def get_cancellation_token(self) -> CancellationToken:
+        """
+        Returns the token that tells the action it must stop.
+
+        Returns:
+            CancellationToken
+        """
+        return self._cancellation_token
+
+    def cancel(self, reason: str, status: JobStatus = JobStatus.CANCELLED):
+        """
+        Requests the action to stop, cancelling its token. When the activity
+        finishes, the job is set with the status and the reason (as the
+        error) passed by parameter, even if the action returned normally.
+
+        Args:
+            reason (str)
+            status (JobStatus, optional): Defaults to CANCELLED.
+        """
+        self._cancellation_status = status
+        self._cancellation_token.cancel(reason)
+
+    def is_cancelled(self) -> bool:
+        """
+        Returns 'True' if the activity was requested to stop.
+
+        Returns:
+            bool
+        """
+        return self._cancellation_token.is_cancelled()
+
+    def finish_cancelled(self):
+        """
+        Finishes the activity stopped (or given up on) by the executor after
+        it was cancelled, setting the job with the status and the reason of
+        the cancellation.
+        """
+        if (not self._started_to_run):
+            self.set_started_to_run()
+        self.set_job_cancellation_state()
+        self.set_job_end_datetime()
+        self.set_finished()
+
+    def abandon(self):
+        """
+        Finishes the cancelled activity given up on by the executor while its
+        action is still running, detaching it from the job. From then on, the
+        job is a copy with the status and the reason of the cancellation, so
+        the action can't change it when it returns.
+        """
+        job = copy.copy(self._job)
+        if (self.is_cancelled()):
+            job.status = self._cancellation_status
+            job.error = self._cancellation_token.reason
+        job.end_datetime = datetime.datetime.now().isoformat()
+        self._abandoned_job = job
+        if (not self._started_to_run):
+            self.set_started_to_run()
+        self.set_finished()
+
+    def set_job_cancellation_state(self):
+        """
+        Sets the status and the reason of the cancellation on the job entity
+        that represents the activity, if the activity was cancelled.
+        """
+        if (self.is_cancelled()):
+            self.set_job_status(self._cancellation_status)
+            self._job.error = self._cancellation_token.reason
+
+    def is_coroutine_action(self) -> bool:
+        """
+        Returns 'True' if the action is defined as a coroutine function.
+
+        Returns:
+            bool
+        """
+        return inspect.iscoroutinefunction(self.action)
+
     def set_job(self, job: Job):
         """
         Sets the property containing the entity that represents the job on the
@@ -38,16 +176,23 @@ class JobActivityBase(ABC, threading.Thread):
     def get_job(self) -> Job:
         """
         Gets the property containing the entity that represents the job on the
-        repository.
+        repository, or its copy if the activity was abandoned.
 
         Returns:
             Job
         """
+        if (self._abandoned_job is not None):
+            return self._abandoned_job
         return self._job
 
     def set_started_to_run(self):
         """Flags that activity started to run."""
         self._started_to_run = True
+        self._start_time = time.monotonic()
+
+    def set_finished(self):
+        """Flags that the activity finished running."""
+        self._finished = True
 
     def is_finished(self) -> bool:
         """
@@ -57,7 +202,7 @@ class JobActivityBase(ABC, threading.Thread):
         Returns:
             bool
         """
-        return self._started_to_run and not self.is_alive()
+        return self._started_to_run and self._finished
 
     def set_can_be_untracked(self):
         """
@@ -103,35 +248,65 @@ class JobActivityBase(ABC, threading.Thread):
 
     def run(self):
         """
-        Function used by the thread to run the action defined by the activity
-        that inherits from this base class. It also provides the flow control
-        of the execution and exception handling.
+        Function used by the job executors to run the action defined by the
+        activity that inherits from this base class. It also provides the
+        flow control of the execution and exception handling. Coroutine
+        actions run on a new event loop.
 
         To define the activity actions, override the 'action' function.
         """
         try:
             self.set_started_to_run()
-            self.action()
+            result = self.action()
+            if (inspect.isawaitable(result)):
+                asyncio.run(result)
+            self.set_job_status(JobStatus.SUCCESS)
+        except Exception as err:
+            self.set_job_status(JobStatus.ERROR)
+            self.set_job_error(err)
+        self.set_job_cancellation_state()
+        self.set_job_end_datetime()
+        self.set_finished()
+
+    async def run_async(self):
+        """
+        Same as 'run', but awaiting coroutine actions on the running event
+        loop.
+        """
+        try:
+            self.set_started_to_run()
+            result = self.action()
+            if (inspect.isawaitable(result)):
+                await result
             self.set_job_status(JobStatus.SUCCESS)
         except Exception as err:
             self.set_job_status(JobStatus.ERROR)
             self.set_job_error(err)
+        self.set_job_cancellation_state()
         self.set_job_end_datetime()
+        self.set_finished()
 
-    def create_job_object(self, parameters: list[str] = None) -> Job:
+    def create_job_object(self,
+                          parameters: list[str] = None,
+                          priority: int = 0,
+                          queue: str = DEFAULT_QUEUE,
+                          timeout_seconds: float = None) -> Job:
         """
         Returns an instance of the entity that represents the job on the
         repository, based on the activity that inherits from this base class.
 
         Args:
             parameters (list[str])
+            priority (int, optional): Defaults to 0.
+            queue (str, optional): Defaults to 'default'.
+            timeout_seconds (float, optional): Defaults to None.
 
         Returns:
             Job
         """
         module_name = self.__module__
         class_name = self.__class__.__name__
-        job = Job(module_name, class_name)
+        job = Job(module_name, class_name, priority=priority, queue=queue, timeout_seconds=timeout_seconds)
 
         if (parameters is not None):
             job.parameters.extend(parameters)
@@ -0,0 +1,57 @@
+from abc import ABC, abstractmethod
+from hangpy.services.job_activity_base import JobActivityBase
+
+
+class JobExecutor(ABC):
+    """
+    Provides an interface to define how the server instance executes the
+    job activities.
+    """
+
+    @abstractmethod
+    def start(self, workers: int):
+        """
+        Prepares the resources necessary to run up to the number of
+        activities passed by parameter concurrently.
+
+        Args:
+            workers (int)
+        """
+
+        pass
+
+    @abstractmethod
+    def submit(self, job_activity: JobActivityBase):
+        """
+        Starts running the activity without blocking the caller. When the
+        activity ends, the job must be set with its final state and the
+        activity flagged as finished.
+
+        Args:
+            job_activity (JobActivityBase)
+        """
+
+        pass
+
+    def cancel(self, job_activity: JobActivityBase):
+        """
+        Stops the activity passed by parameter, already flagged as cancelled
+        through its cancellation token. By default the action is expected to
+        check the token and stop by itself. Executors able to stop (or give
+        up on) the actions that don't stop override this, flagging the
+        activity as finished once it is stopped.
+
+        Args:
+            job_activity (JobActivityBase)
+        """
+
+        pass
+
+    @abstractmethod
+    def shutdown(self):
+        """
+        Releases the resources used by the executor, waiting for the
+        activities that are running.
+        """
+
+        pass
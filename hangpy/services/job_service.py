@@ -1,4 +1,9 @@
-from hangpy.repositories import JobRepository
+import datetime
+from collections.abc import Iterable
+from hangpy.entities import RecurringJob
+from hangpy.entities.job import DEFAULT_QUEUE
+from hangpy.enums import CatchUpPolicy, JobStatus
+from hangpy.repositories import JobRepository, RecurringJobRepository
 from hangpy.services import JobActivityBase
 
 
@@ -8,24 +13,254 @@ class JobService():
     """
 
     def __init__(self,
-                 job_repository: JobRepository):
+                 job_repository: JobRepository,
+                 recurring_job_repository: RecurringJobRepository = None):
         """
         Args:
             job_repository (JobRepository): Implementation of the job
             repository.
+            recurring_job_repository (RecurringJobRepository, optional):
+            Implementation of the recurring job repository, necessary to add
+            recurring jobs. Defaults to None.
         """
 
         self.job_repository = job_repository
+        self.recurring_job_repository = recurring_job_repository
 
-    def enqueue_job(self, job_activity: JobActivityBase, parameters: list[str] = None):
+    def enqueue_job(self,
+                    job_activity: JobActivityBase,
+                    parameters: list[str] = None,
+                    priority: int = 0,
+                    queue: str = DEFAULT_QUEUE,
+                    timeout_seconds: float = None):
         """
         Add job activity to the queue using the provided repository.
 
         Args:
             job (JobActivityBase)
             parameters (list[str])
+            priority (int, optional): Priority of the job on the queue, from
+            -1000 to 1000. Jobs with a higher priority are dequeued first.
+            Defaults to 0.
+            queue (str, optional): Name of the queue the job is enqueued on.
+            Defaults to 'default'.
+            timeout_seconds (float, optional): Seconds the job can run before
+            it is stopped, instead of the timeout of the activity. Defaults
+            to None.
         """
 
-        job = job_activity.create_job_object(parameters)
+        job = job_activity.create_job_object(parameters, priority, queue, timeout_seconds=timeout_seconds)
 
         self.job_repository.add_job(job)
+
+    def enqueue_jobs(self,
+                     job_activity: JobActivityBase,
+                     parameter_sets: Iterable[list[str]],
+                     batch_size: int = 1000,
+                     priority: int = 0,
+                     queue: str = DEFAULT_QUEUE,
+                     timeout_seconds: float = None) -> list[str]:
+        """
+        Add a job of the activity to the queue for each set of parameters,
+        returning the ids of the jobs created. The parameter sets can be any
+        iterable (including a generator), consumed in batches that are added
+        to the repository at once.
+
+        Args:
+            job_activity (JobActivityBase)
+            parameter_sets (Iterable[list[str]])
+            batch_size (int, optional): Maximum number of jobs added to the
+            repository at once. Defaults to 1000.
+            priority (int, optional): Priority of the jobs on the queue.
+            Defaults to 0.
+            queue (str, optional): Name of the queue the jobs are enqueued
+            on. Defaults to 'default'.
+            timeout_seconds (float, optional): Defaults to None.
+
+        Returns:
+            list[str]
+        """
+
+        self.__validate_batch_size(batch_size)
+        job_ids = []
+        jobs = []
+        for parameters in parameter_sets:
+            jobs.append(job_activity.create_job_object(parameters, priority, queue, timeout_seconds=timeout_seconds))
+            if (len(jobs) == batch_size):
+                job_ids.extend(self.__add_jobs(jobs))
+                jobs = []
+        if (len(jobs) > 0):
+            job_ids.extend(self.__add_jobs(jobs))
+        return job_ids
+
+    def schedule_job(self,
+                     job_activity: JobActivityBase,
+                     run_at: datetime.datetime = None,
+                     parameters: list[str] = None,
+                     priority: int = 0,
+                     queue: str = DEFAULT_QUEUE,
+                     delay: datetime.timedelta = None,
+                     timeout_seconds: float = None) -> str:
+        """
+        Add job activity to the repository to be enqueued at the datetime
+        passed by parameter, or after the delay passed by parameter, returning
+        the id of the job created. The job doesn't take a slot of any server
+        until it is due.
+
+        Args:
+            job_activity (JobActivityBase)
+            run_at (datetime.datetime, optional): Datetime in which the job is
+            enqueued. Datetimes without a timezone are taken as local time.
+            Defaults to None.
+            parameters (list[str], optional)
+            priority (int, optional): Defaults to 0.
+            queue (str, optional): Defaults to 'default'.
+            delay (datetime.timedelta, optional): Time from now after which
+            the job is enqueued, used instead of 'run_at'. Defaults to None.
+            timeout_seconds (float, optional): Defaults to None.
+
+        Returns:
+            str
+        """
+
+        self.__validate_schedule(run_at, delay)
+        if (run_at is None):
+            run_at = datetime.datetime.now() + delay
+        elif (run_at.tzinfo is not None):
+            run_at = run_at.astimezone().replace(tzinfo=None)
+        job = job_activity.create_job_object(parameters, priority, queue, timeout_seconds=timeout_seconds)
+        job.status = JobStatus.SCHEDULED
+        job.enqueued_datetime = run_at.isoformat()
+        self.job_repository.add_job(job)
+        return job.id
+
+    def add_recurring_job(self,
+                          name: str,
+                          job_activity: JobActivityBase,
+                          cron: str,
+                          parameters: list[str] = None,
+                          priority: int = 0,
+                          queue: str = DEFAULT_QUEUE,
+                          catch_up: CatchUpPolicy = CatchUpPolicy.LATEST,
+                          timeout_seconds: float = None):
+        """
+        Add a recurring job to the repository, enqueuing the job activity on
+        each occurrence of the cron expression passed by parameter. If a
+        recurring job with the same name and cron expression exists, it is
+        replaced keeping its schedule, so it is safe to add the recurring
+        jobs every time an application starts.
+
+        Args:
+            name (str): Unique name of the recurring job.
+            job_activity (JobActivityBase)
+            cron (str): Cron expression, like '*/5 * * * *' or '@daily'.
+            parameters (list[str], optional)
+            priority (int, optional): Defaults to 0.
+            queue (str, optional): Defaults to 'default'.
+            catch_up (CatchUpPolicy, optional): Defines how the occurrences
+            missed while no server was running are handled. Defaults to
+            LATEST.
+            timeout_seconds (float, optional): Defaults to None.
+        """
+
+        job = job_activity.create_job_object(parameters, priority, queue, timeout_seconds=timeout_seconds)
+        recurring_job = RecurringJob(name, job, cron, catch_up)
+        stored_recurring_job = self.__get_recurring_job_repository().get_recurring_job(name)
+        if (stored_recurring_job is not None and stored_recurring_job.cron == cron):
+            recurring_job.next_run_datetime = stored_recurring_job.next_run_datetime
+            recurring_job.last_run_datetime = stored_recurring_job.last_run_datetime
+        self.recurring_job_repository.add_recurring_job(recurring_job)
+
+    def remove_recurring_job(self, name: str):
+        """
+        Removes the recurring job with the name passed by parameter. The jobs
+        already enqueued by it are kept.
+
+        Args:
+            name (str)
+        """
+
+        self.__get_recurring_job_repository().remove_recurring_job(name)
+
+    def cancel_job(self, job_id: str) -> bool:
+        """
+        Cancels the job with the id passed by parameter. Jobs that didn't
+        start are set with the status CANCELLED right away, and running jobs
+        are stopped by the server running them, within a second. Returns
+        'True' if the job was cancelled, and 'False' if it was not found or
+        is already finished.
+
+        Args:
+            job_id (str)
+
+        Returns:
+            bool
+        """
+
+        return self.job_repository.cancel_job(job_id)
+
+    def requeue_dead_letter_job(self, job_id: str) -> bool:
+        """
+        Enqueues again the job with the id passed by parameter, moving it out
+        of the dead-letter queue. The job runs once more, and if it fails
+        again it goes back to the dead-letter queue. Returns 'True' if the
+        job was enqueued, and 'False' if it is not on the dead-letter queue.
+
+        Args:
+            job_id (str)
+
+        Returns:
+            bool
+        """
+
+        return self.job_repository.requeue_dead_letter_job(job_id) is not None
+
+    def __get_recurring_job_repository(self) -> RecurringJobRepository:
+        """
+        Internal function that returns the recurring job repository.
+
+        Raises:
+            ValueError: The recurring job repository was not informed
+        """
+
+        if (self.recurring_job_repository is None):
+            raise ValueError('recurring_job_repository', None, 'The recurring job repository was not informed')
+        return self.recurring_job_repository
+
+    def __add_jobs(self, jobs: list) -> list[str]:
+        """Internal function that adds a batch of jobs to the repository,
+        returning their ids."""
+
+        self.job_repository.add_jobs(jobs)
+        return [job.id for job in jobs]
+
+    def __validate_batch_size(self, batch_size: int):
+        """
+        Internal function used to validate the 'batch_size' value.
+
+        Raises:
+            ValueError: The value must be an integer
+            ValueError: The value must be greater than zero
+        """
+
+        if (not isinstance(batch_size, int)):
+            raise ValueError('batch_size', batch_size, 'The value must be an integer')
+        if (batch_size <= 0):
+            raise ValueError('batch_size', batch_size, 'The value must be greater than zero')
+
+    def __validate_schedule(self, run_at: datetime.datetime, delay: datetime.timedelta):
+        """
+        Internal function used to validate the 'run_at' and 'delay' values.
+
+        Raises:
+            ValueError: Either 'run_at' or 'delay' must be informed
+            ValueError: The value must be a datetime
+            ValueError: The value must be a timedelta
+        """
+
+        if ((run_at is None) == (delay is None)):
+            raise ValueError('run_at', run_at, 'Either \'run_at\' or \'delay\' must be informed')
+        if (run_at is not None and not isinstance(run_at, datetime.datetime)):
+            raise ValueError('run_at', run_at, 'The value must be a datetime')
+        if (delay is not None and not isinstance(delay, datetime.timedelta)):
+            raise ValueError('delay', delay, 'The value must be a timedelta')
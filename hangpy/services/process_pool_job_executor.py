@@ -0,0 +1,310 @@
+import collections
+import multiprocessing
+import multiprocessing.connection
+import threading
+from hangpy.entities import Job
+from hangpy.enums import JobStatus
+from hangpy.services.job_activity_base import JobActivityBase
+from hangpy.services.job_executor import JobExecutor
+
+JOB_RESULT_ATTRIBUTES = ('status', 'error', 'start_datetime', 'end_datetime')
+
+
+def run_job_activity(job_activity: JobActivityBase) -> Job:
+    """
+    Runs the activity on the worker process, returning the job with its
+    final state.
+
+    Args:
+        job_activity (JobActivityBase)
+
+    Returns:
+        Job
+    """
+
+    job_activity.run()
+    return job_activity.get_job()
+
+
+def run_worker(connection):
+    """
+    Runs the activities received through the connection passed by parameter,
+    one at a time, sending back their jobs, until the connection is closed or
+    'None' is received.
+
+    Args:
+        connection (Connection)
+    """
+
+    while (True):
+        try:
+            job_activity = connection.recv()
+        except EOFError:
+            return
+        if (job_activity is None):
+            return
+        connection.send(run_job_activity(job_activity))
+
+
+class WorkerProcess():
+    """A worker process of the ProcessPoolJobExecutor, and the connection
+    used to send it the activities."""
+
+    def __init__(self, mp_context):
+        self.connection, worker_connection = mp_context.Pipe()
+        self.process = mp_context.Process(target=run_worker, args=(worker_connection,), name='hangpy-job', daemon=True)
+        self.process.start()
+        self.killed = False
+        worker_connection.close()
+
+    def stop(self):
+        """Asks the worker process to exit once it is idle."""
+
+        try:
+            self.connection.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join()
+        self.connection.close()
+
+    def kill(self):
+        """Kills the worker process right away."""
+
+        self.killed = True
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+
+class ProcessPoolJobExecutor(JobExecutor):
+    """
+    Executor that runs the activities on a pool of worker processes, which
+    are not limited by the GIL. Suitable for CPU bound activities.
+
+    The activities are sent to the worker processes using 'pickle', so
+    their attributes must be picklable. The state of the job is sent back to
+    the server instance when the activity ends, and copied to the job of the
+    activity.
+
+    Each worker process runs one activity at a time, and is reused by the
+    next ones. The activities submitted while all the workers are running
+    wait for one of them to be free. A single thread of the server instance
+    sends the activities to the worker processes and waits for their jobs,
+    so the number of threads doesn't grow with the activities running. A
+    cancelled activity is stopped right away, killing its worker process,
+    which is replaced by a new one.
+    """
+
+    def __init__(self, mp_context=None):
+        """
+        Args:
+            mp_context (optional): Multiprocessing context used to start
+            the worker processes. Defaults to None.
+        """
+
+        self.mp_context = mp_context
+        self.workers = 0
+        self.idle_worker_processes = None
+        self.running_worker_processes = {}
+        self.pending_job_activities = collections.deque()
+        self.dispatcher_thread = None
+        self.dispatcher_stopping = False
+        self.wakeup_receiver = None
+        self.wakeup_sender = None
+        self.lock = threading.Lock()
+
+    def start(self, workers: int):
+        self.workers = workers
+        self.idle_worker_processes = []
+
+    def submit(self, job_activity: JobActivityBase):
+        job_activity.set_started_to_run()
+        with self.lock:
+            self.pending_job_activities.append(job_activity)
+            self.start_dispatcher()
+            self.wake_dispatcher()
+
+    def start_dispatcher(self):
+        """
+        Starts the thread that dispatches the activities to the worker
+        processes, if it is not running. Must be called holding the lock.
+        """
+
+        if (self.dispatcher_thread is not None):
+            return
+        self.wakeup_receiver, self.wakeup_sender = multiprocessing.Pipe(duplex=False)
+        self.dispatcher_stopping = False
+        self.dispatcher_thread = threading.Thread(target=self.run_dispatcher, name='hangpy-job-dispatcher', daemon=True)
+        self.dispatcher_thread.start()
+
+    def wake_dispatcher(self):
+        """
+        Wakes the dispatcher thread up, so it sends the pending activities
+        or stops. Must be called holding the lock.
+        """
+
+        self.wakeup_sender.send_bytes(b'')
+
+    def run_dispatcher(self):
+        """
+        Sends the pending activities to the worker processes and waits on
+        all their connections at once, finishing each activity when its
+        worker process sends its job back (or dies), until the executor is
+        shut down and no activity is left.
+        """
+
+        while (True):
+            self.send_pending_job_activities()
+            with self.lock:
+                if (self.dispatcher_stopping and len(self.pending_job_activities) == 0 and len(self.running_worker_processes) == 0):
+                    return
+                running_job_activities = {worker_process.connection: job_activity
+                                          for job_activity, worker_process in self.running_worker_processes.items()}
+            for connection in multiprocessing.connection.wait(list(running_job_activities) + [self.wakeup_receiver]):
+                if (connection is self.wakeup_receiver):
+                    while (self.wakeup_receiver.poll()):
+                        self.wakeup_receiver.recv_bytes()
+                else:
+                    self.receive_job(running_job_activities[connection])
+
+    def send_pending_job_activities(self):
+        """
+        Sends the pending activities to idle worker processes, while there
+        are free workers. The activities cancelled before being sent are
+        finished without running.
+        """
+
+        while (True):
+            with self.lock:
+                if (len(self.pending_job_activities) == 0 or len(self.running_worker_processes) >= self.workers):
+                    return
+                job_activity = self.pending_job_activities.popleft()
+            if (job_activity.is_cancelled()):
+                self.finish_job_activity(job_activity, None)
+                continue
+            worker_process = None
+            try:
+                worker_process = self.get_idle_worker_process(job_activity)
+                worker_process.connection.send(job_activity)
+            except Exception as err:
+                if (worker_process is not None):
+                    self.release_worker_process(job_activity, worker_process, False)
+                self.finish_job_activity(job_activity, None, err)
+
+    def receive_job(self, job_activity: JobActivityBase):
+        """
+        Receives the job of the activity passed by parameter from its worker
+        process, and finishes the activity. If the worker process died (or
+        was killed), the activity is finished with the error.
+
+        Args:
+            job_activity (JobActivityBase)
+        """
+
+        with self.lock:
+            worker_process = self.running_worker_processes[job_activity]
+        try:
+            job = worker_process.connection.recv()
+        except Exception as err:
+            self.release_worker_process(job_activity, worker_process, False)
+            self.finish_job_activity(job_activity, None, err)
+            return
+        self.release_worker_process(job_activity, worker_process, True)
+        self.finish_job_activity(job_activity, job)
+
+    def get_idle_worker_process(self, job_activity: JobActivityBase) -> WorkerProcess:
+        """
+        Takes an idle worker process to run the activity passed by parameter,
+        starting a new one if there is none.
+
+        Args:
+            job_activity (JobActivityBase)
+
+        Returns:
+            WorkerProcess
+        """
+
+        worker_process = None
+        with self.lock:
+            if (len(self.idle_worker_processes) > 0):
+                worker_process = self.idle_worker_processes.pop()
+        if (worker_process is None):
+            worker_process = WorkerProcess(self.mp_context or multiprocessing.get_context())
+        with self.lock:
+            self.running_worker_processes[job_activity] = worker_process
+            if (job_activity.is_cancelled()):
+                worker_process.killed = True
+                worker_process.process.kill()
+        return worker_process
+
+    def release_worker_process(self, job_activity: JobActivityBase, worker_process: WorkerProcess, reusable: bool):
+        """
+        Stops tracking the worker process that ran the activity passed by
+        parameter. Reusable worker processes are kept idle (up to the number
+        of workers), and the others are killed.
+
+        Args:
+            job_activity (JobActivityBase)
+            worker_process (WorkerProcess)
+            reusable (bool)
+        """
+
+        with self.lock:
+            self.running_worker_processes.pop(job_activity, None)
+            if (reusable and not worker_process.killed and len(self.idle_worker_processes) < self.workers):
+                self.idle_worker_processes.append(worker_process)
+                return
+        worker_process.kill()
+
+    def finish_job_activity(self, job_activity: JobActivityBase, job: Job, err: Exception = None):
+        """
+        Copies the final state of the job from the worker process to the job
+        of the activity tracked by the server instance, keeping the same
+        instance, which the repositories may track. If the activity was
+        cancelled, the job is set with the cancellation, and if it couldn't
+        be run by the worker process, with the error.
+
+        Args:
+            job_activity (JobActivityBase)
+            job (Job)
+            err (Exception, optional): Defaults to None.
+        """
+
+        if (job is not None):
+            for attribute in JOB_RESULT_ATTRIBUTES:
+                setattr(job_activity.get_job(), attribute, getattr(job, attribute, None))
+        if (job_activity.is_cancelled()):
+            job_activity.finish_cancelled()
+            return
+        if (err is not None):
+            job_activity.set_job_status(JobStatus.ERROR)
+            job_activity.set_job_error(err)
+            job_activity.set_job_end_datetime()
+        job_activity.set_finished()
+
+    def cancel(self, job_activity: JobActivityBase):
+        with self.lock:
+            worker_process = self.running_worker_processes.get(job_activity)
+            if (worker_process is not None):
+                worker_process.killed = True
+                worker_process.process.kill()
+
+    def shutdown(self):
+        if (self.idle_worker_processes is None):
+            return
+        with self.lock:
+            dispatcher_thread = self.dispatcher_thread
+            if (dispatcher_thread is not None):
+                self.dispatcher_stopping = True
+                self.wake_dispatcher()
+        if (dispatcher_thread is not None):
+            dispatcher_thread.join()
+            with self.lock:
+                self.dispatcher_thread = None
+                self.wakeup_receiver.close()
+                self.wakeup_sender.close()
+        with self.lock:
+            idle_worker_processes = self.idle_worker_processes
+            self.idle_worker_processes = []
+        for worker_process in idle_worker_processes:
+            worker_process.stop()
@@ -1,12 +1,25 @@
 import datetime
 import importlib
+import inspect
+import random
 import threading
 import time
 from hangpy.dtos import ServerConfigurationDto
-from hangpy.entities import Job, Server
-from hangpy.enums import JobStatus
-from hangpy.repositories import JobRepository, ServerRepository
-from hangpy.services import JobActivityBase, LogService
+from hangpy.entities import CronExpression, Job, RecurringJob, RetentionPolicy, Server
+from hangpy.entities.job import CANCELLED_JOB_ERROR
+from hangpy.enums import CatchUpPolicy, JobStatus
+from hangpy.repositories import JobArchive, JobRepository, RecurringJobRepository, ServerRepository
+from hangpy.services import AsyncioJobExecutor, JobActivityBase, JobExecutor, LogService, ThreadPoolJobExecutor
+
+SCHEDULED_JOBS_BATCH_SIZE = 1000
+
+MISSED_OCCURRENCE_TOLERANCE_SECONDS = 60
+
+EXPIRED_JOBS_BATCH_SIZE = 1000
+
+JOB_RETENTION_INTERVAL_SECONDS = 60
+
+RETAINED_STATUSES = (JobStatus.SUCCESS, JobStatus.CANCELLED, JobStatus.ERROR)
 
 
 class ServerService(threading.Thread):
@@ -19,7 +32,11 @@ class ServerService(threading.Thread):
                  server_configuration: ServerConfigurationDto,
                  server_repository: ServerRepository,
                  job_repository: JobRepository,
-                 log_service: LogService = None):
+                 log_service: LogService = None,
+                 job_executor: JobExecutor = None,
+                 recurring_job_repository: RecurringJobRepository = None,
+                 retention_policies: dict[JobStatus, RetentionPolicy] = None,
+                 job_archive: JobArchive = None):
         """
         Args:
             server_configuration (ServerConfigurationDto): Class contaning the
@@ -29,14 +46,41 @@ class ServerService(threading.Thread):
             job_repository (JobRepository): Implementation of the job
             repository.
             log_service (LogService): Logger.
-        """
-
+            job_executor (JobExecutor): Defines how the job activities are
+            executed. Defaults to a ThreadPoolJobExecutor.
+            recurring_job_repository (RecurringJobRepository): Implementation
+            of the recurring job repository. When informed, the server takes
+            part on the election of the server that enqueues the recurring
+            jobs. Defaults to None.
+            retention_policies (dict[JobStatus, RetentionPolicy]): Retention
+            of the finished jobs of each status (SUCCESS, CANCELLED or
+            ERROR). The jobs of the statuses without a policy are kept
+            forever. Defaults to None.
+            job_archive (JobArchive): Where the jobs removed by their
+            retention are archived before being deleted. When None, they are
+            only deleted. Defaults to None.
+        """
+
+        self.__validate_retention_policies(retention_policies)
         self.stop_signal = False
         self.server = Server(server_configuration)
         self.server_repository = server_repository
         self.job_repository = job_repository
+        self.recurring_job_repository = recurring_job_repository
+        self.retention_policies = retention_policies or {}
+        self.job_archive = job_archive
         self.log_service = log_service
+        self.job_executor = job_executor if job_executor is not None else ThreadPoolJobExecutor()
+        self.async_job_executor = AsyncioJobExecutor()
         self.job_activities_assigned = []
+        self.prefetched_jobs = []
+        self.job_leases_maintenance_time = 0
+        self.scheduled_jobs_promotion_time = 0
+        self.recurring_jobs_schedule_time = 0
+        self.job_cancellations_check_time = 0
+        self.job_retention_time = 0
+        self.heartbeat_stop_event = threading.Event()
+        self.heartbeat_thread = threading.Thread(target=self.run_heartbeat, daemon=True)
         threading.Thread.__init__(self)
 
     def run(self):
@@ -47,11 +91,17 @@ class ServerService(threading.Thread):
         """
 
         self.set_server_start_state()
+        self.start_heartbeat()
+        self.start_job_executor()
         self.log_run()
         while (self.run_enabled()):
             self.try_run_cycle()
             self.sleep_cycle()
+        self.release_prefetched_jobs()
         self.wait_until_slots_are_empty()
+        self.shutdown_job_executor()
+        self.stop_heartbeat()
+        self.release_scheduler_lease()
         self.set_server_stop_state()
 
     def log_run(self):
@@ -59,15 +109,102 @@ class ServerService(threading.Thread):
                    f'\nServer id: {self.server.id}'
                    f'\nStarted: {self.server.start_datetime}'
                    f'\nInterval: {self.server.configuration.cycle_interval_milliseconds} ms'
-                   f'\nSlots: {self.server.configuration.slots}')
+                   f'\nSlots: {self.server.configuration.slots}'
+                   f'\nAsync slots: {self.server.configuration.async_slots}'
+                   f'\nExecutor: {self.job_executor.__class__.__name__}')
         self.log(message)
 
+    def start_heartbeat(self):
+        """
+        Sends the first heartbeat of the server instance, and starts the
+        thread that keeps sending them on the configured interval, apart from
+        the cycles, which may sleep longer than the interval.
+        """
+
+        self.try_send_heartbeat()
+        self.heartbeat_thread.start()
+
+    def stop_heartbeat(self):
+        """
+        Stops the thread that sends the heartbeats.
+        """
+
+        self.heartbeat_stop_event.set()
+        self.heartbeat_thread.join()
+
+    def run_heartbeat(self):
+        """
+        Sends a heartbeat on every interval until the heartbeat is stopped.
+        """
+
+        while (not self.heartbeat_stop_event.wait(self.server.configuration.heartbeat_interval_milliseconds / 1000)):
+            self.try_send_heartbeat()
+
+    def try_send_heartbeat(self):
+        """
+        Try to send a heartbeat, catching and logging any eventual
+        exceptions.
+        """
+
+        try:
+            self.send_heartbeat()
+        except Exception as err:
+            self.log(f'An error ocurred while sending the server heartbeat: {err}')
+
+    def send_heartbeat(self):
+        """
+        Reports to the repository that the server instance is live, and the
+        slots it is using. The server is considered dead if three heartbeats
+        are missed.
+        """
+
+        self.server.last_heartbeat_datetime = datetime.datetime.now().isoformat()
+        self.server.used_slots = self.server.configuration.slots - self.get_free_regular_slots()
+        self.server.used_async_slots = self.server.configuration.async_slots - self.get_free_async_slots()
+        timeout_milliseconds = self.server.configuration.heartbeat_interval_milliseconds * 3
+        self.server_repository.send_heartbeat(self.server, timeout_milliseconds)
+
+    def start_job_executor(self):
+        """
+        Starts the job executor with one worker for each slot, and the async
+        job executor if the async slots are enabled.
+        """
+
+        self.job_executor.start(self.server.configuration.slots)
+        if (self.server.configuration.async_slots > 0):
+            self.async_job_executor.start(self.server.configuration.async_slots)
+
+    def shutdown_job_executor(self):
+        """
+        Releases the resources used by the job executors.
+        """
+
+        self.job_executor.shutdown()
+        self.async_job_executor.shutdown()
+
     def sleep_cycle(self):
         """
-        Waits the time configured for the server instance in between cycles.
+        Waits the time configured for the server instance in between cycles,
+        waking up earlier if the repository notifies that jobs were enqueued.
+        """
+
+        self.wait_for_enqueued_jobs(self.server.configuration.cycle_interval_milliseconds / 1000)
+
+    def wait_for_enqueued_jobs(self, timeout_seconds: float):
+        """
+        Waits until the repository notifies that jobs were enqueued, or until
+        the timeout expires. If the repository fails to wait, the server
+        sleeps the whole timeout, falling back to polling the queue.
+
+        Args:
+            timeout_seconds (float)
         """
 
-        time.sleep(self.server.configuration.cycle_interval_milliseconds / 1000)
+        try:
+            self.job_repository.wait_for_enqueued_jobs(timeout_seconds, list(self.server.configuration.queues))
+        except Exception as err:
+            self.log(f'An error ocurred while waiting for enqueued jobs: {err}')
+            time.sleep(timeout_seconds)
 
     def run_enabled(self) -> bool:
         """
@@ -97,23 +234,92 @@ class ServerService(threading.Thread):
         """
 
         self.set_server_cycle_state()
+        self.maintain_job_leases()
+        self.promote_scheduled_jobs()
+        self.schedule_recurring_jobs()
+        self.purge_expired_jobs()
         while (self.must_run_cycle_loop()):
             self.run_cycle_loop()
 
     def run_cycle_loop(self):
         """
-        Function responsible for trying to get, lock and run the next enqueued
-        job.
+        Function responsible for trying to claim and run the next enqueued
+        job. A job claimed while the slots of its kind (regular or async)
+        are in use waits on the prefetched jobs, and no other job is claimed
+        until it starts. When the server is configured to use the batch
+        claim, this is delegated to 'run_batch_cycle_loop'.
         """
 
+        if (self.server.configuration.batch_claim):
+            self.run_batch_cycle_loop()
+            return
         self.clear_finished_jobs()
         self.wait_until_slot_is_open()
-        job = self.get_next_enqueued_job()
+        if (len(self.prefetched_jobs) > 0):
+            if (self.run_prefetched_jobs() == 0):
+                time.sleep(0.1)
+            return
+        job = self.claim_next_enqueued_job()
         if (job is None):
-            time.sleep(0.1)
+            self.wait_for_enqueued_jobs(0.1)
             return
-        if (self.try_set_lock_on_job(job)):
-            self.run_job(job)
+        self.prefetched_jobs.append(job)
+        self.run_prefetched_jobs()
+
+    def run_batch_cycle_loop(self):
+        """
+        Function responsible for filling every free slot with jobs claimed in
+        a single batch, keeping the prefetched jobs waiting for a free slot.
+        The server only waits when no job could be started.
+        """
+
+        self.clear_finished_jobs()
+        self.prefetch_enqueued_jobs()
+        if (self.run_prefetched_jobs() == 0):
+            self.wait_for_enqueued_jobs(0.1)
+
+    def prefetch_enqueued_jobs(self):
+        """
+        Claims in a single batch the jobs necessary to fill the free slots
+        and the prefetch buffer of the server instance.
+        """
+
+        quantity = self.get_free_slots() + self.server.configuration.prefetch_jobs - len(self.prefetched_jobs)
+        if (quantity > 0):
+            self.prefetched_jobs.extend(self.job_repository.claim_jobs(quantity,
+                                                                       self.server.configuration.lease_milliseconds,
+                                                                       self.get_queue_order()))
+
+    def run_prefetched_jobs(self) -> int:
+        """
+        Runs the prefetched jobs that have a free slot of their kind (regular
+        or async). Returns the number of jobs started.
+
+        Returns:
+            int
+        """
+
+        jobs_started = 0
+        for job in list(self.prefetched_jobs):
+            if (self.has_free_slot_for_job(job)):
+                self.prefetched_jobs.remove(job)
+                self.run_job(job)
+                jobs_started += 1
+        return jobs_started
+
+    def release_prefetched_jobs(self):
+        """
+        Puts the prefetched jobs that didn't start back on the queue, so they
+        can be claimed by other servers.
+        """
+
+        if (len(self.prefetched_jobs) == 0):
+            return
+        for job in self.prefetched_jobs:
+            job.status = JobStatus.ENQUEUED
+            job.start_datetime = None
+        self.job_repository.update_jobs(self.prefetched_jobs)
+        self.prefetched_jobs = []
 
     def must_run_cycle_loop(self) -> bool:
         """
@@ -124,7 +330,7 @@ class ServerService(threading.Thread):
             bool
         """
 
-        run_necessity = self.exists_enqueued_jobs() or not self.slots_empty()
+        run_necessity = self.exists_enqueued_jobs() or not self.slots_empty() or len(self.prefetched_jobs) > 0
         return self.run_enabled() and run_necessity
 
     def wait_until_slot_is_open(self):
@@ -149,13 +355,124 @@ class ServerService(threading.Thread):
     def slots_limit_reached(self) -> bool:
         """
         Returns 'True' if all slots available for this server instance are
-        currently in use, and 'False' if there is any slots available.
+        currently in use, and 'False' if there is any slots available. When
+        the async slots are enabled, both the regular and the async slots
+        must be in use.
+
+        Returns:
+            bool
+        """
+
+        return self.regular_slots_limit_reached() and self.async_slots_limit_reached()
+
+    def regular_slots_limit_reached(self) -> bool:
+        """
+        Returns 'True' if all the regular slots are currently in use.
+
+        Returns:
+            bool
+        """
+
+        return self.get_free_regular_slots() == 0
+
+    def async_slots_limit_reached(self) -> bool:
+        """
+        Returns 'True' if all the async slots are currently in use. If the
+        async slots are not enabled, returns 'True' as well.
 
         Returns:
             bool
         """
 
-        return len(self.job_activities_assigned) >= self.server.configuration.slots
+        return self.get_free_async_slots() == 0
+
+    def get_free_slots(self) -> int:
+        """
+        Returns the number of slots (regular and async) available for running
+        jobs on this server instance.
+
+        Returns:
+            int
+        """
+
+        return self.get_free_regular_slots() + self.get_free_async_slots()
+
+    def get_free_regular_slots(self) -> int:
+        """
+        Returns the number of regular slots available for running jobs on
+        this server instance.
+
+        Returns:
+            int
+        """
+
+        regular_job_activities = [job_activity for job_activity in self.job_activities_assigned
+                                  if not self.is_async_job_activity(job_activity)]
+        return max(self.server.configuration.slots - len(regular_job_activities), 0)
+
+    def get_free_async_slots(self) -> int:
+        """
+        Returns the number of async slots available for running jobs on this
+        server instance.
+
+        Returns:
+            int
+        """
+
+        async_job_activities = [job_activity for job_activity in self.job_activities_assigned
+                                if self.is_async_job_activity(job_activity)]
+        return max(self.server.configuration.async_slots - len(async_job_activities), 0)
+
+    def has_free_slot_for_job(self, job: Job) -> bool:
+        """
+        Returns 'True' if there is a free slot of the kind (regular or async)
+        used to run the job passed by parameter.
+
+        Args:
+            job (Job)
+
+        Returns:
+            bool
+        """
+
+        if (self.is_async_job(job)):
+            return not self.async_slots_limit_reached()
+        return not self.regular_slots_limit_reached()
+
+    def is_async_job(self, job: Job) -> bool:
+        """
+        Returns 'True' if the job must run on an async slot: the async slots
+        are enabled and the action of its activity is a coroutine function.
+        Jobs whose activity can't be found run on regular slots, where the
+        error is handled.
+
+        Args:
+            job (Job)
+
+        Returns:
+            bool
+        """
+
+        if (self.server.configuration.async_slots == 0):
+            return False
+        try:
+            return inspect.iscoroutinefunction(self.get_job_activity_class(job).action)
+        except Exception:
+            return False
+
+    def is_async_job_activity(self, job_activity: JobActivityBase) -> bool:
+        """
+        Returns 'True' if the activity must run on an async slot: the async
+        slots are enabled and its action is a coroutine function.
+
+        Args:
+            job_activity (JobActivityBase)
+
+        Returns:
+            bool
+        """
+
+        return self.server.configuration.async_slots > 0 and job_activity.is_coroutine_action()
 
     def slots_empty(self) -> bool:
         """
@@ -176,19 +493,310 @@ class ServerService(threading.Thread):
 
         self.save_finished_jobs()
         self.untrack_jobs()
+        self.stop_timed_out_jobs()
+        self.cancel_requested_jobs()
+        self.maintain_job_leases()
+        self.promote_scheduled_jobs()
+        self.schedule_recurring_jobs()
+
+    def stop_timed_out_jobs(self):
+        """
+        Cancels the running activities that exceeded their timeout, so their
+        jobs end with an error and their slots are released.
+        """
+
+        for job_activity in self.job_activities_assigned:
+            timeout_seconds = job_activity.get_timeout_seconds()
+            if (timeout_seconds is None or job_activity.is_cancelled() or job_activity.is_finished()):
+                continue
+            if (job_activity.get_running_seconds() > timeout_seconds):
+                self.cancel_job_activity(job_activity, f'The job timed out after {timeout_seconds} seconds', JobStatus.ERROR)
+
+    def cancel_requested_jobs(self):
+        """
+        Cancels the jobs claimed by this server instance (running or
+        prefetched) that were flagged to be cancelled on the repository, at
+        most once per second. The prefetched jobs are cancelled right away,
+        as they didn't start.
+        """
+
+        if (time.monotonic() < self.job_cancellations_check_time):
+            return
+        self.job_cancellations_check_time = time.monotonic() + 1
+        running_activities = {job_activity.get_job().id: job_activity for job_activity in self.job_activities_assigned
+                              if not job_activity.is_cancelled()}
+        job_ids = list(running_activities) + [job.id for job in self.prefetched_jobs]
+        if (len(job_ids) == 0):
+            return
+        cancelled_job_ids = set(self.job_repository.get_cancelled_job_ids(job_ids))
+        for job_id in cancelled_job_ids.intersection(running_activities):
+            self.cancel_job_activity(running_activities[job_id], CANCELLED_JOB_ERROR, JobStatus.CANCELLED)
+        cancelled_jobs = [job for job in self.prefetched_jobs if job.id in cancelled_job_ids]
+        if (len(cancelled_jobs) > 0):
+            self.prefetched_jobs = [job for job in self.prefetched_jobs if job.id not in cancelled_job_ids]
+            for job in cancelled_jobs:
+                job.status = JobStatus.CANCELLED
+                job.error = CANCELLED_JOB_ERROR
+                job.end_datetime = datetime.datetime.now().isoformat()
+            self.job_repository.update_jobs(cancelled_jobs)
+
+    def cancel_job_activity(self, job_activity: JobActivityBase, reason: str, status: JobStatus):
+        """
+        Requests the activity passed by parameter to stop, and has its
+        executor stop it.
+
+        Args:
+            job_activity (JobActivityBase)
+            reason (str): Set as the error of the job.
+            status (JobStatus): Status the job ends with.
+        """
+
+        self.log(f'Stopping the job {job_activity.get_job().id}: {reason}')
+        job_activity.cancel(reason, status)
+        if (self.is_async_job_activity(job_activity)):
+            self.async_job_executor.cancel(job_activity)
+        else:
+            self.job_executor.cancel(job_activity)
+
+    def maintain_job_leases(self):
+        """
+        Renews the leases of the jobs claimed by this server instance (running
+        or prefetched), and puts back on the queue the jobs whose lease
+        expired on any server. It runs three times per lease duration, so the
+        leases are renewed before they expire.
+        """
+
+        if (time.monotonic() < self.job_leases_maintenance_time):
+            return
+        lease_milliseconds = self.server.configuration.lease_milliseconds
+        self.job_leases_maintenance_time = time.monotonic() + lease_milliseconds / 3000
+        jobs = [job_activity.get_job() for job_activity in self.job_activities_assigned] + self.prefetched_jobs
+        if (len(jobs) > 0):
+            for job in self.job_repository.renew_job_leases(jobs, lease_milliseconds):
+                self.log(f'The lease of the job {job.id} expired, so it may run again on another server')
+        reclaimed_job_ids = self.job_repository.reclaim_expired_jobs()
+        if (len(reclaimed_job_ids) > 0):
+            self.log(f'Jobs enqueued again after their lease expired: {", ".join(reclaimed_job_ids)}')
+
+    def promote_scheduled_jobs(self):
+        """
+        Enqueues the scheduled jobs that are due, in batches, at most once
+        per second. The jobs scheduled to the future are not read.
+        """
+
+        if (time.monotonic() < self.scheduled_jobs_promotion_time):
+            return
+        self.scheduled_jobs_promotion_time = time.monotonic() + 1
+        while (len(self.job_repository.promote_scheduled_jobs(SCHEDULED_JOBS_BATCH_SIZE)) == SCHEDULED_JOBS_BATCH_SIZE):
+            pass
+
+    def schedule_recurring_jobs(self):
+        """
+        Enqueues the occurrences of the recurring jobs that are due, at most
+        once per second. Only the server holding the lease of the scheduler
+        enqueues them, so the servers don't compete for the occurrences, and
+        the others only try to take the lease.
+        """
+
+        if (self.recurring_job_repository is None or time.monotonic() < self.recurring_jobs_schedule_time):
+            return
+        self.recurring_jobs_schedule_time = time.monotonic() + 1
+        if (not self.recurring_job_repository.try_acquire_scheduler_lease(self.server.id, self.get_scheduler_lease_milliseconds())):
+            return
+        for recurring_job in self.recurring_job_repository.get_due_recurring_jobs():
+            self.enqueue_recurring_job(recurring_job)
+
+    def purge_expired_jobs(self):
+        """
+        Removes the finished jobs that exceeded the retention of their
+        status, in batches, at most once per minute. Each batch is archived
+        before being deleted, and if the archive fails, the jobs are kept
+        claimed until their lease expires, and tried again.
+        """
+
+        if (len(self.retention_policies) == 0 or time.monotonic() < self.job_retention_time):
+            return
+        self.job_retention_time = time.monotonic() + JOB_RETENTION_INTERVAL_SECONDS
+        for status, retention_policy in self.retention_policies.items():
+            while (True):
+                jobs = self.job_repository.claim_expired_jobs(status,
+                                                              retention_policy.max_age_seconds,
+                                                              retention_policy.max_count,
+                                                              EXPIRED_JOBS_BATCH_SIZE,
+                                                              self.server.configuration.lease_milliseconds)
+                if (len(jobs) == 0):
+                    break
+                if (self.job_archive is not None):
+                    self.job_archive.archive_jobs(jobs)
+                self.job_repository.delete_jobs(jobs)
+                self.log(f'{len(jobs)} jobs removed after exceeding the retention of the status {status.name}')
+                if (len(jobs) < EXPIRED_JOBS_BATCH_SIZE):
+                    break
+
+    def enqueue_recurring_job(self, recurring_job: RecurringJob):
+        """
+        Enqueues the jobs of the due occurrences of the recurring job passed
+        by parameter, according to its catch up policy, and moves its next run
+        to the next occurrence. The jobs are only enqueued if no other server
+        took the occurrences first.
+
+        The next run is moved before the jobs are enqueued, since the
+        recurring jobs and the jobs may be stored apart, and it's moved back
+        when the jobs can't be enqueued, so the occurrences are taken again on
+        the next cycle. The occurrences are delivered at most once: the ones
+        taken by a server stopped before enqueuing their jobs are lost.
+
+        Args:
+            recurring_job (RecurringJob)
+        """
+
+        now = datetime.datetime.now()
+        cron_expression = CronExpression(recurring_job.cron)
+        stored_next_run_datetime = recurring_job.next_run_datetime
+        next_run_datetime = datetime.datetime.fromisoformat(stored_next_run_datetime)
+        run_datetimes = cron_expression.get_datetimes(next_run_datetime, now) or [next_run_datetime]
+        jobs_quantity = len(run_datetimes)
+        if (recurring_job.catch_up == CatchUpPolicy.LATEST):
+            jobs_quantity = 1
+        elif (recurring_job.catch_up == CatchUpPolicy.NONE):
+            jobs_quantity = 1 if (now - run_datetimes[-1]).total_seconds() <= self.get_missed_occurrence_tolerance_seconds() else 0
+        stored_last_run_datetime = recurring_job.last_run_datetime
+        recurring_job.last_run_datetime = run_datetimes[-1].isoformat()
+        recurring_job.next_run_datetime = cron_expression.get_next_datetime(now).isoformat()
+        if (not self.recurring_job_repository.try_update_recurring_job_run(recurring_job, stored_next_run_datetime)):
+            return
+        try:
+            self.job_repository.add_jobs([self.create_recurring_job_occurrence(recurring_job) for _ in range(jobs_quantity)])
+        except Exception:
+            updated_next_run_datetime = recurring_job.next_run_datetime
+            recurring_job.last_run_datetime = stored_last_run_datetime
+            recurring_job.next_run_datetime = stored_next_run_datetime
+            self.recurring_job_repository.try_update_recurring_job_run(recurring_job, updated_next_run_datetime)
+            raise
+        if (jobs_quantity < len(run_datetimes)):
+            self.log(f'Occurrences of the recurring job \'{recurring_job.name}\' skipped: {len(run_datetimes) - jobs_quantity}')
+
+    def create_recurring_job_occurrence(self, recurring_job: RecurringJob) -> Job:
+        """
+        Returns a new job created from the template of the recurring job
+        passed by parameter.
+
+        Args:
+            recurring_job (RecurringJob)
+
+        Returns:
+            Job
+        """
+
+        template = recurring_job.job
+        return Job(template.module_name, template.class_name, template.parameters, template.priority, template.queue,
+                   getattr(template, 'timeout_seconds', None))
+
+    def get_scheduler_lease_milliseconds(self) -> int:
+        """
+        Returns the duration of the lease of the scheduler: three cycles (at
+        least three seconds), as an idle server renews it once per cycle.
+
+        Returns:
+            int
+        """
+
+        return max(self.server.configuration.cycle_interval_milliseconds, 1000) * 3
+
+    def get_missed_occurrence_tolerance_seconds(self) -> float:
+        """
+        Returns the delay after which an occurrence of a recurring job is
+        considered missed: a minute or two cycles, whichever is longer.
+
+        Returns:
+            float
+        """
+
+        return max(MISSED_OCCURRENCE_TOLERANCE_SECONDS, self.server.configuration.cycle_interval_milliseconds * 2 / 1000)
+
+    def release_scheduler_lease(self):
+        """
+        Releases the lease of the scheduler, if it is held by this server
+        instance, so another server takes it without waiting it to expire.
+        """
+
+        if (self.recurring_job_repository is None):
+            return
+        try:
+            self.recurring_job_repository.release_scheduler_lease(self.server.id)
+        except Exception as err:
+            self.log(f'An error ocurred while releasing the scheduler lease: {err}')
 
     def save_finished_jobs(self):
         """
         Find all the finished jobs on this server instance, saves them on the
-        repository, and mark them to be untracked.
+        repository, and mark them to be untracked. The attempt is recorded on
+        the history of each job, the failed jobs whose activity has a retry
+        policy are scheduled to run again (the error is kept on the history
+        only), and the ones that exhausted their retries are moved to the dead-letter queue.
         """
 
         finished_activities = [job_activity for job_activity in self.job_activities_assigned if job_activity.is_finished()]
-        finished_jobs = [job_activity.get_job() for job_activity in finished_activities]
+        finished_jobs = []
+        dead_letter_jobs = []
+        for job_activity in finished_activities:
+            job = job_activity.get_job()
+            self.record_job_attempt(job)
+            if (self.try_schedule_job_retry(job_activity)):
+                finished_jobs.append(job)
+            elif (job.status == JobStatus.ERROR and job_activity.get_retry_policy() is not None):
+                self.log(f'The job {job.id} failed on all its {len(job.attempts)} attempts, and was moved to the dead-letter queue')
+                dead_letter_jobs.append(job)
+            else:
+                finished_jobs.append(job)
         self.job_repository.update_jobs(finished_jobs)
+        if (len(dead_letter_jobs) > 0):
+            self.job_repository.move_jobs_to_dead_letter(dead_letter_jobs)
         for job_activity in finished_activities:
             job_activity.set_can_be_untracked()
 
+    def record_job_attempt(self, job: Job):
+        """
+        Adds the run that just finished to the history of attempts of the job
+        passed by parameter.
+
+        Args:
+            job (Job)
+        """
+
+        job.attempts.append({'start_datetime': job.start_datetime,
+                             'end_datetime': job.end_datetime,
+                             'error': job.error})
+
+    def try_schedule_job_retry(self, job_activity: JobActivityBase) -> bool:
+        """
+        Schedules the job of the activity passed by parameter to run again,
+        if it failed and the retry policy of the activity allows another
+        attempt, after the delay given by the policy. Returns 'True' if the
+        job was scheduled, and 'False' otherwise.
+
+        Args:
+            job_activity (JobActivityBase)
+
+        Returns:
+            bool
+        """
+
+        job = job_activity.get_job()
+        if (job.status != JobStatus.ERROR):
+            return False
+        retry_policy = job_activity.get_retry_policy()
+        if (retry_policy is None or not retry_policy.can_retry(len(job.attempts))):
+            return False
+        retry_datetime = datetime.datetime.now() + datetime.timedelta(seconds=retry_policy.get_delay_seconds(len(job.attempts)))
+        job.status = JobStatus.SCHEDULED
+        job.error = None
+        job.enqueued_datetime = retry_datetime.isoformat()
+        job.start_datetime = None
+        job.end_datetime = None
+        self.log(f'The job {job.id} failed on the attempt {len(job.attempts)}, and will run again at {job.enqueued_datetime}')
+        return True
+
     def untrack_jobs(self):
         """
         Find all the jobs marked to be untracked and remove them from the
@@ -200,25 +808,40 @@ class ServerService(threading.Thread):
 
     def exists_enqueued_jobs(self) -> bool:
         """
-        Returns 'True' if there is at least one enqueued job in the
-        repository, and returns 'False' if there is none.
+        Returns 'True' if there is at least one job enqueued on the queues
+        served by the server instance, and returns 'False' if there is none.
 
         Returns:
             bool
         """
 
-        return self.job_repository.exists_jobs_with_status(JobStatus.ENQUEUED)
+        return self.job_repository.count_enqueued_jobs(list(self.server.configuration.queues)) > 0
 
-    def get_next_enqueued_job(self) -> Job:
+    def claim_next_enqueued_job(self) -> Job:
         """
-        Get a enqueued job from the repository. If there is none, returns
-        'None'.
+        Claims the next enqueued job from the repository, already locked for
+        this server and set with the status PROCESSING. If there is none,
+        returns 'None'.
 
         Returns:
             Job
         """
 
-        return self.job_repository.get_job_by_status(JobStatus.ENQUEUED)
+        return self.job_repository.claim_job(self.server.configuration.lease_milliseconds, self.get_queue_order())
+
+    def get_queue_order(self) -> list[str]:
+        """
+        Returns the queues served by the server instance in the order they
+        are read by the next claim, drawn at random according to their
+        weights, so each queue comes first in proportion to its weight and
+        the other ones are only read when it is empty.
+
+        Returns:
+            list[str]
+        """
+
+        queues = self.server.configuration.queues
+        return sorted(queues, key=lambda queue: random.random() ** (1 / queues[queue]), reverse=True)
 
     def run_job(self, job: Job):
         """
@@ -228,7 +851,6 @@ class ServerService(threading.Thread):
             job (Job)
         """
         try:
-            self.set_job_start_state(job)
             self.log(f'\nProcessing job: {job.id}')
             job_activity_instance = self.get_job_activity_instance(job)
             self.add_job_activity_assigned(job_activity_instance)
@@ -238,13 +860,18 @@ class ServerService(threading.Thread):
 
     def run_job_instance(self, job_activity_instance: JobActivityBase):
         """
-        Starts a thread to process the activity instance.
+        Submits the activity instance to the job executor. Activities running
+        on async slots are submitted to the async job executor, sharing a
+        single event loop.
 
         Args:
             job_activity_instance (JobActivityBase)
         """
 
-        job_activity_instance.start()
+        if (self.is_async_job_activity(job_activity_instance)):
+            self.async_job_executor.submit(job_activity_instance)
+            return
+        self.job_executor.submit(job_activity_instance)
 
     def add_job_activity_assigned(self, job_activity_instance: JobActivityBase):
         """
@@ -269,12 +896,26 @@ class ServerService(threading.Thread):
             JobActivityBase
         """
 
-        job_module = importlib.import_module(job.module_name)
-        job_class = getattr(job_module, job.class_name)
+        job_class = self.get_job_activity_class(job)
         job_activity_instance = job_class()
         job_activity_instance.set_job(job)
         return job_activity_instance
 
+    def get_job_activity_class(self, job: Job) -> type:
+        """
+        Returns the class defined by the job, that inherits from
+        'JobActivityBase'.
+
+        Args:
+            job (Job)
+
+        Returns:
+            type
+        """
+
+        job_module = importlib.import_module(job.module_name)
+        return getattr(job_module, job.class_name)
+
     def set_server_start_state(self):
         """
         Fill the properties necessary when the server instance starts.
@@ -299,30 +940,6 @@ class ServerService(threading.Thread):
         self.server.stop_datetime = datetime.datetime.now().isoformat()
         self.server_repository.update_server(self.server)
 
-    def set_job_start_state(self, job: Job):
-        """
-        Fill the properties necessary when the job starts.
-        """
-
-        job.start_datetime = datetime.datetime.now().isoformat()
-        job.status = JobStatus.PROCESSING
-        self.job_repository.update_job(job)
-
-    def try_set_lock_on_job(self, job: Job) -> bool:
-        """
-        Locks the job on the repository, informing all servers that it is
-        currently being handled by this server. Returns 'True' if the server
-        could obtain the lock and 'False' otherwise.
-
-        Args:
-            job (Job)
-
-        Returns:
-            bool
-        """
-
-        return self.job_repository.try_set_lock_on_job(job)
-
     def stop(self):
         """
         Send the stop signal to the server instance.
@@ -354,3 +971,22 @@ class ServerService(threading.Thread):
 
         if (self.log_service is not None):
             self.log_service.log(message)
+
+    def __validate_retention_policies(self, retention_policies: dict[JobStatus, RetentionPolicy]):
+        """
+        Internal function used to validate the 'retention_policies' value.
+
+        Raises:
+            ValueError: The value must be a dictionary or None
+            ValueError: The retention policies must be set for finished statuses only
+            ValueError: The values must be instances of RetentionPolicy
+        """
+
+        if (retention_policies is None):
+            return
+        if (not isinstance(retention_policies, dict)):
+            raise ValueError('retention_policies', retention_policies, 'The value must be a dictionary or None')
+        if (any(status not in RETAINED_STATUSES for status in retention_policies)):
+            raise ValueError('retention_policies', retention_policies, 'The retention policies must be set for finished statuses only')
+        if (any(not isinstance(retention_policy, RetentionPolicy) for retention_policy in retention_policies.values())):
+            raise ValueError('retention_policies', retention_policies, 'The values must be instances of RetentionPolicy')
@@ -0,0 +1,135 @@
+import queue
+import threading
+from concurrent.futures import Executor, Future
+from hangpy.services.job_activity_base import JobActivityBase
+from hangpy.services.job_executor import JobExecutor
+
+CANCELLATION_GRACE_SECONDS = 5
+
+
+class DaemonThreadPoolExecutor(Executor):
+    """
+    Pool of daemon threads used by the ThreadPoolJobExecutor and the
+    AsyncioJobExecutor to run the actions. Unlike the threads of the
+    concurrent.futures ThreadPoolExecutor, which are joined when the
+    interpreter exits, a thread left behind running an abandoned action
+    doesn't keep the interpreter from exiting.
+    """
+
+    def __init__(self, max_workers: int, thread_name_prefix: str = 'hangpy-job'):
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+        self.work_items = queue.SimpleQueue()
+        self.threads = []
+        self.idle_threads = 0
+        self.is_shutdown = False
+        self.lock = threading.Lock()
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future = Future()
+        with self.lock:
+            if (self.is_shutdown):
+                raise RuntimeError('cannot schedule new futures after shutdown')
+            self.work_items.put((future, fn, args, kwargs))
+            if (self.idle_threads > 0):
+                self.idle_threads -= 1
+            elif (len(self.threads) < self.max_workers):
+                thread = threading.Thread(target=self.run_worker, name=f'{self.thread_name_prefix}_{len(self.threads)}', daemon=True)
+                self.threads.append(thread)
+                thread.start()
+        return future
+
+    def run_worker(self):
+        """
+        Runs the work items of the pool, one at a time, until 'None' is
+        received.
+        """
+
+        while (True):
+            work_item = self.work_items.get()
+            if (work_item is None):
+                return
+            future, fn, args, kwargs = work_item
+            if (future.set_running_or_notify_cancel()):
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except BaseException as exception:
+                    future.set_exception(exception)
+            del future, work_item
+            with self.lock:
+                self.idle_threads += 1
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        with self.lock:
+            if (not self.is_shutdown):
+                self.is_shutdown = True
+                for _ in self.threads:
+                    self.work_items.put(None)
+        if (wait):
+            for thread in self.threads:
+                thread.join()
+
+
+class ThreadPoolJobExecutor(JobExecutor):
+    """
+    Executor that runs the activities on a pool of reusable threads. This is
+    the default executor, suitable for I/O bound activities.
+
+    Threads can't be stopped, so a cancelled activity is given a grace period
+    to stop by itself. After that the activity is finished and its thread is
+    left behind running the action: the pool is replaced, so the slot is
+    available to other jobs, and the thread ends when the action returns. The
+    threads are daemon threads, so a thread left behind doesn't keep the
+    interpreter from exiting, ending with it instead. Activities that must
+    be stopped right away should run on the ProcessPoolJobExecutor.
+    """
+
+    def __init__(self, cancellation_grace_seconds: float = CANCELLATION_GRACE_SECONDS):
+        """
+        Args:
+            cancellation_grace_seconds (float, optional): Seconds a cancelled
+            activity has to stop by itself. Defaults to 5.
+        """
+
+        self.cancellation_grace_seconds = cancellation_grace_seconds
+        self.workers = 0
+        self.thread_pool = None
+        self.thread_pool_lock = threading.Lock()
+
+    def start(self, workers: int):
+        self.workers = workers
+        self.thread_pool = self.create_thread_pool()
+
+    def create_thread_pool(self) -> DaemonThreadPoolExecutor:
+        return DaemonThreadPoolExecutor(self.workers)
+
+    def submit(self, job_activity: JobActivityBase):
+        with self.thread_pool_lock:
+            self.thread_pool.submit(job_activity.run)
+
+    def cancel(self, job_activity: JobActivityBase):
+        timer = threading.Timer(self.cancellation_grace_seconds, self.abandon_job_activity, [job_activity])
+        timer.daemon = True
+        timer.start()
+
+    def abandon_job_activity(self, job_activity: JobActivityBase):
+        """
+        Finishes the cancelled activity that didn't stop within the grace
+        period, replacing the thread pool, as one of its threads is still
+        running the action. The activity is abandoned, so the action can't
+        change its job when it returns.
+
+        Args:
+            job_activity (JobActivityBase)
+        """
+
+        if (job_activity.is_finished()):
+            return
+        with self.thread_pool_lock:
+            self.thread_pool.shutdown(wait=False)
+            self.thread_pool = self.create_thread_pool()
+        job_activity.abandon()
+
+    def shutdown(self):
+        if (self.thread_pool is not None):
+            self.thread_pool.shutdown(wait=True)
@@ -8,11 +8,23 @@ class TestServerConfigurationDto(unittest.TestCase):
         server_configuration = ServerConfigurationDto()
         self.assertEqual(server_configuration.cycle_interval_milliseconds, 10000)
         self.assertEqual(server_configuration.slots, 10)
+        self.assertFalse(server_configuration.batch_claim)
+        self.assertEqual(server_configuration.prefetch_jobs, 0)
+        self.assertEqual(server_configuration.async_slots, 0)
+        self.assertEqual(server_configuration.lease_milliseconds, 60000)
+        self.assertEqual(server_configuration.heartbeat_interval_milliseconds, 5000)
+        self.assertDictEqual(server_configuration.queues, {'default': 1})
 
     def test_init_with_custom_values(self):
-        server_configuration = ServerConfigurationDto(500, 5)
+        server_configuration = ServerConfigurationDto(500, 5, True, 3, 1000, 30000, 1000, ['cpu', ('latency', 3)])
         self.assertEqual(server_configuration.cycle_interval_milliseconds, 500)
         self.assertEqual(server_configuration.slots, 5)
+        self.assertTrue(server_configuration.batch_claim)
+        self.assertEqual(server_configuration.prefetch_jobs, 3)
+        self.assertEqual(server_configuration.async_slots, 1000)
+        self.assertEqual(server_configuration.lease_milliseconds, 30000)
+        self.assertEqual(server_configuration.heartbeat_interval_milliseconds, 1000)
+        self.assertDictEqual(server_configuration.queues, {'cpu': 1, 'latency': 3})
 
     def test_init_with_invalid_cycle_interval_milliseconds(self):
         with self.assertRaises(ValueError):
@@ -46,6 +58,84 @@ class TestServerConfigurationDto(unittest.TestCase):
         with self.assertRaises(ValueError):
             ServerConfigurationDto(slots='x')
 
+    def test_init_with_invalid_batch_claim(self):
+        with self.assertRaises(ValueError):
+            ServerConfigurationDto(batch_claim=1)
+
+        with self.assertRaises(ValueError):
+            ServerConfigurationDto(batch_claim=None)
+
+        with self.assertRaises(ValueError):
+            ServerConfigurationDto(batch_claim='x')
+
+    def test_init_with_invalid_prefetch_jobs(self):
+        with self.assertRaises(ValueError):
+            ServerConfigurationDto(prefetch_jobs=1.1)
+
+        with self.assertRaises(ValueError):
+            ServerConfigurationDto(prefetch_jobs=-1)
+
+        with self.assertRaises(ValueError):
+            ServerConfigurationDto(slots=2, prefetch_jobs=3)
+
+        with self.assertRaises(ValueError):
+            ServerConfigurationDto(prefetch_jobs=None)
+
+    def test_init_with_invalid_async_slots(self):
+        with self.assertRaises(ValueError):
+            ServerConfigurationDto(async_slots=1.1)
+
+        with self.assertRaises(ValueError):
+            ServerConfigurationDto(async_slots=-1)
+
+        with self.assertRaises(ValueError):
+            ServerConfigurationDto(async_slots=None)
+
+    def test_init_with_invalid_lease_milliseconds(self):
+        with self.assertRaises(ValueError):
+            ServerConfigurationDto(lease_milliseconds=1.1)
+
+        with self.assertRaises(ValueError):
+            ServerConfigurationDto(lease_milliseconds=0)
+
+        with self.assertRaises(ValueError):
+            ServerConfigurationDto(lease_milliseconds=None)
+
+    def test_init_with_invalid_heartbeat_interval_milliseconds(self):
+        with self.assertRaises(ValueError):
+            ServerConfigurationDto(heartbeat_interval_milliseconds=1.1)
+
+        with self.assertRaises(ValueError):
+            ServerConfigurationDto(heartbeat_interval_milliseconds=0)
+
+        with self.assertRaises(ValueError):
+            ServerConfigurationDto(heartbeat_interval_milliseconds=None)
+
+    def test_init_with_invalid_queues(self):
+        with self.assertRaises(ValueError):
+            ServerConfigurationDto(queues='default')
+
+        with self.assertRaises(ValueError):
+            ServerConfigurationDto(queues=[])
+
+        with self.assertRaises(ValueError):
+            ServerConfigurationDto(queues=[''])
+
+        with self.assertRaises(ValueError):
+            ServerConfigurationDto(queues=['cpu', ('cpu', 2)])
+
+        with self.assertRaises(ValueError):
+            ServerConfigurationDto(queues=[('cpu', 0)])
+
+        with self.assertRaises(ValueError):
+            ServerConfigurationDto(queues=[('cpu', 1.5)])
+
+        with self.assertRaises(ValueError):
+            ServerConfigurationDto(queues=[('cpu', 1, 2)])
+
+        with self.assertRaises(ValueError):
+            ServerConfigurationDto(queues=[123])
+
 
 if (__name__ == "__main__"):
     unittest.main()
@@ -0,0 +1,59 @@
+import datetime
+import unittest
+from hangpy.entities import CronExpression
+
+
+class TestCronExpression(unittest.TestCase):
+
+    def test_get_next_datetime_every_minute(self):
+        cron_expression = CronExpression('* * * * *')
+        actual_datetime = cron_expression.get_next_datetime(datetime.datetime(1988, 4, 10, 11, 1, 2))
+        self.assertEqual(actual_datetime, datetime.datetime(1988, 4, 10, 11, 2))
+
+    def test_get_next_datetime_with_steps_and_lists(self):
+        cron_expression = CronExpression('*/15 8-10,14 * * *')
+        actual_datetime = cron_expression.get_next_datetime(datetime.datetime(1988, 4, 10, 10, 45))
+        self.assertEqual(actual_datetime, datetime.datetime(1988, 4, 10, 14, 0))
+        actual_datetime = cron_expression.get_next_datetime(datetime.datetime(1988, 4, 10, 14, 50))
+        self.assertEqual(actual_datetime, datetime.datetime(1988, 4, 11, 8, 0))
+
+    def test_get_next_datetime_nightly(self):
+        cron_expression = CronExpression('@daily')
+        actual_datetime = cron_expression.get_next_datetime(datetime.datetime(1988, 12, 31, 0, 0))
+        self.assertEqual(actual_datetime, datetime.datetime(1989, 1, 1, 0, 0))
+
+    def test_get_next_datetime_with_weekdays(self):
+        cron_expression = CronExpression('30 9 * * 1-5')
+        actual_datetime = cron_expression.get_next_datetime(datetime.datetime(1988, 4, 8, 10, 0))
+        self.assertEqual(actual_datetime, datetime.datetime(1988, 4, 11, 9, 30))
+        self.assertEqual(CronExpression('0 0 * * 7').get_next_datetime(datetime.datetime(1988, 4, 8)),
+                         datetime.datetime(1988, 4, 10))
+
+    def test_get_next_datetime_with_day_or_weekday(self):
+        cron_expression = CronExpression('0 0 13 * 5')
+        actual_datetime = cron_expression.get_next_datetime(datetime.datetime(1988, 4, 10))
+        self.assertEqual(actual_datetime, datetime.datetime(1988, 4, 13))
+        actual_datetime = cron_expression.get_next_datetime(datetime.datetime(1988, 4, 13))
+        self.assertEqual(actual_datetime, datetime.datetime(1988, 4, 15))
+
+    def test_get_next_datetime_on_leap_day(self):
+        cron_expression = CronExpression('0 12 29 2 *')
+        actual_datetime = cron_expression.get_next_datetime(datetime.datetime(1988, 4, 10))
+        self.assertEqual(actual_datetime, datetime.datetime(1992, 2, 29, 12, 0))
+
+    def test_get_datetimes(self):
+        cron_expression = CronExpression('0 * * * *')
+        actual_datetimes = cron_expression.get_datetimes(datetime.datetime(1988, 4, 10, 11), datetime.datetime(1988, 4, 10, 13, 30))
+        self.assertListEqual(actual_datetimes, [datetime.datetime(1988, 4, 10, 11),
+                                                datetime.datetime(1988, 4, 10, 12),
+                                                datetime.datetime(1988, 4, 10, 13)])
+
+    def test_init_with_invalid_expression(self):
+        for expression in [None, '', '* * * *', '60 * * * *', '* 24 * * *', '* * 0 * *', '* * * 13 *', '* * * * 8',
+                           '5-1 * * * *', '*/0 * * * *', 'a * * * *', '@never', '0 0 30 2 *']:
+            with self.assertRaises(ValueError):
+                CronExpression(expression)
+
+
+if (__name__ == "__main__"):
+    unittest.main()
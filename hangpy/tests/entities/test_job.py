@@ -28,6 +28,14 @@ class TestJob(unittest.TestCase):
         self.assertIsNone(job.start_datetime)
         self.assertIsNone(job.end_datetime)
         self.assertListEqual(job.parameters, [])
+        self.assertEqual(job.priority, 0)
+        self.assertEqual(job.queue, 'default')
+        self.assertListEqual(job.attempts, [])
+        self.assertIsNone(job.timeout_seconds)
+
+    def test_init_with_priority(self):
+        job = Job('module1', 'class2', priority=-1000)
+        self.assertEqual(job.priority, -1000)
 
     def test_init_with_invalid_module_name(self):
         with self.assertRaises(ValueError):
@@ -53,6 +61,44 @@ class TestJob(unittest.TestCase):
         with self.assertRaises(ValueError):
             Job('module1', 'class2', range(10))
 
+    def test_init_with_invalid_priority(self):
+        with self.assertRaises(ValueError):
+            Job('module1', 'class2', priority=1.5)
+
+        with self.assertRaises(ValueError):
+            Job('module1', 'class2', priority=None)
+
+        with self.assertRaises(ValueError):
+            Job('module1', 'class2', priority=1001)
+
+        with self.assertRaises(ValueError):
+            Job('module1', 'class2', priority=-1001)
+
+    def test_init_with_queue(self):
+        job = Job('module1', 'class2', queue='reports')
+        self.assertEqual(job.queue, 'reports')
+
+    def test_init_with_invalid_queue(self):
+        with self.assertRaises(ValueError):
+            Job('module1', 'class2', queue='')
+
+        with self.assertRaises(ValueError):
+            Job('module1', 'class2', queue=None)
+
+    def test_init_with_timeout_seconds(self):
+        self.assertEqual(Job('module1', 'class2', timeout_seconds=30).timeout_seconds, 30)
+        self.assertEqual(Job('module1', 'class2', timeout_seconds=0.5).timeout_seconds, 0.5)
+
+    def test_init_with_invalid_timeout_seconds(self):
+        with self.assertRaises(ValueError):
+            Job('module1', 'class2', timeout_seconds=0)
+
+        with self.assertRaises(ValueError):
+            Job('module1', 'class2', timeout_seconds='30')
+
+        with self.assertRaises(ValueError):
+            Job('module1', 'class2', timeout_seconds=True)
+
 
 if (__name__ == "__main__"):
     unittest.main()
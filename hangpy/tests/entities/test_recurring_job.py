@@ -0,0 +1,43 @@
+import unittest
+from freezegun import freeze_time
+from hangpy.entities import Job, RecurringJob
+from hangpy.enums import CatchUpPolicy
+
+
+class TestRecurringJob(unittest.TestCase):
+
+    @freeze_time('1988-04-10 11:01:02')
+    def test_init(self):
+        job = Job('module1', 'class2', ['param3'])
+        recurring_job = RecurringJob('nightly', job, '@daily')
+        self.assertEqual(recurring_job.name, 'nightly')
+        self.assertEqual(recurring_job.job, job)
+        self.assertEqual(recurring_job.cron, '@daily')
+        self.assertEqual(recurring_job.catch_up, CatchUpPolicy.LATEST)
+        self.assertEqual(recurring_job.next_run_datetime, '1988-04-11T00:00:00')
+        self.assertIsNone(recurring_job.last_run_datetime)
+
+    def test_init_with_catch_up(self):
+        recurring_job = RecurringJob('nightly', Job('module1', 'class2'), '@daily', CatchUpPolicy.ALL)
+        self.assertEqual(recurring_job.catch_up, CatchUpPolicy.ALL)
+
+    def test_init_with_invalid_values(self):
+        job = Job('module1', 'class2')
+        with self.assertRaises(ValueError):
+            RecurringJob('', job, '@daily')
+
+        with self.assertRaises(ValueError):
+            RecurringJob(None, job, '@daily')
+
+        with self.assertRaises(ValueError):
+            RecurringJob('nightly', None, '@daily')
+
+        with self.assertRaises(ValueError):
+            RecurringJob('nightly', job, 'nightly')
+
+        with self.assertRaises(ValueError):
+            RecurringJob('nightly', job, '@daily', 'ALL')
+
+
+if (__name__ == "__main__"):
+    unittest.main()
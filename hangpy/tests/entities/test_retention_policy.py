@@ -0,0 +1,33 @@
+import unittest
+from hangpy.entities import RetentionPolicy
+
+
+class TestRetentionPolicy(unittest.TestCase):
+
+    def test_init(self):
+        retention_policy = RetentionPolicy(max_age_seconds=86400)
+        self.assertEqual(retention_policy.max_age_seconds, 86400)
+        self.assertIsNone(retention_policy.max_count)
+        retention_policy = RetentionPolicy(max_count=0)
+        self.assertIsNone(retention_policy.max_age_seconds)
+        self.assertEqual(retention_policy.max_count, 0)
+
+    def test_init_with_invalid_values(self):
+        with self.assertRaises(ValueError):
+            RetentionPolicy()
+
+        with self.assertRaises(ValueError):
+            RetentionPolicy(max_age_seconds=-1)
+
+        with self.assertRaises(ValueError):
+            RetentionPolicy(max_age_seconds='10')
+
+        with self.assertRaises(ValueError):
+            RetentionPolicy(max_count=1.5)
+
+        with self.assertRaises(ValueError):
+            RetentionPolicy(max_count=-1)
+
+
+if (__name__ == "__main__"):
+    unittest.main()
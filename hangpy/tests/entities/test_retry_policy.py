@@ -0,0 +1,49 @@
+import unittest
+from hangpy.entities import RetryPolicy
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def test_init(self):
+        retry_policy = RetryPolicy()
+        self.assertEqual(retry_policy.max_attempts, 3)
+        self.assertEqual(retry_policy.base_delay_seconds, 1)
+        self.assertEqual(retry_policy.max_delay_seconds, 3600)
+        self.assertTrue(retry_policy.jitter)
+
+    def test_init_with_invalid_values(self):
+        with self.assertRaises(ValueError):
+            RetryPolicy(max_attempts=0)
+
+        with self.assertRaises(ValueError):
+            RetryPolicy(max_attempts=2.5)
+
+        with self.assertRaises(ValueError):
+            RetryPolicy(base_delay_seconds=-1)
+
+        with self.assertRaises(ValueError):
+            RetryPolicy(max_delay_seconds='10')
+
+        with self.assertRaises(ValueError):
+            RetryPolicy(jitter=None)
+
+    def test_can_retry(self):
+        retry_policy = RetryPolicy(max_attempts=3)
+        self.assertTrue(retry_policy.can_retry(1))
+        self.assertTrue(retry_policy.can_retry(2))
+        self.assertFalse(retry_policy.can_retry(3))
+
+    def test_get_delay_seconds(self):
+        retry_policy = RetryPolicy(max_attempts=10, base_delay_seconds=2, max_delay_seconds=30, jitter=False)
+        self.assertListEqual([retry_policy.get_delay_seconds(attempts) for attempts in range(1, 6)], [2, 4, 8, 16, 30])
+        self.assertEqual(retry_policy.get_delay_seconds(1000), 30)
+
+    def test_get_delay_seconds_with_jitter(self):
+        retry_policy = RetryPolicy(base_delay_seconds=10)
+        delays = [retry_policy.get_delay_seconds(2) for _ in range(100)]
+        self.assertTrue(all(10 <= delay <= 20 for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+
+if (__name__ == "__main__"):
+    unittest.main()
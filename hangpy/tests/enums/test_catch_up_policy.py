@@ -0,0 +1,14 @@
+import unittest
+from hangpy.enums import CatchUpPolicy
+
+
+class TestCatchUpPolicy(unittest.TestCase):
+
+    def test_enum_values(self):
+        self.assertEqual(CatchUpPolicy.ALL.value, 0)
+        self.assertEqual(CatchUpPolicy.LATEST.value, 1)
+        self.assertEqual(CatchUpPolicy.NONE.value, 2)
+
+
+if (__name__ == "__main__"):
+    unittest.main()
@@ -6,8 +6,10 @@ class TestJobStatus(unittest.TestCase):
 
     def test_enum_values(self):
         self.assertEqual(JobStatus.ENQUEUED.value, 0)
+        self.assertEqual(JobStatus.SCHEDULED.value, 5)
         self.assertEqual(JobStatus.PROCESSING.value, 10)
         self.assertEqual(JobStatus.SUCCESS.value, 20)
+        self.assertEqual(JobStatus.CANCELLED.value, 30)
         self.assertEqual(JobStatus.ERROR.value, 99)
 
 
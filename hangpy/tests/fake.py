@@ -1,6 +1,74 @@
+import asyncio
+import fakeredis
+import redis
+import time
 from hangpy.services import JobActivityBase
+from redis.cluster import RedisCluster
 
 
 class FakeJobActivity(JobActivityBase):
     def action(self):
         pass
+
+
+class FakeAsyncJobActivity(JobActivityBase):
+    async def action(self):
+        await asyncio.sleep(0)
+
+
+class FakeErrorJobActivity(JobActivityBase):
+    def action(self):
+        raise Exception('some exception message')
+
+
+class FakeHungJobActivity(JobActivityBase):
+    sleep_seconds = 10
+
+    def action(self):
+        time.sleep(self.sleep_seconds)
+
+
+class FakeHungAsyncJobActivity(JobActivityBase):
+    async def action(self):
+        await asyncio.sleep(10)
+
+
+class FakeCancellableJobActivity(JobActivityBase):
+    def action(self):
+        self.get_cancellation_token().wait(10)
+
+
+class FakeRedisClusterConnection(fakeredis.FakeRedisConnection):
+    """Connection to a fake Redis server that answers 'CLUSTER SLOTS' as the
+    only node of a cluster, so a RedisCluster client can use it."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cluster_slots_requested = False
+
+    def send_command(self, *args, **kwargs):
+        if (args[:1] == ('CLUSTER SLOTS',)):
+            self.cluster_slots_requested = True
+            return
+        super().send_command(*args, **kwargs)
+
+    def read_response(self, *args, **kwargs):
+        if (self.cluster_slots_requested):
+            self.cluster_slots_requested = False
+            return [[0, 16383, [self.host.encode(), self.port, b'fake-node']]]
+        return super().read_response(*args, **kwargs)
+
+
+def create_fake_redis_cluster(server: fakeredis.FakeServer = None) -> RedisCluster:
+    """Returns a RedisCluster client of a single node served by a fake Redis
+    server. The client routes the commands by their slots and checks that
+    the keys of each transaction and script share a slot, like on a real
+    cluster."""
+
+    server = server or fakeredis.FakeServer()
+
+    class FakeRedisClusterConnectionPool(redis.ConnectionPool):
+        def __init__(self, **kwargs):
+            super().__init__(connection_class=FakeRedisClusterConnection, server=server, **kwargs)
+
+    return RedisCluster.from_url('redis://127.0.0.1:7000', connection_pool_class=FakeRedisClusterConnectionPool)
@@ -0,0 +1,179 @@
+import jsonpickle
+import unittest
+from freezegun import freeze_time
+from hangpy.dtos import ServerConfigurationDto
+from hangpy.entities import Job, Server
+from hangpy.enums import JobStatus
+from hangpy.repositories import CompactEntryCodec
+from hangpy.repositories.compact_entry_codec import JOB_RECORD, RecordReader, RecordWriter, SERVER_RECORD
+
+
+class TestCompactEntryCodec(unittest.TestCase):
+
+    def setUp(self):
+        self.entry_codec = CompactEntryCodec()
+
+    def encode_and_decode(self, entry):
+        return self.entry_codec.decode(self.entry_codec.encode(entry))
+
+    @freeze_time('1988-04-10 11:01:02.123456')
+    def test_encode_and_decode_job(self):
+        job = Job('some_module', 'SomeClass', ['luiz', 'fernando'])
+        job.status = JobStatus.ERROR
+        job.error = 'some error'
+        job.start_datetime = '1988-04-10T11:01:02'
+        job.end_datetime = '1988-04-10T11:01:03.000001'
+        actual_job = self.encode_and_decode(job)
+        self.assertIsInstance(actual_job, Job)
+        self.assertDictEqual(vars(actual_job), vars(job))
+
+    def test_encode_and_decode_job_with_priority_and_queue(self):
+        job = Job('some_module', 'SomeClass', priority=-1000, queue='reports')
+        actual_job = self.encode_and_decode(job)
+        self.assertEqual(actual_job.priority, -1000)
+        self.assertEqual(actual_job.queue, 'reports')
+        self.assertNotIn(b'priority', self.entry_codec.encode(job))
+
+    def test_decode_job_version_2(self):
+        writer = RecordWriter(JOB_RECORD)
+        writer.buffer[1] = 2
+        for value in ['ABCDE', 'some_module', 'SomeClass']:
+            writer.write_string(value)
+        writer.write_unsigned(JobStatus.ENQUEUED.value)
+        writer.write_optional_string(None)
+        for value in ['1988-04-10T11:01:02', None, None]:
+            writer.write_datetime(value)
+        writer.write_parameters(['luiz'])
+        writer.write_byte(0)
+        actual_job = self.entry_codec.decode(writer.get_bytes())
+        self.assertEqual(actual_job.id, 'ABCDE')
+        self.assertListEqual(actual_job.parameters, ['luiz'])
+        self.assertEqual(actual_job.priority, 0)
+        self.assertEqual(actual_job.queue, 'default')
+        self.assertListEqual(actual_job.attempts, [])
+        self.assertIsNone(actual_job.timeout_seconds)
+
+    def test_encode_and_decode_job_with_attempts(self):
+        job = Job('some_module', 'SomeClass')
+        job.attempts.append({'start_datetime': '1988-04-10T11:01:02', 'end_datetime': '1988-04-10T11:01:03', 'error': 'some error'})
+        job.attempts.append({'start_datetime': '1988-04-10T11:02:02', 'end_datetime': None, 'error': None})
+        self.assertListEqual(self.encode_and_decode(job).attempts, job.attempts)
+        self.assertNotIn(b'start_datetime', self.entry_codec.encode(job))
+
+        job.attempts.append({'start_datetime': None, 'end_datetime': None, 'error': None, 'server': 'A'})
+        self.assertListEqual(self.encode_and_decode(job).attempts, job.attempts)
+
+    def test_encode_and_decode_job_with_timeout_seconds(self):
+        for timeout_seconds in [None, 30, 0.25]:
+            job = Job('some_module', 'SomeClass', timeout_seconds=timeout_seconds)
+            actual_timeout_seconds = self.encode_and_decode(job).timeout_seconds
+            self.assertEqual(actual_timeout_seconds, timeout_seconds)
+            self.assertIs(type(actual_timeout_seconds), type(timeout_seconds))
+
+    def test_write_and_read_signed(self):
+        writer = RecordWriter(JOB_RECORD)
+        values = [0, 1, -1, 63, -64, 1000, -1000, 2 ** 40, -2 ** 40]
+        for value in values:
+            writer.write_signed(value)
+        reader = RecordReader(writer.get_bytes())
+        reader.position = 3
+        self.assertListEqual([reader.read_signed() for _ in values], values)
+
+    def test_encode_and_decode_job_with_unset_values(self):
+        job = Job('some_module', 'SomeClass')
+        actual_job = self.encode_and_decode(job)
+        self.assertDictEqual(vars(actual_job), vars(job))
+
+    def test_encode_and_decode_job_with_parameters_not_strings(self):
+        job = Job('some_module', 'SomeClass', ['luiz', 1, {'key': [1.5, None]}])
+        actual_job = self.encode_and_decode(job)
+        self.assertListEqual(actual_job.parameters, job.parameters)
+
+    def test_encode_and_decode_job_with_datetimes_kept_as_text(self):
+        job = Job('some_module', 'SomeClass')
+        job.start_datetime = '1988-04-10T11:01:02+03:00'
+        job.end_datetime = 'some datetime'
+        actual_job = self.encode_and_decode(job)
+        self.assertEqual(actual_job.start_datetime, job.start_datetime)
+        self.assertEqual(actual_job.end_datetime, job.end_datetime)
+
+    def test_encode_and_decode_job_with_extra_attributes(self):
+        job = Job('some_module', 'SomeClass')
+        job.test_sequence = 1
+        actual_job = self.encode_and_decode(job)
+        self.assertEqual(actual_job.test_sequence, 1)
+
+    def test_encode_job_is_smaller_than_jsonpickle(self):
+        job = Job('some_module', 'SomeClass', ['luiz', 'fernando'])
+        self.assertLess(len(self.entry_codec.encode(job)), len(jsonpickle.encode(job)) / 2)
+
+    @freeze_time('1988-04-10 11:01:02.123456')
+    def test_encode_and_decode_server(self):
+        server = Server(ServerConfigurationDto(slots=5, batch_claim=True))
+        server.start_datetime = '1988-04-10T11:01:02.123456'
+        server.last_heartbeat_datetime = '1988-04-10T11:01:03'
+        server.used_slots = 3
+        server.used_async_slots = 200
+        actual_server = self.encode_and_decode(server)
+        self.assertIsInstance(actual_server, Server)
+        self.assertEqual(actual_server.id, server.id)
+        self.assertEqual(actual_server.start_datetime, server.start_datetime)
+        self.assertIsNone(actual_server.stop_datetime)
+        self.assertEqual(actual_server.last_heartbeat_datetime, server.last_heartbeat_datetime)
+        self.assertEqual(actual_server.used_slots, 3)
+        self.assertEqual(actual_server.used_async_slots, 200)
+        self.assertIsInstance(actual_server.configuration, ServerConfigurationDto)
+        self.assertDictEqual(vars(actual_server.configuration), vars(server.configuration))
+
+    def test_decode_server_version_1(self):
+        writer = RecordWriter(SERVER_RECORD)
+        writer.buffer[1] = 1
+        writer.write_string('ABCDE')
+        writer.write_datetime('1988-04-10T11:01:02')
+        writer.write_datetime(None)
+        writer.write_datetime(None)
+        writer.write_optional_string(None)
+        writer.write_byte(0)
+        actual_server = self.entry_codec.decode(writer.get_bytes())
+        self.assertEqual(actual_server.id, 'ABCDE')
+        self.assertEqual(actual_server.start_datetime, '1988-04-10T11:01:02')
+        self.assertIsNone(actual_server.last_heartbeat_datetime)
+        self.assertEqual(actual_server.used_slots, 0)
+        self.assertEqual(actual_server.used_async_slots, 0)
+
+    def test_encode_and_decode_server_without_configuration(self):
+        server = Server(None)
+        actual_server = self.encode_and_decode(server)
+        self.assertIsNone(actual_server.configuration)
+
+    def test_decode_legacy_entry(self):
+        job = Job('some_module', 'SomeClass', ['luiz'])
+        actual_job = self.entry_codec.decode(jsonpickle.encode(job).encode())
+        self.assertDictEqual(vars(actual_job), vars(job))
+
+    def test_encode_and_decode_other_entries(self):
+        entry = {'key': 'value'}
+        serialized_entry = self.entry_codec.encode(entry)
+        self.assertFalse(self.entry_codec.is_compact_record(serialized_entry))
+        self.assertDictEqual(self.entry_codec.decode(serialized_entry), entry)
+
+    def test_is_compact_record(self):
+        self.assertTrue(self.entry_codec.is_compact_record(self.entry_codec.encode(Job('some_module', 'SomeClass'))))
+        self.assertFalse(self.entry_codec.is_compact_record(b'{"py/object": "hangpy.entities.job.Job"}'))
+        self.assertFalse(self.entry_codec.is_compact_record('{"py/object": "hangpy.entities.job.Job"}'))
+
+    def test_decode_unsupported_version(self):
+        serialized_job = bytearray(self.entry_codec.encode(Job('some_module', 'SomeClass')))
+        serialized_job[1] = 255
+        with self.assertRaises(ValueError):
+            self.entry_codec.decode(bytes(serialized_job))
+
+    def test_decode_unsupported_record_type(self):
+        serialized_job = bytearray(self.entry_codec.encode(Job('some_module', 'SomeClass')))
+        serialized_job[2] = 255
+        with self.assertRaises(ValueError):
+            self.entry_codec.decode(bytes(serialized_job))
+
+
+if (__name__ == "__main__"):
+    unittest.main()
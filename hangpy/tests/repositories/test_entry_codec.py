@@ -0,0 +1,23 @@
+import unittest
+from hangpy.repositories import EntryCodec
+
+
+class TestEntryCodec(unittest.TestCase):
+
+    def test_instantiate(self):
+        entry_codec = FakeEntryCodec()
+        self.assertIsNone(entry_codec.encode(None))
+        self.assertIsNone(entry_codec.decode(None))
+
+
+class FakeEntryCodec(EntryCodec):
+
+    def encode(self, entry):
+        return EntryCodec.encode(self, entry)
+
+    def decode(self, serialized_entry):
+        return EntryCodec.decode(self, serialized_entry)
+
+
+if (__name__ == "__main__"):
+    unittest.main()
@@ -0,0 +1,49 @@
+import gzip
+import os
+import tempfile
+import unittest
+from freezegun import freeze_time
+from hangpy.entities import Job
+from hangpy.enums import JobStatus
+from hangpy.repositories import GzipFileJobArchive
+
+
+class TestGzipFileJobArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.temporary_directory.name, 'archive')
+        self.job_archive = GzipFileJobArchive(self.directory)
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_init(self):
+        self.assertTrue(os.path.isdir(self.directory))
+        GzipFileJobArchive(self.directory)
+
+    @freeze_time('1988-04-10 11:01:02')
+    def test_archive_jobs(self):
+        jobs = [Job('some_module', 'SomeClass', ['A']), Job('some_module', 'SomeClass', ['B'])]
+        jobs[1].status = JobStatus.ERROR
+        jobs[1].error = 'Some error'
+        self.job_archive.archive_jobs(jobs)
+        self.job_archive.archive_jobs([])
+        file_names = os.listdir(self.directory)
+        self.assertEqual(len(file_names), 1)
+        self.assertTrue(file_names[0].startswith('jobs-19880410T110102-'))
+        self.assertTrue(file_names[0].endswith('.jsonl.gz'))
+        file_path = os.path.join(self.directory, file_names[0])
+        with gzip.open(file_path, 'rt') as archive_file:
+            self.assertEqual(len(archive_file.readlines()), 2)
+        actual_jobs = self.job_archive.read_jobs(file_path)
+        self.assertListEqual([vars(job) for job in actual_jobs], [vars(job) for job in jobs])
+
+    def test_archive_jobs_on_separate_files(self):
+        self.job_archive.archive_jobs([Job('some_module', 'SomeClass')])
+        self.job_archive.archive_jobs([Job('some_module', 'SomeClass')])
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+
+
+if (__name__ == "__main__"):
+    unittest.main()
@@ -0,0 +1,250 @@
+import datetime
+import threading
+import unittest
+import hangpy.tests.fake as fake
+from freezegun import freeze_time
+from hangpy.enums import JobStatus
+from hangpy.repositories import InMemoryJobRepository
+
+
+class TestInMemoryJobRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.job_repository = InMemoryJobRepository()
+
+    def create_fake_job(self, status: JobStatus = JobStatus.ENQUEUED, priority: int = 0, queue: str = 'default'):
+        job = fake.FakeJobActivity().create_job_object(priority=priority, queue=queue)
+        job.status = status
+        return job
+
+    def test_add_and_get_jobs(self):
+        job = self.create_fake_job()
+        self.job_repository.add_job(job)
+        actual_job = self.job_repository.get_jobs()[0]
+        self.assertIsNot(actual_job, job)
+        self.assertEqual(actual_job.id, job.id)
+        self.assertListEqual(actual_job.parameters, job.parameters)
+        job.status = JobStatus.SUCCESS
+        job.parameters.append('changed')
+        self.assertEqual(self.job_repository.get_jobs()[0].status, JobStatus.ENQUEUED)
+        self.assertListEqual(self.job_repository.get_jobs()[0].parameters, actual_job.parameters)
+
+    def test_get_job_by_status(self):
+        self.assertIsNone(self.job_repository.get_job_by_status(JobStatus.ENQUEUED))
+        self.assertIsNone(self.job_repository.get_job_by_status(JobStatus.SUCCESS))
+        jobs = [self.create_fake_job(queue='reports'), self.create_fake_job(priority=10), self.create_fake_job(JobStatus.SUCCESS)]
+        self.job_repository.add_jobs(jobs)
+        self.assertEqual(self.job_repository.get_job_by_status(JobStatus.ENQUEUED).id, jobs[1].id)
+        self.assertEqual(self.job_repository.get_job_by_status(JobStatus.SUCCESS).id, jobs[2].id)
+        self.assertListEqual([job.id for job in self.job_repository.get_jobs_by_status(JobStatus.ENQUEUED)], [jobs[0].id, jobs[1].id])
+
+    def test_counts(self):
+        jobs = [self.create_fake_job(), self.create_fake_job(queue='reports'), self.create_fake_job(priority=5, queue='reports'),
+                self.create_fake_job(JobStatus.ERROR)]
+        self.job_repository.add_jobs(jobs)
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.ENQUEUED), 3)
+        self.assertEqual(self.job_repository.count_enqueued_jobs(['reports', 'missing']), 2)
+        self.assertTrue(self.job_repository.exists_jobs_with_status(JobStatus.ERROR))
+        self.assertFalse(self.job_repository.exists_jobs_with_status(JobStatus.SUCCESS))
+        expected_counts = {**dict.fromkeys(JobStatus, 0), JobStatus.ENQUEUED: 3, JobStatus.ERROR: 1}
+        self.assertDictEqual(self.job_repository.get_status_counts(), expected_counts)
+
+    def test_update_job(self):
+        job = self.create_fake_job()
+        self.job_repository.add_job(job)
+        job.status = JobStatus.SUCCESS
+        self.job_repository.update_job(job)
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.ENQUEUED), 0)
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.SUCCESS), 1)
+        job.status = JobStatus.ENQUEUED
+        job.queue = 'reports'
+        self.job_repository.update_jobs([job])
+        self.assertEqual(self.job_repository.count_enqueued_jobs(['reports']), 1)
+        self.assertEqual(len(self.job_repository.get_jobs()), 1)
+
+    def test_try_set_lock_on_job(self):
+        job = self.create_fake_job()
+        with freeze_time('1988-04-10 11:01:02'):
+            self.assertTrue(self.job_repository.try_set_lock_on_job(job, 1000))
+            self.assertFalse(self.job_repository.try_set_lock_on_job(job, 1000))
+        with freeze_time('1988-04-10 11:01:04'):
+            self.assertTrue(self.job_repository.try_set_lock_on_job(job, 1000))
+
+    @freeze_time('1988-04-10 11:01:02')
+    def test_claim_jobs(self):
+        self.assertIsNone(self.job_repository.claim_job())
+        jobs = [self.create_fake_job(), self.create_fake_job(priority=1), self.create_fake_job(queue='reports'), self.create_fake_job()]
+        self.job_repository.add_jobs(jobs)
+        claimed_job = self.job_repository.claim_job()
+        self.assertEqual(claimed_job.id, jobs[1].id)
+        self.assertEqual(claimed_job.status, JobStatus.PROCESSING)
+        self.assertEqual(claimed_job.start_datetime, '1988-04-10T11:01:02')
+        self.assertFalse(self.job_repository.try_set_lock_on_job(claimed_job))
+        claimed_jobs = self.job_repository.claim_jobs(5, queues=['reports', 'default'])
+        self.assertListEqual([job.id for job in claimed_jobs], [jobs[2].id, jobs[0].id, jobs[3].id])
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.PROCESSING), 4)
+        self.assertListEqual(self.job_repository.claim_jobs(5), [])
+
+    def test_claim_jobs_concurrently(self):
+        self.job_repository.add_jobs([self.create_fake_job() for _ in range(1000)])
+        claimed_job_ids = []
+
+        def claim_jobs():
+            while (True):
+                job = self.job_repository.claim_job()
+                if (job is None):
+                    return
+                claimed_job_ids.append(job.id)
+
+        threads = [threading.Thread(target=claim_jobs) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(claimed_job_ids), 1000)
+        self.assertEqual(len(set(claimed_job_ids)), 1000)
+
+    def test_renew_and_reclaim_expired_jobs(self):
+        self.job_repository.add_jobs([self.create_fake_job(), self.create_fake_job()])
+        with freeze_time('1988-04-10 11:01:02'):
+            claimed_jobs = self.job_repository.claim_jobs(2, lease_milliseconds=1000)
+        with freeze_time('1988-04-10 11:01:02.500'):
+            self.assertListEqual(self.job_repository.renew_job_leases(claimed_jobs[:1], 5000), [])
+        with freeze_time('1988-04-10 11:01:04'):
+            self.assertListEqual(self.job_repository.reclaim_expired_jobs(), [claimed_jobs[1].id])
+            self.assertListEqual(self.job_repository.reclaim_expired_jobs(), [])
+            self.assertListEqual(self.job_repository.renew_job_leases(claimed_jobs), [claimed_jobs[1]])
+        reclaimed_job = self.job_repository.get_job_by_status(JobStatus.ENQUEUED)
+        self.assertEqual(reclaimed_job.id, claimed_jobs[1].id)
+        self.assertIsNone(reclaimed_job.start_datetime)
+
+    def test_update_job_finished_releases_lease(self):
+        self.job_repository.add_job(self.create_fake_job())
+        with freeze_time('1988-04-10 11:01:02'):
+            claimed_job = self.job_repository.claim_job(1000)
+        claimed_job.status = JobStatus.SUCCESS
+        self.job_repository.update_job(claimed_job)
+        self.assertTrue(self.job_repository.try_set_lock_on_job(claimed_job))
+        with freeze_time('1988-04-10 11:01:04'):
+            self.assertListEqual(self.job_repository.reclaim_expired_jobs(), [])
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.SUCCESS), 1)
+
+    def test_update_job_released_keeps_its_place(self):
+        jobs = [self.create_fake_job() for _ in range(4)]
+        for index, job in enumerate(jobs):
+            job.enqueued_datetime = f'1988-04-10T11:01:0{index}'
+        self.job_repository.add_jobs(jobs[:3])
+        claimed_jobs = self.job_repository.claim_jobs(2)
+        self.job_repository.add_job(jobs[3])
+        for job in claimed_jobs:
+            job.status = JobStatus.ENQUEUED
+            job.start_datetime = None
+        self.job_repository.update_jobs(claimed_jobs[::-1])
+        self.assertListEqual([job.id for job in self.job_repository.claim_jobs(4)], [job.id for job in jobs])
+
+    def test_promote_scheduled_jobs(self):
+        jobs = [self.create_fake_job(JobStatus.SCHEDULED) for _ in range(3)]
+        jobs[0].enqueued_datetime = '1988-04-10T11:00:00'
+        jobs[1].enqueued_datetime = '1988-04-10T10:00:00'
+        jobs[2].enqueued_datetime = '1988-04-10T13:00:00'
+        self.job_repository.add_jobs(jobs)
+        jobs[0].enqueued_datetime = '1988-04-10T12:30:00'
+        self.job_repository.update_job(jobs[0])
+        with freeze_time('1988-04-10 12:00:00'):
+            self.assertListEqual(self.job_repository.promote_scheduled_jobs(), [jobs[1].id])
+        with freeze_time('1988-04-10 14:00:00'):
+            self.assertListEqual(self.job_repository.promote_scheduled_jobs(limit=1), [jobs[0].id])
+            self.assertListEqual(self.job_repository.promote_scheduled_jobs(), [jobs[2].id])
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.ENQUEUED), 3)
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.SCHEDULED), 0)
+
+    @freeze_time('1988-04-10 11:01:02')
+    def test_cancel_job(self):
+        jobs = [self.create_fake_job(), self.create_fake_job(JobStatus.SCHEDULED), self.create_fake_job(),
+                self.create_fake_job(JobStatus.SUCCESS)]
+        jobs[1].enqueued_datetime = '1988-04-10T11:00:00'
+        self.job_repository.add_jobs(jobs)
+        self.assertTrue(self.job_repository.cancel_job(jobs[0].id))
+        self.assertTrue(self.job_repository.cancel_job(jobs[1].id))
+        self.assertListEqual(self.job_repository.promote_scheduled_jobs(), [])
+        claimed_job = self.job_repository.claim_job()
+        self.assertEqual(claimed_job.id, jobs[2].id)
+        self.assertTrue(self.job_repository.cancel_job(claimed_job.id))
+        self.assertFalse(self.job_repository.cancel_job(jobs[3].id))
+        self.assertFalse(self.job_repository.cancel_job('missing'))
+        self.assertListEqual(self.job_repository.get_cancelled_job_ids([jobs[0].id, claimed_job.id]), [claimed_job.id])
+        cancelled_job = self.job_repository.get_job_by_status(JobStatus.CANCELLED)
+        self.assertEqual(cancelled_job.error, 'The job was cancelled')
+        self.assertEqual(cancelled_job.end_datetime, '1988-04-10T11:01:02')
+        claimed_job.status = JobStatus.CANCELLED
+        self.job_repository.update_job(claimed_job)
+        self.assertListEqual(self.job_repository.get_cancelled_job_ids([claimed_job.id]), [])
+
+    def test_reclaim_expired_jobs_cancelled(self):
+        self.job_repository.add_job(self.create_fake_job())
+        with freeze_time('1988-04-10 11:01:02'):
+            claimed_job = self.job_repository.claim_job(1000)
+        self.job_repository.cancel_job(claimed_job.id)
+        with freeze_time('1988-04-10 11:01:04'):
+            self.assertListEqual(self.job_repository.reclaim_expired_jobs(), [])
+        self.assertEqual(self.job_repository.get_job_by_status(JobStatus.CANCELLED).end_datetime, '1988-04-10T11:01:04')
+
+    def test_dead_letter_jobs(self):
+        jobs = [self.create_fake_job(JobStatus.ERROR) for _ in range(3)]
+        self.job_repository.add_jobs(jobs)
+        self.job_repository.move_jobs_to_dead_letter(jobs[:2])
+        self.assertEqual(self.job_repository.count_dead_letter_jobs(), 2)
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.ERROR), 1)
+        self.assertListEqual([job.id for job in self.job_repository.get_dead_letter_jobs(1)], [jobs[0].id])
+        self.assertListEqual(self.job_repository.get_dead_letter_jobs(0), [])
+        requeued_job = self.job_repository.requeue_dead_letter_job(jobs[1].id)
+        self.assertEqual(requeued_job.status, JobStatus.ENQUEUED)
+        self.assertIsNone(requeued_job.error)
+        self.assertIsNone(self.job_repository.requeue_dead_letter_job(jobs[1].id))
+        self.assertEqual(self.job_repository.claim_job().id, jobs[1].id)
+        self.assertEqual(self.job_repository.count_dead_letter_jobs(), 1)
+
+    @freeze_time('1988-04-10 12:00:00')
+    def test_claim_expired_jobs(self):
+        jobs = [self.create_fake_job(JobStatus.SUCCESS) for _ in range(4)]
+        for job, end_datetime in zip(jobs, ['1988-04-10T10:00:00', '1988-04-10T10:30:00', '1988-04-10T11:30:00', '1988-04-10T11:50:00']):
+            job.end_datetime = end_datetime
+        self.job_repository.add_jobs(jobs)
+        claimed_jobs = self.job_repository.claim_expired_jobs(JobStatus.SUCCESS, max_age_seconds=3600, limit=1)
+        self.assertListEqual([job.id for job in claimed_jobs], [jobs[0].id])
+        claimed_jobs += self.job_repository.claim_expired_jobs(JobStatus.SUCCESS, max_age_seconds=3600, max_count=2)
+        self.assertListEqual([job.id for job in claimed_jobs], [jobs[0].id, jobs[1].id])
+        self.assertListEqual(self.job_repository.claim_expired_jobs(JobStatus.SUCCESS, max_age_seconds=3600, max_count=2), [])
+        self.job_repository.delete_jobs(claimed_jobs)
+        self.assertListEqual([job.id for job in self.job_repository.get_jobs()], [jobs[2].id, jobs[3].id])
+
+    def test_claim_expired_jobs_after_claim_expired(self):
+        job = self.create_fake_job(JobStatus.SUCCESS)
+        job.end_datetime = '1988-04-10T10:00:00'
+        self.job_repository.add_job(job)
+        with freeze_time('1988-04-10 12:00:00'):
+            self.assertEqual(len(self.job_repository.claim_expired_jobs(JobStatus.SUCCESS, max_count=0, lease_milliseconds=1000)), 1)
+            self.assertListEqual(self.job_repository.get_jobs(), [])
+        with freeze_time('1988-04-10 12:00:02'):
+            claimed_jobs = self.job_repository.claim_expired_jobs(JobStatus.ERROR, max_count=0)
+        self.assertListEqual([claimed_job.id for claimed_job in claimed_jobs], [job.id])
+
+    def test_wait_for_enqueued_jobs(self):
+        self.assertFalse(self.job_repository.wait_for_enqueued_jobs(0.01))
+        timer = threading.Timer(0.05, self.job_repository.add_job, [self.create_fake_job(queue='reports')])
+        timer.start()
+        self.assertTrue(self.job_repository.wait_for_enqueued_jobs(5, ['default', 'reports']))
+        timer.join()
+        self.assertFalse(self.job_repository.wait_for_enqueued_jobs(0.01, ['reports']))
+
+    def test_wait_for_enqueued_jobs_on_other_queue(self):
+        timer = threading.Timer(0.05, self.job_repository.add_job, [self.create_fake_job(queue='reports')])
+        timer.start()
+        started = datetime.datetime.now()
+        self.assertFalse(self.job_repository.wait_for_enqueued_jobs(0.2))
+        self.assertGreaterEqual((datetime.datetime.now() - started).total_seconds(), 0.2)
+        timer.join()
+
+
+if (__name__ == "__main__"):
+    unittest.main()
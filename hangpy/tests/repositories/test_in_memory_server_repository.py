@@ -0,0 +1,59 @@
+import datetime
+import unittest
+from freezegun import freeze_time
+from hangpy.dtos import ServerConfigurationDto
+from hangpy.entities.server import Server
+from hangpy.repositories import InMemoryServerRepository
+
+
+class TestInMemoryServerRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.server_repository = InMemoryServerRepository()
+        self.fake_server = Server(ServerConfigurationDto())
+
+    def test_add_and_get_servers(self):
+        self.server_repository.add_server(self.fake_server)
+        actual_server = self.server_repository.get_servers()[0]
+        self.assertNotEqual(actual_server, self.fake_server)
+        self.assertEqual(actual_server.id, self.fake_server.id)
+
+    @freeze_time('1988-04-10 11:01:02.123456')
+    def test_update_server(self):
+        self.server_repository.add_server(self.fake_server)
+        self.fake_server.last_cycle_datetime = datetime.datetime.now().isoformat()
+        self.assertIsNone(self.server_repository.get_servers()[0].last_cycle_datetime)
+        self.server_repository.update_server(self.fake_server)
+        actual_server = self.server_repository.get_servers()[0]
+        self.assertEqual(actual_server.last_cycle_datetime, self.fake_server.last_cycle_datetime)
+
+    def test_send_heartbeat_and_get_live_servers(self):
+        self.assertListEqual(self.server_repository.get_live_servers(), [])
+        self.server_repository.add_server(self.fake_server)
+        self.assertListEqual(self.server_repository.get_live_servers(), [])
+        self.fake_server.used_slots = 2
+        self.server_repository.send_heartbeat(self.fake_server, 30000)
+        actual_servers = self.server_repository.get_live_servers()
+        self.assertListEqual([server.id for server in actual_servers], [self.fake_server.id])
+        self.assertEqual(actual_servers[0].used_slots, 2)
+
+    def test_get_live_servers_expired(self):
+        dead_server = Server(ServerConfigurationDto())
+        with freeze_time('1988-04-10 11:01:02'):
+            self.server_repository.send_heartbeat(dead_server, 1000)
+        with freeze_time('1988-04-10 11:01:04'):
+            self.assertListEqual(self.server_repository.get_live_servers(), [])
+            self.server_repository.send_heartbeat(self.fake_server, 1000)
+            self.assertListEqual([server.id for server in self.server_repository.get_live_servers()], [self.fake_server.id])
+            self.assertListEqual([server.id for server in self.server_repository.get_servers()], [self.fake_server.id])
+
+    def test_update_server_stopped(self):
+        self.server_repository.send_heartbeat(self.fake_server, 30000)
+        self.fake_server.stop_datetime = datetime.datetime.now().isoformat()
+        self.server_repository.update_server(self.fake_server)
+        self.assertListEqual(self.server_repository.get_live_servers(), [])
+        self.assertEqual(self.server_repository.get_servers()[0].stop_datetime, self.fake_server.stop_datetime)
+
+
+if (__name__ == "__main__"):
+    unittest.main()
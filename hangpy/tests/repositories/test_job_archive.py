@@ -0,0 +1,19 @@
+import unittest
+from hangpy.repositories import JobArchive
+
+
+class TestJobArchive(unittest.TestCase):
+
+    def test_abstract_methods(self):
+        job_archive = FakeJobArchive()
+        self.assertIsNone(job_archive.archive_jobs(None))
+
+
+class FakeJobArchive(JobArchive):
+
+    def archive_jobs(self, jobs):
+        return JobArchive.archive_jobs(self, jobs)
+
+
+if (__name__ == "__main__"):
+    unittest.main()
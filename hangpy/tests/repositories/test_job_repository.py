@@ -10,10 +10,28 @@ class TestJobRepository(unittest.TestCase):
         self.assertIsNone(job_repository.get_job_by_status(None))
         self.assertIsNone(job_repository.get_jobs_by_status(None))
         self.assertIsNone(job_repository.exists_jobs_with_status(None))
+        self.assertIsNone(job_repository.count_jobs_by_status(None))
+        self.assertIsNone(job_repository.count_enqueued_jobs(None))
+        self.assertIsNone(job_repository.get_status_counts())
         self.assertIsNone(job_repository.add_job(None))
+        self.assertIsNone(job_repository.add_jobs(None))
         self.assertIsNone(job_repository.update_job(None))
         self.assertIsNone(job_repository.update_jobs(None))
         self.assertIsNone(job_repository.try_set_lock_on_job(None))
+        self.assertIsNone(job_repository.claim_job())
+        self.assertIsNone(job_repository.claim_jobs(None))
+        self.assertIsNone(job_repository.renew_job_leases(None))
+        self.assertIsNone(job_repository.reclaim_expired_jobs())
+        self.assertIsNone(job_repository.promote_scheduled_jobs())
+        self.assertIsNone(job_repository.cancel_job(None))
+        self.assertIsNone(job_repository.get_cancelled_job_ids(None))
+        self.assertIsNone(job_repository.move_jobs_to_dead_letter(None))
+        self.assertIsNone(job_repository.get_dead_letter_jobs())
+        self.assertIsNone(job_repository.count_dead_letter_jobs())
+        self.assertIsNone(job_repository.requeue_dead_letter_job(None))
+        self.assertIsNone(job_repository.claim_expired_jobs(None))
+        self.assertIsNone(job_repository.delete_jobs(None))
+        self.assertIsNone(job_repository.wait_for_enqueued_jobs(None))
 
 
 class FakeJobRepository(JobRepository):
@@ -30,17 +48,71 @@ class FakeJobRepository(JobRepository):
     def exists_jobs_with_status(self, status):
         return JobRepository.exists_jobs_with_status(self, status)
 
+    def count_jobs_by_status(self, status):
+        return JobRepository.count_jobs_by_status(self, status)
+
+    def count_enqueued_jobs(self, queues):
+        return JobRepository.count_enqueued_jobs(self, queues)
+
+    def get_status_counts(self):
+        return JobRepository.get_status_counts(self)
+
     def add_job(self, job):
         return JobRepository.add_job(self, job)
 
+    def add_jobs(self, jobs):
+        return JobRepository.add_jobs(self, jobs)
+
     def update_job(self, job):
         return JobRepository.update_job(self, job)
 
     def update_jobs(self, jobs):
         return JobRepository.update_jobs(self, jobs)
 
-    def try_set_lock_on_job(self, job):
-        return JobRepository.try_set_lock_on_job(self, job)
+    def try_set_lock_on_job(self, job, lease_milliseconds=60000):
+        return JobRepository.try_set_lock_on_job(self, job, lease_milliseconds)
+
+    def claim_job(self, lease_milliseconds=60000, queues=None):
+        return JobRepository.claim_job(self, lease_milliseconds, queues)
+
+    def claim_jobs(self, quantity, lease_milliseconds=60000, queues=None):
+        return JobRepository.claim_jobs(self, quantity, lease_milliseconds, queues)
+
+    def renew_job_leases(self, jobs, lease_milliseconds=60000):
+        return JobRepository.renew_job_leases(self, jobs, lease_milliseconds)
+
+    def reclaim_expired_jobs(self):
+        return JobRepository.reclaim_expired_jobs(self)
+
+    def promote_scheduled_jobs(self, limit=1000):
+        return JobRepository.promote_scheduled_jobs(self, limit)
+
+    def cancel_job(self, job_id):
+        return JobRepository.cancel_job(self, job_id)
+
+    def get_cancelled_job_ids(self, job_ids):
+        return JobRepository.get_cancelled_job_ids(self, job_ids)
+
+    def move_jobs_to_dead_letter(self, jobs):
+        return JobRepository.move_jobs_to_dead_letter(self, jobs)
+
+    def get_dead_letter_jobs(self, limit=100):
+        return JobRepository.get_dead_letter_jobs(self, limit)
+
+    def count_dead_letter_jobs(self):
+        return JobRepository.count_dead_letter_jobs(self)
+
+    def requeue_dead_letter_job(self, job_id):
+        return JobRepository.requeue_dead_letter_job(self, job_id)
+
+    def claim_expired_jobs(self, status, max_age_seconds=None, max_count=None, limit=1000, lease_milliseconds=60000):
+        return JobRepository.claim_expired_jobs(self, status, max_age_seconds, max_count, limit, lease_milliseconds)
+
+    def delete_jobs(self, jobs):
+        return JobRepository.delete_jobs(self, jobs)
+
+    def wait_for_enqueued_jobs(self, timeout_seconds, queues=None):
+        return JobRepository.wait_for_enqueued_jobs(self, timeout_seconds, queues)
 
 
 if (__name__ == "__main__"):
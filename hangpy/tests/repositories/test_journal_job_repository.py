@@ -0,0 +1,141 @@
+import os
+import tempfile
+import unittest
+import hangpy.tests.fake as fake
+from freezegun import freeze_time
+from hangpy.enums import JobStatus
+from hangpy.repositories import JournalJobRepository
+
+
+class TestJournalJobRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.job_repository = JournalJobRepository(self.directory.name)
+
+    def tearDown(self):
+        self.job_repository.close()
+        self.directory.cleanup()
+
+    def create_fake_job(self, status: JobStatus = JobStatus.ENQUEUED, priority: int = 0, queue: str = 'default'):
+        job = fake.FakeJobActivity().create_job_object(priority=priority, queue=queue)
+        job.status = status
+        return job
+
+    def reopen(self, **kwargs) -> JournalJobRepository:
+        self.job_repository.close()
+        self.job_repository = JournalJobRepository(self.directory.name, **kwargs)
+        return self.job_repository
+
+    def get_journal_files(self) -> list[str]:
+        return sorted(file_name for file_name in os.listdir(self.directory.name) if file_name != 'lock')
+
+    def test_init_validates_segment_max_bytes(self):
+        with self.assertRaises(ValueError):
+            JournalJobRepository(self.directory.name, segment_max_bytes=0)
+        with self.assertRaises(ValueError):
+            JournalJobRepository(self.directory.name, segment_max_bytes='1024')
+
+    def test_init_journal_in_use(self):
+        with self.assertRaises(ValueError):
+            JournalJobRepository(self.directory.name)
+
+    def test_reopen_keeps_jobs(self):
+        jobs = [self.create_fake_job(), self.create_fake_job(priority=5), self.create_fake_job(queue='reports'),
+                self.create_fake_job(JobStatus.SUCCESS)]
+        self.job_repository.add_jobs(jobs)
+        jobs[3].status = JobStatus.ERROR
+        jobs[3].error = 'failed'
+        self.job_repository.update_job(jobs[3])
+        self.reopen()
+        self.assertEqual(len(self.job_repository.get_jobs()), 4)
+        self.assertEqual(self.job_repository.get_job_by_status(JobStatus.ERROR).error, 'failed')
+        self.assertListEqual([job.id for job in self.job_repository.claim_jobs(3)], [jobs[1].id, jobs[0].id])
+        self.assertEqual(self.job_repository.claim_job(queues=['reports']).id, jobs[2].id)
+
+    def test_transitions_are_small_records(self):
+        job = self.create_fake_job()
+        job.parameters = ['x' * 1000]
+        self.job_repository.add_job(job)
+        segment_path = os.path.join(self.directory.name, self.get_journal_files()[0])
+        size = os.path.getsize(segment_path)
+        claimed_job = self.job_repository.claim_job()
+        claimed_job.status = JobStatus.SUCCESS
+        claimed_job.end_datetime = '1988-04-10T11:01:02'
+        self.job_repository.update_job(claimed_job)
+        self.assertLess(os.path.getsize(segment_path) - size, 500)
+        self.reopen()
+        stored_job = self.job_repository.get_job_by_status(JobStatus.SUCCESS)
+        self.assertEqual(stored_job.end_datetime, '1988-04-10T11:01:02')
+        self.assertListEqual(stored_job.parameters, job.parameters)
+
+    @freeze_time('1988-04-10 11:01:02')
+    def test_reopen_reclaims_processing_jobs(self):
+        self.job_repository.add_jobs([self.create_fake_job(), self.create_fake_job()])
+        claimed_jobs = self.job_repository.claim_jobs(2)
+        self.job_repository.cancel_job(claimed_jobs[1].id)
+        self.reopen()
+        self.assertEqual(self.job_repository.get_job_by_status(JobStatus.ENQUEUED).id, claimed_jobs[0].id)
+        cancelled_job = self.job_repository.get_job_by_status(JobStatus.CANCELLED)
+        self.assertEqual(cancelled_job.id, claimed_jobs[1].id)
+        self.assertEqual(cancelled_job.end_datetime, '1988-04-10T11:01:02')
+        self.reopen()
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.ENQUEUED), 1)
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.CANCELLED), 1)
+
+    def test_reopen_keeps_scheduled_and_dead_letter_jobs(self):
+        jobs = [self.create_fake_job(JobStatus.SCHEDULED), self.create_fake_job(JobStatus.ERROR), self.create_fake_job(JobStatus.ERROR)]
+        jobs[0].enqueued_datetime = '1988-04-10T11:00:00'
+        self.job_repository.add_jobs(jobs)
+        self.job_repository.move_jobs_to_dead_letter(jobs[1:])
+        self.job_repository.requeue_dead_letter_job(jobs[2].id)
+        self.reopen()
+        self.assertListEqual([job.id for job in self.job_repository.get_dead_letter_jobs()], [jobs[1].id])
+        self.assertListEqual(self.job_repository.promote_scheduled_jobs(), [jobs[0].id])
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.ENQUEUED), 2)
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.ERROR), 0)
+
+    def test_delete_jobs(self):
+        jobs = [self.create_fake_job(JobStatus.SUCCESS) for _ in range(3)]
+        self.job_repository.add_jobs(jobs)
+        claimed_jobs = self.job_repository.claim_expired_jobs(JobStatus.SUCCESS, max_count=1)
+        self.job_repository.delete_jobs(claimed_jobs[:1])
+        self.reopen()
+        self.assertListEqual([job.id for job in self.job_repository.get_jobs()], [jobs[1].id, jobs[2].id])
+
+    def test_compaction(self):
+        jobs = [self.create_fake_job() for _ in range(20)]
+        self.reopen(segment_max_bytes=2048)
+        self.job_repository.add_jobs(jobs)
+        for job in self.job_repository.claim_jobs(10):
+            job.status = JobStatus.SUCCESS
+            self.job_repository.update_job(job)
+        self.job_repository.cancel_job(self.job_repository.claim_job().id)
+        self.job_repository.move_jobs_to_dead_letter([jobs[19]])
+        journal_files = self.get_journal_files()
+        self.assertEqual(len(journal_files), 2)
+        self.assertTrue(journal_files[0].endswith('.journal'))
+        self.assertTrue(journal_files[1].endswith('.snapshot'))
+        self.assertNotEqual(journal_files[0], '000000000000.journal')
+        self.reopen()
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.SUCCESS), 10)
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.CANCELLED), 1)
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.ENQUEUED), 8)
+        self.assertEqual(self.job_repository.count_dead_letter_jobs(), 1)
+
+    def test_reopen_truncates_incomplete_record(self):
+        jobs = [self.create_fake_job(), self.create_fake_job()]
+        self.job_repository.add_job(jobs[0])
+        self.job_repository.add_job(jobs[1])
+        segment_path = os.path.join(self.directory.name, self.get_journal_files()[0])
+        self.job_repository.close()
+        os.truncate(segment_path, os.path.getsize(segment_path) - 10)
+        self.reopen()
+        self.assertListEqual([job.id for job in self.job_repository.get_jobs()], [jobs[0].id])
+        self.job_repository.add_job(jobs[1])
+        self.reopen()
+        self.assertListEqual([job.id for job in self.job_repository.get_jobs()], [jobs[0].id, jobs[1].id])
+
+
+if (__name__ == "__main__"):
+    unittest.main()
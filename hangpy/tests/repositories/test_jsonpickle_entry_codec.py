@@ -0,0 +1,23 @@
+import unittest
+from hangpy.entities import Job
+from hangpy.repositories import JsonpickleEntryCodec
+
+
+class TestJsonpickleEntryCodec(unittest.TestCase):
+
+    def setUp(self):
+        self.entry_codec = JsonpickleEntryCodec()
+
+    def test_encode(self):
+        job = Job('some_module', 'SomeClass')
+        actual = self.entry_codec.encode(job)
+        self.assertRegex(actual, r'^\{"py/object": "hangpy\.entities\.job\.Job"')
+
+    def test_decode(self):
+        job = Job('some_module', 'SomeClass', ['a', 1])
+        actual_job = self.entry_codec.decode(self.entry_codec.encode(job))
+        self.assertDictEqual(vars(actual_job), vars(job))
+
+
+if (__name__ == "__main__"):
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+from hangpy.repositories import RecurringJobRepository
+
+
+class TestRecurringJobRepository(unittest.TestCase):
+
+    def test_instantiate(self):
+        recurring_job_repository = FakeRecurringJobRepository()
+        self.assertIsNone(recurring_job_repository.get_recurring_jobs())
+        self.assertIsNone(recurring_job_repository.get_recurring_job(None))
+        self.assertIsNone(recurring_job_repository.add_recurring_job(None))
+        self.assertIsNone(recurring_job_repository.remove_recurring_job(None))
+        self.assertIsNone(recurring_job_repository.get_due_recurring_jobs())
+        self.assertIsNone(recurring_job_repository.try_update_recurring_job_run(None, None))
+        self.assertIsNone(recurring_job_repository.try_acquire_scheduler_lease(None, None))
+        self.assertIsNone(recurring_job_repository.release_scheduler_lease(None))
+
+
+class FakeRecurringJobRepository(RecurringJobRepository):
+
+    def get_recurring_jobs(self):
+        return RecurringJobRepository.get_recurring_jobs(self)
+
+    def get_recurring_job(self, name):
+        return RecurringJobRepository.get_recurring_job(self, name)
+
+    def add_recurring_job(self, recurring_job):
+        return RecurringJobRepository.add_recurring_job(self, recurring_job)
+
+    def remove_recurring_job(self, name):
+        return RecurringJobRepository.remove_recurring_job(self, name)
+
+    def get_due_recurring_jobs(self):
+        return RecurringJobRepository.get_due_recurring_jobs(self)
+
+    def try_update_recurring_job_run(self, recurring_job, next_run_datetime):
+        return RecurringJobRepository.try_update_recurring_job_run(self, recurring_job, next_run_datetime)
+
+    def try_acquire_scheduler_lease(self, server_id, lease_milliseconds):
+        return RecurringJobRepository.try_acquire_scheduler_lease(self, server_id, lease_milliseconds)
+
+    def release_scheduler_lease(self, server_id):
+        return RecurringJobRepository.release_scheduler_lease(self, server_id)
+
+
+if (__name__ == "__main__"):
+    unittest.main()
@@ -0,0 +1,86 @@
+import fakeredis
+import redis
+import threading
+import unittest
+from hangpy.repositories import RedisConnectionPool, RedisJobRepository
+
+
+class TestRedisConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        self.connection_pool = RedisConnectionPool(max_connections=2, timeout=0.1, connection_class=fakeredis.FakeConnection,
+                                                   server=fakeredis.FakeServer())
+        self.redis_client = redis.Redis(connection_pool=self.connection_pool)
+
+    def test_init_validates_parameters(self):
+        with self.assertRaises(ValueError):
+            RedisConnectionPool(max_connections=0)
+        with self.assertRaises(ValueError):
+            RedisConnectionPool(max_connections='2')
+        with self.assertRaises(ValueError):
+            RedisConnectionPool(retries=-1)
+
+    def test_init_configures_connections(self):
+        connection_pool = RedisConnectionPool(retries=5, host='localhost')
+        self.assertEqual(connection_pool.connection_kwargs['socket_timeout'], 5)
+        self.assertEqual(connection_pool.connection_kwargs['socket_connect_timeout'], 5)
+        self.assertEqual(connection_pool.connection_kwargs['health_check_interval'], 30)
+        self.assertEqual(connection_pool.connection_kwargs['retry'].get_retries(), 5)
+        self.assertEqual(connection_pool.max_connections, 50)
+
+    def test_from_url(self):
+        connection_pool = RedisConnectionPool.from_url('redis://localhost:6380/2?socket_timeout=1', max_connections=4)
+        self.assertEqual(connection_pool.connection_kwargs['port'], 6380)
+        self.assertEqual(connection_pool.connection_kwargs['db'], 2)
+        self.assertEqual(connection_pool.connection_kwargs['socket_timeout'], 1)
+        self.assertEqual(connection_pool.max_connections, 4)
+
+    def test_get_statistics(self):
+        self.redis_client.set('key', 'value')
+        self.redis_client.get('key')
+        statistics = self.connection_pool.get_statistics()
+        self.assertEqual(statistics['max_connections'], 2)
+        self.assertEqual(statistics['connections_in_use'], 0)
+        self.assertEqual(statistics['peak_connections_in_use'], 1)
+        self.assertEqual(statistics['saturation'], 0.5)
+        self.assertEqual(statistics['acquisitions'], 2)
+        self.assertGreaterEqual(statistics['total_wait_seconds'], statistics['max_wait_seconds'])
+        self.assertEqual(statistics['exhaustions'], 0)
+
+    def test_get_statistics_with_pool_exhausted(self):
+        connections = [self.connection_pool.get_connection() for _ in range(2)]
+        self.assertEqual(self.connection_pool.get_statistics()['saturation'], 1)
+        with self.assertRaises(redis.ConnectionError):
+            self.redis_client.get('key')
+        self.assertEqual(self.connection_pool.get_statistics()['exhaustions'], 1)
+        timer = threading.Timer(0.05, self.connection_pool.release, [connections[0]])
+        timer.start()
+        self.connection_pool.timeout = 5
+        self.redis_client.get('key')
+        timer.join()
+        statistics = self.connection_pool.get_statistics()
+        self.assertGreaterEqual(statistics['max_wait_seconds'], 0.04)
+        self.assertEqual(statistics['connections_in_use'], 1)
+        self.connection_pool.release(connections[1])
+        self.assertEqual(self.connection_pool.get_statistics()['connections_in_use'], 0)
+
+    def test_reset_statistics(self):
+        connection = self.connection_pool.get_connection()
+        self.redis_client.get('key')
+        self.connection_pool.reset_statistics()
+        statistics = self.connection_pool.get_statistics()
+        self.assertEqual(statistics['acquisitions'], 0)
+        self.assertEqual(statistics['connections_in_use'], 1)
+        self.assertEqual(statistics['peak_connections_in_use'], 1)
+        self.connection_pool.release(connection)
+
+    def test_subscription_holds_connection(self):
+        job_repository = RedisJobRepository(self.redis_client)
+        self.assertFalse(job_repository.wait_for_enqueued_jobs(0.01))
+        self.assertEqual(job_repository.get_connection_pool_statistics()['connections_in_use'], 1)
+        job_repository.close()
+        self.assertEqual(job_repository.get_connection_pool_statistics()['connections_in_use'], 0)
+
+
+if (__name__ == "__main__"):
+    unittest.main()
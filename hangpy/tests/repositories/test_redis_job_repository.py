@@ -1,16 +1,15 @@
+import datetime
 import fakeredis
 import hangpy.tests.fake as fake
+import jsonpickle
 import redis
 import unittest
+from unittest import mock
+from freezegun import freeze_time
 from hangpy.enums.job_status import JobStatus
 from hangpy.repositories.redis_job_repository import RedisJobRepository
 
 
-class FakeRedisTestGetNone(fakeredis.FakeStrictRedis):
-    def get(self, key):
-        return None
-
-
 class TestRedisJobRepository(unittest.TestCase):
 
     def setUp(self):
@@ -34,6 +33,17 @@ class TestRedisJobRepository(unittest.TestCase):
     def test_init(self):
         self.assertIsInstance(self.job_repository.redis_client, redis.StrictRedis)
 
+    def test_decoding_client(self):
+        job_repository = RedisJobRepository(fakeredis.FakeStrictRedis(decode_responses=True))
+        jobs = [fake.FakeJobActivity().create_job_object() for _ in range(2)]
+        job_repository.add_jobs(jobs)
+        self.assertSetEqual({job.id for job in job_repository.get_jobs()}, {job.id for job in jobs})
+        claimed_job = job_repository.claim_job()
+        claimed_job.status = JobStatus.SUCCESS
+        job_repository.update_job(claimed_job)
+        self.assertEqual(job_repository.get_job_by_status(JobStatus.SUCCESS).id, claimed_job.id)
+        self.assertEqual(job_repository.count_jobs_by_status(JobStatus.ENQUEUED), 1)
+
     def test_add_and_get_jobs(self):
         self.setUp_fake_job()
         self.add_fake_job_to_repository()
@@ -67,11 +77,10 @@ class TestRedisJobRepository(unittest.TestCase):
         self.assertListEqual(actual_job.parameters, self.fake_job.parameters)
 
     def test_get_job_by_status_with_orphan_key(self):
-        redis_client = FakeRedisTestGetNone()
-        job_repository = RedisJobRepository(redis_client)
-        redis_client.set(F'jobstatus:ABCDE:{str(JobStatus.ENQUEUED)}', 'some_key_that_doesnt_exist')
-        actual_job = job_repository.get_job_by_status(JobStatus.ENQUEUED)
+        self.job_repository.redis_client.zadd('jobindex:ENQUEUED', {'ABCDE': 1})
+        actual_job = self.job_repository.get_job_by_status(JobStatus.ENQUEUED)
         self.assertIsNone(actual_job)
+        self.assertListEqual(self.job_repository.get_jobs_by_status(JobStatus.ENQUEUED), [])
 
     def test_get_jobs_by_status_returning_job_enqueued(self):
         self.setUp_fake_job()
@@ -103,6 +112,34 @@ class TestRedisJobRepository(unittest.TestCase):
         self.assertTrue(self.job_repository.exists_jobs_with_status(JobStatus.ENQUEUED))
         self.assertFalse(self.job_repository.exists_jobs_with_status(JobStatus.PROCESSING))
 
+    def test_exists_jobs_with_status_after_update(self):
+        self.setUp_fake_job()
+        self.add_fake_job_to_repository()
+        self.fake_job.status = JobStatus.SUCCESS
+        self.job_repository.update_job(self.fake_job)
+        self.assertFalse(self.job_repository.exists_jobs_with_status(JobStatus.ENQUEUED))
+        self.assertTrue(self.job_repository.exists_jobs_with_status(JobStatus.SUCCESS))
+        self.assertEqual(len(self.job_repository.get_jobs()), 1)
+
+    def test_count_jobs_by_status(self):
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.ENQUEUED), 0)
+        self.setUp_fake_jobs()
+        self.add_fake_jobs_to_repository()
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.ENQUEUED), 2)
+        self.fake_job1.status = JobStatus.SUCCESS
+        self.job_repository.update_job(self.fake_job1)
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.ENQUEUED), 1)
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.SUCCESS), 1)
+
+    def test_get_status_counts(self):
+        self.setUp_fake_jobs()
+        self.add_fake_jobs_to_repository()
+        self.job_repository.claim_job()
+        expected_counts = {status: 0 for status in JobStatus}
+        expected_counts[JobStatus.ENQUEUED] = 1
+        expected_counts[JobStatus.PROCESSING] = 1
+        self.assertDictEqual(self.job_repository.get_status_counts(), expected_counts)
+
     def test_update_job(self):
         self.setUp_fake_job()
         self.add_fake_job_to_repository()
@@ -129,6 +166,69 @@ class TestRedisJobRepository(unittest.TestCase):
         self.assertEqual(actual_jobs[0].status, JobStatus.ERROR)
         self.assertEqual(actual_jobs[1].status, JobStatus.PROCESSING)
 
+    def test_add_jobs(self):
+        self.setUp_fake_jobs()
+        redis_client = self.job_repository.redis_client
+        with mock.patch.object(redis_client, 'pipeline', wraps=redis_client.pipeline) as pipeline:
+            self.job_repository.add_jobs([self.fake_job1, self.fake_job2])
+            self.job_repository.add_jobs([])
+        self.assertEqual(pipeline.call_count, 1)
+        actual_ids = {job.id for job in self.job_repository.get_jobs_by_status(JobStatus.ENQUEUED)}
+        self.assertSetEqual(actual_ids, {self.fake_job1.id, self.fake_job2.id})
+
+    def test_update_jobs_single_transaction(self):
+        self.setUp_fake_jobs()
+        self.add_fake_jobs_to_repository()
+        self.fake_job1.status = JobStatus.SUCCESS
+        self.fake_job2.status = JobStatus.ERROR
+        redis_client = self.job_repository.redis_client
+        with mock.patch.object(redis_client, 'pipeline', wraps=redis_client.pipeline) as pipeline:
+            self.job_repository.update_jobs([self.fake_job1, self.fake_job2])
+        self.assertEqual(pipeline.call_count, 1)
+        self.assertFalse(self.job_repository.exists_jobs_with_status(JobStatus.ENQUEUED))
+        self.assertEqual(self.job_repository.get_job_by_status(JobStatus.SUCCESS).id, self.fake_job1.id)
+        self.assertEqual(self.job_repository.get_job_by_status(JobStatus.ERROR).id, self.fake_job2.id)
+
+    def test_update_job_writes_only_changed_fields(self):
+        self.setUp_fake_job()
+        self.add_fake_job_to_repository()
+        redis_client = self.job_repository.redis_client
+        redis_client.hset(f'job:{self.fake_job.id}', 'data', b'some data')
+        self.fake_job.status = JobStatus.ERROR
+        self.fake_job.error = 'some error'
+        self.job_repository.update_job(self.fake_job)
+        stored_fields = redis_client.hgetall(f'job:{self.fake_job.id}')
+        self.assertEqual(stored_fields[b'data'], b'some data')
+        self.assertEqual(stored_fields[b'status'], b'ERROR')
+        self.assertEqual(stored_fields[b'error'], b'some error')
+        self.assertListEqual(redis_client.zrange('jobindex:ERROR', 0, -1), [self.fake_job.id.encode()])
+        self.assertListEqual(redis_client.zrange('jobindex:ENQUEUED', 0, -1), [])
+
+    @freeze_time('1988-04-10 11:01:02')
+    def test_update_job_claimed_writes_only_changed_fields(self):
+        self.setUp_fake_job()
+        self.add_fake_job_to_repository()
+        actual_job = self.job_repository.claim_job()
+        redis_client = self.job_repository.redis_client
+        redis_client.hset(f'job:{self.fake_job.id}', 'data', b'some data')
+        actual_job.status = JobStatus.SUCCESS
+        actual_job.end_datetime = '1988-04-10T11:01:03'
+        self.job_repository.update_job(actual_job)
+        stored_fields = redis_client.hgetall(f'job:{self.fake_job.id}')
+        self.assertEqual(stored_fields[b'data'], b'some data')
+        self.assertEqual(stored_fields[b'status'], b'SUCCESS')
+        self.assertEqual(stored_fields[b'start_datetime'], b'1988-04-10T11:01:02')
+        self.assertEqual(stored_fields[b'end_datetime'], b'1988-04-10T11:01:03')
+        self.assertListEqual(redis_client.zrange('jobindex:PROCESSING', 0, -1), [])
+
+    def test_update_job_with_parameters_changed(self):
+        self.setUp_fake_job()
+        self.add_fake_job_to_repository()
+        actual_job = self.job_repository.get_jobs()[0]
+        actual_job.parameters.append('luiz')
+        self.job_repository.update_job(actual_job)
+        self.assertListEqual(self.job_repository.get_jobs()[0].parameters, ['luiz'])
+
     def test_try_set_lock_on_job(self):
         self.setUp_fake_jobs()
         self.add_fake_jobs_to_repository()
@@ -138,6 +238,498 @@ class TestRedisJobRepository(unittest.TestCase):
         self.assertTrue(self.job_repository.try_set_lock_on_job(self.fake_job2))
         self.assertFalse(self.job_repository.try_set_lock_on_job(self.fake_job2))
 
+    @freeze_time('1988-04-10 11:01:02.123456')
+    def test_claim_job(self):
+        self.setUp_fake_job()
+        self.add_fake_job_to_repository()
+        actual_job = self.job_repository.claim_job()
+        self.assertEqual(actual_job.id, self.fake_job.id)
+        self.assertEqual(actual_job.status, JobStatus.PROCESSING)
+        self.assertEqual(actual_job.start_datetime, '1988-04-10T11:01:02.123456')
+        self.assertFalse(self.job_repository.try_set_lock_on_job(actual_job))
+        self.assertFalse(self.job_repository.exists_jobs_with_status(JobStatus.ENQUEUED))
+        stored_job = self.job_repository.get_job_by_status(JobStatus.PROCESSING)
+        self.assertEqual(stored_job.id, self.fake_job.id)
+        self.assertEqual(stored_job.start_datetime, '1988-04-10T11:01:02.123456')
+        self.assertIsNone(self.job_repository.claim_job())
+
+    def test_claim_job_oldest_first(self):
+        with freeze_time('1988-04-10 11:01:02'):
+            self.setUp_fake_jobs()
+        with freeze_time('1988-04-10 11:01:01'):
+            older_job = fake.FakeJobActivity().create_job_object()
+        self.add_fake_jobs_to_repository()
+        self.job_repository.add_job(older_job)
+        self.assertEqual(self.job_repository.claim_job().id, older_job.id)
+        claimed_ids = {self.job_repository.claim_job().id, self.job_repository.claim_job().id}
+        self.assertSetEqual(claimed_ids, {self.fake_job1.id, self.fake_job2.id})
+
+    def test_claim_job_strict_priority(self):
+        with freeze_time('1988-04-10 11:01:01'):
+            low_priority_job = fake.FakeJobActivity().create_job_object(priority=-1)
+            default_priority_job = fake.FakeJobActivity().create_job_object()
+        with freeze_time('1989-04-10 11:01:02'):
+            high_priority_job = fake.FakeJobActivity().create_job_object(priority=1)
+        self.job_repository.add_jobs([low_priority_job, default_priority_job, high_priority_job])
+        claimed_ids = [self.job_repository.claim_job().id for _ in range(3)]
+        self.assertListEqual(claimed_ids, [high_priority_job.id, default_priority_job.id, low_priority_job.id])
+
+    def test_claim_job_weighted_priority(self):
+        job_repository = RedisJobRepository(fakeredis.FakeStrictRedis(), priority_weight_seconds=60)
+        with freeze_time('1988-04-10 11:00:00'):
+            old_job = fake.FakeJobActivity().create_job_object()
+        with freeze_time('1988-04-10 11:01:30'):
+            high_priority_job = fake.FakeJobActivity().create_job_object(priority=1)
+        with freeze_time('1988-04-10 11:00:40'):
+            newer_job = fake.FakeJobActivity().create_job_object()
+        job_repository.add_jobs([old_job, high_priority_job, newer_job])
+        claimed_ids = [job_repository.claim_job().id for _ in range(3)]
+        self.assertListEqual(claimed_ids, [old_job.id, high_priority_job.id, newer_job.id])
+
+    def test_init_with_invalid_priority_weight_seconds(self):
+        with self.assertRaises(ValueError):
+            RedisJobRepository(fakeredis.FakeStrictRedis(), priority_weight_seconds=0)
+
+        with self.assertRaises(ValueError):
+            RedisJobRepository(fakeredis.FakeStrictRedis(), priority_weight_seconds=1.5)
+
+    def test_update_job_priority(self):
+        self.setUp_fake_jobs()
+        self.add_fake_jobs_to_repository()
+        self.fake_job2.priority = 5
+        self.job_repository.update_job(self.fake_job2)
+        actual_job = self.job_repository.claim_job()
+        self.assertEqual(actual_job.id, self.fake_job2.id)
+        self.assertEqual(actual_job.priority, 5)
+
+    def test_claim_job_from_queues(self):
+        default_job = fake.FakeJobActivity().create_job_object()
+        cpu_job = fake.FakeJobActivity().create_job_object(queue='cpu')
+        latency_job = fake.FakeJobActivity().create_job_object(queue='latency')
+        self.job_repository.add_jobs([default_job, cpu_job, latency_job])
+        self.assertIsNone(self.job_repository.claim_job(queues=['reports']))
+        self.assertEqual(self.job_repository.claim_job(queues=['latency', 'cpu']).id, latency_job.id)
+        actual_job = self.job_repository.claim_job(queues=['latency', 'cpu'])
+        self.assertEqual(actual_job.id, cpu_job.id)
+        self.assertEqual(actual_job.queue, 'cpu')
+        self.assertIsNone(self.job_repository.claim_job(queues=['latency', 'cpu']))
+        self.assertEqual(self.job_repository.claim_job().id, default_job.id)
+
+    def test_claim_jobs_from_queues(self):
+        cpu_jobs = [fake.FakeJobActivity().create_job_object(queue='cpu') for _ in range(2)]
+        latency_jobs = [fake.FakeJobActivity().create_job_object(queue='latency') for _ in range(2)]
+        self.job_repository.add_jobs(cpu_jobs + latency_jobs)
+        actual_jobs = self.job_repository.claim_jobs(3, queues=['cpu', 'latency'])
+        self.assertListEqual([job.queue for job in actual_jobs], ['cpu', 'cpu', 'latency'])
+
+    def test_count_jobs_of_queues(self):
+        self.setUp_fake_job()
+        self.add_fake_job_to_repository()
+        self.job_repository.add_jobs([fake.FakeJobActivity().create_job_object(queue='cpu') for _ in range(2)])
+        self.assertEqual(self.job_repository.count_enqueued_jobs(['default']), 1)
+        self.assertEqual(self.job_repository.count_enqueued_jobs(['cpu', 'latency']), 2)
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.ENQUEUED), 3)
+        self.assertEqual(self.job_repository.get_status_counts()[JobStatus.ENQUEUED], 3)
+        self.assertEqual(len(self.job_repository.get_jobs_by_status(JobStatus.ENQUEUED)), 3)
+        self.assertEqual(len(self.job_repository.get_jobs()), 3)
+
+    def test_get_job_by_status_of_queues(self):
+        with freeze_time('1988-04-10 11:01:02'):
+            self.setUp_fake_job()
+        with freeze_time('1988-04-10 11:01:01'):
+            cpu_job = fake.FakeJobActivity().create_job_object(queue='cpu')
+        self.job_repository.add_jobs([self.fake_job, cpu_job])
+        self.assertEqual(self.job_repository.get_job_by_status(JobStatus.ENQUEUED).id, cpu_job.id)
+
+    def test_update_job_queue(self):
+        self.setUp_fake_job()
+        self.add_fake_job_to_repository()
+        self.fake_job.queue = 'cpu'
+        self.job_repository.update_job(self.fake_job)
+        self.assertEqual(self.job_repository.count_enqueued_jobs(['default']), 0)
+        self.assertEqual(self.job_repository.claim_job(queues=['cpu']).id, self.fake_job.id)
+
+    def test_reclaim_expired_jobs_of_queue(self):
+        cpu_job = fake.FakeJobActivity().create_job_object(queue='cpu')
+        self.job_repository.add_job(cpu_job)
+        with freeze_time('1988-04-10 11:01:02'):
+            self.job_repository.claim_job(1000, ['cpu'])
+        default_job_repository = RedisJobRepository(self.job_repository.redis_client)
+        self.assertFalse(default_job_repository.wait_for_enqueued_jobs(0))
+        self.assertFalse(self.job_repository.wait_for_enqueued_jobs(0, ['cpu']))
+        with freeze_time('1988-04-10 11:01:04'):
+            self.assertListEqual(self.job_repository.reclaim_expired_jobs(), [cpu_job.id])
+        self.assertFalse(default_job_repository.wait_for_enqueued_jobs(0.01))
+        self.assertTrue(self.job_repository.wait_for_enqueued_jobs(0.01, ['cpu']))
+        self.assertEqual(self.job_repository.count_enqueued_jobs(['cpu']), 1)
+
+    def test_wait_for_enqueued_jobs_of_queues(self):
+        self.assertFalse(self.job_repository.wait_for_enqueued_jobs(0.01, ['cpu']))
+        self.job_repository.add_job(fake.FakeJobActivity().create_job_object(queue='latency'))
+        self.assertFalse(self.job_repository.wait_for_enqueued_jobs(0.01, ['cpu']))
+        self.job_repository.add_job(fake.FakeJobActivity().create_job_object(queue='cpu'))
+        self.assertTrue(self.job_repository.wait_for_enqueued_jobs(0.01, ['cpu']))
+
+    def test_add_jobs_notifies_count_of_each_queue(self):
+        subscription = self.job_repository.redis_client.pubsub(ignore_subscribe_messages=True)
+        subscription.subscribe('jobs:enqueued', 'jobs:enqueued:cpu')
+        jobs = [fake.FakeJobActivity().create_job_object(queue=queue) for queue in ['default', 'cpu', 'cpu', 'cpu']]
+        self.job_repository.add_jobs(jobs)
+        messages = [subscription.get_message(timeout=0.1) for _ in range(4)]
+        self.assertDictEqual({message['channel']: message['data'] for message in messages if message is not None},
+                             {b'jobs:enqueued': b'1', b'jobs:enqueued:cpu': b'3'})
+        subscription.close()
+
+    def test_promote_scheduled_jobs(self):
+        with freeze_time('1988-04-10 11:00:00'):
+            due_jobs = [fake.FakeJobActivity().create_job_object() for _ in range(3)]
+            future_job = fake.FakeJobActivity().create_job_object(queue='cpu')
+        due_jobs[1].queue = 'cpu'
+        for index, job in enumerate(due_jobs + [future_job]):
+            job.status = JobStatus.SCHEDULED
+            job.enqueued_datetime = f'1988-04-10T11:0{index + 1}:00'
+        self.assertFalse(self.job_repository.wait_for_enqueued_jobs(0))
+        self.job_repository.add_jobs(due_jobs + [future_job])
+        self.assertFalse(self.job_repository.wait_for_enqueued_jobs(0.01))
+        self.assertIsNone(self.job_repository.claim_job(queues=['default', 'cpu']))
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.SCHEDULED), 4)
+        with freeze_time('1988-04-10 11:03:30'):
+            self.assertListEqual(self.job_repository.promote_scheduled_jobs(2), [due_jobs[0].id, due_jobs[1].id])
+            self.assertListEqual(self.job_repository.promote_scheduled_jobs(), [due_jobs[2].id])
+            self.assertListEqual(self.job_repository.promote_scheduled_jobs(), [])
+        self.assertTrue(self.job_repository.wait_for_enqueued_jobs(0.01))
+        enqueued_score = self.job_repository.redis_client.zscore('jobindex:ENQUEUED', due_jobs[0].id)
+        self.assertEqual(enqueued_score, datetime.datetime(1988, 4, 10, 11, 1).timestamp())
+        self.assertEqual(self.job_repository.count_enqueued_jobs(['default']), 2)
+        self.assertEqual(self.job_repository.claim_job(queues=['cpu']).id, due_jobs[1].id)
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.SCHEDULED), 1)
+        actual_job = self.job_repository.claim_job()
+        self.assertEqual(actual_job.id, due_jobs[0].id)
+        self.assertEqual(actual_job.status, JobStatus.PROCESSING)
+
+    def test_claim_job_with_orphan_key(self):
+        self.setUp_fake_job()
+        self.job_repository.redis_client.zadd('jobindex:ENQUEUED', {'ABCDE': 0})
+        self.add_fake_job_to_repository()
+        self.assertEqual(self.job_repository.claim_job().id, self.fake_job.id)
+        self.assertFalse(self.job_repository.exists_jobs_with_status(JobStatus.ENQUEUED))
+        self.assertEqual(len(self.job_repository.get_jobs_by_status(JobStatus.PROCESSING)), 1)
+
+    def test_claim_jobs(self):
+        self.setUp_fake_jobs()
+        self.add_fake_jobs_to_repository()
+        self.assertListEqual(self.job_repository.claim_jobs(0), [])
+        actual_jobs = self.job_repository.claim_jobs(5)
+        self.assertSetEqual({job.id for job in actual_jobs}, {self.fake_job1.id, self.fake_job2.id})
+        self.assertTrue(all(job.status == JobStatus.PROCESSING for job in actual_jobs))
+        self.assertListEqual(self.job_repository.claim_jobs(5), [])
+
+    def test_claim_job_sets_lease(self):
+        self.setUp_fake_job()
+        self.add_fake_job_to_repository()
+        self.job_repository.claim_job(30000)
+        redis_client = self.job_repository.redis_client
+        self.assertTrue(0 < redis_client.pttl(f'lock:job:{self.fake_job.id}') <= 30000)
+        self.assertIsNotNone(redis_client.zscore('jobleases', self.fake_job.id))
+
+    def test_try_set_lock_on_job_sets_expiration(self):
+        self.setUp_fake_job()
+        self.job_repository.try_set_lock_on_job(self.fake_job, 30000)
+        self.assertTrue(0 < self.job_repository.redis_client.pttl(f'lock:job:{self.fake_job.id}') <= 30000)
+
+    def test_renew_job_leases(self):
+        self.setUp_fake_jobs()
+        self.add_fake_jobs_to_repository()
+        with freeze_time('1988-04-10 11:01:02'):
+            claimed_job = self.job_repository.claim_job(1000)
+        other_job = self.fake_job2 if claimed_job.id == self.fake_job1.id else self.fake_job1
+        self.assertListEqual(self.job_repository.renew_job_leases([], 30000), [])
+        with freeze_time('1988-04-10 11:01:03'):
+            lost_jobs = self.job_repository.renew_job_leases([claimed_job, other_job], 30000)
+        self.assertListEqual(lost_jobs, [other_job])
+        with freeze_time('1988-04-10 11:01:10'):
+            self.assertListEqual(self.job_repository.reclaim_expired_jobs(), [])
+        self.assertEqual(self.job_repository.redis_client.zcard('jobleases'), 1)
+
+    def test_reclaim_expired_jobs(self):
+        self.setUp_fake_jobs()
+        self.add_fake_jobs_to_repository()
+        with freeze_time('1988-04-10 11:01:02'):
+            claimed_jobs = self.job_repository.claim_jobs(2, 1000)
+        self.assertFalse(self.job_repository.wait_for_enqueued_jobs(0))
+        with freeze_time('1988-04-10 11:01:02.500000'):
+            self.assertListEqual(self.job_repository.reclaim_expired_jobs(), [])
+        claimed_jobs[0].status = JobStatus.SUCCESS
+        self.job_repository.update_job(claimed_jobs[0])
+        with freeze_time('1988-04-10 11:01:04'):
+            self.assertListEqual(self.job_repository.reclaim_expired_jobs(), [claimed_jobs[1].id])
+        enqueued_score = self.job_repository.redis_client.zscore('jobindex:ENQUEUED', claimed_jobs[1].id)
+        self.assertEqual(enqueued_score, datetime.datetime(1988, 4, 10, 11, 1, 4).timestamp())
+        self.assertTrue(self.job_repository.wait_for_enqueued_jobs(0.01))
+        reclaimed_job = self.job_repository.get_job_by_status(JobStatus.ENQUEUED)
+        self.assertEqual(reclaimed_job.id, claimed_jobs[1].id)
+        self.assertIsNone(reclaimed_job.start_datetime)
+        self.assertFalse(self.job_repository.exists_jobs_with_status(JobStatus.PROCESSING))
+        self.assertTrue(self.job_repository.try_set_lock_on_job(reclaimed_job))
+        self.assertEqual(self.job_repository.redis_client.zcard('jobleases'), 0)
+
+    def test_reclaim_expired_jobs_cancelled(self):
+        self.setUp_fake_job()
+        self.add_fake_job_to_repository()
+        with freeze_time('1988-04-10 11:01:02'):
+            claimed_job = self.job_repository.claim_job(1000)
+        self.assertTrue(self.job_repository.cancel_job(claimed_job.id))
+        with freeze_time('1988-04-10 11:01:04'):
+            self.assertListEqual(self.job_repository.reclaim_expired_jobs(), [])
+        actual_job = self.job_repository.get_job_by_status(JobStatus.CANCELLED)
+        self.assertEqual(actual_job.id, claimed_job.id)
+        self.assertEqual(actual_job.error, 'The job was cancelled')
+        self.assertEqual(actual_job.end_datetime, '1988-04-10T11:01:04')
+        self.assertListEqual(self.job_repository.get_cancelled_job_ids([claimed_job.id]), [])
+
+    @freeze_time('1988-04-10 11:01:02')
+    def test_cancel_job_enqueued(self):
+        self.setUp_fake_job()
+        self.fake_job.queue = 'reports'
+        self.add_fake_job_to_repository()
+        self.assertTrue(self.job_repository.cancel_job(self.fake_job.id))
+        self.assertEqual(self.job_repository.count_enqueued_jobs(['reports']), 0)
+        self.assertIsNone(self.job_repository.claim_job(queues=['reports']))
+        actual_job = self.job_repository.get_job_by_status(JobStatus.CANCELLED)
+        self.assertEqual(actual_job.id, self.fake_job.id)
+        self.assertEqual(actual_job.error, 'The job was cancelled')
+        self.assertEqual(actual_job.end_datetime, '1988-04-10T11:01:02')
+        self.assertFalse(self.job_repository.cancel_job(self.fake_job.id))
+        self.assertFalse(self.job_repository.cancel_job('missing'))
+
+    def test_cancel_job_scheduled(self):
+        self.setUp_fake_job()
+        self.fake_job.status = JobStatus.SCHEDULED
+        self.add_fake_job_to_repository()
+        self.assertTrue(self.job_repository.cancel_job(self.fake_job.id))
+        self.assertDictEqual(self.job_repository.get_status_counts(), {**dict.fromkeys(JobStatus, 0), JobStatus.CANCELLED: 1})
+        with freeze_time(datetime.datetime.now() + datetime.timedelta(days=1)):
+            self.assertListEqual(self.job_repository.promote_scheduled_jobs(), [])
+
+    def test_cancel_job_processing(self):
+        self.setUp_fake_jobs()
+        self.add_fake_jobs_to_repository()
+        claimed_jobs = self.job_repository.claim_jobs(2)
+        job_ids = [job.id for job in claimed_jobs]
+        self.assertListEqual(self.job_repository.get_cancelled_job_ids(job_ids), [])
+        self.assertListEqual(self.job_repository.get_cancelled_job_ids([]), [])
+        self.assertTrue(self.job_repository.cancel_job(job_ids[1]))
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.PROCESSING), 2)
+        self.assertListEqual(self.job_repository.get_cancelled_job_ids(job_ids), [job_ids[1]])
+        claimed_jobs[1].status = JobStatus.CANCELLED
+        self.job_repository.update_job(claimed_jobs[1])
+        self.assertListEqual(self.job_repository.get_cancelled_job_ids(job_ids), [])
+
+    def test_hash_tag(self):
+        redis_client = self.job_repository.redis_client
+        job_repository = RedisJobRepository(redis_client, hash_tag='shard-1')
+        jobs = [fake.FakeJobActivity().create_job_object(queue='reports') for _ in range(3)]
+        jobs[2].status = JobStatus.SCHEDULED
+        jobs[2].enqueued_datetime = '1988-04-10T11:00:00'
+        job_repository.add_jobs(jobs)
+        with freeze_time('1988-04-10 11:01:02'):
+            claimed_jobs = job_repository.claim_jobs(2, lease_milliseconds=1000, queues=['reports'])
+            self.assertListEqual(job_repository.promote_scheduled_jobs(), [jobs[2].id])
+        self.assertTrue(job_repository.cancel_job(claimed_jobs[1].id))
+        with freeze_time('1988-04-10 11:01:04'):
+            self.assertListEqual(job_repository.reclaim_expired_jobs(), [claimed_jobs[0].id])
+        job_repository.move_jobs_to_dead_letter([jobs[2]])
+        self.assertEqual(job_repository.requeue_dead_letter_job(jobs[2].id).id, jobs[2].id)
+        self.assertEqual(job_repository.count_enqueued_jobs(['reports']), 2)
+        self.assertEqual(job_repository.count_jobs_by_status(JobStatus.CANCELLED), 1)
+        self.assertEqual(self.job_repository.get_jobs(), [])
+        self.assertTrue(all(key.startswith(b'{shard-1}:') for key in redis_client.keys('*')))
+
+    def test_hash_tag_wait_for_enqueued_jobs(self):
+        job_repository = RedisJobRepository(self.job_repository.redis_client, hash_tag='shard-1')
+        self.assertFalse(job_repository.wait_for_enqueued_jobs(0.01))
+        self.setUp_fake_job()
+        self.add_fake_job_to_repository()
+        self.assertFalse(job_repository.wait_for_enqueued_jobs(0.01))
+        job_repository.add_job(fake.FakeJobActivity().create_job_object())
+        self.assertTrue(job_repository.wait_for_enqueued_jobs(1))
+
+    def test_cluster_client(self):
+        redis_client = fake.create_fake_redis_cluster()
+        with self.assertRaises(ValueError):
+            RedisJobRepository(redis_client)
+        job_repository = RedisJobRepository(redis_client, hash_tag='shard-1')
+        jobs = [fake.FakeJobActivity().create_job_object(queue='reports') for _ in range(3)]
+        jobs[2].status = JobStatus.SCHEDULED
+        jobs[2].enqueued_datetime = '1988-04-10T11:00:00'
+        self.assertFalse(job_repository.wait_for_enqueued_jobs(0.01, ['reports']))
+        job_repository.add_jobs(jobs)
+        self.assertTrue(job_repository.wait_for_enqueued_jobs(1, ['reports']))
+        with freeze_time('1988-04-10 11:01:02'):
+            claimed_jobs = job_repository.claim_jobs(2, lease_milliseconds=1000, queues=['reports'])
+            self.assertListEqual(job_repository.promote_scheduled_jobs(), [jobs[2].id])
+        self.assertListEqual(job_repository.renew_job_leases(claimed_jobs), [])
+        self.assertTrue(job_repository.cancel_job(claimed_jobs[1].id))
+        self.assertListEqual(job_repository.get_cancelled_job_ids([job.id for job in jobs]), [claimed_jobs[1].id])
+        with freeze_time('2100-01-01 00:00:00'):
+            self.assertListEqual(job_repository.reclaim_expired_jobs(), [claimed_jobs[0].id])
+        job_repository.move_jobs_to_dead_letter([jobs[2]])
+        self.assertEqual(job_repository.requeue_dead_letter_job(jobs[2].id).id, jobs[2].id)
+        self.assertEqual(job_repository.count_enqueued_jobs(['reports']), 2)
+        self.assertEqual(job_repository.count_jobs_by_status(JobStatus.CANCELLED), 1)
+        cancelled_jobs = job_repository.claim_expired_jobs(JobStatus.CANCELLED, max_count=0)
+        job_repository.delete_jobs(cancelled_jobs)
+        self.assertEqual(len(job_repository.get_jobs()), 2)
+        self.assertEqual(job_repository.migrate_legacy_keys(), 0)
+        self.assertTrue(all(key.startswith(b'{shard-1}:') for key in redis_client.keys('*')))
+        job_repository.close()
+
+    def add_finished_jobs_to_repository(self, status: JobStatus, end_datetimes: list[str]) -> list:
+        jobs = []
+        for end_datetime in end_datetimes:
+            job = fake.FakeJobActivity().create_job_object()
+            job.status = status
+            job.end_datetime = end_datetime
+            jobs.append(job)
+        self.job_repository.add_jobs(jobs)
+        return jobs
+
+    @freeze_time('1988-04-10 12:00:00')
+    def test_claim_expired_jobs_by_age(self):
+        jobs = self.add_finished_jobs_to_repository(JobStatus.SUCCESS, ['1988-04-10T10:00:00', '1988-04-10T10:30:00',
+                                                                        '1988-04-10T11:30:00'])
+        self.add_finished_jobs_to_repository(JobStatus.ERROR, ['1988-04-10T09:00:00'])
+        claimed_jobs = self.job_repository.claim_expired_jobs(JobStatus.SUCCESS, max_age_seconds=3600)
+        self.assertListEqual([job.id for job in claimed_jobs], [jobs[0].id, jobs[1].id])
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.SUCCESS), 1)
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.ERROR), 1)
+        self.assertListEqual(self.job_repository.claim_expired_jobs(JobStatus.SUCCESS, max_age_seconds=3600), [])
+        self.job_repository.delete_jobs(claimed_jobs)
+        self.assertIsNone(self.job_repository.redis_client.get(f'job:{jobs[0].id}'))
+        self.assertEqual(self.job_repository.redis_client.zcard('jobpurges'), 0)
+        self.assertEqual(len(self.job_repository.get_jobs()), 2)
+
+    @freeze_time('1988-04-10 12:00:00')
+    def test_claim_expired_jobs_by_count(self):
+        jobs = self.add_finished_jobs_to_repository(JobStatus.CANCELLED, ['1988-04-10T11:00:00', '1988-04-10T10:00:00',
+                                                                          '1988-04-10T11:30:00', '1988-04-10T11:50:00'])
+        claimed_jobs = self.job_repository.claim_expired_jobs(JobStatus.CANCELLED, max_count=2, limit=1)
+        self.assertListEqual([job.id for job in claimed_jobs], [jobs[1].id])
+        claimed_jobs = self.job_repository.claim_expired_jobs(JobStatus.CANCELLED, max_age_seconds=1200, max_count=2)
+        self.assertListEqual([job.id for job in claimed_jobs], [jobs[0].id, jobs[2].id])
+        self.assertListEqual([job.id for job in self.job_repository.get_jobs()], [jobs[3].id])
+        self.assertListEqual(self.job_repository.claim_expired_jobs(JobStatus.CANCELLED, max_count=0, limit=0), [])
+
+    def test_claim_expired_jobs_after_claim_expired(self):
+        with freeze_time('1988-04-10 12:00:00'):
+            jobs = self.add_finished_jobs_to_repository(JobStatus.SUCCESS, ['1988-04-10T10:00:00', '1988-04-10T10:30:00'])
+            self.assertEqual(len(self.job_repository.claim_expired_jobs(JobStatus.SUCCESS, max_count=0, lease_milliseconds=1000)), 2)
+            self.job_repository.redis_client.delete(f'job:{jobs[1].id}')
+        with freeze_time('1988-04-10 12:00:02'):
+            claimed_jobs = self.job_repository.claim_expired_jobs(JobStatus.ERROR, max_count=0)
+        self.assertListEqual([job.id for job in claimed_jobs], [jobs[0].id])
+        self.assertListEqual(self.job_repository.redis_client.zrange('jobpurges', 0, -1), [jobs[0].id.encode()])
+
+    def test_update_job_finished_releases_lease(self):
+        self.setUp_fake_job()
+        self.add_fake_job_to_repository()
+        actual_job = self.job_repository.claim_job()
+        actual_job.status = JobStatus.SUCCESS
+        self.job_repository.update_job(actual_job)
+        redis_client = self.job_repository.redis_client
+        self.assertEqual(redis_client.exists(f'lock:job:{self.fake_job.id}'), 0)
+        self.assertEqual(redis_client.zcard('jobleases'), 0)
+
+    def test_update_job_enqueued_releases_lock(self):
+        self.setUp_fake_job()
+        self.add_fake_job_to_repository()
+        actual_job = self.job_repository.claim_job()
+        actual_job.status = JobStatus.ENQUEUED
+        actual_job.start_datetime = None
+        self.job_repository.update_job(actual_job)
+        self.assertTrue(self.job_repository.exists_jobs_with_status(JobStatus.ENQUEUED))
+        self.assertTrue(self.job_repository.try_set_lock_on_job(actual_job))
+
+    def test_update_job_attempts(self):
+        self.setUp_fake_job()
+        self.add_fake_job_to_repository()
+        actual_job = self.job_repository.claim_job()
+        actual_job.attempts.append({'start_datetime': actual_job.start_datetime, 'end_datetime': None, 'error': 'some error'})
+        self.job_repository.update_job(actual_job)
+        self.assertEqual(self.job_repository.get_jobs()[0].attempts[0]['error'], 'some error')
+
+    def test_move_jobs_to_dead_letter(self):
+        self.setUp_fake_jobs()
+        self.add_fake_jobs_to_repository()
+        actual_job = self.job_repository.claim_job()
+        actual_job.status = JobStatus.ERROR
+        actual_job.error = 'some error'
+        self.job_repository.move_jobs_to_dead_letter([actual_job])
+        self.job_repository.move_jobs_to_dead_letter([])
+        redis_client = self.job_repository.redis_client
+        self.assertEqual(redis_client.exists(f'job:{actual_job.id}', f'lock:job:{actual_job.id}'), 0)
+        self.assertEqual(redis_client.zcard('jobleases'), 0)
+        self.assertDictEqual(self.job_repository.get_status_counts(), {**dict.fromkeys(JobStatus, 0), JobStatus.ENQUEUED: 1})
+        self.assertEqual(self.job_repository.count_dead_letter_jobs(), 1)
+        dead_letter_jobs = self.job_repository.get_dead_letter_jobs()
+        self.assertListEqual([job.id for job in dead_letter_jobs], [actual_job.id])
+        self.assertEqual(dead_letter_jobs[0].error, 'some error')
+        self.assertListEqual(self.job_repository.get_dead_letter_jobs(limit=0), [])
+
+    def test_requeue_dead_letter_job(self):
+        self.setUp_fake_job()
+        self.fake_job.queue = 'reports'
+        self.fake_job.status = JobStatus.ERROR
+        self.fake_job.error = 'some error'
+        self.fake_job.attempts.append({'start_datetime': None, 'end_datetime': None, 'error': 'some error'})
+        self.add_fake_job_to_repository()
+        self.job_repository.move_jobs_to_dead_letter([self.fake_job])
+        self.job_repository.wait_for_enqueued_jobs(0, ['reports'])
+        actual_job = self.job_repository.requeue_dead_letter_job(self.fake_job.id)
+        self.assertEqual(actual_job.status, JobStatus.ENQUEUED)
+        self.assertIsNone(actual_job.error)
+        self.assertEqual(len(actual_job.attempts), 1)
+        self.assertTrue(self.job_repository.wait_for_enqueued_jobs(0, ['reports']))
+        self.assertEqual(self.job_repository.count_dead_letter_jobs(), 0)
+        self.assertIsNone(self.job_repository.requeue_dead_letter_job(self.fake_job.id))
+        claimed_job = self.job_repository.claim_job(queues=['reports'])
+        self.assertEqual(claimed_job.id, self.fake_job.id)
+        self.assertEqual(claimed_job.attempts[0]['error'], 'some error')
+
+    def test_wait_for_enqueued_jobs(self):
+        self.assertFalse(self.job_repository.wait_for_enqueued_jobs(0.01))
+        self.setUp_fake_jobs()
+        self.add_fake_jobs_to_repository()
+        self.assertTrue(self.job_repository.wait_for_enqueued_jobs(0.01))
+        self.assertFalse(self.job_repository.wait_for_enqueued_jobs(0.01))
+        self.fake_job1.status = JobStatus.SUCCESS
+        self.job_repository.update_job(self.fake_job1)
+        self.assertFalse(self.job_repository.wait_for_enqueued_jobs(0.01))
+
+    def test_get_job_serialized_with_jsonpickle(self):
+        self.setUp_fake_job()
+        self.job_repository.redis_client.hset(f'job:{self.fake_job.id}', mapping={'data': jsonpickle.encode(self.fake_job),
+                                                                                  'status': JobStatus.ENQUEUED.name,
+                                                                                  'start_datetime': ''})
+        self.job_repository.redis_client.zadd('jobindex:ENQUEUED', {self.fake_job.id: 0})
+        actual_job = self.job_repository.claim_job()
+        self.assertEqual(actual_job.id, self.fake_job.id)
+        self.assertListEqual(actual_job.parameters, self.fake_job.parameters)
+
+    def test_migrate_legacy_keys(self):
+        self.setUp_fake_jobs()
+        self.fake_job2.status = JobStatus.SUCCESS
+        redis_client = self.job_repository.redis_client
+        for job in [self.fake_job1, self.fake_job2]:
+            redis_client.set(f'job:{job.id}', jsonpickle.encode(job))
+            redis_client.set(f'jobstatus:{job.id}:{str(job.status)}', f'job:{job.id}')
+        redis_client.set(f'jobstatus:ABCDE:{str(JobStatus.ENQUEUED)}', 'job:ABCDE')
+        self.assertEqual(self.job_repository.migrate_legacy_keys(), 2)
+        self.assertEqual(self.job_repository.migrate_legacy_keys(), 0)
+        self.assertListEqual(self.job_repository._get_keys('jobstatus:*'), [])
+        self.assertEqual(self.job_repository.get_job_by_status(JobStatus.ENQUEUED).id, self.fake_job1.id)
+        self.assertEqual(self.job_repository.get_job_by_status(JobStatus.SUCCESS).id, self.fake_job2.id)
+
 
 if (__name__ == '__main__'):
     unittest.main()
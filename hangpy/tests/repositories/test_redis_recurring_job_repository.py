@@ -0,0 +1,105 @@
+import fakeredis
+import hangpy.tests.fake as fake
+import redis
+import unittest
+from freezegun import freeze_time
+from hangpy.entities import Job, RecurringJob
+from hangpy.enums import CatchUpPolicy
+from hangpy.repositories.redis_recurring_job_repository import RedisRecurringJobRepository
+
+
+class TestRedisRecurringJobRepository(unittest.TestCase):
+
+    def setUp(self):
+        redis_client = fakeredis.FakeStrictRedis()
+        self.recurring_job_repository = RedisRecurringJobRepository(redis_client)
+
+    def get_recurring_job(self, name: str, cron: str = '* * * * *') -> RecurringJob:
+        with freeze_time('1988-04-10 11:01:02'):
+            return RecurringJob(name, Job('module1', 'class2', ['param3'], queue='cpu'), cron, CatchUpPolicy.ALL)
+
+    def test_init(self):
+        self.assertIsInstance(self.recurring_job_repository.redis_client, redis.StrictRedis)
+
+    def test_add_and_get_recurring_jobs(self):
+        self.recurring_job_repository.add_recurring_job(self.get_recurring_job('every-minute'))
+        actual_recurring_job = self.recurring_job_repository.get_recurring_jobs()[0]
+        self.assertEqual(actual_recurring_job.name, 'every-minute')
+        self.assertEqual(actual_recurring_job.cron, '* * * * *')
+        self.assertEqual(actual_recurring_job.catch_up, CatchUpPolicy.ALL)
+        self.assertEqual(actual_recurring_job.next_run_datetime, '1988-04-10T11:02:00')
+        self.assertListEqual(actual_recurring_job.job.parameters, ['param3'])
+        self.assertEqual(actual_recurring_job.job.queue, 'cpu')
+        self.assertEqual(self.recurring_job_repository.get_recurring_job('every-minute').name, 'every-minute')
+        self.assertIsNone(self.recurring_job_repository.get_recurring_job('nightly'))
+
+    def test_remove_recurring_job(self):
+        self.recurring_job_repository.add_recurring_job(self.get_recurring_job('every-minute'))
+        self.recurring_job_repository.remove_recurring_job('every-minute')
+        self.assertListEqual(self.recurring_job_repository.get_recurring_jobs(), [])
+        with freeze_time('1988-04-10 11:05:00'):
+            self.assertListEqual(self.recurring_job_repository.get_due_recurring_jobs(), [])
+
+    def test_get_due_recurring_jobs(self):
+        self.recurring_job_repository.add_recurring_job(self.get_recurring_job('every-minute'))
+        self.recurring_job_repository.add_recurring_job(self.get_recurring_job('nightly', '@daily'))
+        with freeze_time('1988-04-10 11:01:59'):
+            self.assertListEqual(self.recurring_job_repository.get_due_recurring_jobs(), [])
+        with freeze_time('1988-04-10 11:02:00'):
+            due_recurring_jobs = self.recurring_job_repository.get_due_recurring_jobs()
+        self.assertListEqual([recurring_job.name for recurring_job in due_recurring_jobs], ['every-minute'])
+
+    def test_try_update_recurring_job_run(self):
+        self.recurring_job_repository.add_recurring_job(self.get_recurring_job('every-minute'))
+        recurring_job = self.recurring_job_repository.get_recurring_job('every-minute')
+        other_recurring_job = self.recurring_job_repository.get_recurring_job('every-minute')
+        recurring_job.next_run_datetime = other_recurring_job.next_run_datetime = '1988-04-10T11:03:00'
+        self.assertTrue(self.recurring_job_repository.try_update_recurring_job_run(recurring_job, '1988-04-10T11:02:00'))
+        self.assertFalse(self.recurring_job_repository.try_update_recurring_job_run(other_recurring_job, '1988-04-10T11:02:00'))
+        self.assertFalse(self.recurring_job_repository.try_update_recurring_job_run(self.get_recurring_job('nightly'),
+                                                                                    '1988-04-10T11:02:00'))
+        self.assertEqual(self.recurring_job_repository.get_recurring_job('every-minute').next_run_datetime, '1988-04-10T11:03:00')
+        with freeze_time('1988-04-10 11:02:30'):
+            self.assertListEqual(self.recurring_job_repository.get_due_recurring_jobs(), [])
+
+    def test_scheduler_lease(self):
+        redis_client = self.recurring_job_repository.redis_client
+        self.assertTrue(self.recurring_job_repository.try_acquire_scheduler_lease('server1', 1000))
+        self.assertFalse(self.recurring_job_repository.try_acquire_scheduler_lease('server2', 1000))
+        self.assertTrue(self.recurring_job_repository.try_acquire_scheduler_lease('server1', 30000))
+        self.assertTrue(1000 < redis_client.pttl('recurringjobs:scheduler') <= 30000)
+        self.recurring_job_repository.release_scheduler_lease('server2')
+        self.assertFalse(self.recurring_job_repository.try_acquire_scheduler_lease('server2', 1000))
+        self.recurring_job_repository.release_scheduler_lease('server1')
+        self.assertTrue(self.recurring_job_repository.try_acquire_scheduler_lease('server2', 1000))
+
+    def test_hash_tag(self):
+        recurring_job_repository = RedisRecurringJobRepository(self.recurring_job_repository.redis_client, hash_tag='shard-1')
+        recurring_job_repository.add_recurring_job(self.get_recurring_job('every-minute'))
+        self.assertTrue(recurring_job_repository.try_acquire_scheduler_lease('server1', 1000))
+        self.assertEqual(recurring_job_repository.get_recurring_job('every-minute').name, 'every-minute')
+        self.assertListEqual(self.recurring_job_repository.get_recurring_jobs(), [])
+        self.assertTrue(self.recurring_job_repository.try_acquire_scheduler_lease('server2', 1000))
+        keys = [key for key in self.recurring_job_repository.redis_client.keys('*') if not key.startswith(b'{shard-1}:')]
+        self.assertListEqual(keys, [b'recurringjobs:scheduler'])
+
+    def test_cluster_client(self):
+        redis_client = fake.create_fake_redis_cluster()
+        with self.assertRaises(ValueError):
+            RedisRecurringJobRepository(redis_client)
+        recurring_job_repository = RedisRecurringJobRepository(redis_client, hash_tag='shard-1')
+        recurring_job = self.get_recurring_job('every-minute')
+        recurring_job_repository.add_recurring_job(recurring_job)
+        self.assertTrue(recurring_job_repository.try_acquire_scheduler_lease('server1', 1000))
+        with freeze_time('1988-04-10 11:02:30'):
+            self.assertEqual(len(recurring_job_repository.get_due_recurring_jobs()), 1)
+        stored_next_run_datetime = recurring_job.next_run_datetime
+        recurring_job.next_run_datetime = '1988-04-10T11:03:00'
+        self.assertTrue(recurring_job_repository.try_update_recurring_job_run(recurring_job, stored_next_run_datetime))
+        recurring_job_repository.release_scheduler_lease('server1')
+        recurring_job_repository.remove_recurring_job('every-minute')
+        self.assertListEqual(recurring_job_repository.get_recurring_jobs(), [])
+
+
+if (__name__ == "__main__"):
+    unittest.main()
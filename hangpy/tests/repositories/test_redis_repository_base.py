@@ -1,6 +1,6 @@
 import fakeredis
 import unittest
-from hangpy.repositories import RedisRepositoryBase
+from hangpy.repositories import CompactEntryCodec, JsonpickleEntryCodec, RedisConnectionPool, RedisRepositoryBase
 
 
 def get_redis_repository():
@@ -17,6 +17,41 @@ class TestRedisRepositoryBase(unittest.TestCase):
     def setUp(self):
         self.redis_repository = get_redis_repository()
 
+    def test_init_with_default_entry_codec(self):
+        self.assertIsInstance(self.redis_repository.entry_codec, CompactEntryCodec)
+
+    def test_init_with_entry_codec(self):
+        entry_codec = JsonpickleEntryCodec()
+        redis_repository = RedisRepositoryBase(fakeredis.FakeStrictRedis(), entry_codec)
+        self.assertIs(redis_repository.entry_codec, entry_codec)
+
+    def test_init_with_decoding_client(self):
+        redis_client = fakeredis.FakeStrictRedis(decode_responses=True)
+        self.assertIsInstance(RedisRepositoryBase(redis_client).entry_codec, JsonpickleEntryCodec)
+        with self.assertRaises(ValueError):
+            RedisRepositoryBase(redis_client, CompactEntryCodec())
+
+    def test_init_with_url(self):
+        redis_repository = RedisRepositoryBase('redis://localhost:6380/1')
+        self.assertTrue(redis_repository.owns_redis_client)
+        self.assertIsInstance(redis_repository.redis_client.connection_pool, RedisConnectionPool)
+        self.assertEqual(redis_repository.get_connection_pool_statistics()['acquisitions'], 0)
+        redis_repository.close()
+
+    def test_get_connection_pool_statistics_without_connection_pool(self):
+        self.assertFalse(self.redis_repository.owns_redis_client)
+        self.assertIsNone(self.redis_repository.get_connection_pool_statistics())
+
+    def test_close_keeps_client_passed(self):
+        self.redis_repository.close()
+        self.redis_repository.redis_client.set('key', 'value')
+        self.assertEqual(self.redis_repository.redis_client.get('key'), b'value')
+
+    def test_get_prefixed_key(self):
+        self.assertEqual(self.redis_repository._get_prefixed_key('jobleases'), 'jobleases')
+        redis_repository = RedisRepositoryBase(fakeredis.FakeStrictRedis(), hash_tag='shard-1')
+        self.assertEqual(redis_repository._get_prefixed_key('jobleases'), '{shard-1}:jobleases')
+
     def test_get_key_with_valid_key(self):
         fill_fake_data(self.redis_repository)
         actual_key = self.redis_repository._get_key('key*').decode()
@@ -46,12 +81,23 @@ class TestRedisRepositoryBase(unittest.TestCase):
         actual_keys = [key.decode() for key in self.redis_repository._get_keys('*')]
         self.assertListEqual(actual_keys, [])
 
+    def test_decode_value(self):
+        self.assertEqual(self.redis_repository._decode_value(b'luiz'), 'luiz')
+        self.assertEqual(self.redis_repository._decode_value('luiz'), 'luiz')
+        self.assertIsNone(self.redis_repository._decode_value(None))
+
     def test_serialize_entry(self):
         fake_object = FakeClass('luiz', 'fernando')
         actual = self.redis_repository._serialize_entry(fake_object)
         validation_regex = r'\{\"py/object\"\: \".+\.FakeClass\", \"property1\"\: \"luiz\", \"property2\"\: \"fernando\"\}'
         self.assertRegex(actual, validation_regex)
 
+    def test_deserialize_legacy_entry(self):
+        fake_object = FakeClass('luiz', 'fernando')
+        serialized_entry = JsonpickleEntryCodec().encode(fake_object).encode()
+        actual_object = self.redis_repository._deserialize_entry(serialized_entry)
+        self.assertEqual(actual_object, fake_object)
+
     def test_deserialize_entries(self):
         fake_object = FakeClass('luiz', 'fernando')
         serialized_entry = self.redis_repository._serialize_entry(fake_object)
@@ -1,5 +1,6 @@
 import datetime
 import fakeredis
+import hangpy.tests.fake as fake
 import redis
 import unittest
 from freezegun import freeze_time
@@ -41,6 +42,75 @@ class TestRedisServerRepository(unittest.TestCase):
         actual_server = self.server_repository.get_servers()[0]
         self.assertEqual(actual_server.last_cycle_datetime, self.fake_server.last_cycle_datetime)
 
+    def test_send_heartbeat_and_get_live_servers(self):
+        self.assertListEqual(self.server_repository.get_live_servers(), [])
+        self.setUp_fake_server()
+        self.add_fake_server_to_repository()
+        self.assertListEqual(self.server_repository.get_live_servers(), [])
+        self.fake_server.used_slots = 2
+        self.server_repository.send_heartbeat(self.fake_server, 30000)
+        actual_servers = self.server_repository.get_live_servers()
+        self.assertListEqual([server.id for server in actual_servers], [self.fake_server.id])
+        self.assertEqual(actual_servers[0].used_slots, 2)
+        self.assertTrue(0 < self.server_repository.redis_client.pttl(f'server.{self.fake_server.id}') <= 30000)
+
+    def test_get_live_servers_expired(self):
+        self.setUp_fake_server()
+        dead_server = Server(ServerConfigurationDto())
+        with freeze_time('1988-04-10 11:01:02'):
+            self.server_repository.send_heartbeat(dead_server, 1000)
+        with freeze_time('1988-04-10 11:01:04'):
+            self.server_repository.send_heartbeat(self.fake_server, 1000)
+            actual_servers = self.server_repository.get_live_servers()
+        self.assertListEqual([server.id for server in actual_servers], [self.fake_server.id])
+        self.assertEqual(self.server_repository.redis_client.zcard('servers:live'), 1)
+
+    def test_get_servers_expired(self):
+        self.setUp_fake_server()
+        dead_server = Server(ServerConfigurationDto())
+        self.add_fake_server_to_repository()
+        with freeze_time('1988-04-10 11:01:02'):
+            self.server_repository.send_heartbeat(dead_server, 1000)
+        with freeze_time('1988-04-10 11:01:04'):
+            self.server_repository.send_heartbeat(Server(ServerConfigurationDto()), 1000)
+            actual_server_ids = {server.id for server in self.server_repository.get_servers()}
+        self.assertNotIn(dead_server.id, actual_server_ids)
+        self.assertIn(self.fake_server.id, actual_server_ids)
+        self.assertEqual(len(actual_server_ids), 2)
+
+    def test_hash_tag(self):
+        server_repository = RedisServerRepository(self.server_repository.redis_client, hash_tag='shard-1')
+        self.setUp_fake_server()
+        server_repository.add_server(self.fake_server)
+        server_repository.send_heartbeat(self.fake_server, 30000)
+        self.assertListEqual([server.id for server in server_repository.get_live_servers()], [self.fake_server.id])
+        self.assertListEqual([server.id for server in server_repository.get_servers()], [self.fake_server.id])
+        self.assertListEqual(self.server_repository.get_servers(), [])
+        self.assertTrue(all(key.startswith(b'{shard-1}:') for key in self.server_repository.redis_client.keys('*')))
+
+    def test_cluster_client(self):
+        redis_client = fake.create_fake_redis_cluster()
+        with self.assertRaises(ValueError):
+            RedisServerRepository(redis_client)
+        server_repository = RedisServerRepository(redis_client, hash_tag='shard-1')
+        self.setUp_fake_server()
+        server_repository.add_server(self.fake_server)
+        server_repository.send_heartbeat(self.fake_server, 30000)
+        self.assertListEqual([server.id for server in server_repository.get_live_servers()], [self.fake_server.id])
+        self.fake_server.stop_datetime = datetime.datetime.now().isoformat()
+        server_repository.update_server(self.fake_server)
+        self.assertListEqual(server_repository.get_live_servers(), [])
+        self.assertListEqual([server.id for server in server_repository.get_servers()], [self.fake_server.id])
+
+    def test_update_server_stopped(self):
+        self.setUp_fake_server()
+        self.server_repository.send_heartbeat(self.fake_server, 30000)
+        self.fake_server.stop_datetime = datetime.datetime.now().isoformat()
+        self.server_repository.update_server(self.fake_server)
+        self.assertListEqual(self.server_repository.get_live_servers(), [])
+        self.assertEqual(self.server_repository.get_servers()[0].stop_datetime, self.fake_server.stop_datetime)
+        self.assertGreater(self.server_repository.redis_client.pttl(f'server.{self.fake_server.id}'), 0)
+
 
 if (__name__ == '__main__'):
     unittest.main()
@@ -9,6 +9,8 @@ class TestServerRepository(unittest.TestCase):
         self.assertIsNone(server_repository.get_servers())
         self.assertIsNone(server_repository.add_server(None))
         self.assertIsNone(server_repository.update_server(None))
+        self.assertIsNone(server_repository.send_heartbeat(None, None))
+        self.assertIsNone(server_repository.get_live_servers())
 
 
 class FakeServerRepository(ServerRepository):
@@ -22,6 +24,12 @@ class FakeServerRepository(ServerRepository):
     def update_server(self, server):
         return ServerRepository.update_server(self, server)
 
+    def send_heartbeat(self, server, timeout_milliseconds):
+        return ServerRepository.send_heartbeat(self, server, timeout_milliseconds)
+
+    def get_live_servers(self):
+        return ServerRepository.get_live_servers(self)
+
 
 if (__name__ == "__main__"):
     unittest.main()
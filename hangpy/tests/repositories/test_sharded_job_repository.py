@@ -0,0 +1,166 @@
+import fakeredis
+import threading
+import unittest
+import hangpy.tests.fake as fake
+from freezegun import freeze_time
+from hangpy.enums import JobStatus
+from hangpy.repositories import InMemoryJobRepository, RedisJobRepository, ShardedJobRepository
+
+
+class TestShardedJobRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.shards = [InMemoryJobRepository() for _ in range(3)]
+        self.job_repository = ShardedJobRepository(self.shards)
+
+    def create_fake_jobs(self, quantity: int, status: JobStatus = JobStatus.ENQUEUED, queue: str = 'default') -> list:
+        jobs = [fake.FakeJobActivity().create_job_object(queue=queue) for _ in range(quantity)]
+        for job in jobs:
+            job.status = status
+        return jobs
+
+    def test_init_validates_parameters(self):
+        with self.assertRaises(ValueError):
+            ShardedJobRepository([])
+        with self.assertRaises(ValueError):
+            ShardedJobRepository(self.shards, local_shard=3)
+        with self.assertRaises(ValueError):
+            ShardedJobRepository(self.shards, local_shard='0')
+
+    def test_add_jobs_distributes_jobs(self):
+        jobs = self.create_fake_jobs(60)
+        self.job_repository.add_jobs(jobs)
+        self.assertTrue(all(shard.count_jobs_by_status(JobStatus.ENQUEUED) > 0 for shard in self.shards))
+        for job in jobs:
+            self.assertEqual(self.job_repository.get_shard(job.id).count_enqueued_jobs(['default']) > 0, True)
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.ENQUEUED), 60)
+        self.assertEqual(self.job_repository.count_enqueued_jobs(['default']), 60)
+        self.assertEqual(self.job_repository.get_status_counts()[JobStatus.ENQUEUED], 60)
+        self.assertSetEqual({job.id for job in self.job_repository.get_jobs()}, {job.id for job in jobs})
+        self.assertTrue(self.job_repository.exists_jobs_with_status(JobStatus.ENQUEUED))
+        self.assertFalse(self.job_repository.exists_jobs_with_status(JobStatus.ERROR))
+
+    def test_update_jobs(self):
+        jobs = self.create_fake_jobs(10)
+        self.job_repository.add_jobs(jobs)
+        for job in jobs:
+            job.status = JobStatus.SUCCESS
+        self.job_repository.update_jobs(jobs[:9])
+        self.job_repository.update_job(jobs[9])
+        self.assertEqual(len(self.job_repository.get_jobs_by_status(JobStatus.SUCCESS)), 10)
+        self.assertIsNotNone(self.job_repository.get_job_by_status(JobStatus.SUCCESS))
+        self.assertIsNone(self.job_repository.get_job_by_status(JobStatus.ENQUEUED))
+
+    def test_claim_jobs_round_robin(self):
+        self.job_repository.add_jobs(self.create_fake_jobs(30))
+        first_claims = [self.job_repository.claim_job() for _ in range(3)]
+        self.assertSetEqual({self.shards.index(self.job_repository.get_shard(job.id)) for job in first_claims}, {0, 1, 2})
+        claimed_jobs = self.job_repository.claim_jobs(40)
+        self.assertEqual(len(claimed_jobs), 27)
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.PROCESSING), 30)
+        self.assertIsNone(self.job_repository.claim_job())
+
+    def test_claim_jobs_local_shard_first(self):
+        job_repository = ShardedJobRepository(self.shards, local_shard=2)
+        job_repository.add_jobs(self.create_fake_jobs(30))
+        local_jobs = self.shards[2].count_jobs_by_status(JobStatus.ENQUEUED)
+        claimed_jobs = job_repository.claim_jobs(local_jobs)
+        self.assertTrue(all(job_repository.get_shard(job.id) is self.shards[2] for job in claimed_jobs))
+        self.assertEqual(len(job_repository.claim_jobs(30)), 30 - local_jobs)
+
+    def test_leases_and_cancellations(self):
+        jobs = self.create_fake_jobs(6)
+        self.job_repository.add_jobs(jobs)
+        with freeze_time('1988-04-10 11:01:02'):
+            claimed_jobs = self.job_repository.claim_jobs(6, lease_milliseconds=1000)
+        self.assertTrue(self.job_repository.cancel_job(claimed_jobs[0].id))
+        job_ids = [job.id for job in claimed_jobs]
+        self.assertListEqual(self.job_repository.get_cancelled_job_ids(job_ids), [job_ids[0]])
+        with freeze_time('1988-04-10 11:01:02.500'):
+            self.assertFalse(self.job_repository.try_set_lock_on_job(claimed_jobs[1]))
+            self.assertListEqual(self.job_repository.renew_job_leases(claimed_jobs[1:3], 5000), [])
+        with freeze_time('1988-04-10 11:01:04'):
+            self.assertCountEqual(self.job_repository.reclaim_expired_jobs(), job_ids[3:])
+            self.assertCountEqual(self.job_repository.renew_job_leases(claimed_jobs), [claimed_jobs[0]] + claimed_jobs[3:])
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.CANCELLED), 1)
+
+    def test_promote_scheduled_jobs(self):
+        jobs = self.create_fake_jobs(6, JobStatus.SCHEDULED)
+        for job in jobs:
+            job.enqueued_datetime = '1988-04-10T11:00:00'
+        self.job_repository.add_jobs(jobs)
+        with freeze_time('1988-04-10 12:00:00'):
+            self.assertCountEqual(self.job_repository.promote_scheduled_jobs(), [job.id for job in jobs])
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.ENQUEUED), 6)
+
+    def test_dead_letter_jobs(self):
+        jobs = self.create_fake_jobs(6, JobStatus.ERROR)
+        self.job_repository.add_jobs(jobs)
+        self.job_repository.move_jobs_to_dead_letter(jobs)
+        self.assertEqual(self.job_repository.count_dead_letter_jobs(), 6)
+        self.assertEqual(len(self.job_repository.get_dead_letter_jobs(4)), 4)
+        self.assertEqual(self.job_repository.requeue_dead_letter_job(jobs[0].id).id, jobs[0].id)
+        self.assertEqual(self.job_repository.count_dead_letter_jobs(), 5)
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.ENQUEUED), 1)
+
+    @freeze_time('1988-04-10 12:00:00')
+    def test_claim_expired_jobs(self):
+        jobs = self.create_fake_jobs(30, JobStatus.SUCCESS)
+        for job in jobs:
+            job.end_datetime = '1988-04-10T10:00:00'
+        self.job_repository.add_jobs(jobs)
+        claimed_jobs = self.job_repository.claim_expired_jobs(JobStatus.SUCCESS, max_count=10)
+        self.assertEqual(len(claimed_jobs), 20)
+        self.job_repository.delete_jobs(claimed_jobs)
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.SUCCESS), 10)
+        self.assertEqual(len(self.job_repository.claim_expired_jobs(JobStatus.SUCCESS, max_age_seconds=3600, limit=4)), 4)
+
+    @freeze_time('1988-04-10 12:00:00')
+    def test_claim_expired_jobs_with_uneven_shards(self):
+        jobs_by_shard = {0: [], 1: []}
+        while (len(jobs_by_shard[0]) < 11 or len(jobs_by_shard[1]) < 1):
+            job = self.create_fake_jobs(1, JobStatus.SUCCESS)[0]
+            job.end_datetime = '1988-04-10T10:00:00'
+            jobs_by_shard.get(self.shards.index(self.job_repository.get_shard(job.id)), []).append(job)
+        jobs = jobs_by_shard[0][:11] + jobs_by_shard[1][:1]
+        self.job_repository.add_jobs(jobs)
+        claimed_jobs = self.job_repository.claim_expired_jobs(JobStatus.SUCCESS, max_count=6)
+        self.assertEqual(len(claimed_jobs), 6)
+        self.job_repository.delete_jobs(claimed_jobs)
+        self.assertEqual(self.job_repository.count_jobs_by_status(JobStatus.SUCCESS), 6)
+        self.assertEqual(self.job_repository.claim_expired_jobs(JobStatus.SUCCESS, max_count=6), [])
+
+    def test_wait_for_enqueued_jobs(self):
+        redis_client = fakeredis.FakeStrictRedis()
+        job_repository = ShardedJobRepository([RedisJobRepository(redis_client, hash_tag=f'hangpy-{index}') for index in range(4)])
+        self.assertFalse(job_repository.wait_for_enqueued_jobs(0.05, ['default', 'reports']))
+        timer = threading.Timer(0.05, job_repository.add_jobs, [self.create_fake_jobs(1, queue='reports')])
+        timer.start()
+        self.assertTrue(job_repository.wait_for_enqueued_jobs(5, ['default', 'reports']))
+        timer.join()
+        self.assertFalse(job_repository.wait_for_enqueued_jobs(0.05, ['default', 'reports']))
+
+    def test_wait_for_enqueued_jobs_single_shard(self):
+        job_repository = ShardedJobRepository(self.shards[:1])
+        timer = threading.Timer(0.05, job_repository.add_jobs, [self.create_fake_jobs(1)])
+        timer.start()
+        self.assertTrue(job_repository.wait_for_enqueued_jobs(5))
+        timer.join()
+
+    def test_redis_shards_with_hash_tags(self):
+        redis_client = fakeredis.FakeStrictRedis()
+        job_repository = ShardedJobRepository([RedisJobRepository(redis_client, hash_tag=f'hangpy-{index}') for index in range(4)])
+        jobs = self.create_fake_jobs(40)
+        job_repository.add_jobs(jobs)
+        self.assertEqual(job_repository.count_jobs_by_status(JobStatus.ENQUEUED), 40)
+        claimed_jobs = job_repository.claim_jobs(40)
+        self.assertSetEqual({job.id for job in claimed_jobs}, {job.id for job in jobs})
+        for job in claimed_jobs:
+            job.status = JobStatus.SUCCESS
+        job_repository.update_jobs(claimed_jobs)
+        self.assertEqual(job_repository.count_jobs_by_status(JobStatus.SUCCESS), 40)
+        self.assertEqual({key.split(b'}')[0] for key in redis_client.keys('*')}, {b'{hangpy-0', b'{hangpy-1', b'{hangpy-2', b'{hangpy-3'})
+
+
+if (__name__ == "__main__"):
+    unittest.main()
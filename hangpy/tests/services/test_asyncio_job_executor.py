@@ -0,0 +1,70 @@
+import hangpy.tests.fake as fake
+import time
+from hangpy.enums import JobStatus
+from hangpy.services import AsyncioJobExecutor
+from unittest import TestCase, main
+
+
+def get_job_activity(job_activity_class):
+    job_activity = job_activity_class()
+    job_activity.set_job(job_activity.create_job_object())
+    return job_activity
+
+
+class TestAsyncioJobExecutor(TestCase):
+
+    def test_submit(self):
+        job_executor = AsyncioJobExecutor()
+        job_executor.start(2)
+        job_activities = [get_job_activity(fake.FakeJobActivity),
+                          get_job_activity(fake.FakeAsyncJobActivity),
+                          get_job_activity(fake.FakeErrorJobActivity)]
+        for job_activity in job_activities:
+            job_executor.submit(job_activity)
+        while (not all(job_activity.is_finished() for job_activity in job_activities)):
+            time.sleep(0.01)
+        job_executor.shutdown()
+        self.assertEqual(job_activities[0].get_job().status, JobStatus.SUCCESS)
+        self.assertEqual(job_activities[1].get_job().status, JobStatus.SUCCESS)
+        self.assertEqual(job_activities[2].get_job().status, JobStatus.ERROR)
+        self.assertTrue(job_executor.event_loop.is_closed())
+
+    def test_cancel_coroutine_activity(self):
+        job_executor = AsyncioJobExecutor()
+        job_executor.start(1)
+        job_activity = get_job_activity(fake.FakeHungAsyncJobActivity)
+        job_executor.submit(job_activity)
+        job_activity.cancel('The job was cancelled')
+        job_executor.cancel(job_activity)
+        while (not job_activity.is_finished()):
+            time.sleep(0.01)
+        job_executor.shutdown()
+        self.assertEqual(job_activity.get_job().status, JobStatus.CANCELLED)
+        self.assertEqual(len(job_executor.futures), 0)
+
+    def test_cancel_hung_activity(self):
+        job_executor = AsyncioJobExecutor(cancellation_grace_seconds=0.05)
+        job_executor.start(1)
+        job_activity = get_job_activity(fake.FakeHungJobActivity)
+        job_activity.sleep_seconds = 0.5
+        job_executor.submit(job_activity)
+        thread_pool = job_executor.thread_pool
+        job_activity.cancel('The job was cancelled')
+        job_executor.cancel(job_activity)
+        while (not job_activity.is_finished()):
+            time.sleep(0.01)
+        other_job_activity = get_job_activity(fake.FakeJobActivity)
+        job_executor.submit(other_job_activity)
+        while (not other_job_activity.is_finished()):
+            time.sleep(0.01)
+        job_executor.shutdown()
+        self.assertEqual(job_activity.get_job().status, JobStatus.CANCELLED)
+        self.assertIsNot(job_executor.thread_pool, thread_pool)
+
+    def test_shutdown_without_start(self):
+        job_executor = AsyncioJobExecutor()
+        self.assertIsNone(job_executor.shutdown())
+
+
+if (__name__ == "__main__"):
+    main()
@@ -0,0 +1,33 @@
+import pickle
+import threading
+import unittest
+from hangpy.services import CancellationToken
+
+
+class TestCancellationToken(unittest.TestCase):
+
+    def test_cancel(self):
+        cancellation_token = CancellationToken()
+        self.assertFalse(cancellation_token.is_cancelled())
+        self.assertIsNone(cancellation_token.reason)
+        cancellation_token.cancel('some reason')
+        self.assertTrue(cancellation_token.is_cancelled())
+        self.assertEqual(cancellation_token.reason, 'some reason')
+
+    def test_wait(self):
+        cancellation_token = CancellationToken()
+        self.assertFalse(cancellation_token.wait(0.01))
+        threading.Timer(0.01, cancellation_token.cancel).start()
+        self.assertTrue(cancellation_token.wait(10))
+
+    def test_pickle(self):
+        cancellation_token = CancellationToken()
+        self.assertFalse(pickle.loads(pickle.dumps(cancellation_token)).is_cancelled())
+        cancellation_token.cancel('some reason')
+        actual_cancellation_token = pickle.loads(pickle.dumps(cancellation_token))
+        self.assertTrue(actual_cancellation_token.is_cancelled())
+        self.assertEqual(actual_cancellation_token.reason, 'some reason')
+
+
+if (__name__ == "__main__"):
+    unittest.main()
@@ -1,8 +1,10 @@
+import asyncio
+import pickle
 from freezegun import freeze_time
-from hangpy.entities import Job
+from hangpy.entities import Job, RetryPolicy
 from hangpy.enums import JobStatus
 from hangpy.services import JobActivityBase
-from hangpy.tests.fake import FakeJobActivity
+from hangpy.tests.fake import FakeAsyncJobActivity, FakeErrorJobActivity, FakeJobActivity
 from unittest import TestCase, mock, main
 
 
@@ -30,31 +32,131 @@ class TestJobActivityBase(TestCase):
     @mock.patch(get_fully_qualified_name('set_job_error'))
     @mock.patch(get_fully_qualified_name('set_job_end_datetime'))
     @mock.patch(get_fully_qualified_name('set_started_to_run'))
-    def test_start(self, *args):
+    @mock.patch(get_fully_qualified_name('set_finished'))
+    def test_run(self, *args):
         job_activity = FakeJobActivity()
         job_activity.action = mock.MagicMock()
         self.assertEqual(job_activity.action.call_count, 0)
-        job_activity.start()
-        job_activity.join()
+        job_activity.run()
         self.assertEqual(job_activity.action.call_count, 1)
         self.assertEqual(get_call_count('set_job_status', args), 1)
         self.assertEqual(get_call_count('set_job_error', args), 0)
         self.assertEqual(get_call_count('set_job_end_datetime', args), 1)
         self.assertEqual(get_call_count('set_started_to_run', args), 1)
+        self.assertEqual(get_call_count('set_finished', args), 1)
 
     @mock.patch(get_fully_qualified_name('set_job_status'))
     @mock.patch(get_fully_qualified_name('set_job_error'))
     @mock.patch(get_fully_qualified_name('set_job_end_datetime'))
     @mock.patch(get_fully_qualified_name('set_started_to_run'))
-    def test_start_exception(self, *args):
+    @mock.patch(get_fully_qualified_name('set_finished'))
+    def test_run_exception(self, *args):
         job_activity = FakeJobActivity()
         job_activity.action = mock.MagicMock(side_effect=Exception())
-        job_activity.start()
-        job_activity.join()
+        job_activity.run()
         self.assertEqual(get_call_count('set_job_status', args), 1)
         self.assertEqual(get_call_count('set_job_error', args), 1)
         self.assertEqual(get_call_count('set_job_end_datetime', args), 1)
         self.assertEqual(get_call_count('set_started_to_run', args), 1)
+        self.assertEqual(get_call_count('set_finished', args), 1)
+
+    def test_run_coroutine_action(self):
+        job_activity = FakeAsyncJobActivity()
+        job_activity.set_job(job_activity.create_job_object())
+        job_activity.run()
+        self.assertTrue(job_activity.is_finished())
+        self.assertEqual(job_activity.get_job().status, JobStatus.SUCCESS)
+
+    def test_run_async(self):
+        job_activity = FakeAsyncJobActivity()
+        job_activity.set_job(job_activity.create_job_object())
+        asyncio.run(job_activity.run_async())
+        self.assertTrue(job_activity.is_finished())
+        self.assertEqual(job_activity.get_job().status, JobStatus.SUCCESS)
+
+        job_activity = FakeErrorJobActivity()
+        job_activity.set_job(job_activity.create_job_object())
+        asyncio.run(job_activity.run_async())
+        self.assertTrue(job_activity.is_finished())
+        self.assertEqual(job_activity.get_job().status, JobStatus.ERROR)
+        self.assertEqual(job_activity.get_job().error, 'some exception message')
+
+    def test_get_retry_policy(self):
+        class FakeRetryJobActivity(FakeJobActivity):
+            retry_policy = RetryPolicy(max_attempts=5)
+
+        self.assertIsNone(FakeJobActivity().get_retry_policy())
+        self.assertEqual(FakeRetryJobActivity().get_retry_policy().max_attempts, 5)
+
+    def test_get_timeout_seconds(self):
+        class FakeTimeoutJobActivity(FakeJobActivity):
+            timeout_seconds = 30
+
+        job_activity = FakeTimeoutJobActivity()
+        job_activity.set_job(job_activity.create_job_object())
+        self.assertEqual(job_activity.get_timeout_seconds(), 30)
+        job_activity.set_job(job_activity.create_job_object(timeout_seconds=5))
+        self.assertEqual(job_activity.get_timeout_seconds(), 5)
+        job_activity = FakeJobActivity()
+        job_activity.set_job(job_activity.create_job_object())
+        self.assertIsNone(job_activity.get_timeout_seconds())
+
+    def test_get_running_seconds(self):
+        job_activity = FakeJobActivity()
+        self.assertEqual(job_activity.get_running_seconds(), 0)
+        job_activity.set_started_to_run()
+        self.assertGreaterEqual(job_activity.get_running_seconds(), 0)
+
+    def test_cancel(self):
+        job_activity = FakeJobActivity()
+        job_activity.set_job(job_activity.create_job_object())
+        self.assertFalse(job_activity.is_cancelled())
+        job_activity.cancel('The job timed out', JobStatus.ERROR)
+        self.assertTrue(job_activity.is_cancelled())
+        self.assertTrue(job_activity.get_cancellation_token().is_cancelled())
+        job_activity.run()
+        self.assertEqual(job_activity.get_job().status, JobStatus.ERROR)
+        self.assertEqual(job_activity.get_job().error, 'The job timed out')
+
+    def test_finish_cancelled(self):
+        job_activity = FakeJobActivity()
+        job_activity.set_job(job_activity.create_job_object())
+        job_activity.cancel('The job was cancelled')
+        job_activity.finish_cancelled()
+        self.assertTrue(job_activity.is_finished())
+        self.assertEqual(job_activity.get_job().status, JobStatus.CANCELLED)
+        self.assertEqual(job_activity.get_job().error, 'The job was cancelled')
+        self.assertIsNotNone(job_activity.get_job().end_datetime)
+
+    def test_abandon(self):
+        job_activity = FakeJobActivity()
+        job_activity.set_job(job_activity.create_job_object())
+        job = job_activity.get_job()
+        job_activity.cancel('The job was cancelled')
+        job_activity.abandon()
+        self.assertTrue(job_activity.is_finished())
+        abandoned_job = job_activity.get_job()
+        self.assertIsNot(abandoned_job, job)
+        self.assertEqual(abandoned_job.id, job.id)
+        self.assertEqual(abandoned_job.status, JobStatus.CANCELLED)
+        self.assertEqual(abandoned_job.error, 'The job was cancelled')
+        end_datetime = abandoned_job.end_datetime
+        self.assertIsNotNone(end_datetime)
+        job_activity.run()
+        self.assertIs(job_activity.get_job(), abandoned_job)
+        self.assertEqual(abandoned_job.end_datetime, end_datetime)
+
+    def test_pickle(self):
+        job_activity = FakeJobActivity()
+        job_activity.set_job(job_activity.create_job_object())
+        job_activity.cancel('The job was cancelled')
+        actual_job_activity = pickle.loads(pickle.dumps(job_activity))
+        self.assertTrue(actual_job_activity.is_cancelled())
+        self.assertEqual(actual_job_activity.get_job().id, job_activity.get_job().id)
+
+    def test_is_coroutine_action(self):
+        self.assertFalse(FakeJobActivity().is_coroutine_action())
+        self.assertTrue(FakeAsyncJobActivity().is_coroutine_action())
 
     def test_create_job_object(self):
         job_activity = FakeJobActivity()
@@ -64,6 +166,11 @@ class TestJobActivityBase(TestCase):
 
         actual_job = job_activity.create_job_object(['a', 'b'])
         self.assertListEqual(actual_job.parameters, ['a', 'b'])
+        self.assertEqual(actual_job.priority, 0)
+
+        actual_job = job_activity.create_job_object(priority=5, queue='reports')
+        self.assertEqual(actual_job.priority, 5)
+        self.assertEqual(actual_job.queue, 'reports')
 
     def test_set_job(self):
         job_activity = FakeJobActivity()
@@ -84,10 +191,18 @@ class TestJobActivityBase(TestCase):
         job_activity.set_started_to_run()
         self.assertTrue(job_activity._started_to_run)
 
+    def test_set_finished(self):
+        job_activity = FakeJobActivity()
+        self.assertFalse(job_activity._finished)
+        job_activity.set_finished()
+        self.assertTrue(job_activity._finished)
+
     def test_is_finished(self):
         job_activity = FakeJobActivity()
         self.assertFalse(job_activity.is_finished())
         job_activity._started_to_run = True
+        self.assertFalse(job_activity.is_finished())
+        job_activity._finished = True
         self.assertTrue(job_activity.is_finished())
 
     def test_set_can_be_untracked(self):
@@ -102,13 +217,6 @@ class TestJobActivityBase(TestCase):
         job_activity._can_be_untracked = True
         self.assertTrue(job_activity.can_be_untracked())
 
-    @mock.patch(get_fully_qualified_name('is_alive'), return_value=True)
-    def test_is_finished_thread_running(self, is_alive_mock):
-        job_activity = FakeJobActivity()
-        self.assertFalse(job_activity.is_finished())
-        job_activity._started_to_run = True
-        self.assertFalse(job_activity.is_finished())
-
     def test_set_job_status(self):
         job_activity = FakeJobActivity()
         job = Job('some_module', 'some_class')
@@ -0,0 +1,28 @@
+import unittest
+from hangpy.services import JobExecutor
+
+
+class TestJobExecutor(unittest.TestCase):
+
+    def test_instantiate(self):
+        job_executor = FakeJobExecutor()
+        self.assertIsNone(job_executor.start(None))
+        self.assertIsNone(job_executor.submit(None))
+        self.assertIsNone(job_executor.cancel(None))
+        self.assertIsNone(job_executor.shutdown())
+
+
+class FakeJobExecutor(JobExecutor):
+
+    def start(self, workers):
+        return JobExecutor.start(self, workers)
+
+    def submit(self, job_activity):
+        return JobExecutor.submit(self, job_activity)
+
+    def shutdown(self):
+        return JobExecutor.shutdown(self)
+
+
+if (__name__ == "__main__"):
+    unittest.main()
@@ -1,5 +1,9 @@
+import datetime
 import types
+from freezegun import freeze_time
+from hangpy.enums import CatchUpPolicy, JobStatus
 from hangpy.services import JobService
+from hangpy.tests.fake import FakeJobActivity
 from unittest import TestCase, mock, main
 
 
@@ -18,8 +22,141 @@ class TestJobService(TestCase):
         self.assertEqual(fake_job_repository.add_job.call_count, 1)
 
         job_service.enqueue_job(fake_job_activity, ['a', 'b'])
-        actual_args = fake_job_activity.create_job_object.call_args[0][0]
-        self.assertListEqual(actual_args, ['a', 'b'])
+        actual_args = fake_job_activity.create_job_object.call_args[0]
+        self.assertTupleEqual(actual_args, (['a', 'b'], 0, 'default'))
+
+        job_service.enqueue_job(fake_job_activity, priority=5, queue='reports')
+        actual_args = fake_job_activity.create_job_object.call_args[0]
+        self.assertTupleEqual(actual_args, (None, 5, 'reports'))
+
+    def test_enqueue_jobs(self):
+        fake_job_repository = types.SimpleNamespace()
+        fake_job_repository.add_jobs = mock.MagicMock()
+        fake_job_activity = types.SimpleNamespace()
+        fake_job_activity.create_job_object = mock.MagicMock(
+            side_effect=lambda parameters, *_, **__: types.SimpleNamespace(id=parameters[0]))
+        job_service = JobService(fake_job_repository)
+        parameter_sets = ([str(index)] for index in range(5))
+        actual_ids = job_service.enqueue_jobs(fake_job_activity, parameter_sets, batch_size=2, priority=3, queue='reports')
+        self.assertListEqual(actual_ids, ['0', '1', '2', '3', '4'])
+        self.assertEqual(fake_job_activity.create_job_object.call_count, 5)
+        self.assertTupleEqual(fake_job_activity.create_job_object.call_args[0][1:], (3, 'reports'))
+        self.assertEqual(fake_job_repository.add_jobs.call_count, 3)
+        self.assertListEqual([job.id for job in fake_job_repository.add_jobs.call_args[0][0]], ['4'])
+
+    def test_enqueue_jobs_without_parameter_sets(self):
+        fake_job_repository = types.SimpleNamespace()
+        fake_job_repository.add_jobs = mock.MagicMock()
+        job_service = JobService(fake_job_repository)
+        self.assertListEqual(job_service.enqueue_jobs(None, []), [])
+        self.assertEqual(fake_job_repository.add_jobs.call_count, 0)
+
+    def test_enqueue_jobs_invalid_batch_size(self):
+        job_service = JobService(None)
+        self.assertRaises(ValueError, job_service.enqueue_jobs, None, [], batch_size=0)
+        self.assertRaises(ValueError, job_service.enqueue_jobs, None, [], batch_size='1')
+
+    @freeze_time('1988-04-10 11:01:02')
+    def test_schedule_job(self):
+        fake_job_repository = types.SimpleNamespace()
+        fake_job_repository.add_job = mock.MagicMock()
+        job_service = JobService(fake_job_repository)
+        job_id = job_service.schedule_job(FakeJobActivity(), datetime.datetime(1988, 4, 10, 12), ['a'], 3, 'reports')
+        actual_job = fake_job_repository.add_job.call_args[0][0]
+        self.assertEqual(actual_job.id, job_id)
+        self.assertEqual(actual_job.status, JobStatus.SCHEDULED)
+        self.assertEqual(actual_job.enqueued_datetime, '1988-04-10T12:00:00')
+        self.assertListEqual(actual_job.parameters, ['a'])
+        self.assertEqual(actual_job.priority, 3)
+        self.assertEqual(actual_job.queue, 'reports')
+
+        job_service.schedule_job(FakeJobActivity(), delay=datetime.timedelta(minutes=5))
+        actual_job = fake_job_repository.add_job.call_args[0][0]
+        self.assertEqual(actual_job.enqueued_datetime, '1988-04-10T11:06:02')
+
+    def test_schedule_job_with_invalid_values(self):
+        job_service = JobService(None)
+        with self.assertRaises(ValueError):
+            job_service.schedule_job(FakeJobActivity())
+
+        with self.assertRaises(ValueError):
+            job_service.schedule_job(FakeJobActivity(), datetime.datetime.now(), delay=datetime.timedelta(minutes=5))
+
+        with self.assertRaises(ValueError):
+            job_service.schedule_job(FakeJobActivity(), '1988-04-10T12:00:00')
+
+        with self.assertRaises(ValueError):
+            job_service.schedule_job(FakeJobActivity(), delay=300)
+
+    @freeze_time('1988-04-10 11:01:02')
+    def test_add_recurring_job(self):
+        fake_recurring_job_repository = types.SimpleNamespace()
+        fake_recurring_job_repository.get_recurring_job = mock.MagicMock(return_value=None)
+        fake_recurring_job_repository.add_recurring_job = mock.MagicMock()
+        job_service = JobService(None, fake_recurring_job_repository)
+        job_service.add_recurring_job('nightly', FakeJobActivity(), '@daily', ['a'], 3, 'reports', CatchUpPolicy.ALL)
+        actual_recurring_job = fake_recurring_job_repository.add_recurring_job.call_args[0][0]
+        self.assertEqual(actual_recurring_job.name, 'nightly')
+        self.assertEqual(actual_recurring_job.cron, '@daily')
+        self.assertEqual(actual_recurring_job.catch_up, CatchUpPolicy.ALL)
+        self.assertEqual(actual_recurring_job.next_run_datetime, '1988-04-11T00:00:00')
+        self.assertListEqual(actual_recurring_job.job.parameters, ['a'])
+        self.assertEqual(actual_recurring_job.job.priority, 3)
+        self.assertEqual(actual_recurring_job.job.queue, 'reports')
+
+    @freeze_time('1988-04-10 11:01:02')
+    def test_add_recurring_job_keeping_schedule(self):
+        stored_recurring_job = types.SimpleNamespace(cron='@daily', next_run_datetime='1988-04-09T00:00:00',
+                                                     last_run_datetime='1988-04-08T00:00:00')
+        fake_recurring_job_repository = types.SimpleNamespace()
+        fake_recurring_job_repository.get_recurring_job = mock.MagicMock(return_value=stored_recurring_job)
+        fake_recurring_job_repository.add_recurring_job = mock.MagicMock()
+        job_service = JobService(None, fake_recurring_job_repository)
+        job_service.add_recurring_job('nightly', FakeJobActivity(), '@daily')
+        actual_recurring_job = fake_recurring_job_repository.add_recurring_job.call_args[0][0]
+        self.assertEqual(actual_recurring_job.next_run_datetime, '1988-04-09T00:00:00')
+        self.assertEqual(actual_recurring_job.last_run_datetime, '1988-04-08T00:00:00')
+        job_service.add_recurring_job('nightly', FakeJobActivity(), '@hourly')
+        actual_recurring_job = fake_recurring_job_repository.add_recurring_job.call_args[0][0]
+        self.assertEqual(actual_recurring_job.next_run_datetime, '1988-04-10T12:00:00')
+        self.assertIsNone(actual_recurring_job.last_run_datetime)
+
+    def test_remove_recurring_job(self):
+        fake_recurring_job_repository = types.SimpleNamespace()
+        fake_recurring_job_repository.remove_recurring_job = mock.MagicMock()
+        job_service = JobService(None, fake_recurring_job_repository)
+        job_service.remove_recurring_job('nightly')
+        self.assertEqual(fake_recurring_job_repository.remove_recurring_job.call_args[0][0], 'nightly')
+
+    def test_enqueue_job_with_timeout_seconds(self):
+        fake_job_repository = types.SimpleNamespace()
+        fake_job_repository.add_job = mock.MagicMock()
+        job_service = JobService(fake_job_repository)
+        job_service.enqueue_job(FakeJobActivity(), timeout_seconds=30)
+        self.assertEqual(fake_job_repository.add_job.call_args[0][0].timeout_seconds, 30)
+
+    def test_cancel_job(self):
+        fake_job_repository = types.SimpleNamespace()
+        fake_job_repository.cancel_job = mock.MagicMock(return_value=True)
+        job_service = JobService(fake_job_repository)
+        self.assertTrue(job_service.cancel_job('ABCDE'))
+        self.assertEqual(fake_job_repository.cancel_job.call_args[0][0], 'ABCDE')
+
+    def test_requeue_dead_letter_job(self):
+        fake_job_repository = types.SimpleNamespace()
+        fake_job_repository.requeue_dead_letter_job = mock.MagicMock(side_effect=[FakeJobActivity().create_job_object(), None])
+        job_service = JobService(fake_job_repository)
+        self.assertTrue(job_service.requeue_dead_letter_job('ABCDE'))
+        self.assertEqual(fake_job_repository.requeue_dead_letter_job.call_args[0][0], 'ABCDE')
+        self.assertFalse(job_service.requeue_dead_letter_job('ABCDE'))
+
+    def test_recurring_jobs_without_repository(self):
+        job_service = JobService(None)
+        with self.assertRaises(ValueError):
+            job_service.add_recurring_job('nightly', FakeJobActivity(), '@daily')
+
+        with self.assertRaises(ValueError):
+            job_service.remove_recurring_job('nightly')
 
 
 if (__name__ == "__main__"):
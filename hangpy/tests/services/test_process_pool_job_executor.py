@@ -0,0 +1,106 @@
+import hangpy.tests.fake as fake
+import threading
+import time
+from hangpy.enums import JobStatus
+from hangpy.services import ProcessPoolJobExecutor
+from unittest import TestCase, main
+
+
+def get_job_activity(job_activity_class):
+    job_activity = job_activity_class()
+    job_activity.set_job(job_activity.create_job_object())
+    return job_activity
+
+
+class TestProcessPoolJobExecutor(TestCase):
+
+    def test_submit(self):
+        job_executor = ProcessPoolJobExecutor()
+        job_executor.start(2)
+        job_activities = [get_job_activity(fake.FakeJobActivity),
+                          get_job_activity(fake.FakeAsyncJobActivity),
+                          get_job_activity(fake.FakeErrorJobActivity)]
+        for job_activity in job_activities:
+            job_executor.submit(job_activity)
+        job_executor.shutdown()
+        self.assertTrue(all(job_activity.is_finished() for job_activity in job_activities))
+        self.assertEqual(job_activities[0].get_job().status, JobStatus.SUCCESS)
+        self.assertEqual(job_activities[1].get_job().status, JobStatus.SUCCESS)
+        self.assertEqual(job_activities[2].get_job().status, JobStatus.ERROR)
+        self.assertEqual(job_activities[2].get_job().error, 'some exception message')
+        self.assertIsNotNone(job_activities[2].get_job().end_datetime)
+
+    def test_submit_keeps_job_instance(self):
+        job_executor = ProcessPoolJobExecutor()
+        job_executor.start(1)
+        job_activity = get_job_activity(fake.FakeJobActivity)
+        job = job_activity.get_job()
+        job_executor.submit(job_activity)
+        job_executor.shutdown()
+        self.assertIs(job_activity.get_job(), job)
+        self.assertEqual(job.status, JobStatus.SUCCESS)
+        self.assertIsNotNone(job.end_datetime)
+
+    def test_submit_uses_single_thread(self):
+        job_executor = ProcessPoolJobExecutor()
+        job_executor.start(4)
+        thread_count = threading.active_count()
+        job_activities = [get_job_activity(fake.FakeJobActivity) for _ in range(8)]
+        for job_activity in job_activities:
+            job_executor.submit(job_activity)
+        self.assertEqual(threading.active_count(), thread_count + 1)
+        job_executor.shutdown()
+        self.assertTrue(all(job_activity.get_job().status == JobStatus.SUCCESS for job_activity in job_activities))
+
+    def test_finish_job_activity_with_exception(self):
+        job_executor = ProcessPoolJobExecutor()
+        job_activity = get_job_activity(fake.FakeJobActivity)
+        job_activity.set_started_to_run()
+        job_executor.finish_job_activity(job_activity, None, Exception('pickling exception'))
+        self.assertTrue(job_activity.is_finished())
+        self.assertEqual(job_activity.get_job().status, JobStatus.ERROR)
+        self.assertEqual(job_activity.get_job().error, 'pickling exception')
+
+    def test_submit_reuses_worker_processes(self):
+        job_executor = ProcessPoolJobExecutor()
+        job_executor.start(1)
+        for _ in range(2):
+            job_executor.submit(get_job_activity(fake.FakeJobActivity))
+            job_executor.shutdown()
+        self.assertEqual(len(job_executor.idle_worker_processes), 0)
+        job_executor.start(1)
+        job_activities = [get_job_activity(fake.FakeJobActivity) for _ in range(3)]
+        for job_activity in job_activities:
+            job_executor.submit(job_activity)
+            while (not job_activity.is_finished()):
+                time.sleep(0.01)
+        self.assertEqual(len(job_executor.idle_worker_processes), 1)
+        job_executor.shutdown()
+
+    def test_cancel(self):
+        job_executor = ProcessPoolJobExecutor()
+        job_executor.start(2)
+        job_activity = get_job_activity(fake.FakeHungJobActivity)
+        job_executor.submit(job_activity)
+        while (len(job_executor.running_worker_processes) == 0):
+            time.sleep(0.01)
+        job_activity.cancel('The job was cancelled')
+        job_executor.cancel(job_activity)
+        job_executor.shutdown()
+        self.assertTrue(job_activity.is_finished())
+        self.assertEqual(job_activity.get_job().status, JobStatus.CANCELLED)
+        self.assertEqual(job_activity.get_job().error, 'The job was cancelled')
+        self.assertEqual(len(job_executor.idle_worker_processes), 0)
+
+    def test_cancel_without_worker_process(self):
+        job_executor = ProcessPoolJobExecutor()
+        job_executor.start(1)
+        self.assertIsNone(job_executor.cancel(get_job_activity(fake.FakeJobActivity)))
+
+    def test_shutdown_without_start(self):
+        job_executor = ProcessPoolJobExecutor()
+        self.assertIsNone(job_executor.shutdown())
+
+
+if (__name__ == "__main__"):
+    main()
@@ -1,10 +1,11 @@
 import datetime
+import time
 import types
 from freezegun import freeze_time
 from hangpy.dtos import ServerConfigurationDto
-from hangpy.entities import Job
-from hangpy.enums import JobStatus
-from hangpy.services import JobActivityBase, ServerService
+from hangpy.entities import Job, RecurringJob, RetentionPolicy, RetryPolicy
+from hangpy.enums import CatchUpPolicy, JobStatus
+from hangpy.services import JobActivityBase, JobExecutor, ServerService, ThreadPoolJobExecutor
 from unittest import TestCase, mock, main
 
 
@@ -34,39 +35,153 @@ class FakeJobActivity(JobActivityBase):
         pass
 
 
+class FakeAsyncJobActivity(JobActivityBase):
+
+    async def action(self):
+        pass
+
+
+class FakeRetryJobActivity(JobActivityBase):
+    retry_policy = RetryPolicy(max_attempts=2, base_delay_seconds=10, jitter=False)
+
+    def action(self):
+        pass
+
+
+class FakeTimeoutJobActivity(JobActivityBase):
+    timeout_seconds = 0.001
+
+    def action(self):
+        pass
+
+
 class TestServerService(TestCase):
 
     @mock.patch(get_fully_qualified_name('set_server_start_state'))
+    @mock.patch(get_fully_qualified_name('start_heartbeat'))
+    @mock.patch(get_fully_qualified_name('start_job_executor'))
     @mock.patch(get_fully_qualified_name('log_run'))
     @mock.patch(get_fully_qualified_name('run_enabled'), side_effect=[True, True, False])
     @mock.patch(get_fully_qualified_name('try_run_cycle'))
     @mock.patch(get_fully_qualified_name('sleep_cycle'))
+    @mock.patch(get_fully_qualified_name('release_prefetched_jobs'))
     @mock.patch(get_fully_qualified_name('wait_until_slots_are_empty'))
+    @mock.patch(get_fully_qualified_name('shutdown_job_executor'))
+    @mock.patch(get_fully_qualified_name('stop_heartbeat'))
+    @mock.patch(get_fully_qualified_name('release_scheduler_lease'))
     @mock.patch(get_fully_qualified_name('set_server_stop_state'))
     def test_run(self, *args):
         server_service = ServerService(None, None, None)
         server_service.run()
         self.assertEqual(get_call_count('set_server_start_state', args), 1)
+        self.assertEqual(get_call_count('start_heartbeat', args), 1)
+        self.assertEqual(get_call_count('start_job_executor', args), 1)
         self.assertEqual(get_call_count('run_enabled', args), 3)
         self.assertEqual(get_call_count('try_run_cycle', args), 2)
         self.assertEqual(get_call_count('sleep_cycle', args), 2)
+        self.assertEqual(get_call_count('release_prefetched_jobs', args), 1)
         self.assertEqual(get_call_count('wait_until_slots_are_empty', args), 1)
+        self.assertEqual(get_call_count('shutdown_job_executor', args), 1)
+        self.assertEqual(get_call_count('stop_heartbeat', args), 1)
+        self.assertEqual(get_call_count('release_scheduler_lease', args), 1)
         self.assertEqual(get_call_count('set_server_stop_state', args), 1)
 
+    @mock.patch(get_fully_qualified_name('send_heartbeat'))
+    def test_start_and_stop_heartbeat(self, *args):
+        server_service = ServerService(ServerConfigurationDto(heartbeat_interval_milliseconds=10), None, None)
+        server_service.start_heartbeat()
+        self.assertGreaterEqual(get_call_count('send_heartbeat', args), 1)
+        time.sleep(0.1)
+        server_service.stop_heartbeat()
+        heartbeats_sent = get_call_count('send_heartbeat', args)
+        self.assertGreater(heartbeats_sent, 1)
+        self.assertFalse(server_service.heartbeat_thread.is_alive())
+        time.sleep(0.05)
+        self.assertEqual(get_call_count('send_heartbeat', args), heartbeats_sent)
+
+    @mock.patch(get_fully_qualified_name('log'))
+    @mock.patch(get_fully_qualified_name('send_heartbeat'), side_effect=Exception('some exception message'))
+    def test_try_send_heartbeat(self, *args):
+        server_service = ServerService(None, None, None)
+        server_service.try_send_heartbeat()
+        self.assertEqual(get_call_count('log', args), 1)
+
+    @freeze_time('1988-04-10 11:01:02')
+    def test_send_heartbeat(self):
+        fake_server_repository = types.SimpleNamespace()
+        fake_server_repository.send_heartbeat = mock.MagicMock()
+        server_configuration = ServerConfigurationDto(slots=3, async_slots=2, heartbeat_interval_milliseconds=1000)
+        server_service = ServerService(server_configuration, fake_server_repository, None)
+        server_service.job_activities_assigned.extend([FakeJobActivity(), FakeAsyncJobActivity(), FakeAsyncJobActivity()])
+        server_service.send_heartbeat()
+        self.assertEqual(fake_server_repository.send_heartbeat.call_args[0], (server_service.server, 3000))
+        self.assertEqual(server_service.server.last_heartbeat_datetime, '1988-04-10T11:01:02')
+        self.assertEqual(server_service.server.used_slots, 1)
+        self.assertEqual(server_service.server.used_async_slots, 2)
+
     @mock.patch(get_fully_qualified_name('log'))
     def test_log_run(self, *args):
         server_service = ServerService(ServerConfigurationDto(), None, None)
         server_service.log_run()
         self.assertEqual(get_call_count('log', args), 1)
 
-    def test_sleep_cycle(self):
+    def test_init_job_executor(self):
+        server_service = ServerService(None, None, None)
+        self.assertIsInstance(server_service.job_executor, ThreadPoolJobExecutor)
+        job_executor = mock.MagicMock(spec=JobExecutor)
+        server_service = ServerService(None, None, None, None, job_executor)
+        self.assertEqual(server_service.job_executor, job_executor)
+
+    def test_start_job_executor(self):
+        job_executor = mock.MagicMock(spec=JobExecutor)
+        server_service = ServerService(ServerConfigurationDto(slots=3), None, None, None, job_executor)
+        server_service.start_job_executor()
+        self.assertEqual(job_executor.start.call_args[0][0], 3)
+
+    def test_start_job_executor_with_async_slots(self):
+        job_executor = mock.MagicMock(spec=JobExecutor)
+        server_service = ServerService(ServerConfigurationDto(async_slots=100), None, None, None, job_executor)
+        server_service.async_job_executor = mock.MagicMock(spec=JobExecutor)
+        server_service.start_job_executor()
+        self.assertEqual(server_service.async_job_executor.start.call_args[0][0], 100)
+
+        server_service = ServerService(ServerConfigurationDto(), None, None, None, job_executor)
+        server_service.async_job_executor = mock.MagicMock(spec=JobExecutor)
+        server_service.start_job_executor()
+        self.assertEqual(server_service.async_job_executor.start.call_count, 0)
+
+    def test_shutdown_job_executor(self):
+        job_executor = mock.MagicMock(spec=JobExecutor)
+        server_service = ServerService(None, None, None, None, job_executor)
+        server_service.async_job_executor = mock.MagicMock(spec=JobExecutor)
+        server_service.shutdown_job_executor()
+        self.assertEqual(job_executor.shutdown.call_count, 1)
+        self.assertEqual(server_service.async_job_executor.shutdown.call_count, 1)
+
+    @mock.patch(get_fully_qualified_name('wait_for_enqueued_jobs'))
+    def test_sleep_cycle(self, *args):
         server_service = ServerService(ServerConfigurationDto(1000), None, None)
-        time_start = datetime.datetime.now()
         server_service.sleep_cycle()
+        self.assertEqual(get_mock('wait_for_enqueued_jobs', args).call_args[0][0], 1)
+
+    def test_wait_for_enqueued_jobs(self):
+        fake_job_repository = types.SimpleNamespace()
+        fake_job_repository.wait_for_enqueued_jobs = mock.MagicMock(return_value=True)
+        server_service = ServerService(ServerConfigurationDto(queues=['cpu', 'reports']), None, fake_job_repository)
+        server_service.wait_for_enqueued_jobs(0.5)
+        self.assertTupleEqual(fake_job_repository.wait_for_enqueued_jobs.call_args[0], (0.5, ['cpu', 'reports']))
+
+    @mock.patch(get_fully_qualified_name('log'))
+    def test_wait_for_enqueued_jobs_exception(self, *args):
+        fake_job_repository = types.SimpleNamespace()
+        fake_job_repository.wait_for_enqueued_jobs = mock.MagicMock(side_effect=Exception('wait exception'))
+        server_service = ServerService(ServerConfigurationDto(), None, fake_job_repository)
+        time_start = datetime.datetime.now()
+        server_service.wait_for_enqueued_jobs(0.2)
         time_stop = datetime.datetime.now()
-        total_milliseconds = (time_stop - time_start).seconds * 1000
-        total_milliseconds += (time_stop - time_start).microseconds / 1000
-        self.assertGreater(total_milliseconds, 1000)
+        self.assertGreaterEqual((time_stop - time_start).total_seconds(), 0.2)
+        actual_log = str(get_mock('log', args).call_args[0][0])
+        self.assertTrue(actual_log.endswith('wait exception'))
 
     def test_run_enabled(self):
         server_service = ServerService(None, None, None)
@@ -90,56 +205,141 @@ class TestServerService(TestCase):
         self.assertTrue(actual_log.endswith('run_cycle exception'))
 
     @mock.patch(get_fully_qualified_name('set_server_cycle_state'))
+    @mock.patch(get_fully_qualified_name('maintain_job_leases'))
+    @mock.patch(get_fully_qualified_name('promote_scheduled_jobs'))
+    @mock.patch(get_fully_qualified_name('schedule_recurring_jobs'))
+    @mock.patch(get_fully_qualified_name('purge_expired_jobs'))
     @mock.patch(get_fully_qualified_name('must_run_cycle_loop'), side_effect=[True, False])
     @mock.patch(get_fully_qualified_name('run_cycle_loop'))
     def test_run_cycle(self, *args):
         server_service = ServerService(None, None, None)
         server_service.run_cycle()
         self.assertEqual(get_call_count('set_server_cycle_state', args), 1)
+        self.assertEqual(get_call_count('maintain_job_leases', args), 1)
+        self.assertEqual(get_call_count('promote_scheduled_jobs', args), 1)
+        self.assertEqual(get_call_count('schedule_recurring_jobs', args), 1)
+        self.assertEqual(get_call_count('purge_expired_jobs', args), 1)
         self.assertEqual(get_call_count('must_run_cycle_loop', args), 2)
         self.assertEqual(get_call_count('run_cycle_loop', args), 1)
 
     @mock.patch(get_fully_qualified_name('clear_finished_jobs'))
     @mock.patch(get_fully_qualified_name('wait_until_slot_is_open'))
-    @mock.patch(get_fully_qualified_name('get_next_enqueued_job'), return_value=get_fake_job())
-    @mock.patch(get_fully_qualified_name('try_set_lock_on_job'), return_value=True)
+    @mock.patch(get_fully_qualified_name('claim_next_enqueued_job'), return_value=get_fake_job())
     @mock.patch(get_fully_qualified_name('run_job'))
     def test_run_cycle_loop(self, *args):
-        server_service = ServerService(None, None, None)
+        server_service = ServerService(ServerConfigurationDto(), None, None)
         server_service.run_cycle_loop()
         self.assertEqual(get_call_count('clear_finished_jobs', args), 1)
         self.assertEqual(get_call_count('wait_until_slot_is_open', args), 1)
-        self.assertEqual(get_call_count('get_next_enqueued_job', args), 1)
-        self.assertEqual(get_call_count('try_set_lock_on_job', args), 1)
+        self.assertEqual(get_call_count('claim_next_enqueued_job', args), 1)
         self.assertEqual(get_call_count('run_job', args), 1)
 
     @mock.patch(get_fully_qualified_name('clear_finished_jobs'))
     @mock.patch(get_fully_qualified_name('wait_until_slot_is_open'))
-    @mock.patch(get_fully_qualified_name('get_next_enqueued_job'), return_value=None)
-    @mock.patch(get_fully_qualified_name('try_set_lock_on_job'), return_value=True)
+    @mock.patch(get_fully_qualified_name('claim_next_enqueued_job'), return_value=None)
+    @mock.patch(get_fully_qualified_name('wait_for_enqueued_jobs'))
     @mock.patch(get_fully_qualified_name('run_job'))
     def test_run_cycle_loop_with_no_jobs_enqueued(self, *args):
-        server_service = ServerService(None, None, None)
+        server_service = ServerService(ServerConfigurationDto(), None, None)
         server_service.run_cycle_loop()
         self.assertEqual(get_call_count('clear_finished_jobs', args), 1)
         self.assertEqual(get_call_count('wait_until_slot_is_open', args), 1)
-        self.assertEqual(get_call_count('get_next_enqueued_job', args), 1)
-        self.assertEqual(get_call_count('try_set_lock_on_job', args), 0)
+        self.assertEqual(get_call_count('claim_next_enqueued_job', args), 1)
+        self.assertEqual(get_call_count('wait_for_enqueued_jobs', args), 1)
         self.assertEqual(get_call_count('run_job', args), 0)
 
     @mock.patch(get_fully_qualified_name('clear_finished_jobs'))
     @mock.patch(get_fully_qualified_name('wait_until_slot_is_open'))
-    @mock.patch(get_fully_qualified_name('get_next_enqueued_job'), return_value=get_fake_job())
-    @mock.patch(get_fully_qualified_name('try_set_lock_on_job'), return_value=False)
-    @mock.patch(get_fully_qualified_name('run_job'))
-    def test_run_cycle_loop_cannot_set_lock_on_job(self, *args):
-        server_service = ServerService(None, None, None)
+    @mock.patch(get_fully_qualified_name('run_prefetched_jobs'), side_effect=[0, 1])
+    @mock.patch(get_fully_qualified_name('claim_next_enqueued_job'))
+    @mock.patch('time.sleep')
+    def test_run_cycle_loop_with_job_waiting_for_slot(self, *args):
+        server_service = ServerService(ServerConfigurationDto(), None, None)
+        server_service.prefetched_jobs.append(get_fake_job())
+        server_service.run_cycle_loop()
+        self.assertEqual(get_call_count('run_prefetched_jobs', args), 1)
+        self.assertEqual(get_call_count('sleep', args), 1)
+        server_service.run_cycle_loop()
+        self.assertEqual(get_call_count('run_prefetched_jobs', args), 2)
+        self.assertEqual(get_call_count('sleep', args), 1)
+        self.assertEqual(get_call_count('claim_next_enqueued_job', args), 0)
+
+    @mock.patch(get_fully_qualified_name('run_batch_cycle_loop'))
+    @mock.patch(get_fully_qualified_name('claim_next_enqueued_job'))
+    def test_run_cycle_loop_with_batch_claim(self, *args):
+        server_service = ServerService(ServerConfigurationDto(batch_claim=True), None, None)
         server_service.run_cycle_loop()
+        self.assertEqual(get_call_count('run_batch_cycle_loop', args), 1)
+        self.assertEqual(get_call_count('claim_next_enqueued_job', args), 0)
+
+    @mock.patch(get_fully_qualified_name('clear_finished_jobs'))
+    @mock.patch(get_fully_qualified_name('prefetch_enqueued_jobs'))
+    @mock.patch(get_fully_qualified_name('run_prefetched_jobs'), side_effect=[2, 0])
+    @mock.patch(get_fully_qualified_name('wait_for_enqueued_jobs'))
+    def test_run_batch_cycle_loop(self, *args):
+        server_service = ServerService(ServerConfigurationDto(batch_claim=True), None, None)
+        server_service.run_batch_cycle_loop()
         self.assertEqual(get_call_count('clear_finished_jobs', args), 1)
-        self.assertEqual(get_call_count('wait_until_slot_is_open', args), 1)
-        self.assertEqual(get_call_count('get_next_enqueued_job', args), 1)
-        self.assertEqual(get_call_count('try_set_lock_on_job', args), 1)
-        self.assertEqual(get_call_count('run_job', args), 0)
+        self.assertEqual(get_call_count('prefetch_enqueued_jobs', args), 1)
+        self.assertEqual(get_call_count('wait_for_enqueued_jobs', args), 0)
+        server_service.run_batch_cycle_loop()
+        self.assertEqual(get_call_count('wait_for_enqueued_jobs', args), 1)
+
+    def test_prefetch_enqueued_jobs(self):
+        fake_job_repository = types.SimpleNamespace()
+        fake_job_repository.claim_jobs = mock.MagicMock(side_effect=lambda quantity, *_: [get_fake_job() for _ in range(quantity)])
+        server_configuration = ServerConfigurationDto(slots=3, batch_claim=True, prefetch_jobs=2)
+        server_service = ServerService(server_configuration, None, fake_job_repository)
+        server_service.job_activities_assigned.append(mock.MagicMock(spec=JobActivityBase))
+        server_service.prefetch_enqueued_jobs()
+        self.assertEqual(fake_job_repository.claim_jobs.call_args[0], (4, 60000, ['default']))
+        self.assertEqual(len(server_service.prefetched_jobs), 4)
+        server_service.prefetch_enqueued_jobs()
+        self.assertEqual(fake_job_repository.claim_jobs.call_count, 1)
+
+    @mock.patch(get_fully_qualified_name('run_job'))
+    def test_run_prefetched_jobs_async(self, *args):
+        server_service = ServerService(ServerConfigurationDto(slots=1, async_slots=1), None, None)
+        server_service.job_activities_assigned.append(FakeJobActivity())
+        regular_job = Job(FakeJobActivity.__module__, FakeJobActivity.__name__)
+        async_job = Job(FakeAsyncJobActivity.__module__, FakeAsyncJobActivity.__name__)
+        server_service.prefetched_jobs.extend([regular_job, async_job])
+        self.assertEqual(server_service.run_prefetched_jobs(), 1)
+        self.assertListEqual(server_service.prefetched_jobs, [regular_job])
+        self.assertEqual(get_mock('run_job', args).call_args[0][0], async_job)
+
+    @mock.patch(get_fully_qualified_name('run_job'))
+    def test_run_prefetched_jobs(self, *args):
+        server_service = ServerService(ServerConfigurationDto(slots=2), None, None)
+        get_mock('run_job', args).side_effect = lambda job: server_service.job_activities_assigned.append(job)
+        server_service.prefetched_jobs.extend([get_fake_job(), get_fake_job(), get_fake_job()])
+        self.assertEqual(server_service.run_prefetched_jobs(), 2)
+        self.assertEqual(len(server_service.prefetched_jobs), 1)
+        self.assertEqual(server_service.run_prefetched_jobs(), 0)
+
+    def test_release_prefetched_jobs(self):
+        fake_job_repository = types.SimpleNamespace()
+        fake_job_repository.update_jobs = mock.MagicMock()
+        server_service = ServerService(None, None, fake_job_repository)
+        server_service.release_prefetched_jobs()
+        self.assertEqual(fake_job_repository.update_jobs.call_count, 0)
+        job = get_fake_job()
+        job.status = JobStatus.PROCESSING
+        job.start_datetime = '1988-04-10T11:01:02.123456'
+        server_service.prefetched_jobs.append(job)
+        server_service.release_prefetched_jobs()
+        self.assertEqual(fake_job_repository.update_jobs.call_count, 1)
+        self.assertEqual(job.status, JobStatus.ENQUEUED)
+        self.assertIsNone(job.start_datetime)
+        self.assertListEqual(server_service.prefetched_jobs, [])
+
+    @mock.patch(get_fully_qualified_name('exists_enqueued_jobs'), return_value=False)
+    @mock.patch(get_fully_qualified_name('slots_empty'), return_value=True)
+    def test_must_run_cycle_loop_with_prefetched_jobs(self, *args):
+        server_service = ServerService(None, None, None)
+        self.assertFalse(server_service.must_run_cycle_loop())
+        server_service.prefetched_jobs.append(get_fake_job())
+        self.assertTrue(server_service.must_run_cycle_loop())
 
     @mock.patch(get_fully_qualified_name('exists_enqueued_jobs'), side_effect=[False, False, False, False, True, True, True, True])
     @mock.patch(get_fully_qualified_name('slots_empty'), side_effect=[False, False, True, True, False, False, True, True])
@@ -184,6 +384,53 @@ class TestServerService(TestCase):
         server_service.job_activities_assigned.clear()
         self.assertFalse(server_service.slots_limit_reached())
 
+    def test_get_free_slots(self):
+        server_service = ServerService(ServerConfigurationDto(slots=2), None, None)
+        job_activity = mock.MagicMock(spec=JobActivityBase)
+        self.assertEqual(server_service.get_free_slots(), 2)
+        server_service.job_activities_assigned.append(job_activity)
+        self.assertEqual(server_service.get_free_slots(), 1)
+        server_service.job_activities_assigned.extend([job_activity, job_activity])
+        self.assertEqual(server_service.get_free_slots(), 0)
+
+    def test_slots_limit_reached_with_async_slots(self):
+        server_configuration = ServerConfigurationDto(slots=1, async_slots=1)
+        server_service = ServerService(server_configuration, None, None)
+        server_service.job_activities_assigned.append(FakeJobActivity())
+        self.assertTrue(server_service.regular_slots_limit_reached())
+        self.assertFalse(server_service.async_slots_limit_reached())
+        self.assertFalse(server_service.slots_limit_reached())
+        self.assertEqual(server_service.get_free_slots(), 1)
+        server_service.job_activities_assigned.append(FakeAsyncJobActivity())
+        self.assertTrue(server_service.async_slots_limit_reached())
+        self.assertTrue(server_service.slots_limit_reached())
+        self.assertEqual(server_service.get_free_slots(), 0)
+
+    def test_async_slots_limit_reached_without_async_slots(self):
+        server_service = ServerService(ServerConfigurationDto(), None, None)
+        self.assertTrue(server_service.async_slots_limit_reached())
+        self.assertEqual(server_service.get_free_async_slots(), 0)
+        server_service.job_activities_assigned.append(FakeAsyncJobActivity())
+        self.assertEqual(server_service.get_free_regular_slots(), 9)
+
+    def test_is_async_job(self):
+        async_job = Job(FakeAsyncJobActivity.__module__, FakeAsyncJobActivity.__name__)
+        regular_job = Job(FakeJobActivity.__module__, FakeJobActivity.__name__)
+        server_service = ServerService(ServerConfigurationDto(), None, None)
+        self.assertFalse(server_service.is_async_job(async_job))
+        server_service = ServerService(ServerConfigurationDto(async_slots=1), None, None)
+        self.assertTrue(server_service.is_async_job(async_job))
+        self.assertFalse(server_service.is_async_job(regular_job))
+        self.assertFalse(server_service.is_async_job(get_fake_job()))
+
+    def test_has_free_slot_for_job(self):
+        async_job = Job(FakeAsyncJobActivity.__module__, FakeAsyncJobActivity.__name__)
+        regular_job = Job(FakeJobActivity.__module__, FakeJobActivity.__name__)
+        server_service = ServerService(ServerConfigurationDto(slots=1, async_slots=1), None, None)
+        server_service.job_activities_assigned.append(FakeAsyncJobActivity())
+        self.assertTrue(server_service.has_free_slot_for_job(regular_job))
+        self.assertFalse(server_service.has_free_slot_for_job(async_job))
+
     def test_slots_empty(self):
         server_configuration = ServerConfigurationDto(slots=2)
         server_service = ServerService(server_configuration, None, None)
@@ -195,11 +442,289 @@ class TestServerService(TestCase):
 
     @mock.patch(get_fully_qualified_name('save_finished_jobs'))
     @mock.patch(get_fully_qualified_name('untrack_jobs'))
+    @mock.patch(get_fully_qualified_name('stop_timed_out_jobs'))
+    @mock.patch(get_fully_qualified_name('cancel_requested_jobs'))
+    @mock.patch(get_fully_qualified_name('maintain_job_leases'))
+    @mock.patch(get_fully_qualified_name('promote_scheduled_jobs'))
+    @mock.patch(get_fully_qualified_name('schedule_recurring_jobs'))
     def test_clear_finished_jobs(self, *args):
         server_service = ServerService(None, None, None)
         server_service.clear_finished_jobs()
         self.assertEqual(get_call_count('save_finished_jobs', args), 1)
         self.assertEqual(get_call_count('untrack_jobs', args), 1)
+        self.assertEqual(get_call_count('stop_timed_out_jobs', args), 1)
+        self.assertEqual(get_call_count('cancel_requested_jobs', args), 1)
+        self.assertEqual(get_call_count('maintain_job_leases', args), 1)
+        self.assertEqual(get_call_count('promote_scheduled_jobs', args), 1)
+        self.assertEqual(get_call_count('schedule_recurring_jobs', args), 1)
+
+    @mock.patch(get_fully_qualified_name('cancel_job_activity'))
+    def test_stop_timed_out_jobs(self, *args):
+        server_service = ServerService(ServerConfigurationDto(), None, None)
+        job_activities = [FakeTimeoutJobActivity() for _ in range(4)]
+        for job_activity in job_activities:
+            job_activity.set_job(job_activity.create_job_object())
+            job_activity.set_started_to_run()
+            server_service.job_activities_assigned.append(job_activity)
+        job_activities[0].set_job(job_activities[0].create_job_object(timeout_seconds=1000))
+        job_activities[2].cancel('The job was cancelled')
+        job_activities[3].set_finished()
+        time.sleep(0.01)
+        server_service.stop_timed_out_jobs()
+        cancel_job_activity = get_mock('cancel_job_activity', args)
+        self.assertEqual(cancel_job_activity.call_count, 1)
+        expected_args = (job_activities[1], 'The job timed out after 0.001 seconds', JobStatus.ERROR)
+        self.assertTupleEqual(cancel_job_activity.call_args[0], expected_args)
+
+    @mock.patch(get_fully_qualified_name('cancel_job_activity'))
+    def test_cancel_requested_jobs(self, *args):
+        fake_job_repository = types.SimpleNamespace()
+        fake_job_repository.update_jobs = mock.MagicMock()
+        server_service = ServerService(ServerConfigurationDto(), None, fake_job_repository)
+        fake_job_repository.get_cancelled_job_ids = mock.MagicMock(return_value=[])
+        server_service.cancel_requested_jobs()
+        self.assertEqual(fake_job_repository.get_cancelled_job_ids.call_count, 0)
+
+        job_activities = [FakeJobActivity() for _ in range(2)]
+        for job_activity in job_activities:
+            job_activity.set_job = types.MethodType(JobActivityBase.set_job, job_activity)
+            job_activity.set_job(get_fake_job())
+            server_service.job_activities_assigned.append(job_activity)
+        prefetched_jobs = [get_fake_job(), get_fake_job()]
+        server_service.prefetched_jobs.extend(prefetched_jobs)
+        cancelled_job_ids = [job_activities[1].get_job().id, prefetched_jobs[0].id]
+        fake_job_repository.get_cancelled_job_ids = mock.MagicMock(return_value=cancelled_job_ids)
+        server_service.job_cancellations_check_time = 0
+        server_service.cancel_requested_jobs()
+        self.assertEqual(len(fake_job_repository.get_cancelled_job_ids.call_args[0][0]), 4)
+        cancel_job_activity = get_mock('cancel_job_activity', args)
+        self.assertTupleEqual(cancel_job_activity.call_args[0], (job_activities[1], 'The job was cancelled', JobStatus.CANCELLED))
+        self.assertListEqual(server_service.prefetched_jobs, [prefetched_jobs[1]])
+        self.assertListEqual(fake_job_repository.update_jobs.call_args[0][0], [prefetched_jobs[0]])
+        self.assertEqual(prefetched_jobs[0].status, JobStatus.CANCELLED)
+        self.assertIsNotNone(prefetched_jobs[0].end_datetime)
+
+        server_service.cancel_requested_jobs()
+        self.assertEqual(fake_job_repository.get_cancelled_job_ids.call_count, 1)
+
+    @mock.patch(get_fully_qualified_name('log'))
+    def test_cancel_job_activity(self, *args):
+        server_service = ServerService(ServerConfigurationDto(async_slots=1), None, None, job_executor=mock.MagicMock())
+        server_service.async_job_executor = mock.MagicMock()
+        job_activity = FakeAsyncJobActivity()
+        job_activity.set_job(get_fake_job())
+        server_service.cancel_job_activity(job_activity, 'The job was cancelled', JobStatus.CANCELLED)
+        self.assertTrue(job_activity.is_cancelled())
+        self.assertEqual(server_service.async_job_executor.cancel.call_args[0][0], job_activity)
+        job_activity = FakeTimeoutJobActivity()
+        job_activity.set_job(get_fake_job())
+        server_service.cancel_job_activity(job_activity, 'The job was cancelled', JobStatus.CANCELLED)
+        self.assertEqual(server_service.job_executor.cancel.call_args[0][0], job_activity)
+
+    @mock.patch(get_fully_qualified_name('log'))
+    def test_maintain_job_leases(self, *args):
+        fake_job_repository = types.SimpleNamespace()
+        lost_job = get_fake_job()
+        fake_job_repository.renew_job_leases = mock.MagicMock(return_value=[lost_job])
+        fake_job_repository.reclaim_expired_jobs = mock.MagicMock(return_value=['ABCDE'])
+        server_service = ServerService(ServerConfigurationDto(lease_milliseconds=30000), None, fake_job_repository)
+        job_activity = FakeJobActivity()
+        job_activity.get_job = mock.MagicMock(return_value=lost_job)
+        prefetched_job = get_fake_job()
+        server_service.job_activities_assigned.append(job_activity)
+        server_service.prefetched_jobs.append(prefetched_job)
+        server_service.maintain_job_leases()
+        self.assertEqual(fake_job_repository.renew_job_leases.call_args[0], ([lost_job, prefetched_job], 30000))
+        self.assertEqual(fake_job_repository.reclaim_expired_jobs.call_count, 1)
+        self.assertEqual(get_call_count('log', args), 2)
+        server_service.maintain_job_leases()
+        self.assertEqual(fake_job_repository.renew_job_leases.call_count, 1)
+        self.assertEqual(fake_job_repository.reclaim_expired_jobs.call_count, 1)
+
+    def test_maintain_job_leases_without_jobs(self):
+        fake_job_repository = types.SimpleNamespace()
+        fake_job_repository.renew_job_leases = mock.MagicMock()
+        fake_job_repository.reclaim_expired_jobs = mock.MagicMock(return_value=[])
+        server_service = ServerService(ServerConfigurationDto(), None, fake_job_repository)
+        server_service.maintain_job_leases()
+        self.assertEqual(fake_job_repository.renew_job_leases.call_count, 0)
+        self.assertEqual(fake_job_repository.reclaim_expired_jobs.call_count, 1)
+
+    @mock.patch('hangpy.services.server_service.SCHEDULED_JOBS_BATCH_SIZE', 2)
+    def test_promote_scheduled_jobs(self):
+        fake_job_repository = types.SimpleNamespace()
+        fake_job_repository.promote_scheduled_jobs = mock.MagicMock(side_effect=[['A', 'B'], ['C']])
+        server_service = ServerService(ServerConfigurationDto(), None, fake_job_repository)
+        server_service.promote_scheduled_jobs()
+        self.assertEqual(fake_job_repository.promote_scheduled_jobs.call_count, 2)
+        self.assertEqual(fake_job_repository.promote_scheduled_jobs.call_args[0][0], 2)
+        server_service.promote_scheduled_jobs()
+        self.assertEqual(fake_job_repository.promote_scheduled_jobs.call_count, 2)
+
+    def test_init_retention_policies(self):
+        server_service = ServerService(None, None, None)
+        self.assertDictEqual(server_service.retention_policies, {})
+        self.assertIsNone(server_service.job_archive)
+        retention_policies = {JobStatus.SUCCESS: RetentionPolicy(max_count=10)}
+        server_service = ServerService(None, None, None, retention_policies=retention_policies)
+        self.assertDictEqual(server_service.retention_policies, retention_policies)
+
+    def test_init_with_invalid_retention_policies(self):
+        with self.assertRaises(ValueError):
+            ServerService(None, None, None, retention_policies=[RetentionPolicy(max_count=10)])
+
+        with self.assertRaises(ValueError):
+            ServerService(None, None, None, retention_policies={JobStatus.ENQUEUED: RetentionPolicy(max_count=10)})
+
+        with self.assertRaises(ValueError):
+            ServerService(None, None, None, retention_policies={JobStatus.ERROR: 10})
+
+    def test_purge_expired_jobs_without_retention_policies(self):
+        server_service = ServerService(ServerConfigurationDto(), None, None)
+        server_service.purge_expired_jobs()
+        self.assertEqual(server_service.job_retention_time, 0)
+
+    @mock.patch('hangpy.services.server_service.EXPIRED_JOBS_BATCH_SIZE', 2)
+    @mock.patch(get_fully_qualified_name('log'))
+    def test_purge_expired_jobs(self, *args):
+        fake_job_repository = types.SimpleNamespace()
+        success_jobs = [get_fake_job(), get_fake_job(), get_fake_job()]
+        error_jobs = [get_fake_job(), get_fake_job()]
+        fake_job_repository.claim_expired_jobs = mock.MagicMock(side_effect=[success_jobs[:2], success_jobs[2:], error_jobs, []])
+        fake_job_repository.delete_jobs = mock.MagicMock()
+        fake_job_archive = mock.MagicMock()
+        retention_policies = {JobStatus.SUCCESS: RetentionPolicy(max_age_seconds=3600),
+                              JobStatus.ERROR: RetentionPolicy(max_count=100)}
+        server_service = ServerService(ServerConfigurationDto(lease_milliseconds=5000), None, fake_job_repository,
+                                       retention_policies=retention_policies, job_archive=fake_job_archive)
+        server_service.purge_expired_jobs()
+        claim_expired_jobs_args = [call[0] for call in fake_job_repository.claim_expired_jobs.call_args_list]
+        self.assertListEqual(claim_expired_jobs_args, [(JobStatus.SUCCESS, 3600, None, 2, 5000),
+                                                       (JobStatus.SUCCESS, 3600, None, 2, 5000),
+                                                       (JobStatus.ERROR, None, 100, 2, 5000),
+                                                       (JobStatus.ERROR, None, 100, 2, 5000)])
+        archived_jobs = [call[0][0] for call in fake_job_archive.archive_jobs.call_args_list]
+        self.assertListEqual(archived_jobs, [success_jobs[:2], success_jobs[2:], error_jobs])
+        deleted_jobs = [call[0][0] for call in fake_job_repository.delete_jobs.call_args_list]
+        self.assertListEqual(deleted_jobs, archived_jobs)
+        server_service.purge_expired_jobs()
+        self.assertEqual(fake_job_repository.claim_expired_jobs.call_count, 4)
+
+    def test_purge_expired_jobs_with_archive_error(self):
+        fake_job_repository = types.SimpleNamespace()
+        fake_job_repository.claim_expired_jobs = mock.MagicMock(return_value=[get_fake_job()])
+        fake_job_repository.delete_jobs = mock.MagicMock()
+        fake_job_archive = mock.MagicMock()
+        fake_job_archive.archive_jobs = mock.MagicMock(side_effect=OSError('No space left on device'))
+        server_service = ServerService(ServerConfigurationDto(), None, fake_job_repository,
+                                       retention_policies={JobStatus.SUCCESS: RetentionPolicy(max_count=0)},
+                                       job_archive=fake_job_archive)
+        with self.assertRaises(OSError):
+            server_service.purge_expired_jobs()
+        self.assertEqual(fake_job_repository.delete_jobs.call_count, 0)
+
+    def test_schedule_recurring_jobs_without_repository(self):
+        server_service = ServerService(ServerConfigurationDto(), None, None)
+        server_service.schedule_recurring_jobs()
+        self.assertEqual(server_service.recurring_jobs_schedule_time, 0)
+
+    @mock.patch(get_fully_qualified_name('enqueue_recurring_job'))
+    def test_schedule_recurring_jobs(self, *args):
+        fake_recurring_job_repository = types.SimpleNamespace()
+        fake_recurring_job_repository.try_acquire_scheduler_lease = mock.MagicMock(side_effect=[False, True])
+        fake_recurring_job_repository.get_due_recurring_jobs = mock.MagicMock(return_value=['A', 'B'])
+        server_configuration = ServerConfigurationDto(cycle_interval_milliseconds=500)
+        server_service = ServerService(server_configuration, None, None, recurring_job_repository=fake_recurring_job_repository)
+        server_service.schedule_recurring_jobs()
+        self.assertEqual(fake_recurring_job_repository.try_acquire_scheduler_lease.call_args[0], (server_service.server.id, 3000))
+        self.assertEqual(fake_recurring_job_repository.get_due_recurring_jobs.call_count, 0)
+        server_service.schedule_recurring_jobs()
+        self.assertEqual(fake_recurring_job_repository.try_acquire_scheduler_lease.call_count, 1)
+        server_service.recurring_jobs_schedule_time = 0
+        server_service.schedule_recurring_jobs()
+        self.assertEqual(get_call_count('enqueue_recurring_job', args), 2)
+
+    def get_recurring_job_service(self, catch_up: CatchUpPolicy, update_succeeds: bool = True, cron: str = '* * * * *') -> ServerService:
+        fake_job_repository = types.SimpleNamespace()
+        fake_job_repository.add_jobs = mock.MagicMock()
+        fake_recurring_job_repository = types.SimpleNamespace()
+        fake_recurring_job_repository.try_update_recurring_job_run = mock.MagicMock(return_value=update_succeeds)
+        with freeze_time('1988-04-10 11:01:02'):
+            self.recurring_job = RecurringJob('every-minute', Job('module1', 'class2', ['param3'], 5, 'cpu'), cron, catch_up)
+        return ServerService(ServerConfigurationDto(), None, fake_job_repository, recurring_job_repository=fake_recurring_job_repository)
+
+    @mock.patch(get_fully_qualified_name('log'))
+    @freeze_time('1988-04-10 11:05:30')
+    def test_enqueue_recurring_job_catching_up_all(self, *args):
+        server_service = self.get_recurring_job_service(CatchUpPolicy.ALL)
+        server_service.enqueue_recurring_job(self.recurring_job)
+        self.assertEqual(server_service.recurring_job_repository.try_update_recurring_job_run.call_args[0][1], '1988-04-10T11:02:00')
+        self.assertEqual(self.recurring_job.last_run_datetime, '1988-04-10T11:05:00')
+        self.assertEqual(self.recurring_job.next_run_datetime, '1988-04-10T11:06:00')
+        actual_jobs = server_service.job_repository.add_jobs.call_args[0][0]
+        self.assertEqual(len(actual_jobs), 4)
+        self.assertEqual(len({job.id for job in actual_jobs}), 4)
+        self.assertEqual(get_call_count('log', args), 0)
+
+    @mock.patch(get_fully_qualified_name('log'))
+    @freeze_time('1988-04-10 11:05:30')
+    def test_enqueue_recurring_job_catching_up_latest(self, *args):
+        server_service = self.get_recurring_job_service(CatchUpPolicy.LATEST)
+        server_service.enqueue_recurring_job(self.recurring_job)
+        self.assertEqual(len(server_service.job_repository.add_jobs.call_args[0][0]), 1)
+        self.assertEqual(get_call_count('log', args), 1)
+
+    @mock.patch(get_fully_qualified_name('log'))
+    def test_enqueue_recurring_job_catching_up_none(self, *args):
+        server_service = self.get_recurring_job_service(CatchUpPolicy.NONE, cron='@hourly')
+        with freeze_time('1988-04-10 14:30:00'):
+            server_service.enqueue_recurring_job(self.recurring_job)
+        self.assertEqual(len(server_service.job_repository.add_jobs.call_args[0][0]), 0)
+        self.assertEqual(self.recurring_job.next_run_datetime, '1988-04-10T15:00:00')
+        self.assertEqual(get_call_count('log', args), 1)
+        with freeze_time('1988-04-10 15:00:20'):
+            server_service.enqueue_recurring_job(self.recurring_job)
+        self.assertEqual(len(server_service.job_repository.add_jobs.call_args[0][0]), 1)
+
+    @freeze_time('1988-04-10 11:02:00')
+    def test_enqueue_recurring_job_taken_by_other_server(self):
+        server_service = self.get_recurring_job_service(CatchUpPolicy.ALL, update_succeeds=False)
+        server_service.enqueue_recurring_job(self.recurring_job)
+        self.assertEqual(server_service.job_repository.add_jobs.call_count, 0)
+
+    @freeze_time('1988-04-10 11:02:30')
+    def test_enqueue_recurring_job_failing_to_add_jobs(self):
+        server_service = self.get_recurring_job_service(CatchUpPolicy.ALL)
+        server_service.job_repository.add_jobs.side_effect = ConnectionError()
+        with self.assertRaises(ConnectionError):
+            server_service.enqueue_recurring_job(self.recurring_job)
+        try_update_recurring_job_run = server_service.recurring_job_repository.try_update_recurring_job_run
+        self.assertEqual(try_update_recurring_job_run.call_count, 2)
+        self.assertEqual(try_update_recurring_job_run.call_args[0][1], '1988-04-10T11:03:00')
+        self.assertIsNone(self.recurring_job.last_run_datetime)
+        self.assertEqual(self.recurring_job.next_run_datetime, '1988-04-10T11:02:00')
+
+    def test_create_recurring_job_occurrence(self):
+        server_service = self.get_recurring_job_service(CatchUpPolicy.ALL)
+        actual_job = server_service.create_recurring_job_occurrence(self.recurring_job)
+        self.assertNotEqual(actual_job.id, self.recurring_job.job.id)
+        self.assertEqual(actual_job.module_name, 'module1')
+        self.assertEqual(actual_job.class_name, 'class2')
+        self.assertListEqual(actual_job.parameters, ['param3'])
+        self.assertEqual(actual_job.priority, 5)
+        self.assertEqual(actual_job.queue, 'cpu')
+        self.assertEqual(actual_job.status, JobStatus.ENQUEUED)
+
+    @mock.patch(get_fully_qualified_name('log'))
+    def test_release_scheduler_lease(self, *args):
+        ServerService(ServerConfigurationDto(), None, None).release_scheduler_lease()
+        fake_recurring_job_repository = types.SimpleNamespace()
+        fake_recurring_job_repository.release_scheduler_lease = mock.MagicMock(side_effect=[None, Exception('release exception')])
+        server_service = ServerService(ServerConfigurationDto(), None, None, recurring_job_repository=fake_recurring_job_repository)
+        server_service.release_scheduler_lease()
+        self.assertEqual(fake_recurring_job_repository.release_scheduler_lease.call_args[0][0], server_service.server.id)
+        server_service.release_scheduler_lease()
+        self.assertTrue(str(get_mock('log', args).call_args[0][0]).endswith('release exception'))
 
     def test_save_finished_jobs(self):
         jobs_updated = 0
@@ -231,6 +756,55 @@ class TestServerService(TestCase):
         self.assertEqual(jobs_updated, 1)
         self.assertEqual(job_activity_finished.set_can_be_untracked.call_count, 1)
 
+    @freeze_time('1988-04-10 11:01:02')
+    @mock.patch(get_fully_qualified_name('log'))
+    def test_save_finished_jobs_with_retry_policy(self, *args):
+        fake_job_repository = types.SimpleNamespace()
+        fake_job_repository.update_jobs = mock.MagicMock()
+        fake_job_repository.move_jobs_to_dead_letter = mock.MagicMock()
+        server_service = ServerService(None, None, fake_job_repository)
+        job_activity = FakeRetryJobActivity()
+        job_activity.set_job(get_fake_job())
+        job_activity.get_job().status = JobStatus.ERROR
+        job_activity.get_job().error = 'some error'
+        job_activity.get_job().start_datetime = '1988-04-10T11:01:00'
+        job_activity.get_job().end_datetime = '1988-04-10T11:01:01'
+        job_activity.set_started_to_run()
+        job_activity.set_finished()
+        server_service.job_activities_assigned.append(job_activity)
+        server_service.save_finished_jobs()
+        actual_job = fake_job_repository.update_jobs.call_args[0][0][0]
+        self.assertEqual(actual_job.status, JobStatus.SCHEDULED)
+        self.assertEqual(actual_job.enqueued_datetime, '1988-04-10T11:01:12')
+        self.assertIsNone(actual_job.error)
+        self.assertIsNone(actual_job.start_datetime)
+        self.assertListEqual(actual_job.attempts, [{'start_datetime': '1988-04-10T11:01:00',
+                                                    'end_datetime': '1988-04-10T11:01:01',
+                                                    'error': 'some error'}])
+        self.assertEqual(fake_job_repository.move_jobs_to_dead_letter.call_count, 0)
+
+        job_activity.get_job().status = JobStatus.ERROR
+        server_service.job_activities_assigned = [job_activity]
+        server_service.save_finished_jobs()
+        self.assertListEqual(fake_job_repository.update_jobs.call_args[0][0], [])
+        self.assertListEqual(fake_job_repository.move_jobs_to_dead_letter.call_args[0][0], [actual_job])
+        self.assertEqual(len(actual_job.attempts), 2)
+
+    def test_save_finished_jobs_succeeded_with_retry_policy(self):
+        fake_job_repository = types.SimpleNamespace()
+        fake_job_repository.update_jobs = mock.MagicMock()
+        server_service = ServerService(None, None, fake_job_repository)
+        job_activity = FakeRetryJobActivity()
+        job_activity.set_job(get_fake_job())
+        job_activity.get_job().status = JobStatus.SUCCESS
+        job_activity.set_started_to_run()
+        job_activity.set_finished()
+        server_service.job_activities_assigned.append(job_activity)
+        server_service.save_finished_jobs()
+        actual_job = fake_job_repository.update_jobs.call_args[0][0][0]
+        self.assertEqual(actual_job.status, JobStatus.SUCCESS)
+        self.assertEqual(len(actual_job.attempts), 1)
+
     def test_untrack_jobs(self):
         server_service = ServerService(None, None, None)
         job_activity_running = types.SimpleNamespace()
@@ -249,20 +823,30 @@ class TestServerService(TestCase):
 
     def test_exists_enqueued_jobs(self):
         fake_job_repository = types.SimpleNamespace()
-        fake_job_repository.exists_jobs_with_status = mock.MagicMock(side_effect=[True, False])
-        server_service = ServerService(None, None, fake_job_repository)
+        fake_job_repository.count_enqueued_jobs = mock.MagicMock(side_effect=[3, 0])
+        server_service = ServerService(ServerConfigurationDto(queues=['cpu']), None, fake_job_repository)
         self.assertTrue(server_service.exists_enqueued_jobs())
         self.assertFalse(server_service.exists_enqueued_jobs())
+        self.assertListEqual(fake_job_repository.count_enqueued_jobs.call_args[0][0], ['cpu'])
 
-    def test_get_next_enqueued_job(self):
+    def test_claim_next_enqueued_job(self):
         fake_job_repository = types.SimpleNamespace()
-        fake_job_repository.get_job_by_status = mock.MagicMock(return_value=get_fake_job())
-        server_service = ServerService(None, None, fake_job_repository)
-        enqueued_job = server_service.get_next_enqueued_job()
-        self.assertIsNotNone(enqueued_job)
-        self.assertIsInstance(enqueued_job, Job)
+        fake_job_repository.claim_job = mock.MagicMock(return_value=get_fake_job())
+        server_service = ServerService(ServerConfigurationDto(lease_milliseconds=30000), None, fake_job_repository)
+        claimed_job = server_service.claim_next_enqueued_job()
+        self.assertIsNotNone(claimed_job)
+        self.assertIsInstance(claimed_job, Job)
+        self.assertEqual(fake_job_repository.claim_job.call_count, 1)
+        self.assertTupleEqual(fake_job_repository.claim_job.call_args[0], (30000, ['default']))
+
+    def test_get_queue_order(self):
+        server_configuration = ServerConfigurationDto(queues=[('cpu', 1), ('latency', 3)])
+        server_service = ServerService(server_configuration, None, None)
+        first_queues = [server_service.get_queue_order()[0] for _ in range(2000)]
+        self.assertSetEqual(set(first_queues), {'cpu', 'latency'})
+        self.assertAlmostEqual(first_queues.count('latency') / len(first_queues), 0.75, delta=0.05)
+        self.assertListEqual(sorted(server_service.get_queue_order()), ['cpu', 'latency'])
 
-    @mock.patch(get_fully_qualified_name('set_job_start_state'))
     @mock.patch(get_fully_qualified_name('log'))
     @mock.patch(get_fully_qualified_name('get_job_activity_instance'))
     @mock.patch(get_fully_qualified_name('add_job_activity_assigned'))
@@ -271,12 +855,10 @@ class TestServerService(TestCase):
         server_service = ServerService(None, None, None)
         job = get_fake_job()
         server_service.run_job(job)
-        self.assertEqual(get_call_count('set_job_start_state', args), 1)
         self.assertEqual(get_call_count('get_job_activity_instance', args), 1)
         self.assertEqual(get_call_count('add_job_activity_assigned', args), 1)
         self.assertEqual(get_call_count('run_job_instance', args), 1)
 
-    @mock.patch(get_fully_qualified_name('set_job_start_state'))
     @mock.patch(get_fully_qualified_name('log'))
     @mock.patch(get_fully_qualified_name('get_job_activity_instance'))
     @mock.patch(get_fully_qualified_name('add_job_activity_assigned'))
@@ -285,7 +867,6 @@ class TestServerService(TestCase):
         server_service = ServerService(None, None, None)
         job = get_fake_job()
         server_service.run_job(job)
-        self.assertEqual(get_call_count('set_job_start_state', args), 1)
         self.assertEqual(get_call_count('get_job_activity_instance', args), 1)
         self.assertEqual(get_call_count('add_job_activity_assigned', args), 1)
         self.assertEqual(get_call_count('run_job_instance', args), 1)
@@ -293,12 +874,22 @@ class TestServerService(TestCase):
         self.assertTrue(actual_log.endswith('run_job_instance exception'))
 
     def test_run_job_instance(self):
-        server_service = ServerService(None, None, None)
+        job_executor = mock.MagicMock(spec=JobExecutor)
+        server_service = ServerService(ServerConfigurationDto(), None, None, None, job_executor)
         job_activity = mock.MagicMock(spec=JobActivityBase)
-        job_activity.start = mock.MagicMock()
-        self.assertEqual(job_activity.start.call_count, 0)
+        self.assertEqual(job_executor.submit.call_count, 0)
         server_service.run_job_instance(job_activity)
-        self.assertEqual(job_activity.start.call_count, 1)
+        self.assertEqual(job_executor.submit.call_args[0][0], job_activity)
+
+    def test_run_job_instance_async(self):
+        job_executor = mock.MagicMock(spec=JobExecutor)
+        server_service = ServerService(ServerConfigurationDto(async_slots=10), None, None, None, job_executor)
+        server_service.async_job_executor = mock.MagicMock(spec=JobExecutor)
+        server_service.run_job_instance(FakeJobActivity())
+        self.assertEqual(job_executor.submit.call_count, 1)
+        server_service.run_job_instance(FakeAsyncJobActivity())
+        self.assertEqual(job_executor.submit.call_count, 1)
+        self.assertEqual(server_service.async_job_executor.submit.call_count, 1)
 
     def test_add_job_activity_assigned(self):
         server_service = ServerService(None, None, None)
@@ -347,25 +938,6 @@ class TestServerService(TestCase):
         self.assertEqual(server_service.server.stop_datetime, '1988-04-10T11:01:02.123456')
         self.assertEqual(fake_server_repository.update_server.call_count, 1)
 
-    @freeze_time('1988-04-10 11:01:02.123456')
-    def test_set_job_start_state(self):
-        fake_job_repository = types.SimpleNamespace()
-        fake_job_repository.update_job = mock.MagicMock()
-        job = get_fake_job()
-        server_service = ServerService(None, None, fake_job_repository)
-        server_service.set_job_start_state(job)
-        self.assertEqual(job.start_datetime, '1988-04-10T11:01:02.123456')
-        self.assertEqual(job.status, JobStatus.PROCESSING)
-        self.assertEqual(fake_job_repository.update_job.call_count, 1)
-
-    def test_try_set_lock_on_job(self):
-        fake_job_repository = types.SimpleNamespace()
-        fake_job_repository.try_set_lock_on_job = mock.MagicMock(side_effect=[True, False])
-        server_service = ServerService(None, None, fake_job_repository)
-        job = get_fake_job()
-        self.assertTrue(server_service.try_set_lock_on_job(job))
-        self.assertFalse(server_service.try_set_lock_on_job(job))
-
     @mock.patch(get_fully_qualified_name('log_stop'))
     def test_stop(self, *args):
         server_service = ServerService(None, None, None)
@@ -0,0 +1,114 @@
+import hangpy.tests.fake as fake
+import os
+import subprocess
+import sys
+import time
+from hangpy.enums import JobStatus
+from hangpy.services import ThreadPoolJobExecutor
+from hangpy.services.thread_pool_job_executor import DaemonThreadPoolExecutor
+from unittest import TestCase, main
+
+ABANDONED_JOB_SCRIPT = '''
+import time
+import hangpy.tests.fake as fake
+from hangpy.services import ThreadPoolJobExecutor
+
+job_executor = ThreadPoolJobExecutor(cancellation_grace_seconds=0.05)
+job_executor.start(1)
+job_activity = fake.FakeHungJobActivity()
+job_activity.set_job(job_activity.create_job_object())
+job_activity.sleep_seconds = 60
+job_executor.submit(job_activity)
+job_activity.cancel('The job was cancelled')
+job_executor.cancel(job_activity)
+while (not job_activity.is_finished()):
+    time.sleep(0.01)
+job_executor.shutdown()
+'''
+
+
+def get_job_activity(job_activity_class):
+    job_activity = job_activity_class()
+    job_activity.set_job(job_activity.create_job_object())
+    return job_activity
+
+
+class TestThreadPoolJobExecutor(TestCase):
+
+    def test_submit(self):
+        job_executor = ThreadPoolJobExecutor()
+        job_executor.start(2)
+        job_activities = [get_job_activity(fake.FakeJobActivity),
+                          get_job_activity(fake.FakeAsyncJobActivity),
+                          get_job_activity(fake.FakeErrorJobActivity)]
+        for job_activity in job_activities:
+            job_executor.submit(job_activity)
+        job_executor.shutdown()
+        self.assertTrue(all(job_activity.is_finished() for job_activity in job_activities))
+        self.assertEqual(job_activities[0].get_job().status, JobStatus.SUCCESS)
+        self.assertEqual(job_activities[1].get_job().status, JobStatus.SUCCESS)
+        self.assertEqual(job_activities[2].get_job().status, JobStatus.ERROR)
+
+    def test_cancel_cooperative_activity(self):
+        job_executor = ThreadPoolJobExecutor(cancellation_grace_seconds=10)
+        job_executor.start(1)
+        job_activity = get_job_activity(fake.FakeCancellableJobActivity)
+        job_executor.submit(job_activity)
+        job_activity.cancel('The job timed out', JobStatus.ERROR)
+        job_executor.cancel(job_activity)
+        job_executor.shutdown()
+        self.assertTrue(job_activity.is_finished())
+        self.assertEqual(job_activity.get_job().status, JobStatus.ERROR)
+        self.assertEqual(job_activity.get_job().error, 'The job timed out')
+
+    def test_cancel_hung_activity(self):
+        job_executor = ThreadPoolJobExecutor(cancellation_grace_seconds=0.05)
+        job_executor.start(1)
+        job_activity = get_job_activity(fake.FakeHungJobActivity)
+        job_activity.sleep_seconds = 0.5
+        job_executor.submit(job_activity)
+        thread_pool = job_executor.thread_pool
+        job_activity.cancel('The job was cancelled')
+        job_executor.cancel(job_activity)
+        while (not job_activity.is_finished()):
+            time.sleep(0.01)
+        job = job_activity.get_job()
+        end_datetime = job.end_datetime
+        self.assertEqual(job.status, JobStatus.CANCELLED)
+        self.assertIsNot(job_executor.thread_pool, thread_pool)
+        for thread in thread_pool.threads:
+            thread.join()
+        self.assertIs(job_activity.get_job(), job)
+        self.assertEqual(job.end_datetime, end_datetime)
+        other_job_activity = get_job_activity(fake.FakeJobActivity)
+        job_executor.submit(other_job_activity)
+        job_executor.shutdown()
+        self.assertTrue(other_job_activity.is_finished())
+
+    def test_exit_with_abandoned_activity(self):
+        root_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+        time_start = time.monotonic()
+        completed_process = subprocess.run([sys.executable, '-c', ABANDONED_JOB_SCRIPT], cwd=root_path, timeout=30)
+        self.assertEqual(completed_process.returncode, 0)
+        self.assertLess(time.monotonic() - time_start, 10)
+
+    def test_daemon_thread_pool(self):
+        thread_pool = DaemonThreadPoolExecutor(2)
+        futures = [thread_pool.submit(pow, 2, exponent) for exponent in range(5)]
+        error_future = thread_pool.submit(int, 'A')
+        self.assertListEqual([future.result() for future in futures], [1, 2, 4, 8, 16])
+        self.assertIsInstance(error_future.exception(), ValueError)
+        self.assertLessEqual(len(thread_pool.threads), 2)
+        self.assertTrue(all(thread.daemon for thread in thread_pool.threads))
+        thread_pool.shutdown()
+        self.assertFalse(any(thread.is_alive() for thread in thread_pool.threads))
+        with self.assertRaises(RuntimeError):
+            thread_pool.submit(pow, 2, 1)
+
+    def test_shutdown_without_start(self):
+        job_executor = ThreadPoolJobExecutor()
+        self.assertIsNone(job_executor.shutdown())
+
+
+if (__name__ == "__main__"):
+    main()
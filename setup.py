@@ -22,7 +22,7 @@ setup(
     python_requires='>=3.9',
     install_requires=[
         'jsonpickle>=2.0.0',
-        'redis>=3.5.3'
+        'redis>=6.1.0'
     ],
     packages=find_packages(),
     )